@@ -5,10 +5,14 @@ This module provides the controller layer for the Metis API, handling
 the business logic between API routes and the task manager.
 """
 
+from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple, Set, Union
 from fastapi import HTTPException, Depends, Query, Path, Body, status
+from fastapi import status as http_status  # For methods with a `status` filter argument
 
 from metis.core.task_manager import TaskManager
+from metis.core.storage import encode_cursor
+from metis.core.changes import TASK, Change
 from metis.models.task import Task
 from metis.models.dependency import Dependency
 from metis.models.subtask import Subtask
@@ -16,9 +20,11 @@ from metis.models.requirement import RequirementRef
 from metis.api.schemas import (
     TaskCreate, TaskUpdate, TaskResponse, TaskListResponse,
     TaskDetailResponse, DependencyCreate, DependencyUpdate,
-    DependencyResponse, DependencyListResponse, SubtaskCreate,
-    SubtaskUpdate, RequirementRefCreate, RequirementRefUpdate,
-    ApiResponse
+    DependencyResponse, DependencyListResponse, DependencyAnalysisResponse, CriticalPathResponse,
+    ReachableTaskResponse, ReachableTaskListResponse, DependencyDistanceResponse,
+    SubtaskCreate, SubtaskUpdate, SubtaskMove, SubtaskResponse, RequirementRefCreate,
+    RequirementRefUpdate, ApiResponse, TaskStatisticsResponse, NamespaceListResponse,
+    ChangeResponse, ChangeListResponse
 )
 
 
@@ -42,22 +48,25 @@ class TaskController:
     
     # Task endpoints
     
-    async def create_task(self, task_create: TaskCreate) -> TaskResponse:
+    async def create_task(self, task_create: TaskCreate, namespace: Optional[str] = None) -> TaskResponse:
         """
         Create a new task.
         
         Args:
             task_create: Task creation schema
-            
+            namespace: Namespace to create the task in, overriding the one in task_create
+        
         Returns:
             TaskResponse: Created task
-            
+        
         Raises:
             HTTPException: If task creation fails
         """
         try:
             # Convert to Task model
             task_data = task_create.dict()
+            if namespace:
+                task_data["namespace"] = namespace
             
             # Create task
             task = await self.task_manager.create_task(task_data)
@@ -81,10 +90,10 @@ class TaskController:
         
         Args:
             task_id: ID of the task to retrieve
-            
+        
         Returns:
             TaskDetailResponse: Task detail response
-            
+        
         Raises:
             HTTPException: If task is not found
         """
@@ -108,10 +117,10 @@ class TaskController:
         Args:
             task_id: ID of the task to update
             task_update: Task update schema
-            
+        
         Returns:
             TaskResponse: Updated task
-            
+        
         Raises:
             HTTPException: If task is not found or update fails
         """
@@ -146,10 +155,10 @@ class TaskController:
         
         Args:
             task_id: ID of the task to delete
-            
+        
         Returns:
             ApiResponse: Success response
-            
+        
         Raises:
             HTTPException: If task is not found or delete fails
         """
@@ -176,6 +185,31 @@ class TaskController:
                 detail=f"Failed to delete task: {str(e)}"
             )
     
+    async def list_ready_tasks(self, limit: int = 50, namespace: Optional[str] = None) -> TaskListResponse:
+        """
+        List pending tasks whose dependencies are all done.
+        
+        Args:
+            limit: Maximum number of tasks to return
+            namespace: Only list tasks in this namespace
+        
+        Returns:
+            TaskListResponse: Ready tasks, highest priority first, then oldest first
+        """
+        try:
+            tasks = await self.task_manager.list_ready_tasks(limit=limit, namespace=namespace)
+            return TaskListResponse(
+                success=True,
+                tasks=[self._task_to_response(task) for task in tasks],
+                total=len(tasks),
+                page_size=limit
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to list ready tasks: {str(e)}"
+            )
+    
     async def list_tasks(
         self,
         status: Optional[str] = None,
@@ -184,7 +218,13 @@ class TaskController:
         tag: Optional[str] = None,
         search: Optional[str] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        sort: str = "updated_at",
+        cursor: Optional[str] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        include_archived: bool = False,
+        namespace: Optional[str] = None
     ) -> TaskListResponse:
         """
         List tasks with optional filtering.
@@ -194,12 +234,21 @@ class TaskController:
             priority: Filter by priority
             assignee: Filter by assignee
             tag: Filter by tag
-            search: Search term for title/description
+            search: Search terms for title/description/details
             page: Page number
             page_size: Page size
-            
+            sort: Sort order ("updated_at", "relevance" or "due_date")
+            cursor: Opaque cursor from a previous response's next_cursor
+            due_after: Only tasks due at or after this time
+            due_before: Only tasks due before this time
+            include_archived: Whether to also search archived tasks
+            namespace: Only list tasks in this namespace
+        
         Returns:
             TaskListResponse: List of tasks and metadata
+        
+        Raises:
+            HTTPException: If the query is invalid or listing fails
         """
         try:
             # Get tasks from manager
@@ -210,22 +259,39 @@ class TaskController:
                 tag=tag,
                 search=search,
                 page=page,
-                page_size=page_size
+                page_size=page_size,
+                sort=sort,
+                cursor=cursor,
+                due_after=due_after,
+                due_before=due_before,
+                include_archived=include_archived,
+                namespace=namespace
             )
             
             # Convert to response schema
             task_responses = [self._task_to_response(task) for task in tasks]
             
+            # A full page may have more results after it
+            next_cursor = None
+            if sort == "updated_at" and len(tasks) == page_size:
+                next_cursor = encode_cursor(tasks[-1])
+            
             return TaskListResponse(
                 success=True,
                 tasks=task_responses,
                 total=total,
                 page=page,
-                page_size=page_size
+                page_size=page_size,
+                next_cursor=next_cursor
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
             )
         except Exception as e:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to list tasks: {str(e)}"
             )
     
@@ -238,10 +304,10 @@ class TaskController:
         Args:
             task_id: ID of the parent task
             subtask_create: Subtask creation schema
-            
+        
         Returns:
             TaskResponse: Updated task with new subtask
-            
+        
         Raises:
             HTTPException: If task is not found or subtask creation fails
         """
@@ -273,6 +339,48 @@ class TaskController:
                 detail=f"Failed to add subtask: {str(e)}"
             )
     
+    async def add_subtasks(self, task_id: str, subtask_creates: List[SubtaskCreate]) -> TaskResponse:
+        """
+        Add several subtasks to a task at once.
+        
+        Args:
+            task_id: ID of the parent task
+            subtask_creates: Subtask creation schemas, in order
+        
+        Returns:
+            TaskResponse: Updated task with the new subtasks
+        
+        Raises:
+            HTTPException: If task is not found or subtask creation fails
+        """
+        try:
+            subtasks = await self.task_manager.add_subtasks(
+                task_id, [subtask_create.dict() for subtask_create in subtask_creates]
+            )
+            if subtasks is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Task not found: {task_id}"
+                )
+            
+            # Get updated task
+            task = await self.task_manager.get_task(task_id)
+            
+            # Convert to response schema
+            return self._task_to_response(task)
+        except HTTPException:
+            raise
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to add subtasks: {str(e)}"
+            )
+    
     async def update_subtask(
         self, task_id: str, subtask_id: str, subtask_update: SubtaskUpdate
     ) -> TaskResponse:
@@ -283,10 +391,10 @@ class TaskController:
             task_id: ID of the parent task
             subtask_id: ID of the subtask to update
             subtask_update: Subtask update schema
-            
+        
         Returns:
             TaskResponse: Updated task
-            
+        
         Raises:
             HTTPException: If task or subtask is not found or update fails
         """
@@ -318,6 +426,44 @@ class TaskController:
                 detail=f"Failed to update subtask: {str(e)}"
             )
     
+    async def move_subtask(self, task_id: str, subtask_move: SubtaskMove) -> SubtaskResponse:
+        """
+        Move a subtask within its task.
+        
+        Args:
+            task_id: ID of the parent task
+            subtask_move: Subtask move schema
+        
+        Returns:
+            SubtaskResponse: Moved subtask with its new rank
+        
+        Raises:
+            HTTPException: If task or subtask is not found or the move fails
+        """
+        try:
+            subtask = await self.task_manager.move_subtask(
+                task_id, subtask_move.subtask_id, subtask_move.after_id
+            )
+            if not subtask:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Subtask not found: {subtask_move.subtask_id}"
+                )
+            
+            return self._subtask_to_response(subtask)
+        except HTTPException:
+            raise
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to move subtask: {str(e)}"
+            )
+    
     async def remove_subtask(self, task_id: str, subtask_id: str) -> TaskResponse:
         """
         Remove a subtask from a task.
@@ -325,10 +471,10 @@ class TaskController:
         Args:
             task_id: ID of the parent task
             subtask_id: ID of the subtask to remove
-            
+        
         Returns:
             TaskResponse: Updated task
-            
+        
         Raises:
             HTTPException: If task or subtask is not found or removal fails
         """
@@ -363,10 +509,10 @@ class TaskController:
         Args:
             task_id: ID of the task
             req_ref_create: Requirement reference creation schema
-            
+        
         Returns:
             TaskResponse: Updated task with new requirement reference
-            
+        
         Raises:
             HTTPException: If task is not found or reference creation fails
         """
@@ -408,10 +554,10 @@ class TaskController:
             task_id: ID of the task
             ref_id: ID of the requirement reference to update
             req_ref_update: Requirement reference update schema
-            
+        
         Returns:
             TaskResponse: Updated task
-            
+        
         Raises:
             HTTPException: If task or reference is not found or update fails
         """
@@ -450,10 +596,10 @@ class TaskController:
         Args:
             task_id: ID of the task
             ref_id: ID of the requirement reference to remove
-            
+        
         Returns:
             TaskResponse: Updated task
-            
+        
         Raises:
             HTTPException: If task or reference is not found or removal fails
         """
@@ -485,10 +631,10 @@ class TaskController:
         
         Args:
             dependency_create: Dependency creation schema
-            
+        
         Returns:
             DependencyResponse: Created dependency
-            
+        
         Raises:
             HTTPException: If dependency creation fails
         """
@@ -518,10 +664,10 @@ class TaskController:
         
         Args:
             dependency_id: ID of the dependency to retrieve
-            
+        
         Returns:
             DependencyResponse: Dependency response
-            
+        
         Raises:
             HTTPException: If dependency is not found
         """
@@ -544,10 +690,10 @@ class TaskController:
         Args:
             dependency_id: ID of the dependency to update
             dependency_update: Dependency update schema
-            
+        
         Returns:
             DependencyResponse: Updated dependency
-            
+        
         Raises:
             HTTPException: If dependency is not found or update fails
         """
@@ -582,10 +728,10 @@ class TaskController:
         
         Args:
             dependency_id: ID of the dependency to delete
-            
+        
         Returns:
             ApiResponse: Success response
-            
+        
         Raises:
             HTTPException: If dependency is not found or delete fails
         """
@@ -618,7 +764,7 @@ class TaskController:
         Args:
             task_id: Filter by source or target task ID
             dependency_type: Filter by dependency type
-            
+        
         Returns:
             DependencyListResponse: List of dependencies
         """
@@ -645,33 +791,289 @@ class TaskController:
                 detail=f"Failed to list dependencies: {str(e)}"
             )
     
+    async def analyze_dependencies(self, namespace: Optional[str] = None) -> DependencyAnalysisResponse:
+        """
+        Report every dependency cycle and missing dependency.
+        
+        Args:
+            namespace: Only analyze tasks in this namespace
+        
+        Returns:
+            DependencyAnalysisResponse: Cycle groups and missing dependencies
+        """
+        try:
+            analysis = await self.task_manager.analyze_dependencies(namespace=namespace)
+            return DependencyAnalysisResponse(success=True, **analysis)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to analyze dependencies: {str(e)}"
+            )
+    
+    async def get_critical_path(self, namespace: str) -> CriticalPathResponse:
+        """
+        Get the critical path and slack of a namespace.
+        
+        Args:
+            namespace: Namespace to schedule
+        
+        Returns:
+            CriticalPathResponse: Critical path, project duration and slack
+        
+        Raises:
+            HTTPException: If there are cyclic dependencies
+        """
+        try:
+            schedule = await self.task_manager.get_critical_path(namespace)
+            return CriticalPathResponse(success=True, namespace=namespace, **schedule)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to compute critical path: {str(e)}"
+            )
+    
+    async def list_reachable_tasks(
+        self,
+        task_id: str,
+        direction: str,
+        max_depth: Optional[int] = None,
+        limit: int = 1000
+    ) -> ReachableTaskListResponse:
+        """
+        List the tasks downstream or upstream of a task.
+        
+        Args:
+            task_id: ID of the task
+            direction: "downstream" for tasks that depend on the task,
+                "upstream" for tasks it depends on
+            max_depth: Only follow this many dependency links (None for no limit)
+            limit: Maximum number of tasks to return
+        
+        Returns:
+            ReachableTaskListResponse: Reached tasks, nearest first
+        
+        Raises:
+            HTTPException: If task is not found
+        """
+        if not await self.task_manager.get_task(task_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Task not found: {task_id}"
+            )
+        
+        try:
+            if direction == "downstream":
+                reached, total = await self.task_manager.list_downstream_tasks(task_id, max_depth, limit)
+            else:
+                reached, total = await self.task_manager.list_upstream_tasks(task_id, max_depth, limit)
+            return ReachableTaskListResponse(
+                success=True,
+                task_id=task_id,
+                direction=direction,
+                max_depth=max_depth,
+                tasks=[
+                    ReachableTaskResponse(
+                        id=task.id,
+                        title=task.title,
+                        status=task.status,
+                        priority=task.priority,
+                        depth=depth
+                    )
+                    for task, depth in reached
+                ],
+                total=total
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to list {direction} tasks: {str(e)}"
+            )
+    
+    async def get_dependency_distance(self, upstream_id: str, downstream_id: str) -> DependencyDistanceResponse:
+        """
+        Check whether a task depends on another, directly or transitively.
+        
+        Args:
+            upstream_id: ID of the task depended on
+            downstream_id: ID of the task that may depend on it
+        
+        Returns:
+            DependencyDistanceResponse: Whether and how closely the tasks are linked
+        
+        Raises:
+            HTTPException: If either task is not found
+        """
+        for task_id in (upstream_id, downstream_id):
+            if not await self.task_manager.get_task(task_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Task not found: {task_id}"
+                )
+        
+        distance = await self.task_manager.get_dependency_distance(upstream_id, downstream_id)
+        return DependencyDistanceResponse(
+            success=True,
+            upstream_id=upstream_id,
+            downstream_id=downstream_id,
+            depends=distance is not None,
+            distance=distance
+        )
+    
+    # Statistics endpoints
+    
+    async def get_statistics(self, namespace: Optional[str] = None) -> TaskStatisticsResponse:
+        """
+        Get live task statistics.
+        
+        Args:
+            namespace: Only count tasks in this namespace
+        
+        Returns:
+            TaskStatisticsResponse: Task counts and overdue counts
+        """
+        try:
+            statistics = await self.task_manager.get_statistics(namespace=namespace)
+            return TaskStatisticsResponse(success=True, **statistics)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to get statistics: {str(e)}"
+            )
+    
+    # Namespace endpoints
+    
+    async def list_namespaces(self) -> NamespaceListResponse:
+        """
+        List the namespaces that have tasks.
+        
+        Returns:
+            NamespaceListResponse: Number of tasks by namespace
+        """
+        try:
+            namespaces = await self.task_manager.list_namespaces()
+            return NamespaceListResponse(success=True, namespaces=namespaces)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to list namespaces: {str(e)}"
+            )
+    
+    async def get_changes(self, since: Optional[int] = None, limit: int = 1000) -> ChangeListResponse:
+        """
+        Get the changes made after a sequence number.
+        
+        Args:
+            since: Last sequence number the client has seen; if omitted, only
+                the latest sequence number is returned to start syncing from
+            limit: Maximum number of changes to return
+        
+        Returns:
+            ChangeListResponse: Changes in sequence order and the sequence to resume from
+        
+        Raises:
+            HTTPException: 410 if the changes are no longer available and the
+                client must reload its state
+        """
+        since, result = await self.task_manager.get_changes(since, limit)
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail=f"Changes since sequence {since} are no longer available; reload tasks and resync"
+            )
+        
+        changes, has_more = result
+        latest_sequence = changes[-1].sequence if changes else since
+        return ChangeListResponse(
+            success=True,
+            changes=[self._change_to_response(change) for change in changes],
+            latest_sequence=latest_sequence,
+            has_more=has_more
+        )
+    
     # Conversion methods
     
+    def _change_to_response(self, change: Change) -> ChangeResponse:
+        """
+        Convert a Change to a ChangeResponse schema.
+        
+        Args:
+            change: Change feed entry
+        
+        Returns:
+            ChangeResponse: Change response schema
+        """
+        response = ChangeResponse(
+            sequence=change.sequence,
+            type=change.entity_type,
+            id=change.entity_id,
+            op=change.op,
+            timestamp=change.timestamp
+        )
+        if change.entity is not None:
+            if change.entity_type == TASK:
+                response.task = self._task_to_response(change.entity)
+            else:
+                response.dependency = self._dependency_to_response(change.entity)
+        return response
+    
     def _task_to_response(self, task: Task) -> TaskResponse:
         """
         Convert a Task model to a TaskResponse schema.
         
+        The response is cached per task revision, so unchanged tasks are
+        not converted again for every listing or change feed page.
+        
         Args:
             task: Task model
-            
+        
+        Returns:
+            TaskResponse: Task response schema (shared; must not be modified)
+        """
+        return task.derived("api_response", self._build_task_response)
+    
+    @staticmethod
+    def _subtask_to_response(subtask: Subtask) -> SubtaskResponse:
+        """
+        Convert a Subtask model to a SubtaskResponse schema.
+        
+        Args:
+            subtask: Subtask model
+        
+        Returns:
+            SubtaskResponse: Subtask response schema
+        """
+        return SubtaskResponse(
+            id=subtask.id,
+            title=subtask.title,
+            description=subtask.description,
+            status=subtask.status,
+            order=subtask.order,
+            rank=subtask.rank,
+            created_at=subtask.created_at,
+            updated_at=subtask.updated_at
+        )
+    
+    @staticmethod
+    def _build_task_response(task: Task) -> TaskResponse:
+        """
+        Build the TaskResponse schema of a task.
+        
+        Args:
+            task: Task model
+        
         Returns:
             TaskResponse: Task response schema
         """
         # Handle nested objects
-        from metis.api.schemas import SubtaskResponse, RequirementRefResponse, ComplexityScoreResponse
+        from metis.api.schemas import RequirementRefResponse, ComplexityScoreResponse
         
         # Convert subtasks
-        subtask_responses = []
-        for subtask in task.subtasks:
-            subtask_responses.append(SubtaskResponse(
-                id=subtask.id,
-                title=subtask.title,
-                description=subtask.description,
-                status=subtask.status,
-                order=subtask.order,
-                created_at=subtask.created_at,
-                updated_at=subtask.updated_at
-            ))
+        subtask_responses = [TaskController._subtask_to_response(subtask) for subtask in task.subtasks]
         
         # Convert requirement references
         req_ref_responses = []
@@ -735,7 +1137,8 @@ class TaskController:
             subtasks=subtask_responses,
             requirement_refs=req_ref_responses,
             complexity=complexity_response,
-            progress=progress
+            progress=progress,
+            namespace=task.namespace
         )
     
     def _dependency_to_response(self, dependency: Dependency) -> DependencyResponse:
@@ -744,7 +1147,7 @@ class TaskController:
         
         Args:
             dependency: Dependency model
-            
+        
         Returns:
             DependencyResponse: Dependency response schema
         """
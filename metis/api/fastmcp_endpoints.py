@@ -87,22 +87,18 @@ async def get_task_status() -> Dict[str, Any]:
     """
     try:
         # Import here to avoid circular imports
-        from metis.api.routes import task_manager
+        from metis.core.mcp.tools import get_task_manager
+        task_manager = get_task_manager()
         
-        # Get all tasks
-        all_tasks = await task_manager.list_tasks()
-        
-        # Calculate status summary
-        status_counts = {}
-        for task in all_tasks:
-            status_counts[task.status] = status_counts.get(task.status, 0) + 1
+        # Counts are maintained by storage, so no tasks are scanned
+        statistics = await task_manager.get_statistics()
         
         return {
             "success": True,
             "status": "operational",
             "service": "metis-task-management",
-            "total_tasks": len(all_tasks),
-            "status_breakdown": status_counts,
+            "total_tasks": statistics["total_tasks"],
+            "status_breakdown": statistics["by_status"],
             "capabilities": [
                 "task_management",
                 "dependency_management", 
@@ -126,7 +122,7 @@ async def execute_task_workflow(
     Args:
         workflow_name: Name of the workflow to execute
         parameters: Parameters for the workflow
-        
+    
     Returns:
         Dictionary containing workflow execution results
     """
@@ -5,6 +5,7 @@ This module defines the FastAPI routes for the Metis API, mapping HTTP
 endpoints to controller methods.
 """
 
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, Depends, Query, Path, Body, HTTPException, WebSocket, status, Request
 
@@ -12,9 +13,11 @@ from metis.api.controllers import TaskController
 from metis.api.schemas import (
     TaskCreate, TaskUpdate, TaskResponse, TaskListResponse,
     TaskDetailResponse, DependencyCreate, DependencyUpdate,
-    DependencyResponse, DependencyListResponse, SubtaskCreate,
-    SubtaskUpdate, RequirementRefCreate, RequirementRefUpdate,
-    ApiResponse, WebSocketMessage, WebSocketRegistration
+    DependencyResponse, DependencyListResponse, DependencyAnalysisResponse, CriticalPathResponse,
+    ReachableTaskListResponse, DependencyDistanceResponse, SubtaskCreate, SubtaskUpdate, SubtaskMove, SubtaskResponse, RequirementRefCreate,
+    RequirementRefUpdate, ApiResponse, TaskStatisticsResponse, NamespaceListResponse,
+    ChangeListResponse, WebSocketMessage,
+    WebSocketRegistration
 )
 from metis.core.mcp.tools import decompose_task as mcp_decompose_task
 
@@ -54,6 +57,22 @@ async def create_task(
     return await controller.create_task(task_create)
 
 
+@router.get(
+    "/tasks/ready",
+    response_model=TaskListResponse,
+    summary="List ready tasks",
+    description="List pending tasks whose dependencies are all done, highest priority first, then oldest first",
+    tags=["Tasks"]
+)
+async def list_ready_tasks(
+    limit: int = Query(50, title="Maximum number of tasks", ge=1, le=100),
+    namespace: Optional[str] = Query(None, title="Filter by namespace"),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """List tasks that can start now."""
+    return await controller.list_ready_tasks(limit=limit, namespace=namespace)
+
+
 @router.get(
     "/tasks/{task_id}",
     response_model=TaskDetailResponse,
@@ -112,9 +131,15 @@ async def list_tasks(
     priority: Optional[str] = Query(None, title="Filter by priority"),
     assignee: Optional[str] = Query(None, title="Filter by assignee"),
     tag: Optional[str] = Query(None, title="Filter by tag"),
-    search: Optional[str] = Query(None, title="Search term for title/description"),
+    search: Optional[str] = Query(None, title="Search terms for title/description/details"),
     page: int = Query(1, title="Page number", ge=1),
     page_size: int = Query(50, title="Page size", ge=1, le=100),
+    sort: str = Query("updated_at", title="Sort order", enum=["updated_at", "relevance", "due_date"]),
+    cursor: Optional[str] = Query(None, title="Cursor from the previous page's next_cursor"),
+    due_after: Optional[datetime] = Query(None, title="Only tasks due at or after this time"),
+    due_before: Optional[datetime] = Query(None, title="Only tasks due before this time"),
+    include_archived: bool = Query(False, title="Also search archived tasks"),
+    namespace: Optional[str] = Query(None, title="Filter by namespace"),
     controller: TaskController = Depends(get_task_controller)
 ):
     """List tasks with filtering."""
@@ -125,7 +150,13 @@ async def list_tasks(
         tag=tag,
         search=search,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        sort=sort,
+        cursor=cursor,
+        due_after=due_after,
+        due_before=due_before,
+        include_archived=include_archived,
+        namespace=namespace
     )
 
 
@@ -147,6 +178,38 @@ async def add_subtask(
     return await controller.add_subtask(task_id, subtask_create)
 
 
+@router.post(
+    "/tasks/{task_id}/subtasks/batch",
+    response_model=TaskResponse,
+    summary="Add several subtasks",
+    description="Add a list of subtasks to a task in one update",
+    tags=["Subtasks"]
+)
+async def add_subtasks(
+    subtask_creates: List[SubtaskCreate],
+    task_id: str = Path(..., title="The ID of the parent task"),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """Add several subtasks to a task."""
+    return await controller.add_subtasks(task_id, subtask_creates)
+
+
+@router.patch(
+    "/tasks/{task_id}/subtasks/order",
+    response_model=SubtaskResponse,
+    summary="Move a subtask",
+    description="Move a subtask after a sibling, or to the front, changing only its rank",
+    tags=["Subtasks"]
+)
+async def move_subtask(
+    subtask_move: SubtaskMove,
+    task_id: str = Path(..., title="The ID of the parent task"),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """Move a subtask within its task."""
+    return await controller.move_subtask(task_id, subtask_move)
+
+
 @router.put(
     "/tasks/{task_id}/subtasks/{subtask_id}",
     response_model=TaskResponse,
@@ -249,6 +312,21 @@ async def create_dependency(
     return await controller.create_dependency(dependency_create)
 
 
+@router.get(
+    "/dependencies/analysis",
+    response_model=DependencyAnalysisResponse,
+    summary="Analyze dependencies",
+    description="Report every group of cyclically dependent tasks, the dependencies whose removal breaks each group, and every missing dependency",
+    tags=["Dependencies"]
+)
+async def analyze_dependencies(
+    namespace: Optional[str] = Query(None, title="Only analyze tasks in this namespace"),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """Analyze dependencies for cycles and missing tasks."""
+    return await controller.analyze_dependencies(namespace=namespace)
+
+
 @router.get(
     "/dependencies/{dependency_id}",
     response_model=DependencyResponse,
@@ -329,6 +407,197 @@ async def list_task_dependencies(
     return await controller.list_dependencies(task_id=task_id)
 
 
+@router.get(
+    "/tasks/{task_id}/downstream",
+    response_model=ReachableTaskListResponse,
+    summary="List downstream tasks",
+    description="List the tasks that depend on a task, directly or transitively, nearest first",
+    tags=["Dependencies"]
+)
+async def list_downstream_tasks(
+    task_id: str = Path(..., title="The ID of the task"),
+    max_depth: Optional[int] = Query(None, title="Maximum number of dependency links to follow", ge=1),
+    limit: int = Query(1000, title="Maximum number of tasks", ge=1, le=10000),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """List the tasks affected if a task slips."""
+    return await controller.list_reachable_tasks(task_id, "downstream", max_depth=max_depth, limit=limit)
+
+
+@router.get(
+    "/tasks/{task_id}/downstream/{other_task_id}",
+    response_model=DependencyDistanceResponse,
+    summary="Check a downstream task",
+    description="Check whether a task depends on another, directly or transitively",
+    tags=["Dependencies"]
+)
+async def get_dependency_distance(
+    task_id: str = Path(..., title="The ID of the upstream task"),
+    other_task_id: str = Path(..., title="The ID of the task that may depend on it"),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """Check whether one task is upstream of another."""
+    return await controller.get_dependency_distance(task_id, other_task_id)
+
+
+@router.get(
+    "/tasks/{task_id}/upstream",
+    response_model=ReachableTaskListResponse,
+    summary="List upstream tasks",
+    description="List the tasks a task depends on, directly or transitively, nearest first",
+    tags=["Dependencies"]
+)
+async def list_upstream_tasks(
+    task_id: str = Path(..., title="The ID of the task"),
+    max_depth: Optional[int] = Query(None, title="Maximum number of dependency links to follow", ge=1),
+    limit: int = Query(1000, title="Maximum number of tasks", ge=1, le=10000),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """List the tasks a task waits on."""
+    return await controller.list_reachable_tasks(task_id, "upstream", max_depth=max_depth, limit=limit)
+
+
+# Statistics routes
+
+@router.get(
+    "/stats",
+    response_model=TaskStatisticsResponse,
+    summary="Get task statistics",
+    description="Get live task counts by status, priority, assignee, tag and complexity, plus overdue counts",
+    tags=["Statistics"]
+)
+async def get_statistics(
+    controller: TaskController = Depends(get_task_controller)
+):
+    """Get task statistics."""
+    return await controller.get_statistics()
+
+
+# Namespace routes
+
+@router.get(
+    "/namespaces",
+    response_model=NamespaceListResponse,
+    summary="List namespaces",
+    description="List the namespaces that have tasks, with their task counts",
+    tags=["Namespaces"]
+)
+async def list_namespaces(
+    controller: TaskController = Depends(get_task_controller)
+):
+    """List namespaces."""
+    return await controller.list_namespaces()
+
+
+@router.get(
+    "/namespaces/{namespace}/tasks",
+    response_model=TaskListResponse,
+    summary="List the tasks of a namespace",
+    description="List tasks in one namespace with optional filtering",
+    tags=["Namespaces"]
+)
+async def list_namespace_tasks(
+    namespace: str = Path(..., title="The namespace to list"),
+    status: Optional[str] = Query(None, title="Filter by status"),
+    priority: Optional[str] = Query(None, title="Filter by priority"),
+    assignee: Optional[str] = Query(None, title="Filter by assignee"),
+    tag: Optional[str] = Query(None, title="Filter by tag"),
+    search: Optional[str] = Query(None, title="Search terms for title/description/details"),
+    page: int = Query(1, title="Page number", ge=1),
+    page_size: int = Query(50, title="Page size", ge=1, le=100),
+    sort: str = Query("updated_at", title="Sort order", enum=["updated_at", "relevance", "due_date"]),
+    cursor: Optional[str] = Query(None, title="Cursor from the previous page's next_cursor"),
+    due_after: Optional[datetime] = Query(None, title="Only tasks due at or after this time"),
+    due_before: Optional[datetime] = Query(None, title="Only tasks due before this time"),
+    include_archived: bool = Query(False, title="Also search archived tasks"),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """List the tasks of a namespace."""
+    return await controller.list_tasks(
+        status=status,
+        priority=priority,
+        assignee=assignee,
+        tag=tag,
+        search=search,
+        page=page,
+        page_size=page_size,
+        sort=sort,
+        cursor=cursor,
+        due_after=due_after,
+        due_before=due_before,
+        include_archived=include_archived,
+        namespace=namespace
+    )
+
+
+@router.post(
+    "/namespaces/{namespace}/tasks",
+    response_model=TaskResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a task in a namespace",
+    description="Create a new task in the given namespace",
+    tags=["Namespaces"]
+)
+async def create_namespace_task(
+    task_create: TaskCreate,
+    namespace: str = Path(..., title="The namespace to create the task in"),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """Create a task in a namespace."""
+    return await controller.create_task(task_create, namespace=namespace)
+
+
+@router.get(
+    "/namespaces/{namespace}/stats",
+    response_model=TaskStatisticsResponse,
+    summary="Get namespace statistics",
+    description="Get live task counts of one namespace",
+    tags=["Namespaces"]
+)
+async def get_namespace_statistics(
+    namespace: str = Path(..., title="The namespace to count"),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """Get the task statistics of a namespace."""
+    return await controller.get_statistics(namespace=namespace)
+
+
+@router.get(
+    "/namespaces/{namespace}/critical-path",
+    response_model=CriticalPathResponse,
+    summary="Get the critical path of a namespace",
+    description="Get the tasks that determine the project duration and the slack of every task; cached and updated incrementally as tasks change",
+    tags=["Namespaces"]
+)
+async def get_critical_path(
+    namespace: str = Path(..., title="The namespace to schedule"),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """Get the critical path of a namespace."""
+    return await controller.get_critical_path(namespace)
+
+
+# Change feed routes
+
+@router.get(
+    "/changes",
+    response_model=ChangeListResponse,
+    summary="Get changes since a sequence number",
+    description=(
+        "Get task and dependency changes made after `since`, in sequence order. "
+        "Responds with 410 Gone when those changes are no longer retained and the client must reload"
+    ),
+    tags=["Changes"]
+)
+async def get_changes(
+    since: Optional[int] = Query(None, title="Last sequence number seen", ge=0),
+    limit: int = Query(1000, title="Maximum number of changes", ge=1, le=10000),
+    controller: TaskController = Depends(get_task_controller)
+):
+    """Get changes since a sequence number."""
+    return await controller.get_changes(since=since, limit=limit)
+
+
 # Telos integration routes
 
 @router.get(
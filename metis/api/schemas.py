@@ -12,6 +12,7 @@ from uuid import uuid4
 from tekton.models.base import TektonBaseModel
 
 from metis.models.enums import TaskStatus, Priority, ComplexityLevel
+from metis.models.task import DEFAULT_NAMESPACE
 
 
 # Base schema for API responses
@@ -38,6 +39,12 @@ class SubtaskUpdate(TektonBaseModel):
     order: Optional[int] = None
 
 
+class SubtaskMove(TektonBaseModel):
+    """Schema for moving a subtask within its task."""
+    subtask_id: str
+    after_id: Optional[str] = None  # Sibling to place it after; None moves it to the front
+
+
 class SubtaskResponse(TektonBaseModel):
     """Schema for subtask response."""
     id: str
@@ -45,6 +52,7 @@ class SubtaskResponse(TektonBaseModel):
     description: Optional[str] = None
     status: str
     order: int
+    rank: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -163,6 +171,7 @@ class TaskCreate(TektonBaseModel):
     due_date: Optional[datetime] = None
     subtasks: List[SubtaskCreate] = []
     requirement_refs: List[RequirementRefCreate] = []
+    namespace: str = DEFAULT_NAMESPACE
     
     @field_validator("status")
     @classmethod
@@ -229,6 +238,7 @@ class TaskResponse(TektonBaseModel):
     requirement_refs: List[RequirementRefResponse] = []
     complexity: Optional[ComplexityScoreResponse] = None
     progress: float
+    namespace: str = DEFAULT_NAMESPACE
 
 
 class TaskListResponse(ApiResponse):
@@ -237,6 +247,7 @@ class TaskListResponse(ApiResponse):
     total: int = 0
     page: int = 1
     page_size: int = 50
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
 
 
 class TaskDetailResponse(ApiResponse):
@@ -249,6 +260,98 @@ class DependencyListResponse(ApiResponse):
     dependencies: List[DependencyResponse] = []
 
 
+class DependencyEdgeResponse(TektonBaseModel):
+    """Schema for one task's dependency on another."""
+    task_id: str
+    dependency_id: str
+
+
+class DependencyCycleResponse(TektonBaseModel):
+    """Schema for a group of cyclically dependent tasks."""
+    task_ids: List[str]
+    edges_to_remove: List[DependencyEdgeResponse]  # Removing these breaks every cycle in the group
+
+
+class DependencyAnalysisResponse(ApiResponse):
+    """Schema for dependency analysis response."""
+    task_count: int = 0
+    cycles: List[DependencyCycleResponse] = []
+    missing_dependencies: List[DependencyEdgeResponse] = []
+
+
+class CriticalPathResponse(ApiResponse):
+    """Schema for critical path response."""
+    namespace: str
+    critical_path: List[str] = []  # Task IDs ordered by earliest finish
+    project_duration: int = 0
+    slack: Dict[str, int] = {}  # How far each task can slip without delaying the project
+
+
+class ReachableTaskResponse(TektonBaseModel):
+    """Schema for a task reached through dependencies."""
+    id: str
+    title: str
+    status: str
+    priority: str
+    depth: int  # Number of dependency links from the queried task
+
+
+class ReachableTaskListResponse(ApiResponse):
+    """Schema for upstream or downstream task list response."""
+    task_id: str
+    direction: str  # "downstream" (tasks depending on it) or "upstream"
+    max_depth: Optional[int] = None
+    tasks: List[ReachableTaskResponse] = []  # Nearest first
+    total: int = 0
+
+
+class DependencyDistanceResponse(ApiResponse):
+    """Schema for dependency distance response."""
+    upstream_id: str
+    downstream_id: str
+    depends: bool = False  # Whether the downstream task depends on the upstream task
+    distance: Optional[int] = None  # Shortest number of dependency links
+
+
+class TaskStatisticsResponse(ApiResponse):
+    """Schema for task statistics response."""
+    total_tasks: int = 0
+    by_status: Dict[str, int] = {}
+    by_priority: Dict[str, int] = {}
+    by_assignee: Dict[str, int] = {}
+    by_tag: Dict[str, int] = {}
+    by_complexity: Dict[str, int] = {}
+    by_namespace: Dict[str, int] = {}
+    with_due_date: int = 0  # Open tasks that have a due date
+    overdue: int = 0  # Open tasks whose due date has passed
+    archived_tasks: int = 0  # Tasks moved to the archive (not in the other counts)
+    version: int = 0  # Storage version the counts were read at
+
+
+class NamespaceListResponse(ApiResponse):
+    """Schema for namespace list response."""
+    namespaces: Dict[str, int] = {}  # Number of tasks by namespace
+
+
+# Change feed schemas
+class ChangeResponse(TektonBaseModel):
+    """Schema for a single change in the change feed."""
+    sequence: int
+    type: str  # "task" or "dependency"
+    id: str
+    op: str  # "put" or "delete"
+    timestamp: datetime
+    task: Optional[TaskResponse] = None  # State after a task put
+    dependency: Optional[DependencyResponse] = None  # State after a dependency put
+
+
+class ChangeListResponse(ApiResponse):
+    """Schema for change feed response."""
+    changes: List[ChangeResponse] = []
+    latest_sequence: int = 0  # Pass as `since` on the next request
+    has_more: bool = False
+
+
 # Query parameters
 class TaskQueryParams(TektonBaseModel):
     """Query parameters for filtering tasks."""
@@ -259,6 +362,10 @@ class TaskQueryParams(TektonBaseModel):
     search: Optional[str] = None
     page: int = 1
     page_size: int = 50
+    sort: str = "updated_at"
+    cursor: Optional[str] = None
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
 
 
 # WebSocket message schemas
@@ -271,4 +378,7 @@ class WebSocketMessage(TektonBaseModel):
 class WebSocketRegistration(TektonBaseModel):
     """Schema for WebSocket registration messages."""
     client_id: str = Field(default_factory=lambda: str(uuid4()))
-    subscribe_to: List[str] = ["task_created", "task_updated", "task_deleted"]
\ No newline at end of file
+    subscribe_to: List[str] = [
+        "task_created", "task_updated", "task_deleted", "tasks_created", "tasks_updated", "task_overdue",
+        "tasks_archived"
+    ]
\ No newline at end of file
@@ -30,6 +30,7 @@ DEFAULT_CONFIG = {
     "PROMETHEUS_PORT": None,
     
     # Database configuration
+    "STORAGE_BACKEND": "memory",  # "memory" or "sqlite"
     "DB_URL": lambda: f"sqlite:///{os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'metis.db'))}",
     
     # API configuration
@@ -1,7 +1,8 @@
 # Core functionality for Metis
 
 from metis.core.task_manager import TaskManager
-from metis.core.storage import InMemoryStorage
+from metis.core.storage import InMemoryStorage, SQLiteStorage, StorageSnapshot
+from metis.core.partitions import PartitionedStorage
 from metis.core.complexity import ComplexityAnalyzer
 from metis.core.dependency import DependencyResolver
 from metis.core.telos_integration import TelosClient, telos_client
@@ -9,6 +10,9 @@ from metis.core.telos_integration import TelosClient, telos_client
 __all__ = [
     'TaskManager',
     'InMemoryStorage',
+    'SQLiteStorage',
+    'PartitionedStorage',
+    'StorageSnapshot',
     'ComplexityAnalyzer',
     'DependencyResolver',
     'TelosClient',
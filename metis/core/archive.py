@@ -0,0 +1,273 @@
+"""
+Cold-tier archive for Metis storage
+
+This module provides an on-disk store for tasks that have been closed for
+a long time. Archived tasks leave the in-memory working set, its indexes
+and its snapshots, but can still be fetched by ID, searched on request
+and moved back into the working set when they are reactivated.
+"""
+
+import os
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO
+
+from metis.models.task import Task
+from metis.core.persistence import write_atomic
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_LOG_FILE = "manifest.log"
+SEGMENT_SUFFIX = ".json.gz"
+
+
+class TaskArchive:
+    """
+    Compressed, append-mostly segment store of archived tasks.
+    
+    Every archive run writes its tasks as one gzip-compressed JSON segment.
+    A manifest maps each task ID to the segment holding it, so a lookup
+    decompresses a single segment; recently read segments are cached.
+    Changes to the manifest are appended to a log, one JSON line each, and
+    folded into the manifest file by compaction once the log has grown;
+    removed records stay in their segments until then. Segments are
+    written before the log references them and the manifest is updated
+    before a segment is rewritten, so a crash can leave unreferenced
+    records behind but never loses a referenced one.
+    """
+    
+    def __init__(self, directory: str, cache_segments: int = 4, compact_threshold: int = 1000):
+        """
+        Initialize the archive, creating its directory if needed.
+        
+        Args:
+            directory: Directory holding the manifest and segment files
+            cache_segments: Number of decoded segments kept in memory
+            compact_threshold: Number of manifest log records after which
+                the manifest is rewritten and stale segments compacted
+        """
+        self.directory = directory
+        self.cache_segments = cache_segments
+        self.compact_threshold = compact_threshold
+        self._lock = threading.Lock()  # Guards the manifest and the cache
+        self._write_lock = threading.Lock()  # Orders manifest log writes and compaction
+        self._cache: "OrderedDict[int, Dict[str, Dict]]" = OrderedDict()
+        
+        # Manifest changes not yet written to the log, and segments holding
+        # records removed since the last compaction
+        self._pending: List[Dict] = []
+        self._stale_segments: Set[int] = set()
+        
+        os.makedirs(directory, exist_ok=True)
+        self._log: Optional[TextIO] = None
+        self._log_records = 0
+        self._locations: Dict[str, int] = self._read_manifest()
+        self._next_segment = max(self._locations.values(), default=0) + 1
+    
+    def __len__(self) -> int:
+        """Return the number of archived tasks."""
+        return len(self._locations)
+    
+    def __contains__(self, task_id: str) -> bool:
+        """Check whether a task is archived."""
+        return task_id in self._locations
+    
+    def get(self, task_id: str) -> Optional[Task]:
+        """
+        Get an archived task by ID.
+        
+        Args:
+            task_id: ID of the task
+        
+        Returns:
+            Optional[Task]: Task if archived, None otherwise
+        """
+        with self._lock:
+            segment = self._locations.get(task_id)
+            if segment is None:
+                return None
+            
+            record = self._read_segment(segment).get(task_id)
+            return Task(**record) if record is not None else None
+    
+    def put(self, tasks: List[Task]) -> None:
+        """
+        Archive tasks in a new segment, writing it and the manifest log durably.
+        
+        Args:
+            tasks: Tasks to archive
+        """
+        if not tasks:
+            return
+        
+        records = {task.id: task.dict() for task in tasks}
+        with self._write_lock:
+            with self._lock:
+                segment = self._next_segment
+                self._next_segment += 1
+            self._write_segment(segment, records)
+            
+            with self._lock:
+                for task_id in records:
+                    self._locations[task_id] = segment
+                self._pending.append({"put": {task_id: segment for task_id in records}})
+            self._write_pending(fsync=True)
+    
+    def remove(self, task_ids: Iterable[str]) -> None:
+        """
+        Remove tasks from the archive.
+        
+        The tasks leave the archive at once, but the removal is only
+        written by the next call to flush (or put), so callers can leave
+        the file I/O out of their own critical sections.
+        
+        Args:
+            task_ids: IDs of the tasks to remove; unknown IDs are ignored
+        """
+        with self._lock:
+            removed = [task_id for task_id in task_ids if task_id in self._locations]
+            for task_id in removed:
+                self._stale_segments.add(self._locations.pop(task_id))
+            if removed:
+                self._pending.append({"remove": removed})
+    
+    def flush(self) -> None:
+        """Write pending removals to the manifest log, compacting it once it has grown."""
+        with self._write_lock:
+            self._write_pending(fsync=False)
+    
+    def tasks(self) -> Iterator[Task]:
+        """
+        Iterate over all archived tasks, one segment at a time.
+        
+        Returns:
+            Iterator[Task]: Archived tasks
+        """
+        with self._lock:
+            segments = sorted(set(self._locations.values()))
+        
+        for segment in segments:
+            with self._lock:
+                records = [
+                    record for task_id, record in self._read_segment(segment).items()
+                    if self._locations.get(task_id) == segment
+                ]
+            for record in records:
+                yield Task(**record)
+    
+    def _segment_path(self, segment: int) -> str:
+        """Get the file path of a segment."""
+        return os.path.join(self.directory, f"segment-{segment:08d}{SEGMENT_SUFFIX}")
+    
+    def _read_segment(self, segment: int) -> Dict[str, Dict]:
+        """Read a segment through the cache. Must be called with the lock held."""
+        records = self._cache.get(segment)
+        if records is not None:
+            self._cache.move_to_end(segment)
+            return records
+        
+        records = self._load_segment(segment)
+        self._cache_segment(segment, records)
+        return records
+    
+    def _load_segment(self, segment: int) -> Dict[str, Dict]:
+        """Read and decode a segment file, bypassing the cache."""
+        path = self._segment_path(segment)
+        if not os.path.exists(path):
+            return {}
+        
+        with open(path, "rb") as f:
+            return json.loads(gzip.decompress(f.read()))
+    
+    def _write_segment(self, segment: int, records: Dict[str, Dict]) -> None:
+        """Write or delete a segment file. Must be called with the write lock held."""
+        path = self._segment_path(segment)
+        if records:
+            payload = json.dumps(records, default=str, separators=(",", ":")).encode("utf-8")
+            write_atomic(path, gzip.compress(payload))
+            with self._lock:
+                self._cache_segment(segment, records)
+        else:
+            if os.path.exists(path):
+                os.remove(path)
+            with self._lock:
+                self._cache.pop(segment, None)
+    
+    def _cache_segment(self, segment: int, records: Dict[str, Dict]) -> None:
+        """Cache decoded segment records, evicting the least recently used. Must be called with the lock held."""
+        self._cache[segment] = records
+        self._cache.move_to_end(segment)
+        while len(self._cache) > self.cache_segments:
+            self._cache.popitem(last=False)
+    
+    def _read_manifest(self) -> Dict[str, int]:
+        """Read the task ID -> segment manifest and apply its log. A torn final log line is ignored."""
+        locations: Dict[str, int] = {}
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                locations = json.load(f)
+        
+        log_path = os.path.join(self.directory, MANIFEST_LOG_FILE)
+        if os.path.exists(log_path):
+            with open(log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    self._apply_log_record(locations, record)
+                    self._log_records += 1
+        return locations
+    
+    def _apply_log_record(self, locations: Dict[str, int], record: Dict) -> None:
+        """Apply one manifest log record to a manifest."""
+        locations.update(record.get("put", {}))
+        for task_id in record.get("remove", ()):
+            segment = locations.pop(task_id, None)
+            if segment is not None:
+                self._stale_segments.add(segment)
+    
+    def _write_pending(self, fsync: bool) -> None:
+        """Append pending manifest changes to the log. Must be called with the write lock held."""
+        with self._lock:
+            records, self._pending = self._pending, []
+        if not records:
+            return
+        
+        if self._log is None:
+            self._log = open(os.path.join(self.directory, MANIFEST_LOG_FILE), "a", encoding="utf-8")
+        self._log.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+        self._log.flush()
+        if fsync:
+            os.fsync(self._log.fileno())
+        
+        self._log_records += len(records)
+        if self._log_records >= self.compact_threshold:
+            self._compact()
+    
+    def _compact(self) -> None:
+        """
+        Fold the log into the manifest file and drop removed records from their segments.
+        
+        Must be called with the write lock held. Files are read and written
+        without the lock, so lookups carry on meanwhile; tasks archived in
+        the meantime go to new segments, which are not rewritten.
+        """
+        with self._lock:
+            locations = dict(self._locations)
+            stale, self._stale_segments = self._stale_segments, set()
+        
+        write_atomic(os.path.join(self.directory, MANIFEST_FILE), json.dumps(locations, separators=(",", ":")))
+        if self._log is not None:
+            self._log.close()
+        self._log = open(os.path.join(self.directory, MANIFEST_LOG_FILE), "w", encoding="utf-8")
+        self._log_records = 0
+        
+        for segment in stale:
+            records = {
+                task_id: record for task_id, record in self._load_segment(segment).items()
+                if locations.get(task_id) == segment
+            }
+            self._write_segment(segment, records)
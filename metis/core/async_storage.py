@@ -0,0 +1,160 @@
+"""
+Async storage access for Metis
+
+This module lets the async TaskManager use storage backends without
+blocking the event loop. Backends whose methods are coroutines are used
+directly; blocking backends, such as InMemoryStorage and SQLiteStorage,
+are wrapped so that every call runs on a small, bounded thread pool.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Tuple, TypeVar, runtime_checkable
+
+from metis.models.task import Task
+from metis.models.dependency import Dependency
+from metis.core.changes import Change
+from metis.core.storage import StorageSnapshot
+
+T = TypeVar("T")
+
+# Default number of threads used for blocking storage calls
+DEFAULT_STORAGE_WORKERS = 4
+
+
+@runtime_checkable
+class AsyncStorage(Protocol):
+    """
+    Storage whose methods are coroutines.
+    
+    Native async backends set ``is_async = True`` and implement the
+    InMemoryStorage methods the TaskManager uses as coroutines; the core
+    of that interface is listed here. Backends may also offer the other
+    InMemoryStorage methods (namespaces, dependency queries). Native
+    backends keep their own state and should set ``is_persistent``, so
+    the TaskManager never sets up backup files or journals for them.
+    """
+    
+    is_async: bool
+    
+    async def create_task(self, task: Task) -> Task: ...
+    
+    async def get_task(self, task_id: str) -> Optional[Task]: ...
+    
+    async def update_task(self, task_id: str, updates: Dict[str, Any]) -> Optional[Task]: ...
+    
+    async def edit_task(self, task_id: str, edit: Callable[[Task], Any]) -> Optional[Tuple[Task, Any]]: ...
+    
+    async def delete_task(self, task_id: str) -> bool: ...
+    
+    async def create_tasks(self, tasks: List[Task]) -> List[Task]: ...
+    
+    async def update_tasks(self, updates_map: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Task]]: ...
+    
+    async def list_tasks(self, **filters: Any) -> Tuple[List[Task], int]: ...
+    
+    async def get_statistics(self, now: Any = None, namespace: Optional[str] = None) -> Dict[str, Any]: ...
+    
+    async def get_changes(self, since: int, limit: int = 1000) -> Optional[Tuple[List[Change], bool]]: ...
+    
+    async def snapshot(self) -> StorageSnapshot: ...
+    
+    async def create_dependency(self, dependency: Dependency) -> Dependency: ...
+    
+    async def get_dependency(self, dependency_id: str) -> Optional[Dependency]: ...
+    
+    async def update_dependency(self, dependency_id: str, updates: Dict[str, Any]) -> Optional[Dependency]: ...
+    
+    async def delete_dependency(self, dependency_id: str) -> bool: ...
+    
+    async def list_dependencies(self, **filters: Any) -> List[Dependency]: ...
+
+
+class ThreadedStorage:
+    """
+    Async view of a blocking storage backend.
+    
+    Calling a method of the wrapped storage through this view returns a
+    coroutine that runs the call on the view's thread pool. Plain
+    attributes and properties, such as ``is_persistent`` or
+    ``latest_sequence``, are read directly. The pool is bounded, so a burst
+    of writes queues up for a few threads instead of starving the event
+    loop or spawning a thread per request.
+    """
+    
+    is_async = True
+    
+    def __init__(self, storage: Any, max_workers: int = DEFAULT_STORAGE_WORKERS):
+        """
+        Initialize the view.
+        
+        Args:
+            storage: Blocking storage backend to wrap
+            max_workers: Maximum number of threads running storage calls
+        """
+        self.storage = storage
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="metis-storage")
+        self._methods: Dict[str, Callable[..., Awaitable[Any]]] = {}
+    
+    def __getattr__(self, name: str) -> Any:
+        """Get an attribute of the storage, making its methods awaitable."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        
+        method = self._methods.get(name)
+        if method is not None:
+            return method
+        
+        attribute = getattr(self.storage, name)
+        if not callable(attribute):
+            return attribute
+        
+        @functools.wraps(attribute)
+        async def method(*args: Any, **kwargs: Any) -> Any:
+            return await self.run(attribute, *args, **kwargs)
+        
+        self._methods[name] = method
+        return method
+    
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking callable on the storage thread pool.
+        
+        Args:
+            func: Callable to run
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+        
+        Returns:
+            T: Result of the callable
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the thread pool.
+        
+        Args:
+            wait: Whether to wait for running calls to finish
+        """
+        self._executor.shutdown(wait=wait)
+
+
+def as_async_storage(storage: Any, max_workers: int = DEFAULT_STORAGE_WORKERS) -> Any:
+    """
+    Get an async view of a storage backend.
+    
+    Args:
+        storage: Storage backend, blocking or native async
+        max_workers: Thread pool size used to wrap a blocking backend
+    
+    Returns:
+        Any: The backend itself if it is native async, otherwise a
+        ThreadedStorage wrapping it
+    """
+    if getattr(storage, "is_async", False):
+        return storage
+    return ThreadedStorage(storage, max_workers)
@@ -0,0 +1,137 @@
+"""
+Change feed for Metis storage
+
+This module provides a bounded, in-memory feed of recent storage
+mutations. Every change carries a global sequence number, so clients can
+ask for everything that changed since the last sequence they saw instead
+of re-downloading task lists.
+"""
+
+import threading
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Any, Deque, List, Optional, Tuple
+
+# Entity types recorded in the feed
+TASK = "task"
+DEPENDENCY = "dependency"
+
+
+class Change:
+    """
+    A single recorded mutation.
+    
+    ``entity`` holds the stored model after a put, or None after a delete.
+    Stored models are never modified in place, so keeping a reference is
+    enough to report the state at the time of the change.
+    """
+    
+    __slots__ = ("sequence", "entity_type", "entity_id", "entity", "timestamp")
+    
+    def __init__(self, sequence: int, entity_type: str, entity_id: str, entity: Optional[Any]):
+        """
+        Initialize the change.
+        
+        Args:
+            sequence: Sequence number of the change
+            entity_type: TASK or DEPENDENCY
+            entity_id: ID of the changed entity
+            entity: Entity after the change, or None if it was deleted
+        """
+        self.sequence = sequence
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.entity = entity
+        self.timestamp = datetime.utcnow()
+    
+    @property
+    def op(self) -> str:
+        """Kind of change: "put" or "delete"."""
+        return "delete" if self.entity is None else "put"
+
+
+class ChangeFeed:
+    """
+    Ring buffer of the most recent changes.
+    
+    Every change is assigned the next sequence number. Once a change falls
+    out of the buffer, or the feed is invalidated by a bulk state
+    replacement, clients whose last seen sequence is older must fully
+    resync. The feed has its own lock, so several storage partitions can
+    share one feed and one sequence.
+    """
+    
+    def __init__(self, capacity: int = 10000):
+        """
+        Initialize the feed.
+        
+        Args:
+            capacity: Maximum number of changes retained
+        """
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._changes: Deque[Change] = deque()
+        self._floor = 0  # Changes up to this sequence are no longer available
+        self._latest = 0
+    
+    @property
+    def latest_sequence(self) -> int:
+        """Sequence number of the most recent change."""
+        return self._latest
+    
+    def append(self, entity_type: str, entity_id: str, entity: Optional[Any]) -> int:
+        """
+        Record a change, evicting the oldest one if the feed is full.
+        
+        Args:
+            entity_type: TASK or DEPENDENCY
+            entity_id: ID of the changed entity
+            entity: Entity after the change, or None if it was deleted
+        
+        Returns:
+            int: Sequence number assigned to the change
+        """
+        with self._lock:
+            if len(self._changes) >= self.capacity:
+                self._floor = self._changes.popleft().sequence
+            self._latest += 1
+            self._changes.append(Change(self._latest, entity_type, entity_id, entity))
+            return self._latest
+    
+    def invalidate(self) -> int:
+        """
+        Drop all changes after the whole state was replaced.
+        
+        Returns:
+            int: Sequence number assigned to the replacement
+        """
+        with self._lock:
+            self._changes.clear()
+            self._latest += 1
+            self._floor = self._latest
+            return self._latest
+    
+    def since(self, sequence: int, limit: int = 1000) -> Optional[Tuple[List[Change], bool]]:
+        """
+        Get the changes made after a sequence number.
+        
+        Args:
+            sequence: Last sequence number the client has seen
+            limit: Maximum number of changes to return
+        
+        Returns:
+            Optional[Tuple[List[Change], bool]]: Changes in sequence order and
+            whether more changes follow them, or None if the client must resync
+        """
+        with self._lock:
+            if sequence < self._floor or sequence > self._latest:
+                return None
+            
+            if not self._changes:
+                return [], False
+            
+            # Sequences in the buffer are contiguous, so the offset is direct
+            offset = max(0, sequence - self._changes[0].sequence + 1)
+            changes = list(islice(self._changes, offset, offset + limit))
+            return changes, offset + len(changes) < len(self._changes)
@@ -85,10 +85,17 @@ class ConnectionManager:
         """
         if not message:
             return
-            
+        
         # Convert to JSON once
-        message_json = json.dumps(message)
+        await self.broadcast_json(json.dumps(message))
+    
+    async def broadcast_json(self, message_json: str) -> None:
+        """
+        Broadcast an already-encoded JSON message to all connected clients.
         
+        Args:
+            message_json: Message encoded as a JSON document
+        """
         # Send to all connected clients
         disconnected_clients = []
         for client_id, websocket in self.active_connections.items():
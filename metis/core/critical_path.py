@@ -0,0 +1,399 @@
+"""
+Critical path cache for Metis
+
+This module keeps the critical path and slack of every namespace up to
+date as tasks change. Instead of recomputing the whole schedule on each
+request, a change to one task repropagates earliest finish times through
+the tasks that depend on it and remaining path lengths through the tasks
+it depends on, as far as they actually change.
+"""
+
+import asyncio
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from metis.models.task import Task
+from metis.core.dependency import DependencyResolver
+from metis.core.indexes import TopologicalOrder
+
+
+class _Schedule:
+    """
+    Incrementally maintained schedule of the tasks in one namespace.
+    
+    For each task it keeps the earliest finish time (the longest chain of
+    durations up to and including the task) and the tail (the longest
+    chain of durations after it). The project finishes at the largest
+    earliest finish, a task's latest finish is the project finish minus
+    its tail, and tasks without slack form the critical path.
+    
+    Because the tail does not depend on the project finish, a change can
+    only affect earliest finishes downstream of the task and tails
+    upstream of it. Tasks are kept in an online topological order, so both
+    are repropagated in order, stopping wherever a value does not change.
+    After a ValueError the schedule is inconsistent and must be discarded.
+    It is not thread-safe.
+    """
+    
+    def __init__(self):
+        """Initialize an empty schedule."""
+        self.durations: Dict[str, int] = {}
+        self.dependencies: Dict[str, List[str]] = {}  # As listed on the task
+        self.dependents: Dict[str, Set[str]] = {}  # Only tasks in the schedule
+        self.waiting: Dict[str, Set[str]] = {}  # Unknown dependency ID -> tasks listing it
+        self.earliest: Dict[str, int] = {}
+        self.tail: Dict[str, int] = {}
+        self.order = TopologicalOrder()
+        
+        # Multiset of earliest finish times with a lazily cleaned max-heap
+        self._finish_counts: Dict[int, int] = {}
+        self._finish_heap: List[int] = []
+        self._result: Optional[Dict[str, Any]] = None
+    
+    def __contains__(self, task_id: str) -> bool:
+        """Check whether a task is in the schedule."""
+        return task_id in self.durations
+    
+    def build(self, tasks: List[Task]) -> None:
+        """
+        Compute the schedule of a set of tasks from scratch.
+        
+        Args:
+            tasks: Tasks of the namespace
+        
+        Raises:
+            ValueError: If there are cyclic dependencies
+        """
+        order = DependencyResolver.get_execution_order(tasks)
+        for task in tasks:
+            self.durations[task.id] = DependencyResolver.task_duration(task)
+            self.dependencies[task.id] = task.dependencies
+            self.dependents[task.id] = set()
+        for task_id in order:
+            self.order.add_node(task_id)
+        for task_id in order:
+            self._link(task_id)
+        
+        for task_id in order:
+            self._set_earliest(task_id, self._earliest_of(task_id))
+        for task_id in reversed(order):
+            self.tail[task_id] = self._tail_of(task_id)
+    
+    def put(self, task: Task) -> bool:
+        """
+        Add or update a task.
+        
+        Args:
+            task: Task as stored after the change
+        
+        Returns:
+            bool: True if the schedule changed
+        
+        Raises:
+            ValueError: If the change closes a dependency cycle
+        """
+        duration = DependencyResolver.task_duration(task)
+        old_dependencies: List[str] = []
+        if task.id in self.durations:
+            if self.durations[task.id] == duration and self.dependencies[task.id] == task.dependencies:
+                return False
+            old_dependencies = self._known_dependencies(task.id)
+            self._unlink(task.id)
+            self.durations[task.id] = duration
+        else:
+            self.durations[task.id] = duration
+            self.dependencies[task.id] = task.dependencies
+            self.dependents[task.id] = set()
+            self.order.add_node(task.id)
+            
+            # Tasks that listed this one as a dependency before it existed
+            for dependent_id in self.waiting.pop(task.id, ()):
+                self._insert_edge(task.id, dependent_id)
+        
+        self.dependencies[task.id] = task.dependencies
+        self._link(task.id)
+        self._result = None
+        
+        self._propagate_forward([task.id])
+        self._propagate_backward([task.id, *old_dependencies, *self._known_dependencies(task.id)])
+        return True
+    
+    def remove(self, task_id: str) -> bool:
+        """
+        Remove a task.
+        
+        Args:
+            task_id: ID of the task
+        
+        Returns:
+            bool: True if the task was in the schedule
+        """
+        if task_id not in self.durations:
+            return False
+        
+        dependencies = self._known_dependencies(task_id)
+        self._unlink(task_id)
+        dependents = self.dependents.pop(task_id)
+        if dependents:
+            self.waiting[task_id] = set(dependents)
+        
+        del self.durations[task_id]
+        del self.dependencies[task_id]
+        self._set_earliest(task_id, None)
+        self.tail.pop(task_id, None)
+        self.order.remove_node(task_id)
+        self._result = None
+        
+        self._propagate_forward(dependents)
+        self._propagate_backward(dependencies)
+        return True
+    
+    def result(self) -> Dict[str, Any]:
+        """
+        Get the critical path, project duration and slack of every task.
+        
+        Returns:
+            Dict[str, Any]: "critical_path" (task IDs ordered by earliest
+            finish), "project_duration" and "slack" by task ID
+        """
+        if self._result is None:
+            finish = self.project_duration()
+            slack = {
+                task_id: finish - self.tail[task_id] - earliest
+                for task_id, earliest in self.earliest.items()
+            }
+            critical_path = [task_id for task_id, value in slack.items() if value == 0]
+            critical_path.sort(key=lambda task_id: (self.earliest[task_id], self.order.position(task_id)))
+            self._result = {
+                "critical_path": critical_path,
+                "project_duration": finish,
+                "slack": slack
+            }
+        return self._result
+    
+    def project_duration(self) -> int:
+        """Get the largest earliest finish time."""
+        heap, counts = self._finish_heap, self._finish_counts
+        while heap and not counts.get(-heap[0]):
+            heapq.heappop(heap)
+        return -heap[0] if heap else 0
+    
+    def _known_dependencies(self, task_id: str) -> List[str]:
+        """Get the distinct dependencies of a task that are in the schedule."""
+        return [dep_id for dep_id in dict.fromkeys(self.dependencies[task_id]) if dep_id in self.durations]
+    
+    def _insert_edge(self, dep_id: str, task_id: str) -> None:
+        """Record a task as a dependent, keeping the topological order."""
+        if not self.order.insert_edge(dep_id, task_id, self.dependents.__getitem__, self._known_dependencies):
+            raise ValueError(f"Cyclic dependency detected: task {task_id} depends on {dep_id}")
+        self.dependents[dep_id].add(task_id)
+    
+    def _link(self, task_id: str) -> None:
+        """Record a task as a dependent of each of its dependencies."""
+        for dep_id in self.dependencies[task_id]:
+            if dep_id in self.durations:
+                self._insert_edge(dep_id, task_id)
+            else:
+                self.waiting.setdefault(dep_id, set()).add(task_id)
+    
+    def _unlink(self, task_id: str) -> None:
+        """Remove a task from the dependents of its dependencies."""
+        for dep_id in self.dependencies[task_id]:
+            if dep_id in self.durations:
+                self.dependents[dep_id].discard(task_id)
+            else:
+                waiting = self.waiting.get(dep_id)
+                if waiting is not None:
+                    waiting.discard(task_id)
+                    if not waiting:
+                        del self.waiting[dep_id]
+    
+    def _earliest_of(self, task_id: str) -> int:
+        """Compute a task's earliest finish from its dependencies."""
+        start = max((self.earliest[dep_id] for dep_id in self._known_dependencies(task_id)), default=0)
+        return start + self.durations[task_id]
+    
+    def _tail_of(self, task_id: str) -> int:
+        """Compute a task's tail from its dependents."""
+        durations, tail = self.durations, self.tail
+        return max((durations[dependent_id] + tail[dependent_id] for dependent_id in self.dependents[task_id]), default=0)
+    
+    def _set_earliest(self, task_id: str, value: Optional[int]) -> None:
+        """Set or clear the earliest finish of a task, keeping the multiset in sync."""
+        counts = self._finish_counts
+        old = self.earliest.pop(task_id, None)
+        if old is not None:
+            counts[old] -= 1
+            if not counts[old]:
+                del counts[old]
+        
+        if value is not None:
+            self.earliest[task_id] = value
+            if value not in counts:
+                heapq.heappush(self._finish_heap, -value)
+            counts[value] = counts.get(value, 0) + 1
+        
+        # Drop stale heap entries once they outnumber the live ones
+        if len(self._finish_heap) > 2 * len(counts) + 64:
+            self._finish_heap = [-value for value in counts]
+            heapq.heapify(self._finish_heap)
+    
+    def _propagate_forward(self, starts: Iterable[str]) -> None:
+        """Recompute earliest finish times from the starting tasks downstream."""
+        position = self.order.position
+        queued = {task_id for task_id in starts if task_id in self.durations}
+        heap = [(position(task_id), task_id) for task_id in queued]
+        heapq.heapify(heap)
+        
+        # Every dependency of a task comes earlier in the order, so it is final
+        while heap:
+            _, task_id = heapq.heappop(heap)
+            value = self._earliest_of(task_id)
+            if self.earliest.get(task_id) != value:
+                self._set_earliest(task_id, value)
+                for dependent_id in self.dependents[task_id]:
+                    if dependent_id not in queued:
+                        queued.add(dependent_id)
+                        heapq.heappush(heap, (position(dependent_id), dependent_id))
+    
+    def _propagate_backward(self, starts: Iterable[str]) -> None:
+        """Recompute tails from the starting tasks upstream."""
+        position = self.order.position
+        queued = {task_id for task_id in starts if task_id in self.durations}
+        heap = [(-position(task_id), task_id) for task_id in queued]
+        heapq.heapify(heap)
+        
+        while heap:
+            _, task_id = heapq.heappop(heap)
+            value = self._tail_of(task_id)
+            if self.tail.get(task_id) != value:
+                self.tail[task_id] = value
+                for dep_id in self._known_dependencies(task_id):
+                    if dep_id not in queued:
+                        queued.add(dep_id)
+                        heapq.heappush(heap, (-position(dep_id), dep_id))
+
+
+class CriticalPathCache:
+    """
+    Critical path and slack of each namespace, kept current by task events.
+    
+    A namespace's schedule is computed on first request and then updated
+    from the task events the TaskManager fires (task_created,
+    task_updated, task_deleted and their batch counterparts), touching
+    only the tasks upstream and downstream of each change. Changes that
+    do not affect scheduling, such as a new title or status, leave it as
+    is. A change that closes a dependency cycle drops the schedule, and
+    the next request reports the cycle.
+    """
+    
+    # Events that can change a schedule
+    EVENTS = ("task_created", "task_updated", "task_deleted", "tasks_created", "tasks_updated", "tasks_archived")
+    
+    def __init__(self, task_manager: Any):
+        """
+        Initialize the cache and subscribe to task events.
+        
+        Args:
+            task_manager: TaskManager whose tasks are scheduled
+        """
+        self.task_manager = task_manager
+        self._schedules: Dict[str, _Schedule] = {}
+        self._pending: Dict[str, List[Tuple[str, Any]]] = {}  # Events seen while a namespace builds
+        self._build_lock: Optional[asyncio.Lock] = None
+        
+        for event_type in self.EVENTS:
+            task_manager.register_event_handler(event_type, self._on_event)
+    
+    async def get(self, namespace: str) -> Dict[str, Any]:
+        """
+        Get the critical path of a namespace.
+        
+        Args:
+            namespace: Namespace to schedule
+        
+        Returns:
+            Dict[str, Any]: "critical_path" (task IDs ordered by earliest
+            finish), "project_duration" and "slack" by task ID
+        
+        Raises:
+            ValueError: If there are cyclic dependencies
+        """
+        schedule = self._schedules.get(namespace)
+        if schedule is None:
+            if self._build_lock is None:
+                self._build_lock = asyncio.Lock()
+            async with self._build_lock:
+                schedule = self._schedules.get(namespace)
+                if schedule is None:
+                    schedule = await self._build(namespace)
+        return schedule.result()
+    
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        """
+        Drop cached schedules after tasks changed without events.
+        
+        Args:
+            namespace: Namespace to drop (None for all)
+        """
+        if namespace is None:
+            self._schedules.clear()
+        else:
+            self._schedules.pop(namespace, None)
+    
+    async def _build(self, namespace: str) -> _Schedule:
+        """Compute a namespace's schedule off the event loop and publish it."""
+        pending = self._pending[namespace] = []
+        try:
+            snapshot = await self.task_manager.async_storage.snapshot()
+            tasks = [task for task in snapshot.tasks.values() if task.namespace == namespace]
+            
+            schedule = _Schedule()
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, schedule.build, tasks)
+            
+            # Events fired during the build may postdate the snapshot
+            for event_type, data in pending:
+                self._apply(schedule, namespace, event_type, data)
+        finally:
+            del self._pending[namespace]
+        
+        self._schedules[namespace] = schedule
+        return schedule
+    
+    def _on_event(self, event_type: str, data: Any) -> None:
+        """Update the schedules affected by a task event."""
+        if event_type in ("task_created", "task_updated"):
+            namespaces = {data.namespace}
+        elif event_type in ("tasks_created", "tasks_updated"):
+            namespaces = {task.namespace for task in data}
+        else:
+            # Deletions only carry task IDs
+            namespaces = set(self._schedules) | set(self._pending)
+        
+        for namespace in namespaces:
+            if namespace in self._pending:
+                self._pending[namespace].append((event_type, data))
+            
+            schedule = self._schedules.get(namespace)
+            if schedule is not None:
+                try:
+                    self._apply(schedule, namespace, event_type, data)
+                except ValueError:
+                    # Rebuilt, and the cycle reported, on the next request
+                    del self._schedules[namespace]
+    
+    @staticmethod
+    def _apply(schedule: _Schedule, namespace: str, event_type: str, data: Any) -> None:
+        """Apply one task event to the schedule of a namespace."""
+        if event_type == "task_deleted":
+            schedule.remove(data["id"])
+        elif event_type == "tasks_archived":
+            for task_id in data["ids"]:
+                schedule.remove(task_id)
+        elif event_type in ("tasks_created", "tasks_updated"):
+            for task in data:
+                if task.namespace == namespace:
+                    schedule.put(task)
+        else:
+            schedule.put(data)
@@ -5,6 +5,7 @@ This module provides functionality for managing task dependencies,
 including dependency validation, cycle detection, and dependency resolution.
 """
 
+from collections import deque
 from typing import Dict, List, Set, Optional, Any, Tuple
 from metis.models.dependency import Dependency, DependencyManager
 from metis.models.task import Task
@@ -23,24 +24,18 @@ class DependencyResolver:
         """
         Determine a valid execution order for a set of tasks based on dependencies.
         
+        Dependencies on tasks outside the set are ignored.
+        
         Args:
             tasks: List of tasks
-            
+        
         Returns:
             List[str]: List of task IDs in valid execution order
-            
+        
         Raises:
             ValueError: If there are cyclic dependencies
         """
-        # Build dependency graph
-        graph: Dict[str, List[str]] = {}
-        for task in tasks:
-            graph[task.id] = task.dependencies
-        
-        # Check for cycles
-        DependencyResolver._check_cycles(graph)
-        
-        # Topological sort
+        graph: Dict[str, List[str]] = {task.id: task.dependencies for task in tasks}
         return DependencyResolver._topological_sort(graph)
     
     @staticmethod
@@ -48,171 +43,205 @@ class DependencyResolver:
         """
         Check for dependency issues in a set of tasks.
         
+        Every missing dependency and every group of cyclically dependent
+        tasks is reported, as found by analyze_dependencies.
+        
         Args:
             tasks: List of tasks
-            
+        
         Returns:
             List[Dict[str, Any]]: List of issues with their descriptions
         """
+        analysis = DependencyResolver.analyze_dependencies(tasks)
         issues = []
         
-        # Build task dictionary for quick lookup
-        task_dict = {task.id: task for task in tasks}
-        
-        # Check for missing dependencies
-        for task in tasks:
-            for dep_id in task.dependencies:
-                if dep_id not in task_dict:
-                    issues.append({
-                        "type": "missing_dependency",
-                        "task_id": task.id,
-                        "dependency_id": dep_id,
-                        "description": f"Task {task.id} depends on missing task {dep_id}"
-                    })
-        
-        # Try to detect potential circular dependencies
-        try:
-            DependencyResolver.get_execution_order(tasks)
-        except ValueError as e:
+        for missing in analysis["missing_dependencies"]:
+            issues.append({
+                "type": "missing_dependency",
+                "task_id": missing["task_id"],
+                "dependency_id": missing["dependency_id"],
+                "description": f"Task {missing['task_id']} depends on missing task {missing['dependency_id']}"
+            })
+        
+        for cycle in analysis["cycles"]:
+            task_ids = cycle["task_ids"]
+            if len(task_ids) == 1:
+                description = f"Task {task_ids[0]} depends on itself"
+            else:
+                description = f"Cyclic dependency among {len(task_ids)} tasks: {', '.join(task_ids)}"
             issues.append({
                 "type": "circular_dependency",
-                "description": str(e)
+                "task_ids": task_ids,
+                "edges_to_remove": cycle["edges_to_remove"],
+                "description": description
             })
         
         return issues
     
+    @staticmethod
+    def analyze_dependencies(tasks: List[Task]) -> Dict[str, Any]:
+        """
+        Find every dependency cycle and missing dependency in one pass.
+        
+        Uses an iterative form of Tarjan's strongly connected components
+        algorithm, in time linear in the number of tasks and dependencies.
+        Each group of tasks that depend on each other, directly or through
+        other tasks in the group, is one cycle. For each group, the
+        dependencies to remove are the ones that lead back to a task
+        still being explored by the depth-first search; removing them
+        breaks every cycle in the group. For a simple cycle that is one
+        dependency, but it is not guaranteed to be the smallest possible
+        set, which is NP-hard to find.
+        
+        Args:
+            tasks: List of tasks
+        
+        Returns:
+            Dict[str, Any]: "cycles", each with its "task_ids" and
+            "edges_to_remove" (task_id/dependency_id pairs), and
+            "missing_dependencies" (task_id/dependency_id pairs), in task order
+        """
+        graph: Dict[str, List[str]] = {task.id: task.dependencies for task in tasks}
+        position = {task_id: i for i, task_id in enumerate(graph)}
+        
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        on_path: Set[str] = set()
+        component_of: Dict[str, int] = {}
+        components: List[List[str]] = []
+        back_edges: List[Tuple[str, str]] = []
+        missing: List[Tuple[str, str]] = []
+        
+        for root in graph:
+            if root in index:
+                continue
+            
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            on_path.add(root)
+            work = [(root, iter(graph[root]))]
+            while work:
+                node, dependencies = work[-1]
+                for dep_id in dependencies:
+                    if dep_id not in graph:
+                        missing.append((node, dep_id))
+                    elif dep_id not in index:
+                        # Descend; the rest of this node's dependencies wait
+                        index[dep_id] = low[dep_id] = len(index)
+                        stack.append(dep_id)
+                        on_stack.add(dep_id)
+                        on_path.add(dep_id)
+                        work.append((dep_id, iter(graph[dep_id])))
+                        break
+                    else:
+                        if dep_id in on_path:
+                            back_edges.append((node, dep_id))
+                        if dep_id in on_stack:
+                            low[node] = min(low[node], index[dep_id])
+                else:
+                    # All dependencies explored
+                    work.pop()
+                    on_path.discard(node)
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    
+                    if low[node] == index[node]:
+                        component: List[str] = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component_of[member] = len(components)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+        
+        # Back edges always join two tasks of the same component
+        edges_by_component: Dict[int, List[Tuple[str, str]]] = {}
+        for edge in dict.fromkeys(back_edges):
+            edges_by_component.setdefault(component_of[edge[0]], []).append(edge)
+        
+        cycles = []
+        for number, edges in edges_by_component.items():
+            edges.sort(key=lambda edge: (position[edge[0]], position[edge[1]]))
+            cycles.append({
+                "task_ids": sorted(components[number], key=position.__getitem__),
+                "edges_to_remove": [
+                    {"task_id": task_id, "dependency_id": dep_id} for task_id, dep_id in edges
+                ]
+            })
+        cycles.sort(key=lambda cycle: position[cycle["task_ids"][0]])
+        
+        missing.sort(key=lambda edge: position[edge[0]])
+        return {
+            "cycles": cycles,
+            "missing_dependencies": [
+                {"task_id": task_id, "dependency_id": dep_id} for task_id, dep_id in missing
+            ]
+        }
+    
     @staticmethod
     def get_critical_path(tasks: List[Task]) -> List[str]:
         """
         Determine the critical path through the task dependency graph.
         
         The critical path is the sequence of tasks that must be completed
-        to finish the project in the minimum amount of time.
+        to finish the project in the minimum amount of time. Earliest and
+        latest finish times are propagated in one forward and one backward
+        pass over the topological order.
         
         Args:
             tasks: List of tasks
-            
+        
         Returns:
             List[str]: List of task IDs in the critical path
-            
+        
         Raises:
             ValueError: If there are cyclic dependencies
         """
-        # Check for cycles
         graph: Dict[str, List[str]] = {task.id: task.dependencies for task in tasks}
-        DependencyResolver._check_cycles(graph)
-        
-        # Build task dictionary for quick lookup
-        task_dict = {task.id: task for task in tasks}
-        
-        # Calculate earliest finish times
-        earliest_finish = {}
+        order, dependents = DependencyResolver._kahn_sort(graph)
+        durations = {task.id: DependencyResolver.task_duration(task) for task in tasks}
+        
+        # Forward pass: a task finishes after its slowest dependency
+        earliest_finish: Dict[str, int] = {}
+        for task_id in order:
+            start = 0
+            for dep_id in graph[task_id]:
+                if dep_id in earliest_finish:
+                    start = max(start, earliest_finish[dep_id])
+            earliest_finish[task_id] = start + durations[task_id]
         
-        # Helper function for recursive calculation
-        def calculate_earliest_finish(task_id: str) -> int:
-            if task_id in earliest_finish:
-                return earliest_finish[task_id]
-            
-            if task_id not in task_dict:
-                return 0
-            
-            task = task_dict[task_id]
-            
-            # Default complexity score of 3 if not specified
-            complexity = 3
-            if task.complexity:
-                complexity = int(task.complexity.overall_score)
-            
-            # Calculate earliest finish time
-            if not task.dependencies:
-                earliest_finish[task_id] = complexity
-                return complexity
-            
-            max_predecessor = 0
-            for dep_id in task.dependencies:
-                predecessor_finish = calculate_earliest_finish(dep_id)
-                max_predecessor = max(max_predecessor, predecessor_finish)
-            
-            earliest_finish[task_id] = max_predecessor + complexity
-            return earliest_finish[task_id]
-        
-        # Calculate earliest finish for all tasks
-        for task in tasks:
-            calculate_earliest_finish(task.id)
-        
-        # Calculate latest finish times
-        latest_finish = {}
-        
-        # Find the maximum earliest finish time
         max_finish = max(earliest_finish.values()) if earliest_finish else 0
         
-        # Find tasks with no dependents
-        dependents = {task_id: [] for task_id in task_dict.keys()}
-        for task in tasks:
-            for dep_id in task.dependencies:
-                if dep_id in dependents:
-                    dependents[dep_id].append(task.id)
-        
-        end_tasks = [
-            task_id for task_id in task_dict.keys() 
-            if not dependents[task_id]
-        ]
-        
-        # Initialize latest finish times for end tasks
-        for task_id in end_tasks:
-            latest_finish[task_id] = max_finish
-        
-        # Helper function for recursive calculation
-        def calculate_latest_finish(task_id: str) -> int:
-            if task_id in latest_finish:
-                return latest_finish[task_id]
-            
-            if task_id not in task_dict:
-                return max_finish
-            
-            task = task_dict[task_id]
-            
-            # Default complexity score of 3 if not specified
-            complexity = 3
-            if task.complexity:
-                complexity = int(task.complexity.overall_score)
-            
-            # Calculate latest finish time
-            min_dependent = max_finish
-            dependent_tasks = dependents[task_id]
-            
-            if not dependent_tasks:
-                latest_finish[task_id] = max_finish
-                return max_finish
-            
-            for dep_id in dependent_tasks:
-                dependent_latest = calculate_latest_finish(dep_id)
-                dependent_task = task_dict[dep_id]
-                dependent_complexity = 3
-                if dependent_task.complexity:
-                    dependent_complexity = int(dependent_task.complexity.overall_score)
-                min_dependent = min(min_dependent, dependent_latest - dependent_complexity)
-            
-            latest_finish[task_id] = min_dependent
-            return min_dependent
-        
-        # Calculate latest finish for all tasks
-        for task in tasks:
-            calculate_latest_finish(task.id)
-        
-        # Calculate slack
-        slack = {}
-        for task_id in task_dict.keys():
-            slack[task_id] = latest_finish[task_id] - earliest_finish[task_id]
+        # Backward pass: a task must finish before its earliest dependent starts
+        latest_finish: Dict[str, int] = {}
+        for task_id in reversed(order):
+            finish = max_finish
+            for dependent_id in dependents.get(task_id, ()):
+                finish = min(finish, latest_finish[dependent_id] - durations[dependent_id])
+            latest_finish[task_id] = finish
         
         # Tasks with zero slack are on the critical path
-        critical_path_tasks = [task_id for task_id, slack_value in slack.items() if slack_value == 0]
+        critical_path_tasks = [
+            task_id for task_id in order
+            if latest_finish[task_id] == earliest_finish[task_id]
+        ]
         
         # Sort critical path tasks by earliest finish
         critical_path_tasks.sort(key=lambda task_id: earliest_finish[task_id])
         
         return critical_path_tasks
     
+    @staticmethod
+    def task_duration(task: Task) -> int:
+        """Get the duration used for scheduling: the complexity score, or 3."""
+        return int(task.complexity.overall_score) if task.complexity else 3
+    
     @staticmethod
     def _check_cycles(graph: Dict[str, List[str]]) -> None:
         """
@@ -220,39 +249,11 @@ class DependencyResolver:
         
         Args:
             graph: Dependency graph (task_id -> list of dependency IDs)
-            
+        
         Raises:
             ValueError: If cycles are detected, with description of the cycle
         """
-        visited = set()
-        rec_stack = set()
-        path = []
-        
-        def dfs(node: str) -> bool:
-            """DFS helper function to detect cycles."""
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
-            
-            for neighbor in graph.get(node, []):
-                if neighbor not in visited:
-                    if dfs(neighbor):
-                        return True
-                elif neighbor in rec_stack:
-                    # Cycle detected, find the cycle
-                    cycle_start = path.index(neighbor)
-                    cycle = path[cycle_start:] + [neighbor]
-                    cycle_str = " -> ".join(cycle)
-                    raise ValueError(f"Cyclic dependency detected: {cycle_str}")
-            
-            path.pop()
-            rec_stack.remove(node)
-            return False
-        
-        # Run DFS on each node to detect cycles
-        for node in graph:
-            if node not in visited:
-                dfs(node)
+        DependencyResolver._kahn_sort(graph)
     
     @staticmethod
     def _topological_sort(graph: Dict[str, List[str]]) -> List[str]:
@@ -261,28 +262,82 @@ class DependencyResolver:
         
         Args:
             graph: Dependency graph (task_id -> list of dependency IDs)
-            
+        
         Returns:
-            List[str]: Task IDs in topological order
+            List[str]: Task IDs in topological order, dependencies first
+        
+        Raises:
+            ValueError: If cycles are detected, with description of the cycle
         """
-        result = []
-        visited = set()
+        return DependencyResolver._kahn_sort(graph)[0]
+    
+    @staticmethod
+    def _kahn_sort(graph: Dict[str, List[str]]) -> Tuple[List[str], Dict[str, List[str]]]:
+        """
+        Sort the dependency graph by in-degree counting (Kahn's algorithm).
         
-        def dfs(node: str) -> None:
-            """DFS helper function for topological sort."""
-            visited.add(node)
-            
-            for neighbor in graph.get(node, []):
-                if neighbor not in visited:
-                    dfs(neighbor)
-            
-            result.append(node)
+        Runs iteratively in time linear in the size of the graph, so deep
+        dependency chains cannot exhaust the recursion limit. A task is
+        released once all of its dependencies are; tasks left unreleased
+        are on or behind a cycle, so cycle detection needs no second walk.
+        Dependencies on IDs that are not in the graph are ignored.
+        
+        Args:
+            graph: Dependency graph (task_id -> list of dependency IDs)
+        
+        Returns:
+            Tuple[List[str], Dict[str, List[str]]]: Task IDs in topological
+            order, and the dependents of each task that has any
+        
+        Raises:
+            ValueError: If cycles are detected, with description of the cycle
+        """
+        dependents: Dict[str, List[str]] = {}
+        in_degree: Dict[str, int] = dict.fromkeys(graph, 0)
+        for node, dependencies in graph.items():
+            for dep_id in dependencies:
+                if dep_id in in_degree:
+                    dependents.setdefault(dep_id, []).append(node)
+                    in_degree[node] += 1
+        
+        ready = deque(node for node, degree in in_degree.items() if degree == 0)
+        order: List[str] = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for dependent_id in dependents.get(node, ()):
+                in_degree[dependent_id] -= 1
+                if in_degree[dependent_id] == 0:
+                    ready.append(dependent_id)
+        
+        if len(order) < len(graph):
+            cycle = DependencyResolver._find_cycle(graph, in_degree)
+            raise ValueError(f"Cyclic dependency detected: {' -> '.join(cycle)}")
+        
+        return order, dependents
+    
+    @staticmethod
+    def _find_cycle(graph: Dict[str, List[str]], in_degree: Dict[str, int]) -> List[str]:
+        """
+        Find one cycle among the tasks a Kahn sort could not release.
+        
+        Every unreleased task still has an unreleased dependency, so
+        following those dependencies from any unreleased task must revisit
+        a task, closing a cycle.
         
-        # Run DFS on each node to build topological order
-        for node in graph:
-            if node not in visited:
-                dfs(node)
+        Args:
+            graph: Dependency graph (task_id -> list of dependency IDs)
+            in_degree: Remaining in-degrees after the sort
+        
+        Returns:
+            List[str]: Task IDs along the cycle, starting and ending with the same task
+        """
+        node = next(node for node, degree in in_degree.items() if degree > 0)
+        path: List[str] = []
+        positions: Dict[str, int] = {}
+        while node not in positions:
+            positions[node] = len(path)
+            path.append(node)
+            node = next(dep_id for dep_id in graph[node] if in_degree.get(dep_id, 0) > 0)
         
-        # Result is in reverse topological order, so reverse it
-        result.reverse()
-        return result
\ No newline at end of file
+        return path[positions[node]:] + [node]
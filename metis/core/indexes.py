@@ -0,0 +1,275 @@
+"""
+Index structures for Metis storage
+
+This module provides ordered index structures used by the storage layer
+to answer range and ordered queries without sorting the whole store, and
+an online topological order used to reject dependency cycles cheaply.
+"""
+
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class SortedIndex:
+    """
+    Ordered index of unique, comparable keys.
+    
+    Keys are typically tuples such as ``(updated_at, task_id)`` so that
+    ties are broken deterministically. Lookups and range starts are
+    O(log N); inserts and removals are O(log N) searches plus a list
+    shift, which is a fast memory move even for large indexes.
+    It is not thread-safe; callers are expected to hold their own lock.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._keys: List[Tuple[Any, ...]] = []
+    
+    def __len__(self) -> int:
+        """Return the number of keys in the index."""
+        return len(self._keys)
+    
+    def add(self, key: Tuple[Any, ...]) -> None:
+        """
+        Add a key to the index.
+        
+        Args:
+            key: Key to add
+        """
+        insort(self._keys, key)
+    
+    def remove(self, key: Tuple[Any, ...]) -> bool:
+        """
+        Remove a key from the index.
+        
+        Args:
+            key: Key to remove
+        
+        Returns:
+            bool: True if the key was found and removed, False otherwise
+        """
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+            return True
+        return False
+    
+    def clear(self) -> None:
+        """Remove all keys from the index."""
+        self._keys.clear()
+    
+    def ascending(
+        self,
+        start: Optional[Tuple[Any, ...]] = None,
+        stop: Optional[Tuple[Any, ...]] = None
+    ) -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterate keys in ascending order.
+        
+        Args:
+            start: Only yield keys greater than or equal to this key
+            stop: Only yield keys strictly less than this key
+        
+        Returns:
+            Iterator[Tuple[Any, ...]]: Keys in ascending order
+        """
+        lo = bisect_left(self._keys, start) if start is not None else 0
+        hi = bisect_left(self._keys, stop) if stop is not None else len(self._keys)
+        for i in range(lo, hi):
+            yield self._keys[i]
+    
+    def descending(
+        self,
+        before: Optional[Tuple[Any, ...]] = None
+    ) -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterate keys in descending order.
+        
+        Args:
+            before: Only yield keys strictly less than this key
+        
+        Returns:
+            Iterator[Tuple[Any, ...]]: Keys in descending order
+        """
+        hi = bisect_left(self._keys, before) if before is not None else len(self._keys)
+        for i in range(hi - 1, -1, -1):
+            yield self._keys[i]
+    
+    def count_range(
+        self,
+        start: Optional[Tuple[Any, ...]] = None,
+        stop: Optional[Tuple[Any, ...]] = None
+    ) -> int:
+        """
+        Count keys in a half-open range without iterating it.
+        
+        Args:
+            start: Lower bound (inclusive)
+            stop: Upper bound (exclusive)
+        
+        Returns:
+            int: Number of keys in the range
+        """
+        lo = bisect_left(self._keys, start) if start is not None else 0
+        hi = bisect_left(self._keys, stop) if stop is not None else len(self._keys)
+        return max(0, hi - lo)
+
+
+class TopologicalOrder:
+    """
+    Online topological order of a directed acyclic graph (Pearce-Kelly).
+    
+    Every node holds a position such that each edge points from a lower to
+    a higher position. Inserting an edge that already agrees with the order
+    is O(1); otherwise only the nodes between the two endpoints' positions
+    are searched and reordered. A new edge closes a cycle exactly when that
+    bounded search reaches the edge's source.
+    It is not thread-safe; callers are expected to hold their own lock.
+    """
+    
+    def __init__(self):
+        """Initialize an empty order."""
+        self._position: Dict[str, int] = {}
+        self._next_position = 0
+    
+    def __len__(self) -> int:
+        """Return the number of nodes in the order."""
+        return len(self._position)
+    
+    def __contains__(self, node: str) -> bool:
+        """Check whether a node is in the order."""
+        return node in self._position
+    
+    def position(self, node: str) -> int:
+        """
+        Get the position of a node.
+        
+        Args:
+            node: Node to look up
+        
+        Returns:
+            int: Position of the node; lower positions come first
+        """
+        return self._position[node]
+    
+    def add_node(self, node: str) -> None:
+        """
+        Add a node after all existing nodes.
+        
+        Args:
+            node: Node to add
+        """
+        if node not in self._position:
+            self._position[node] = self._next_position
+            self._next_position += 1
+    
+    def remove_node(self, node: str) -> None:
+        """
+        Remove a node. Its edges must already be gone from the graph.
+        
+        Args:
+            node: Node to remove
+        """
+        self._position.pop(node, None)
+    
+    def clear(self) -> None:
+        """Remove all nodes."""
+        self._position.clear()
+        self._next_position = 0
+    
+    def rebuild(self, nodes: Iterable[str], successors: Callable[[str], Iterable[str]]) -> None:
+        """
+        Compute a fresh order for a whole graph (Kahn's algorithm).
+        
+        Nodes on cycles, which cannot be ordered, are placed last.
+        
+        Args:
+            nodes: All nodes of the graph
+            successors: Function returning the direct successors of a node
+        """
+        nodes = list(nodes)
+        in_degree = dict.fromkeys(nodes, 0)
+        for node in nodes:
+            for successor in successors(node):
+                if successor in in_degree:
+                    in_degree[successor] += 1
+        
+        self.clear()
+        ready = deque(node for node in nodes if in_degree[node] == 0)
+        while ready:
+            node = ready.popleft()
+            self.add_node(node)
+            for successor in successors(node):
+                if successor in in_degree:
+                    in_degree[successor] -= 1
+                    if in_degree[successor] == 0:
+                        ready.append(successor)
+        
+        for node in nodes:
+            self.add_node(node)
+    
+    def insert_edge(
+        self,
+        source: str,
+        target: str,
+        successors: Callable[[str], Iterable[str]],
+        predecessors: Callable[[str], Iterable[str]]
+    ) -> bool:
+        """
+        Update the order for a new source -> target edge.
+        
+        Must be called before the edge is added to the graph.
+        
+        Args:
+            source: Source node of the new edge
+            target: Target node of the new edge
+            successors: Function returning the direct successors of a node
+            predecessors: Function returning the direct predecessors of a node
+        
+        Returns:
+            bool: True if the edge keeps the graph acyclic, False if it would
+            close a cycle (the order is left unchanged)
+        """
+        if source == target:
+            return False
+        
+        position = self._position
+        lower, upper = position[target], position[source]
+        if upper < lower:
+            return True
+        
+        # Nodes reachable from the target that are ordered before the source
+        forward = []
+        visited = {target}
+        stack = [target]
+        while stack:
+            node = stack.pop()
+            forward.append(node)
+            for successor in successors(node):
+                if successor == source:
+                    return False
+                if successor not in visited and position[successor] < upper:
+                    visited.add(successor)
+                    stack.append(successor)
+        
+        # Nodes reaching the source that are ordered after the target
+        backward = []
+        visited = {source}
+        stack = [source]
+        while stack:
+            node = stack.pop()
+            backward.append(node)
+            for predecessor in predecessors(node):
+                if predecessor not in visited and position[predecessor] > lower:
+                    visited.add(predecessor)
+                    stack.append(predecessor)
+        
+        # Reuse the affected positions, placing the backward set first
+        backward.sort(key=position.__getitem__)
+        forward.sort(key=position.__getitem__)
+        affected = backward + forward
+        for node, slot in zip(affected, sorted(position[node] for node in affected)):
+            position[node] = slot
+        
+        return True
@@ -14,6 +14,7 @@ from metis.core.task_manager import TaskManager
 from metis.core.llm_adapter import MetisLLMAdapter
 from metis.core.task_decomposer import TaskDecomposer
 from metis.models.enums import TaskStatus
+from metis.models.task import DEFAULT_NAMESPACE
 
 logger = logging.getLogger("metis.mcp.tools")
 
@@ -59,7 +60,7 @@ async def decompose_task(
         depth: Maximum decomposition depth (1-5)
         max_subtasks: Maximum number of subtasks to create (1-20)
         auto_create: Whether to automatically create subtasks
-        
+    
     Returns:
         Dictionary containing decomposition results
     """
@@ -67,8 +68,8 @@ async def decompose_task(
         task_manager = get_task_manager()
         task_decomposer = get_task_decomposer()
         
-        # Get the task (storage method is sync)
-        task = task_manager.storage.get_task(task_id)
+        # Get the task (the storage call runs off the event loop)
+        task = await task_manager.async_storage.get_task(task_id)
         if not task:
             return {
                 "success": False,
@@ -85,14 +86,10 @@ async def decompose_task(
         
         # If auto_create is True and successful, add subtasks to task manager
         if result.get("success") and auto_create and result.get("subtasks"):
-            for subtask in result["subtasks"]:
-                task.add_subtask(subtask)
-            
-            # Update task in storage
-            task_manager.storage.update_task(task_id, {"subtasks": task.subtasks})
+            await task_manager.add_subtasks(task_id, result["subtasks"])
         
         return result
-        
+    
     except Exception as e:
         logger.error(f"Error in decompose_task: {str(e)}")
         return {
@@ -110,7 +107,7 @@ async def analyze_task_complexity(
     Args:
         task_id: ID of the task to analyze
         include_subtasks: Whether to include subtasks in analysis
-        
+    
     Returns:
         Dictionary containing complexity analysis
     """
@@ -118,8 +115,8 @@ async def analyze_task_complexity(
         task_manager = get_task_manager()
         llm_adapter = get_llm_adapter()
         
-        # Get the task (storage method is sync)
-        task = task_manager.storage.get_task(task_id)
+        # Get the task (the storage call runs off the event loop)
+        task = await task_manager.async_storage.get_task(task_id)
         if not task:
             return {
                 "success": False,
@@ -150,13 +147,15 @@ async def analyze_task_complexity(
         if result.get("success") and result.get("analysis"):
             analysis = result["analysis"]
             if "complexity_score" in analysis:
-                # Update task complexity directly on the task
+                # Stored tasks are shared with readers, so update a copy of the score
                 if hasattr(task, 'complexity') and task.complexity:
-                    task.complexity.overall_score = analysis["complexity_score"]
-                    task_manager.storage.update_task(task_id, {"complexity": task.complexity})
+                    complexity = task.complexity.model_copy(
+                        update={"overall_score": analysis["complexity_score"]}
+                    )
+                    await task_manager.update_task(task_id, {"complexity": complexity})
         
         return result
-        
+    
     except Exception as e:
         logger.error(f"Error in analyze_task_complexity: {str(e)}")
         return {
@@ -174,7 +173,7 @@ async def suggest_task_order(
     Args:
         task_ids: List of specific task IDs to order (None for all)
         status_filter: Filter tasks by status (e.g., "pending")
-        
+    
     Returns:
         Dictionary containing execution order suggestions
     """
@@ -184,10 +183,10 @@ async def suggest_task_order(
         
         # Get tasks
         if task_ids:
-            tasks = [task_manager.storage.get_task(tid) for tid in task_ids]
+            tasks = [await task_manager.async_storage.get_task(tid) for tid in task_ids]
             tasks = [t for t in tasks if t is not None]
         else:
-            tasks = list(task_manager.storage._tasks.values())
+            tasks = list((await task_manager.async_storage.snapshot()).tasks.values())
             if status_filter:
                 status_enum = TaskStatus(status_filter.upper())
                 tasks = [t for t in tasks if t.status == status_enum]
@@ -215,12 +214,11 @@ async def suggest_task_order(
         all_deps = []
         for task in tasks:
             # Get dependencies from storage
-            deps = [d for d in task_manager.storage._dependencies.values() 
-                   if d.from_task_id == task.id or d.to_task_id == task.id]
+            deps = await task_manager.async_storage.list_dependencies(task_id=task.id)
             for dep in deps:
                 all_deps.append({
-                    "from_task": dep.from_task_id,
-                    "to_task": dep.to_task_id,
+                    "from_task": dep.source_task_id,
+                    "to_task": dep.target_task_id,
                     "type": dep.dependency_type.value if hasattr(dep.dependency_type, 'value') else str(dep.dependency_type)
                 })
         
@@ -231,7 +229,7 @@ async def suggest_task_order(
         )
         
         return result
-        
+    
     except Exception as e:
         logger.error(f"Error in suggest_task_order: {str(e)}")
         return {
@@ -253,7 +251,7 @@ async def generate_subtasks(
         description: Description to generate subtasks from
         parent_task_id: Optional parent task to attach subtasks to
         auto_create_task: Whether to create a new task if parent_task_id is None
-        
+    
     Returns:
         Dictionary containing generated subtasks
     """
@@ -263,7 +261,7 @@ async def generate_subtasks(
         
         # If parent task ID provided, verify it exists
         if parent_task_id:
-            parent_task = task_manager.storage.get_task(parent_task_id)
+            parent_task = await task_manager.async_storage.get_task(parent_task_id)
             if not parent_task:
                 return {
                     "success": False,
@@ -271,15 +269,13 @@ async def generate_subtasks(
                 }
         elif auto_create_task:
             # Create a new task
-            from metis.models.task import Task
             from metis.models.enums import Priority
-            new_task = Task(
-                title=title,
-                description=description,
-                status=TaskStatus.PENDING,
-                priority=Priority.MEDIUM
-            )
-            task_manager.storage.create_task(new_task)
+            new_task = await task_manager.create_task({
+                "title": title,
+                "description": description,
+                "status": TaskStatus.PENDING,
+                "priority": Priority.MEDIUM
+            })
             parent_task_id = new_task.id
         
         # Generate subtasks using LLM
@@ -293,25 +289,23 @@ async def generate_subtasks(
         # If successful and we have a parent task, create the subtasks
         if result.get("success") and parent_task_id and result.get("subtasks"):
             task_decomposer = get_task_decomposer()
-            created_subtasks = []
-            
-            for idx, subtask_data in enumerate(result["subtasks"]):
-                subtask = task_decomposer._create_subtask_from_data(
+            created_subtasks = [
+                task_decomposer._create_subtask_from_data(
                     task_id=parent_task_id,
                     subtask_data=subtask_data,
                     order=idx + 1
                 )
-                parent_task = task_manager.storage.get_task(parent_task_id)
-                if parent_task:
-                    parent_task.add_subtask(subtask)
-                    task_manager.storage.update_task(parent_task_id, {"subtasks": parent_task.subtasks})
-                created_subtasks.append(subtask)
+                for idx, subtask_data in enumerate(result["subtasks"])
+            ]
+            
+            # Attach all subtasks with a single storage update
+            await task_manager.add_subtasks(parent_task_id, created_subtasks)
             
             result["created_subtasks"] = created_subtasks
             result["parent_task_id"] = parent_task_id
         
         return result
-        
+    
     except Exception as e:
         logger.error(f"Error in generate_subtasks: {str(e)}")
         return {
@@ -329,7 +323,7 @@ async def detect_dependencies(
     Args:
         task_ids: List of task IDs to analyze (None for all)
         auto_create: Whether to automatically create detected dependencies
-        
+    
     Returns:
         Dictionary containing detected dependencies
     """
@@ -338,10 +332,10 @@ async def detect_dependencies(
         
         # Get tasks
         if task_ids:
-            tasks = [task_manager.storage.get_task(tid) for tid in task_ids]
+            tasks = [await task_manager.async_storage.get_task(tid) for tid in task_ids]
             tasks = [t for t in tasks if t is not None]
         else:
-            tasks = list(task_manager.storage._tasks.values())
+            tasks = list((await task_manager.async_storage.snapshot()).tasks.values())
         
         if len(tasks) < 2:
             return {
@@ -387,14 +381,13 @@ async def detect_dependencies(
             for dep in detected:
                 if dep["confidence"] >= 0.7:
                     try:
-                        # Create dependency directly in storage
-                        from metis.models.dependency import Dependency, DependencyType
-                        new_dep = Dependency(
-                            from_task_id=dep["from_task_id"],
-                            to_task_id=dep["to_task_id"],
-                            dependency_type=DependencyType.BLOCKS
-                        )
-                        task_manager.storage._dependencies[new_dep.id] = new_dep
+                        # Create through the task manager so that task events fire
+                        from metis.models.dependency import DependencyType
+                        await task_manager.create_dependency({
+                            "source_task_id": dep["from_task_id"],
+                            "target_task_id": dep["to_task_id"],
+                            "dependency_type": DependencyType.BLOCKS
+                        })
                         created.append(dep)
                     except Exception as e:
                         logger.warning(f"Could not create dependency: {e}")
@@ -410,7 +403,7 @@ async def detect_dependencies(
             "dependencies": detected,
             "auto_created": False
         }
-        
+    
     except Exception as e:
         logger.error(f"Error in detect_dependencies: {str(e)}")
         return {
@@ -418,6 +411,273 @@ async def detect_dependencies(
             "error": str(e)
         }
 
+async def get_task_statistics(namespace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get live task statistics.
+    
+    Args:
+        namespace: Only count tasks in this namespace (None for all)
+    
+    Returns:
+        Dictionary containing task counts by status, priority, assignee,
+        tag, complexity level and namespace, plus overdue counts
+    """
+    try:
+        task_manager = get_task_manager()
+        
+        return {
+            "success": True,
+            "statistics": await task_manager.get_statistics(namespace=namespace)
+        }
+    
+    except Exception as e:
+        logger.error(f"Error in get_task_statistics: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def create_task(
+    title: str,
+    description: str,
+    namespace: str = DEFAULT_NAMESPACE,
+    **fields: Any
+) -> Dict[str, Any]:
+    """
+    Create a task in a namespace.
+    
+    Args:
+        title: Title of the task
+        description: Description of the task
+        namespace: Namespace to create the task in
+        **fields: Other task fields (priority, tags, assignee, ...)
+    
+    Returns:
+        Dictionary containing the created task
+    """
+    try:
+        task_manager = get_task_manager()
+        task = await task_manager.create_task(
+            dict(fields, title=title, description=description, namespace=namespace)
+        )
+        
+        return {
+            "success": True,
+            "task": task.dict()
+        }
+    
+    except Exception as e:
+        logger.error(f"Error in create_task: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def list_tasks(
+    namespace: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assignee: Optional[str] = None,
+    tag: Optional[str] = None,
+    search: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 50
+) -> Dict[str, Any]:
+    """
+    List tasks, optionally scoped to one namespace.
+    
+    Args:
+        namespace: Only list tasks in this namespace (None for all)
+        status: Filter by status
+        priority: Filter by priority
+        assignee: Filter by assignee
+        tag: Filter by tag
+        search: Search terms for title/description/details
+        page: Page number (1-based)
+        page_size: Number of tasks per page
+    
+    Returns:
+        Dictionary containing the tasks and the total count
+    """
+    try:
+        task_manager = get_task_manager()
+        tasks, total = await task_manager.list_tasks(
+            status=status,
+            priority=priority,
+            assignee=assignee,
+            tag=tag,
+            search=search,
+            page=page,
+            page_size=page_size,
+            namespace=namespace
+        )
+        
+        return {
+            "success": True,
+            "tasks": [task.dict() for task in tasks],
+            "total": total
+        }
+    
+    except Exception as e:
+        logger.error(f"Error in list_tasks: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def list_namespaces() -> Dict[str, Any]:
+    """
+    List the namespaces that have tasks.
+    
+    Returns:
+        Dictionary containing the number of tasks by namespace
+    """
+    try:
+        task_manager = get_task_manager()
+        
+        return {
+            "success": True,
+            "namespaces": await task_manager.list_namespaces()
+        }
+    
+    except Exception as e:
+        logger.error(f"Error in list_namespaces: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def list_ready_tasks(namespace: Optional[str] = None, limit: int = 10) -> Dict[str, Any]:
+    """
+    List the tasks that can start now.
+    
+    Args:
+        namespace: Only list tasks in this namespace (None for all)
+        limit: Maximum number of tasks to return
+    
+    Returns:
+        Dictionary containing the pending tasks whose dependencies are all
+        done, highest priority first, then oldest first
+    """
+    try:
+        task_manager = get_task_manager()
+        tasks = await task_manager.list_ready_tasks(limit=limit, namespace=namespace)
+        
+        return {
+            "success": True,
+            "tasks": [task.dict() for task in tasks]
+        }
+    
+    except Exception as e:
+        logger.error(f"Error in list_ready_tasks: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def analyze_dependencies(namespace: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Report every dependency cycle and missing dependency at once.
+    
+    Args:
+        namespace: Only analyze tasks in this namespace (None for all)
+    
+    Returns:
+        Dictionary containing the cycle groups, the dependencies whose
+        removal breaks each group, and the missing dependencies
+    """
+    try:
+        task_manager = get_task_manager()
+        
+        return {
+            "success": True,
+            **await task_manager.analyze_dependencies(namespace=namespace)
+        }
+    
+    except Exception as e:
+        logger.error(f"Error in analyze_dependencies: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_critical_path(namespace: str = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+    """
+    Get the critical path and slack of the tasks in a namespace.
+    
+    Args:
+        namespace: Namespace to schedule
+    
+    Returns:
+        Dictionary containing the critical path task IDs, the project
+        duration and the slack of every task
+    """
+    try:
+        task_manager = get_task_manager()
+        
+        return {
+            "success": True,
+            "namespace": namespace,
+            **await task_manager.get_critical_path(namespace)
+        }
+    
+    except Exception as e:
+        logger.error(f"Error in get_critical_path: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_task_impact(
+    task_id: str,
+    direction: str = "downstream",
+    max_depth: Optional[int] = None,
+    limit: int = 100
+) -> Dict[str, Any]:
+    """
+    List the tasks downstream or upstream of a task.
+    
+    Args:
+        task_id: ID of the task
+        direction: "downstream" for the tasks blocked if it slips,
+            "upstream" for the tasks it waits on
+        max_depth: Only follow this many dependency links (None for no limit)
+        limit: Maximum number of tasks to return
+    
+    Returns:
+        Dictionary containing the reached task IDs, titles, statuses and
+        distances, nearest first, and the total number reached
+    """
+    try:
+        task_manager = get_task_manager()
+        if direction == "downstream":
+            reached, total = await task_manager.list_downstream_tasks(task_id, max_depth, limit)
+        elif direction == "upstream":
+            reached, total = await task_manager.list_upstream_tasks(task_id, max_depth, limit)
+        else:
+            return {
+                "success": False,
+                "error": f"Invalid direction: {direction}"
+            }
+        
+        return {
+            "success": True,
+            "task_id": task_id,
+            "direction": direction,
+            "tasks": [
+                {"id": task.id, "title": task.title, "status": task.status, "depth": depth}
+                for task, depth in reached
+            ],
+            "total": total
+        }
+    
+    except Exception as e:
+        logger.error(f"Error in get_task_impact: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
 # Tool lists for MCP registration
 task_management_tools = [
     {
@@ -537,14 +797,199 @@ task_management_tools = [
                 }
             }
         }
+    },
+    {
+        "name": "create_task",
+        "description": "Create a task in a namespace",
+        "function": create_task,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "title": {
+                    "type": "string",
+                    "description": "Title of the task"
+                },
+                "description": {
+                    "type": "string",
+                    "description": "Description of the task"
+                },
+                "namespace": {
+                    "type": "string",
+                    "description": "Namespace (project) of the task",
+                    "default": DEFAULT_NAMESPACE
+                },
+                "priority": {
+                    "type": "string",
+                    "description": "Priority of the task",
+                    "enum": ["low", "medium", "high"]
+                },
+                "tags": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Tags of the task"
+                },
+                "assignee": {
+                    "type": "string",
+                    "description": "Assignee of the task"
+                }
+            },
+            "required": ["title", "description"]
+        }
+    },
+    {
+        "name": "list_tasks",
+        "description": "List tasks, optionally scoped to one namespace",
+        "function": list_tasks,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "namespace": {
+                    "type": "string",
+                    "description": "Only list tasks in this namespace"
+                },
+                "status": {
+                    "type": "string",
+                    "description": "Filter by status"
+                },
+                "priority": {
+                    "type": "string",
+                    "description": "Filter by priority"
+                },
+                "assignee": {
+                    "type": "string",
+                    "description": "Filter by assignee"
+                },
+                "tag": {
+                    "type": "string",
+                    "description": "Filter by tag"
+                },
+                "search": {
+                    "type": "string",
+                    "description": "Search terms for title/description/details"
+                },
+                "page": {
+                    "type": "integer",
+                    "description": "Page number",
+                    "default": 1
+                },
+                "page_size": {
+                    "type": "integer",
+                    "description": "Number of tasks per page (1-100)",
+                    "default": 50
+                }
+            }
+        }
+    },
+    {
+        "name": "list_namespaces",
+        "description": "List the namespaces that have tasks, with their task counts",
+        "function": list_namespaces,
+        "parameters": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "list_ready_tasks",
+        "description": "List the pending tasks whose dependencies are all done, highest priority first, so a worker can pick the next task to run",
+        "function": list_ready_tasks,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "namespace": {
+                    "type": "string",
+                    "description": "Only list tasks in this namespace"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of tasks to return",
+                    "default": 10
+                }
+            }
+        }
     }
 ]
 
 # Dependency Management Tools  
-dependency_management_tools = []
+dependency_management_tools = [
+    {
+        "name": "analyze_dependencies",
+        "description": "Report every group of cyclically dependent tasks, the dependencies whose removal breaks each group, and every missing dependency",
+        "function": analyze_dependencies,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "namespace": {
+                    "type": "string",
+                    "description": "Only analyze tasks in this namespace"
+                }
+            }
+        }
+    },
+    {
+        "name": "get_critical_path",
+        "description": "Get the tasks that determine the project duration and how far every other task can slip",
+        "function": get_critical_path,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "namespace": {
+                    "type": "string",
+                    "description": "Namespace to schedule",
+                    "default": DEFAULT_NAMESPACE
+                }
+            }
+        }
+    },
+    {
+        "name": "get_task_impact",
+        "description": "List the tasks transitively blocked by a task, or the tasks it transitively waits on",
+        "function": get_task_impact,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "task_id": {
+                    "type": "string",
+                    "description": "ID of the task"
+                },
+                "direction": {
+                    "type": "string",
+                    "enum": ["downstream", "upstream"],
+                    "description": "downstream for tasks depending on it, upstream for tasks it depends on",
+                    "default": "downstream"
+                },
+                "max_depth": {
+                    "type": "integer",
+                    "description": "Maximum number of dependency links to follow"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of tasks to return",
+                    "default": 100
+                }
+            },
+            "required": ["task_id"]
+        }
+    }
+]
 
 # Analytics Tools
-analytics_tools = []
+analytics_tools = [
+    {
+        "name": "get_task_statistics",
+        "description": "Get task counts by status, priority, assignee, tag, complexity and namespace, plus overdue counts",
+        "function": get_task_statistics,
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "namespace": {
+                    "type": "string",
+                    "description": "Only count tasks in this namespace"
+                }
+            }
+        }
+    }
+]
 
 # Telos Integration Tools
 telos_integration_tools = []
@@ -1,4 +1,5 @@
 """Metis component implementation using StandardComponentBase."""
+import json
 import logging
 from typing import List, Dict, Any
 from pathlib import Path
@@ -21,7 +22,29 @@ class MetisComponent(StandardComponentBase):
         self.mcp_tools = {}
         self.fastmcp_server = None
         self.db_path = None
+    
+    def _create_storage(self):
+        """Create the storage backend selected by STORAGE_BACKEND."""
+        from metis.config import config
+        from metis.core.storage import SQLiteStorage
+        from metis.core.partitions import PartitionedStorage
+        
+        backend = config.get("STORAGE_BACKEND", "memory")
+        if backend == "sqlite":
+            # An explicit DB_URL wins over the component data directory
+            db_url = config.get("DB_URL")
+            if isinstance(db_url, str):
+                storage = SQLiteStorage.from_url(db_url)
+            else:
+                storage = SQLiteStorage(str(self.db_path))
+            logger.info(f"Using SQLite storage at {storage.db_path}")
+            return storage
         
+        if backend != "memory":
+            logger.warning(f"Unknown storage backend '{backend}', using in-memory storage")
+        # One in-memory partition per namespace
+        return PartitionedStorage()
+    
     async def _component_specific_init(self):
         """Initialize Metis-specific services."""
         # Critical components - fail if these don't work
@@ -29,8 +52,10 @@ class MetisComponent(StandardComponentBase):
         self.db_path = Path(self.global_config.get_data_dir("metis")) / "tasks.db"
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Initialize task manager (uses InMemoryStorage by default)
-        self.task_manager = TaskManager()
+        # Initialize task manager (in-memory partitions unless SQLite is configured)
+        self.task_manager = TaskManager(self._create_storage())
+        self.task_manager.start_overdue_sweep()
+        self.task_manager.start_archive_sweep()
         
         # Initialize connection manager for WebSocket
         self.connection_manager = ConnectionManager()
@@ -54,7 +79,7 @@ class MetisComponent(StandardComponentBase):
             # Update the global task manager reference in mcp_tools
             # This is a temporary workaround until we refactor mcp_tools
             mcp_tools._task_manager = self.task_manager
-                    
+            
             logger.info("MCP tools initialized successfully")
         except Exception as e:
             logger.warning(f"MCP tools initialization failed: {e}")
@@ -73,21 +98,21 @@ class MetisComponent(StandardComponentBase):
             self.task_manager.on_task_deleted = self._handle_task_deleted
             self.task_manager.on_task_completed = self._handle_task_completed
     
+    async def _broadcast_task(self, event: str, task) -> None:
+        """Broadcast a task event, reusing the task's cached JSON encoding."""
+        await self.connection_manager.broadcast_json(
+            f'{{"event": {json.dumps(event)}, "task": {task.to_json()}}}'
+        )
+    
     async def _handle_task_created(self, task):
         """Handle task created event."""
         if self.connection_manager:
-            await self.connection_manager.broadcast({
-                "event": "task_created",
-                "task": task.dict()
-            })
+            await self._broadcast_task("task_created", task)
     
     async def _handle_task_updated(self, task):
         """Handle task updated event."""
         if self.connection_manager:
-            await self.connection_manager.broadcast({
-                "event": "task_updated", 
-                "task": task.dict()
-            })
+            await self._broadcast_task("task_updated", task)
     
     async def _handle_task_deleted(self, task_id):
         """Handle task deleted event."""
@@ -100,10 +125,7 @@ class MetisComponent(StandardComponentBase):
     async def _handle_task_completed(self, task):
         """Handle task completed event."""
         if self.connection_manager:
-            await self.connection_manager.broadcast({
-                "event": "task_completed",
-                "task": task.dict()
-            })
+            await self._broadcast_task("task_completed", task)
     
     async def _component_specific_cleanup(self):
         """Cleanup Metis-specific resources."""
@@ -120,8 +142,11 @@ class MetisComponent(StandardComponentBase):
             except Exception as e:
                 logger.warning(f"Error during FastMCP cleanup: {e}")
         
-        # Task manager doesn't have a close method - it uses InMemoryStorage
+        # Flush pending writes and close the storage backend if it holds a connection
         if self.task_manager:
+            await self.task_manager.close()
+            if hasattr(self.task_manager.storage, "close"):
+                self.task_manager.storage.close()
             logger.info("Task manager cleanup completed")
         
         # Cleanup MCP tools if needed
@@ -146,7 +171,7 @@ class MetisComponent(StandardComponentBase):
         
         if self.fastmcp_server:
             capabilities.append("fastmcp_server")
-            
+        
         return capabilities
     
     def get_metadata(self) -> Dict[str, Any]:
@@ -159,6 +184,8 @@ class MetisComponent(StandardComponentBase):
             "database": str(self.db_path) if self.db_path else None
         }
         
-        # Task manager doesn't have get_task_count method
-            
+        # Snapshot lag and last flush time for monitoring
+        if self.task_manager:
+            metadata["persistence"] = self.task_manager.get_persistence_status()
+        
         return metadata
\ No newline at end of file
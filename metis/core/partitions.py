@@ -0,0 +1,1009 @@
+"""
+Namespace-partitioned storage for Metis
+
+This module provides a storage that keeps every namespace (project) in
+its own InMemoryStorage partition, with separate maps, indexes and locks.
+Writes and scoped queries in one namespace never wait for another, and a
+namespace can be loaded or saved on its own.
+"""
+
+import heapq
+import os
+import threading
+from contextlib import ExitStack
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from metis.models.task import Task, DEFAULT_NAMESPACE
+from metis.models.dependency import Dependency
+from metis.core.storage import (
+    InMemoryStorage, StorageSnapshot, filter_tasks, order_tasks, page_tasks,
+    prepare_task_updates, read_state, ready_order_key, utc_naive, validate_task_batch, write_state
+)
+from metis.core.changes import Change, ChangeFeed
+from metis.core.archive import TaskArchive
+from metis.core.persistence import TaskJournal, gc_paused
+
+
+class PartitionedStorage:
+    """
+    Storage partitioned by task namespace.
+    
+    Implements the InMemoryStorage interface. Each namespace is held by its
+    own InMemoryStorage; the partitions share one change feed, so change
+    sequence numbers stay global, and share the journal and archive, which
+    are safe to use concurrently. Lookups by ID go through a map of task
+    IDs to namespaces, kept under the registry lock, which also makes the
+    check that a new ID is unused in other namespaces atomic with claiming
+    it. Dependencies may only link tasks of the same namespace.
+    """
+    
+    is_persistent = False  # State is only kept through JSON backups
+    
+    def __init__(self, change_feed_size: int = 10000):
+        """
+        Initialize the partitioned storage.
+        
+        Args:
+            change_feed_size: Number of recent changes kept for incremental sync
+        """
+        self._partitions: Dict[str, InMemoryStorage] = {}
+        self._lock = threading.RLock()  # Guards the partition registry; held while compacting
+        self._namespaces: Dict[str, str] = {}  # Task ID -> namespace, for tasks in a partition or the archive
+        self._change_feed = ChangeFeed(change_feed_size)
+        self._journal: Optional[TaskJournal] = None
+        self._archive: Optional[TaskArchive] = None
+        self._snapshot: Optional[StorageSnapshot] = None
+    
+    @property
+    def version(self) -> int:
+        """Number of changes made across all partitions."""
+        return sum(partition.version for partition in list(self._partitions.values()))
+    
+    @property
+    def latest_sequence(self) -> int:
+        """Sequence number of the latest change in the shared change feed."""
+        return self._change_feed.latest_sequence
+    
+    def partition(self, namespace: str) -> InMemoryStorage:
+        """
+        Get the partition of a namespace, creating it on first use.
+        
+        Args:
+            namespace: Namespace name
+        
+        Returns:
+            InMemoryStorage: Partition holding the namespace
+        """
+        partition = self._partitions.get(namespace)
+        if partition is not None:
+            return partition
+        
+        with self._lock:
+            partition = self._partitions.get(namespace)
+            if partition is None:
+                partition = InMemoryStorage(change_feed=self._change_feed)
+                partition.attach_journal(self._journal)
+                partition.attach_archive(self._archive)
+                self._partitions[namespace] = partition
+            return partition
+    
+    def list_namespaces(self) -> Dict[str, int]:
+        """
+        List the namespaces that have tasks in the working set.
+        
+        Returns:
+            Dict[str, int]: Number of tasks by namespace
+        """
+        return {
+            namespace: len(partition)
+            for namespace, partition in sorted(self._partitions.items())
+            if len(partition)
+        }
+    
+    def get_changes(self, since: int, limit: int = 1000) -> Optional[Tuple[List[Change], bool]]:
+        """
+        Get the changes made in any namespace after a sequence number.
+        
+        Args:
+            since: Last sequence number the client has seen
+            limit: Maximum number of changes to return
+        
+        Returns:
+            Optional[Tuple[List[Change], bool]]: Changes in sequence order and
+            whether more changes follow, or None if the client must resync
+        """
+        return self._change_feed.since(since, limit)
+    
+    def snapshot(self) -> StorageSnapshot:
+        """
+        Get a read-only view of all namespaces.
+        
+        Each namespace is consistent on its own; the combined view is
+        rebuilt only after some partition changed.
+        
+        Returns:
+            StorageSnapshot: Snapshot of all partitions
+        """
+        version = self.version
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        
+        tasks: Dict[str, Task] = {}
+        dependencies: Dict[str, Dependency] = {}
+        for partition in list(self._partitions.values()):
+            partition_snapshot = partition.snapshot()
+            tasks.update(partition_snapshot.tasks)
+            dependencies.update(partition_snapshot.dependencies)
+        
+        self._snapshot = StorageSnapshot(version, tasks, dependencies)
+        return self._snapshot
+    
+    # Routing
+    
+    def _namespace_of(self, task_id: str) -> Optional[str]:
+        """
+        Find the namespace of a task, including archived tasks.
+        
+        IDs missing from the map, such as archived tasks not seen since
+        startup or a dependency a partition brought back from the archive
+        on its own, are probed for and then recorded. Probing holds the
+        registry lock, so it cannot record a task deleted meanwhile.
+        
+        Args:
+            task_id: ID of the task
+        
+        Returns:
+            Optional[str]: Namespace if the task exists, None otherwise
+        """
+        namespace = self._namespaces.get(task_id)
+        if namespace is not None:
+            return namespace
+        
+        with self._lock:
+            namespace = self._namespaces.get(task_id)
+            if namespace is not None:
+                return namespace
+            
+            for namespace, partition in self._partitions.items():
+                if partition.has_task(task_id):
+                    break
+            else:
+                task = self._archive.get(task_id) if self._archive is not None and task_id in self._archive else None
+                if task is None:
+                    return None
+                namespace = task.namespace
+            
+            self._namespaces[task_id] = namespace
+            return namespace
+    
+    def _find_partition(self, task_id: str) -> Optional[InMemoryStorage]:
+        """
+        Find the partition holding a task, including archived tasks.
+        
+        Args:
+            task_id: ID of the task
+        
+        Returns:
+            Optional[InMemoryStorage]: Partition if the task exists, None otherwise
+        """
+        namespace = self._namespace_of(task_id)
+        return self.partition(namespace) if namespace is not None else None
+    
+    def _find_dependency_partition(self, dependency_id: str) -> Optional[InMemoryStorage]:
+        """Find the partition holding a dependency."""
+        for partition in list(self._partitions.values()):
+            if partition.get_dependency(dependency_id) is not None:
+                return partition
+        return None
+    
+    def _claim_ids(self, tasks: List[Task]) -> List[str]:
+        """
+        Record the namespaces of tasks about to be stored.
+        
+        Every ID is checked before any is claimed, under the registry lock,
+        so two namespaces cannot both claim an ID.
+        
+        Args:
+            tasks: Tasks about to be stored
+        
+        Returns:
+            List[str]: IDs that were not claimed before, to release if
+            storing the tasks fails
+        
+        Raises:
+            ValueError: If an ID belongs to a task of another namespace
+        """
+        with self._lock:
+            claims: Dict[str, str] = {}
+            for task in tasks:
+                owner = claims.get(task.id) or self._namespace_of(task.id)
+                if owner is not None and owner != task.namespace:
+                    raise ValueError(f"Task ID already used in another namespace: {task.id}")
+                claims[task.id] = task.namespace
+            
+            claimed = [task_id for task_id in claims if task_id not in self._namespaces]
+            self._namespaces.update(claims)
+            return claimed
+    
+    def _release_ids(self, task_ids: Iterable[str]) -> None:
+        """Forget the namespaces of tasks that were not stored or were deleted."""
+        with self._lock:
+            for task_id in task_ids:
+                self._namespaces.pop(task_id, None)
+    
+    @staticmethod
+    def _lock_all(partitions: Iterable[InMemoryStorage]) -> ExitStack:
+        """
+        Hold the locks of several partitions.
+        
+        Locks are always taken in the same (ID) order, so concurrent
+        multi-partition operations cannot deadlock.
+        
+        Args:
+            partitions: Partitions to lock
+        
+        Returns:
+            ExitStack: Context releasing the locks on exit
+        """
+        stack = ExitStack()
+        for partition in sorted(set(partitions), key=id):
+            stack.enter_context(partition.locked())
+        return stack
+    
+    # Task operations
+    
+    def create_task(self, task: Task) -> Task:
+        """
+        Create a new task in its namespace.
+        
+        Args:
+            task: Task to create
+        
+        Returns:
+            Task: Created task with ID assigned
+        
+        Raises:
+            ValueError: If the ID is already used, in this or another
+                namespace, or a dependency is missing from the namespace
+        """
+        claimed = self._claim_ids([task])
+        try:
+            return self.partition(task.namespace).create_task(task)
+        except Exception:
+            self._release_ids(claimed)
+            raise
+    
+    def get_task(self, task_id: str) -> Optional[Task]:
+        """
+        Get a task by ID from any namespace.
+        
+        Args:
+            task_id: ID of the task to retrieve
+        
+        Returns:
+            Optional[Task]: Task if found, None otherwise
+        """
+        namespace = self._namespace_of(task_id)
+        if namespace is None:
+            return None
+        
+        partition = self._partitions.get(namespace)
+        if partition is not None:
+            return partition.get_task(task_id)
+        return self._archive.get(task_id) if self._archive is not None else None
+    
+    def update_task(self, task_id: str, updates: Dict[str, Any]) -> Optional[Task]:
+        """
+        Update a task by ID.
+        
+        Args:
+            task_id: ID of the task to update
+            updates: Dictionary of field updates
+        
+        Returns:
+            Optional[Task]: Updated task if found, None otherwise
+        """
+        partition = self._find_partition(task_id)
+        return partition.update_task(task_id, updates) if partition is not None else None
+    
+    def edit_task(self, task_id: str, edit: Callable[[Task], Any]) -> Optional[Tuple[Task, Any]]:
+        """
+        Change a task's subtasks or requirement references and store it.
+        
+        Args:
+            task_id: ID of the task
+            edit: Function changing the task; returning None or False means
+                nothing was changed
+        
+        Returns:
+            Optional[Tuple[Task, Any]]: The stored task and the result of the
+            change, or None if the task was not found
+        """
+        partition = self._find_partition(task_id)
+        return partition.edit_task(task_id, edit) if partition is not None else None
+    
+    def delete_task(self, task_id: str) -> bool:
+        """
+        Delete a task by ID.
+        
+        Args:
+            task_id: ID of the task to delete
+        
+        Returns:
+            bool: True if task was found and deleted, False otherwise
+        """
+        partition = self._find_partition(task_id)
+        if partition is None or not partition.delete_task(task_id):
+            return False
+        
+        self._release_ids([task_id])
+        return True
+    
+    def create_tasks(self, tasks: List[Task]) -> List[Task]:
+        """
+        Create several tasks atomically, possibly across namespaces.
+        
+        Every namespace's part of the batch is validated, with the involved
+        partitions locked, before any task is stored.
+        
+        Args:
+            tasks: Tasks to create
+        
+        Returns:
+            List[Task]: Created tasks with IDs assigned
+        
+        Raises:
+            ValueError: If a dependency is missing or the batch is inconsistent
+        """
+        groups: Dict[str, List[Task]] = {}
+        for task in tasks:
+            groups.setdefault(task.namespace, []).append(task)
+        
+        # Claimed before any partition is locked, as the registry lock comes first
+        claimed = self._claim_ids(tasks)
+        try:
+            if len(groups) == 1:
+                return self.partition(tasks[0].namespace).create_tasks(tasks)
+            
+            partitions = {namespace: self.partition(namespace) for namespace in groups}
+            with self._lock_all(partitions.values()):
+                for namespace, group in groups.items():
+                    partition = partitions[namespace]
+                    validate_task_batch(group, lambda task_id: partition.get_task(task_id) is not None)
+                
+                for namespace, group in groups.items():
+                    partitions[namespace].create_tasks(group)
+            return tasks
+        except Exception:
+            self._release_ids(claimed)
+            raise
+    
+    def update_tasks(self, updates_map: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Task]]:
+        """
+        Update several tasks atomically, possibly across namespaces.
+        
+        Args:
+            updates_map: Dictionary mapping task IDs to update dictionaries
+        
+        Returns:
+            Dict[str, Optional[Task]]: Updated tasks by ID (None for unknown IDs)
+        
+        Raises:
+            ValueError: If any update is invalid; no task is changed
+        """
+        results: Dict[str, Optional[Task]] = {}
+        groups: Dict[InMemoryStorage, Dict[str, Dict[str, Any]]] = {}
+        for task_id, updates in updates_map.items():
+            partition = self._find_partition(task_id)
+            if partition is None:
+                results[task_id] = None
+            else:
+                groups.setdefault(partition, {})[task_id] = updates
+        
+        with self._lock_all(groups):
+            if len(groups) > 1:
+                # Validate every part before any partition is changed
+                for partition, group in groups.items():
+                    prepare_task_updates(
+                        group, partition.get_task, lambda task_id: partition.get_task(task_id) is not None
+                    )
+            
+            for partition, group in groups.items():
+                results.update(partition.update_tasks(group))
+        return results
+    
+    def list_tasks(
+        self,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        assignee: Optional[str] = None,
+        tag: Optional[str] = None,
+        search: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 50,
+        sort: str = "updated_at",
+        cursor: Optional[str] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        include_archived: bool = False,
+        namespace: Optional[str] = None
+    ) -> Tuple[List[Task], int]:
+        """
+        List tasks with optional filtering.
+        
+        A namespace-scoped query only touches that namespace's partition.
+        Unscoped queries take the first pages of every partition and merge
+        them; relevance is then re-scored over the merged candidates.
+        Arguments are as for InMemoryStorage.list_tasks.
+        
+        Returns:
+            Tuple[List[Task], int]: List of tasks and total count
+        
+        Raises:
+            ValueError: If the sort order or cursor is invalid
+        """
+        filters = dict(
+            status=status, priority=priority, assignee=assignee, tag=tag,
+            due_after=due_after, due_before=due_before
+        )
+        
+        if namespace:
+            partition = self._partitions.get(namespace)
+            if partition is None:
+                partition = self.partition(namespace) if include_archived and self._archive else None
+            if partition is None:
+                return [], 0
+            return partition.list_tasks(
+                search=search, page=page, page_size=page_size, sort=sort, cursor=cursor,
+                include_archived=include_archived, namespace=namespace, **filters
+            )
+        
+        partitions = list(self._partitions.values())
+        archived_included = include_archived and self._archive is not None and len(self._archive)
+        if len(partitions) == 1 and not archived_included:
+            return partitions[0].list_tasks(
+                search=search, page=page, page_size=page_size, sort=sort, cursor=cursor, **filters
+            )
+        
+        # Every partition contributes its own first pages, in order
+        end = page_size if cursor else page * page_size
+        candidates: List[Task] = []
+        total = 0
+        for partition in partitions:
+            tasks, count = partition.list_tasks(
+                search=search, page=1, page_size=end, sort=sort, cursor=cursor, **filters
+            )
+            candidates.extend(tasks)
+            total += count
+        
+        hot_count = len(candidates)
+        if archived_included:
+            candidates.extend(filter_tasks(
+                (task for task in self._archive.tasks() if self._find_hot(task.id) is None),
+                **filters
+            ))
+        
+        ordered = order_tasks(candidates, sort, search)
+        total += len(ordered) - hot_count
+        return page_tasks(ordered, 1 if cursor else page, page_size, cursor), total
+    
+    def _find_hot(self, task_id: str) -> Optional[InMemoryStorage]:
+        """Find the partition holding a task in its working set."""
+        namespace = self._namespace_of(task_id)
+        partition = self._partitions.get(namespace) if namespace is not None else None
+        return partition if partition is not None and partition.has_task(task_id) else None
+    
+    def list_overdue_tasks(self, now: Optional[datetime] = None) -> List[Task]:
+        """
+        List open tasks whose due date has passed, most overdue first.
+        
+        Args:
+            now: Reference time (defaults to the current UTC time)
+        
+        Returns:
+            List[Task]: Overdue tasks
+        """
+        tasks = [
+            task
+            for partition in list(self._partitions.values())
+            for task in partition.list_overdue_tasks(now)
+        ]
+        tasks.sort(key=lambda task: (utc_naive(task.due_date), task.id))
+        return tasks
+    
+    def get_statistics(self, now: Optional[datetime] = None, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get task counts, summed over all namespaces or for one namespace.
+        
+        Archived tasks are only counted over all namespaces, as the archive
+        is not indexed by namespace.
+        
+        Args:
+            now: Reference time for overdue counts (defaults to the current UTC time)
+            namespace: Only count tasks in this namespace
+        
+        Returns:
+            Dict[str, Any]: Task statistics
+        """
+        if namespace:
+            partitions = [self._partitions[namespace]] if namespace in self._partitions else []
+        else:
+            partitions = list(self._partitions.values())
+        
+        stats: Dict[str, Any] = {
+            "total_tasks": 0,
+            "by_status": {},
+            "by_priority": {},
+            "by_assignee": {},
+            "by_tag": {},
+            "by_complexity": {},
+            "by_namespace": {},
+            "with_due_date": 0,
+            "overdue": 0,
+            "version": self.version
+        }
+        if not namespace:
+            stats["archived_tasks"] = len(self._archive) if self._archive is not None else 0
+        
+        for partition in partitions:
+            partition_stats = partition.get_statistics(now)
+            for key in ("total_tasks", "with_due_date", "overdue"):
+                stats[key] += partition_stats[key]
+            for key in ("by_status", "by_priority", "by_assignee", "by_tag", "by_complexity", "by_namespace"):
+                for value, count in partition_stats[key].items():
+                    stats[key][value] = stats[key].get(value, 0) + count
+        
+        return stats
+    
+    # Dependency operations
+    
+    def create_dependency(self, dependency: Dependency) -> Dependency:
+        """
+        Create a dependency between two tasks of the same namespace.
+        
+        Args:
+            dependency: Dependency to create
+        
+        Returns:
+            Dependency: Created dependency with ID assigned
+        
+        Raises:
+            ValueError: If a task is missing, the tasks are in different
+                namespaces or the dependency would create a cycle
+        """
+        partition = self._find_partition(dependency.source_task_id)
+        if partition is None:
+            raise ValueError(f"Source task not found: {dependency.source_task_id}")
+        
+        target_partition = self._find_partition(dependency.target_task_id)
+        if target_partition is None:
+            raise ValueError(f"Target task not found: {dependency.target_task_id}")
+        
+        if target_partition is not partition:
+            raise ValueError("Dependencies cannot link tasks of different namespaces")
+        
+        return partition.create_dependency(dependency)
+    
+    def get_dependency(self, dependency_id: str) -> Optional[Dependency]:
+        """
+        Get a dependency by ID.
+        
+        Args:
+            dependency_id: ID of the dependency to retrieve
+        
+        Returns:
+            Optional[Dependency]: Dependency if found, None otherwise
+        """
+        partition = self._find_dependency_partition(dependency_id)
+        return partition.get_dependency(dependency_id) if partition is not None else None
+    
+    def update_dependency(self, dependency_id: str, updates: Dict[str, Any]) -> Optional[Dependency]:
+        """
+        Update a dependency by ID.
+        
+        Args:
+            dependency_id: ID of the dependency to update
+            updates: Dictionary of field updates
+        
+        Returns:
+            Optional[Dependency]: Updated dependency if found, None otherwise
+        """
+        partition = self._find_dependency_partition(dependency_id)
+        return partition.update_dependency(dependency_id, updates) if partition is not None else None
+    
+    def delete_dependency(self, dependency_id: str) -> bool:
+        """
+        Delete a dependency by ID.
+        
+        Args:
+            dependency_id: ID of the dependency to delete
+        
+        Returns:
+            bool: True if dependency was found and deleted, False otherwise
+        """
+        partition = self._find_dependency_partition(dependency_id)
+        return partition.delete_dependency(dependency_id) if partition is not None else False
+    
+    def list_dependencies(
+        self,
+        task_id: Optional[str] = None,
+        dependency_type: Optional[str] = None
+    ) -> List[Dependency]:
+        """
+        List dependencies with optional filtering.
+        
+        Args:
+            task_id: Filter by source or target task ID
+            dependency_type: Filter by dependency type
+        
+        Returns:
+            List[Dependency]: List of matching dependencies
+        """
+        if task_id:
+            partition = self._find_hot(task_id)
+            return partition.list_dependencies(task_id, dependency_type) if partition is not None else []
+        
+        dependencies = [
+            dependency
+            for partition in list(self._partitions.values())
+            for dependency in partition.list_dependencies(dependency_type=dependency_type)
+        ]
+        dependencies.sort(key=lambda d: d.updated_at, reverse=True)
+        return dependencies
+    
+    def list_blocking_tasks(self, task_id: str) -> List[Task]:
+        """
+        List tasks that block a given task.
+        
+        Args:
+            task_id: ID of the task to check
+        
+        Returns:
+            List[Task]: List of tasks that block the specified task
+        """
+        partition = self._find_hot(task_id)
+        return partition.list_blocking_tasks(task_id) if partition is not None else []
+    
+    def list_dependent_tasks(self, task_id: str) -> List[Task]:
+        """
+        List tasks that depend on a given task.
+        
+        Args:
+            task_id: ID of the task to check
+        
+        Returns:
+            List[Task]: List of tasks that depend on the specified task
+        """
+        partition = self._find_hot(task_id)
+        return partition.list_dependent_tasks(task_id) if partition is not None else []
+    
+    def list_ready_tasks(self, limit: int = 50, namespace: Optional[str] = None) -> List[Task]:
+        """
+        List pending tasks whose dependencies are all done.
+        
+        Every partition keeps its own ready index; an unscoped query merges
+        the first tasks of each.
+        
+        Args:
+            limit: Maximum number of tasks to return
+            namespace: Only list tasks in this namespace
+        
+        Returns:
+            List[Task]: Ready tasks, highest priority first, then oldest first
+        """
+        if namespace:
+            partition = self._partitions.get(namespace)
+            return partition.list_ready_tasks(limit) if partition is not None else []
+        
+        ready = [partition.list_ready_tasks(limit) for partition in list(self._partitions.values())]
+        return list(islice(heapq.merge(*ready, key=ready_order_key), limit))
+    
+    def list_downstream_tasks(
+        self,
+        task_id: str,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """
+        List the tasks that depend on a task, directly or transitively.
+        
+        Dependencies never cross namespaces, so the partition holding the
+        task answers on its own.
+        
+        Args:
+            task_id: ID of the task
+            max_depth: Only follow this many dependency links (None for no limit)
+            limit: Maximum number of tasks to return (None for all)
+        
+        Returns:
+            Tuple[List[Tuple[Task, int]], int]: Tasks with their distance in
+            links, nearest first, and the total number of such tasks
+        """
+        partition = self._find_hot(task_id)
+        return partition.list_downstream_tasks(task_id, max_depth, limit) if partition is not None else ([], 0)
+    
+    def list_upstream_tasks(
+        self,
+        task_id: str,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """
+        List the tasks a task depends on, directly or transitively.
+        
+        Args:
+            task_id: ID of the task
+            max_depth: Only follow this many dependency links (None for no limit)
+            limit: Maximum number of tasks to return (None for all)
+        
+        Returns:
+            Tuple[List[Tuple[Task, int]], int]: Tasks with their distance in
+            links, nearest first, and the total number of such tasks
+        """
+        partition = self._find_hot(task_id)
+        return partition.list_upstream_tasks(task_id, max_depth, limit) if partition is not None else ([], 0)
+    
+    def get_dependency_distance(self, upstream_id: str, downstream_id: str) -> Optional[int]:
+        """
+        Get how many dependency links lead from a task to one depending on it.
+        
+        Args:
+            upstream_id: ID of the task depended on
+            downstream_id: ID of the task that may depend on it
+        
+        Returns:
+            Optional[int]: Length of the shortest chain of dependencies, or None
+        """
+        partition = self._find_hot(upstream_id)
+        return partition.get_dependency_distance(upstream_id, downstream_id) if partition is not None else None
+    
+    # Archive operations
+    
+    def attach_archive(self, archive: Optional[TaskArchive]) -> None:
+        """
+        Attach a cold-tier archive shared by all namespaces.
+        
+        Args:
+            archive: Archive to use, or None to detach
+        """
+        with self._lock:
+            self._archive = archive
+            for partition in self._partitions.values():
+                partition.attach_archive(archive)
+    
+    def archive_closed_tasks(self, closed_before: datetime) -> List[str]:
+        """
+        Move long-closed tasks of every namespace to the archive.
+        
+        Args:
+            closed_before: Archive tasks last updated before this time
+        
+        Returns:
+            List[str]: IDs of the archived tasks
+        """
+        return [
+            task_id
+            for partition in list(self._partitions.values())
+            for task_id in partition.archive_closed_tasks(closed_before)
+        ]
+    
+    # Persistence operations
+    
+    def save_to_file(self, filepath: str, snapshot_format: str = "json") -> bool:
+        """
+        Save all namespaces to one snapshot file.
+        
+        Args:
+            filepath: Path to save the snapshot file
+            snapshot_format: "json" or "binary"
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        snapshot = self.snapshot()
+        try:
+            write_state(
+                filepath, list(snapshot.tasks.values()), list(snapshot.dependencies.values()), snapshot_format
+            )
+            return True
+        except Exception as e:
+            print(f"Error saving to file: {e}")
+            return False
+    
+    def load_from_file(self, filepath: str) -> bool:
+        """
+        Replace all namespaces with the contents of a snapshot file.
+        
+        Args:
+            filepath: Path to the snapshot file
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            if not os.path.exists(filepath):
+                return False
+            
+            tasks, dependencies = read_state(filepath)
+        except Exception as e:
+            print(f"Error loading from file: {e}")
+            return False
+        
+        task_namespaces = {task.id: task.namespace for task in tasks}
+        task_groups: Dict[str, List[Task]] = {}
+        dependency_groups: Dict[str, List[Dependency]] = {}
+        for task in tasks:
+            task_groups.setdefault(task.namespace, []).append(task)
+        for dependency in dependencies:
+            namespace = task_namespaces.get(dependency.source_task_id, DEFAULT_NAMESPACE)
+            dependency_groups.setdefault(namespace, []).append(dependency)
+        
+        namespaces = set(self._partitions) | set(task_groups) | set(dependency_groups)
+        partitions = {namespace: self.partition(namespace) for namespace in namespaces}
+        with self._lock, self._lock_all(partitions.values()), gc_paused():
+            for namespace, partition in partitions.items():
+                partition.load_state(task_groups.get(namespace, []), dependency_groups.get(namespace, []))
+            self._namespaces = task_namespaces
+        return True
+    
+    def save_namespace(self, namespace: str, filepath: str, snapshot_format: str = "json") -> bool:
+        """
+        Save one namespace to its own snapshot file, without blocking others.
+        
+        Args:
+            namespace: Namespace to save
+            filepath: Path to save the snapshot file
+            snapshot_format: "json" or "binary"
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.partition(namespace).save_to_file(filepath, snapshot_format)
+    
+    def load_namespace(self, namespace: str, filepath: str) -> bool:
+        """
+        Replace one namespace with the contents of a snapshot file.
+        
+        Only that namespace's partition is locked while loading, so other
+        namespaces keep serving reads and writes.
+        
+        Args:
+            namespace: Namespace to replace
+            filepath: Path to the snapshot file
+        
+        Returns:
+            bool: True if successful, False otherwise
+        
+        Raises:
+            ValueError: If the file holds tasks of another namespace, or tasks
+                whose IDs are used in other namespaces
+        """
+        try:
+            if not os.path.exists(filepath):
+                return False
+            
+            tasks, dependencies = read_state(filepath)
+        except Exception as e:
+            print(f"Error loading from file: {e}")
+            return False
+        
+        for task in tasks:
+            if task.namespace != namespace:
+                raise ValueError(f"Task {task.id} belongs to namespace {task.namespace}, not {namespace}")
+        
+        # The replaced tasks are read with the partition locked, so tasks
+        # created meanwhile are released too; the registry lock comes first,
+        # so IDs are claimed before and released after
+        partition = self.partition(namespace)
+        self._claim_ids(tasks)
+        with partition.locked():
+            replaced = set(partition.snapshot().tasks)
+            partition.load_state(tasks, dependencies)
+        self._release_ids(replaced.difference(task.id for task in tasks))
+        return True
+    
+    # Journal operations
+    
+    def attach_journal(self, journal: Optional[TaskJournal]) -> None:
+        """
+        Attach a write-ahead journal shared by all namespaces.
+        
+        Args:
+            journal: Journal to write to, or None to detach
+        """
+        with self._lock:
+            self._journal = journal
+            for partition in self._partitions.values():
+                partition.attach_journal(journal)
+    
+    def replay_journal(self, journal: TaskJournal) -> int:
+        """
+        Apply the records of a journal, routing each to its namespace.
+        
+        Records of one namespace are applied in journal order; records of
+        different namespaces are independent of each other.
+        
+        Args:
+            journal: Journal to replay
+        
+        Returns:
+            int: Number of records applied
+        """
+        owners: Dict[str, InMemoryStorage] = {}  # Entity ID -> partition, for records seen so far
+        batches: Dict[InMemoryStorage, List[Tuple[str, Dict[str, Any]]]] = {}
+        count = 0
+        
+        def route(op: str, data: Dict[str, Any]) -> None:
+            if op == "put_task":
+                partition = self.partition(data.get("namespace", DEFAULT_NAMESPACE))
+                owners[data["id"]] = partition
+            elif op == "put_dependency":
+                partition = self._owner(owners, data["source_task_id"], self._find_hot)
+                if partition is not None:
+                    owners[data["id"]] = partition
+            elif op == "delete_task":
+                partition = self._owner(owners, data["id"], self._find_hot)
+            elif op == "delete_dependency":
+                partition = self._owner(owners, data["id"], self._find_dependency_partition)
+            else:
+                raise ValueError(f"Unknown journal operation: {op}")
+            
+            if partition is not None:
+                batches.setdefault(partition, []).append((op, data))
+        
+        for op, data in journal.replay():
+            count += 1
+            if op == "put_tasks":
+                for task_data in data["tasks"]:
+                    route("put_task", task_data)
+            elif op == "archive_tasks":
+                for task_id in data["ids"]:
+                    partition = self._owner(owners, task_id, self._find_hot)
+                    if partition is not None:
+                        batches.setdefault(partition, []).append(("archive_tasks", {"ids": [task_id]}))
+            else:
+                route(op, data)
+        
+        for partition, records in batches.items():
+            partition.apply_journal_records(records)
+        
+        with self._lock:
+            self._namespaces = {
+                task_id: namespace
+                for namespace, partition in self._partitions.items()
+                for task_id in partition.snapshot().tasks
+            }
+        return count
+    
+    @staticmethod
+    def _owner(
+        owners: Dict[str, InMemoryStorage],
+        entity_id: str,
+        find: Callable[[str], Optional[InMemoryStorage]]
+    ) -> Optional[InMemoryStorage]:
+        """Get the partition owning an entity, from replayed records or by probing."""
+        partition = owners.get(entity_id)
+        return partition if partition is not None else find(entity_id)
+    
+    def compact_journal(self, snapshot_path: str, snapshot_format: str = "json") -> bool:
+        """
+        Write a snapshot of all namespaces and truncate the journal.
+        
+        Args:
+            snapshot_path: Path of the snapshot file
+            snapshot_format: "json" or "binary"
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        # Held so no mutation is journaled between the snapshot and the reset;
+        # the registry lock also keeps new namespaces from being created
+        with self._lock, self._lock_all(list(self._partitions.values())):
+            if not self.save_to_file(snapshot_path, snapshot_format):
+                return False
+            if self._journal:
+                self._journal.reset()
+            return True
@@ -0,0 +1,346 @@
+"""
+Persistence for Metis storage
+
+This module provides the write-ahead journal used to persist in-memory
+storage incrementally, instead of rewriting a full JSON snapshot after
+every mutation.
+"""
+
+import gc
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Pause cyclic garbage collection while bulk-loading state.
+    
+    Allocating many small containers triggers repeated full collections;
+    loaded models and index entries do not form reference cycles, so
+    collection can safely wait until the load is done.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def write_atomic(filepath: str, content: Union[str, bytes]) -> None:
+    """
+    Write a file atomically.
+    
+    The content is written to a temporary file in the same directory,
+    fsynced and renamed over the target, so readers and crash recovery
+    only ever see the old or the new file.
+    
+    Args:
+        filepath: Path of the file to write
+        content: Text or binary content to write
+    """
+    tmp_path = f"{filepath}.tmp"
+    mode = "wb" if isinstance(content, bytes) else "w"
+    with open(tmp_path, mode, encoding=None if mode == "wb" else "utf-8") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
+class TaskJournal:
+    """
+    Append-only journal of storage mutations.
+    
+    Each mutation is written as one compact JSON line of the form
+    ``{"op": ..., "data": ...}``. Recovery loads the last snapshot and
+    replays the journal on top of it; compaction writes a fresh snapshot
+    and truncates the journal. A torn final line, left by a crash in the
+    middle of a write, is ignored on replay.
+    """
+    
+    def __init__(self, path: str, compact_threshold: int = 1000, fsync: bool = False):
+        """
+        Initialize the journal.
+        
+        Args:
+            path: Path to the journal file
+            compact_threshold: Number of records after which compaction is due
+            fsync: Whether to fsync after every record (durable but slower)
+        """
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+        self._record_count = self._count_records()
+    
+    @property
+    def record_count(self) -> int:
+        """Number of records written since the last compaction."""
+        return self._record_count
+    
+    def needs_compaction(self) -> bool:
+        """
+        Check whether the journal has grown past the compaction threshold.
+        
+        Returns:
+            bool: True if a snapshot should be written and the journal reset
+        """
+        return self._record_count >= self.compact_threshold
+    
+    def append(self, op: str, data: Dict[str, Any]) -> None:
+        """
+        Append a mutation record to the journal.
+        
+        Args:
+            op: Operation name (e.g. "put_task", "delete_task")
+            data: Operation payload
+        """
+        self.append_encoded(op, json.dumps(data, default=str, separators=(",", ":")))
+    
+    def append_encoded(self, op: str, data: str) -> None:
+        """
+        Append a mutation record whose payload is already JSON-encoded.
+        
+        Args:
+            op: Operation name (e.g. "put_task", "delete_task")
+            data: Operation payload as a JSON document
+        """
+        line = f'{{"op":{json.dumps(op)},"data":{data}}}'
+        
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            
+            self._record_count += 1
+    
+    def replay(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Iterate over the records in the journal in write order.
+        
+        Returns:
+            Iterator[Tuple[str, Dict[str, Any]]]: (operation, payload) pairs
+        """
+        if not os.path.exists(self.path):
+            return
+        
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring torn journal record at {self.path}:{line_number}")
+                    break
+                
+                yield record["op"], record["data"]
+    
+    def reset(self) -> None:
+        """Truncate the journal after its records were captured in a snapshot."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._record_count = 0
+    
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def _count_records(self) -> int:
+        """Count the records already present in the journal file."""
+        if not os.path.exists(self.path):
+            return 0
+        
+        with open(self.path, "r", encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+
+
+class SnapshotWriter:
+    """
+    Background writer that coalesces snapshot saves.
+    
+    Mutations only mark the store dirty. A background task flushes the
+    snapshot at most once per interval, or as soon as ``max_changes``
+    changes are pending, and runs the serialization in a worker thread
+    so request handlers and the event loop are never blocked by it.
+    """
+    
+    def __init__(
+        self,
+        storage: Any,
+        path: str,
+        interval: float = 1.0,
+        max_changes: int = 100,
+        snapshot_format: str = "json"
+    ):
+        """
+        Initialize the snapshot writer.
+        
+        Args:
+            storage: Storage providing save_to_file
+            path: Path of the snapshot file
+            interval: Minimum seconds between flushes
+            max_changes: Number of pending changes that forces an early flush
+            snapshot_format: Snapshot format passed to save_to_file ("json" or "binary")
+        """
+        self.storage = storage
+        self.path = path
+        self.interval = interval
+        self.max_changes = max_changes
+        self.snapshot_format = snapshot_format
+        
+        self.last_flush: Optional[datetime] = None
+        self.flush_count = 0
+        self.last_error: Optional[str] = None
+        
+        self._pending = 0
+        self._dirty_since: Optional[float] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+    
+    @property
+    def pending_changes(self) -> int:
+        """Number of changes not yet written to the snapshot."""
+        return self._pending
+    
+    @property
+    def lag(self) -> float:
+        """Seconds since the oldest change that is not yet in the snapshot."""
+        if self._dirty_since is None:
+            return 0.0
+        return time.monotonic() - self._dirty_since
+    
+    def mark_dirty(self, changes: int = 1) -> None:
+        """
+        Record changes and schedule a flush.
+        
+        Must be called from the event loop thread; starts the background
+        task on first use.
+        
+        Args:
+            changes: Number of changes to record
+        """
+        self._pending += changes
+        if self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+        
+        self._ensure_started()
+        if self._pending >= self.max_changes:
+            self._wake.set()
+    
+    async def flush(self) -> bool:
+        """
+        Write the snapshot now if changes are pending.
+        
+        Returns:
+            bool: True if the snapshot is up to date, False if the write failed
+        """
+        self._ensure_primitives()
+        async with self._flush_lock:
+            if not self._pending:
+                return True
+            
+            # Changes made while writing are picked up by the next flush
+            pending, dirty_since = self._pending, self._dirty_since
+            self._pending, self._dirty_since = 0, None
+            
+            loop = asyncio.get_running_loop()
+            try:
+                saved = await loop.run_in_executor(None, self.storage.save_to_file, self.path, self.snapshot_format)
+                error = None if saved else f"Failed to write snapshot to {self.path}"
+            except Exception as e:
+                error = f"Failed to write snapshot to {self.path}: {e}"
+            
+            if error:
+                # Keep the changes pending so the next flush retries them
+                self._pending += pending
+                self._dirty_since = dirty_since
+                self.last_error = error
+                logger.error(error)
+                return False
+            
+            self.last_flush = datetime.utcnow()
+            self.flush_count += 1
+            self.last_error = None
+            return True
+    
+    async def stop(self) -> None:
+        """Stop the background task after writing any pending changes."""
+        self._stopping = True
+        if self._task:
+            self._wake.set()
+            await self._task
+            self._task = None
+        
+        if self._pending:
+            await self.flush()
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get monitoring information about the writer.
+        
+        Returns:
+            Dict[str, Any]: Pending changes, last flush time, lag and error state
+        """
+        return {
+            "path": self.path,
+            "pending_changes": self._pending,
+            "last_flush": self.last_flush.isoformat() if self.last_flush else None,
+            "lag_seconds": round(self.lag, 3),
+            "flush_count": self.flush_count,
+            "last_error": self.last_error
+        }
+    
+    def _ensure_primitives(self) -> None:
+        """Create the asyncio primitives inside the running loop."""
+        if self._wake is None:
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+    
+    def _ensure_started(self) -> None:
+        """Start the background task if it is not running."""
+        self._ensure_primitives()
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def _run(self) -> None:
+        """Flush pending changes once per interval or when woken early."""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            
+            if self._stopping:
+                break
+            
+            await self.flush()
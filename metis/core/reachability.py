@@ -0,0 +1,264 @@
+"""
+Reachability index for Metis
+
+This module answers "which tasks are transitively blocked by this one?"
+and "is A upstream of B?" without walking the dependency graph on every
+request. Breadth-first traversals are cached per task and direction, and
+an edge change only drops the traversals of the connected component it
+touches.
+"""
+
+from collections import OrderedDict
+from itertools import chain, takewhile
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Default number of cached traversals
+DEFAULT_CACHE_SIZE = 1024
+
+# A component is split again once it has lost this fraction of its size in
+# edges, so a split costs a bounded number of node visits per removed edge
+SPLIT_RATIO = 0.25
+
+
+class ReachabilityIndex:
+    """
+    Cached transitive closure of a directed graph, kept per component.
+    
+    The graph itself stays with the caller and is read through successor
+    and predecessor functions; the caller reports every edge it adds or
+    removes. Nodes are grouped into components that are never finer than
+    the graph's weakly connected components: adding an edge merges two
+    components, and a component is split into its connected parts again
+    after enough of its edges were removed. Full traversals are cached with the distance of every node
+    reached, and dropped when their component changes. Depth-limited
+    queries filter a cached traversal when there is one, and otherwise
+    stop at the depth limit.
+    It is not thread-safe; callers are expected to hold their own lock.
+    """
+    
+    def __init__(
+        self,
+        successors: Callable[[str], Iterable[str]],
+        predecessors: Callable[[str], Iterable[str]],
+        cache_size: int = DEFAULT_CACHE_SIZE
+    ):
+        """
+        Initialize an empty index.
+        
+        Args:
+            successors: Function returning the direct successors of a node
+            predecessors: Function returning the direct predecessors of a node
+            cache_size: Maximum number of cached traversals
+        """
+        self._successors = successors
+        self._predecessors = predecessors
+        self.cache_size = cache_size
+        
+        # Nodes with edges -> component ID, and the members of each component;
+        # nodes without edges are their own component and are not stored
+        self._component: Dict[str, int] = {}
+        self._members: Dict[int, Set[str]] = {}
+        self._removed_edges: Dict[int, int] = {}
+        self._next_component = 0
+        
+        # (node, downstream) -> (component ID, distance by node), least
+        # recently used first, and the cache keys of each component
+        self._cache: "OrderedDict[Tuple[str, bool], Tuple[int, Dict[str, int]]]" = OrderedDict()
+        self._cached_keys: Dict[int, Set[Tuple[str, bool]]] = {}
+    
+    def clear(self) -> None:
+        """Forget all nodes and cached traversals."""
+        self._component.clear()
+        self._members.clear()
+        self._removed_edges.clear()
+        self._cache.clear()
+        self._cached_keys.clear()
+    
+    def add_edge(self, source: str, target: str) -> None:
+        """
+        Record a source -> target edge that was added to the graph.
+        
+        Args:
+            source: Source node of the edge
+            target: Target node of the edge
+        """
+        keep = self._register(source)
+        merged = self._register(target)
+        if keep != merged:
+            if len(self._members[keep]) < len(self._members[merged]):
+                keep, merged = merged, keep
+            for node in self._members[merged]:
+                self._component[node] = keep
+            self._members[keep] |= self._members.pop(merged)
+            self._invalidate(merged)
+            
+            removed = self._removed_edges.pop(merged, 0)
+            if removed:
+                self._removed_edges[keep] = self._removed_edges.get(keep, 0) + removed
+        self._invalidate(keep)
+    
+    def remove_edge(self, source: str, target: str) -> None:
+        """
+        Record that a source -> target edge was removed from the graph.
+        
+        Args:
+            source: Source node of the edge
+            target: Target node of the edge
+        """
+        component = self._component.get(source)
+        if component is None:
+            return
+        self._invalidate(component)
+        
+        removed = self._removed_edges.get(component, 0) + 1
+        if removed >= len(self._members[component]) * SPLIT_RATIO:
+            self._split(component)
+        else:
+            self._removed_edges[component] = removed
+    
+    def descendants(self, node: str, max_depth: Optional[int] = None) -> Dict[str, int]:
+        """
+        Get the nodes reachable from a node.
+        
+        Args:
+            node: Node to start from
+            max_depth: Only follow this many edges (None for no limit)
+        
+        Returns:
+            Dict[str, int]: Distance in edges by node, in breadth-first
+            order; the dictionary may be cached and must not be modified
+        """
+        return self._reachable(node, True, max_depth)
+    
+    def ancestors(self, node: str, max_depth: Optional[int] = None) -> Dict[str, int]:
+        """
+        Get the nodes from which a node can be reached.
+        
+        Args:
+            node: Node to end at
+            max_depth: Only follow this many edges (None for no limit)
+        
+        Returns:
+            Dict[str, int]: Distance in edges by node, in breadth-first
+            order; the dictionary may be cached and must not be modified
+        """
+        return self._reachable(node, False, max_depth)
+    
+    def distance(self, source: str, target: str) -> Optional[int]:
+        """
+        Get the length of the shortest path between two nodes.
+        
+        Answered from a cached traversal of either node when there is one,
+        and otherwise by a search that stops once it reaches the target.
+        
+        Args:
+            source: Node the path starts at
+            target: Node the path ends at
+        
+        Returns:
+            Optional[int]: Number of edges, or None if there is no path
+        """
+        component = self._component.get(source)
+        if component is None or component != self._component.get(target):
+            return None
+        
+        for key, node in (((source, True), target), ((target, False), source)):
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                return entry[1].get(node)
+        return self._traverse(source, True, None, target).get(target)
+    
+    def _register(self, node: str) -> int:
+        """Get the component of a node, giving a new node its own."""
+        component = self._component.get(node)
+        if component is None:
+            component = self._new_component([node])
+        return component
+    
+    def _new_component(self, nodes: List[str]) -> int:
+        """Create a component holding the given nodes."""
+        component = self._next_component
+        self._next_component += 1
+        self._members[component] = set(nodes)
+        for node in nodes:
+            self._component[node] = component
+        return component
+    
+    def _split(self, component: int) -> None:
+        """Split a component into its weakly connected parts."""
+        self._removed_edges.pop(component, None)
+        self._invalidate(component)
+        members = self._members.pop(component)
+        for node in members:
+            del self._component[node]
+        
+        # Every edge stays within the old component, so each part is found
+        # among its members; nodes left without edges are not stored
+        assigned: Set[str] = set()
+        for start in members:
+            if start in assigned:
+                continue
+            part = [start]
+            assigned.add(start)
+            for node in part:
+                for neighbor in chain(self._successors(node), self._predecessors(node)):
+                    if neighbor not in assigned:
+                        assigned.add(neighbor)
+                        part.append(neighbor)
+            if len(part) > 1:
+                self._new_component(part)
+    
+    def _invalidate(self, component: int) -> None:
+        """Drop the cached traversals of a component."""
+        for key in self._cached_keys.pop(component, ()):
+            self._cache.pop(key, None)
+    
+    def _reachable(self, node: str, downstream: bool, max_depth: Optional[int]) -> Dict[str, int]:
+        """Get the nodes reached from a node in one direction, with distances."""
+        key = (node, downstream)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            distances = entry[1]
+            if max_depth is None:
+                return distances
+            
+            # Distances are in breadth-first order, so the nodes within the
+            # depth limit come first
+            return dict(takewhile(lambda item: item[1] <= max_depth, distances.items()))
+        
+        distances = self._traverse(node, downstream, max_depth)
+        
+        # Only full traversals are cached, under the node's current component
+        component = self._component.get(node)
+        if max_depth is None and component is not None:
+            self._cache[key] = (component, distances)
+            self._cached_keys.setdefault(component, set()).add(key)
+            if len(self._cache) > self.cache_size:
+                (old_node, old_downstream), (old_component, _) = self._cache.popitem(last=False)
+                keys = self._cached_keys.get(old_component)
+                if keys is not None:
+                    keys.discard((old_node, old_downstream))
+        return distances
+    
+    def _traverse(
+        self, node: str, downstream: bool, max_depth: Optional[int], target: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Run a breadth-first traversal from a node, level by level, until the target is reached."""
+        neighbors = self._successors if downstream else self._predecessors
+        distances: Dict[str, int] = {}
+        frontier = [node]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for current in frontier:
+                for neighbor in neighbors(current):
+                    if neighbor not in distances and neighbor != node:
+                        distances[neighbor] = depth
+                        if neighbor == target:
+                            return distances
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return distances
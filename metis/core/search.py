@@ -0,0 +1,165 @@
+"""
+Full-text search for Metis
+
+This module provides an inverted index over task text with BM25 ranking,
+used by the storage layer to answer search queries without scanning
+every task.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+# Tokens are runs of word characters, compared case-insensitively
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lowercase search tokens.
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        List[str]: Tokens in order of appearance
+    """
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """
+    Inverted index with BM25 ranking.
+    
+    Documents are identified by ID and indexed from one or more text fields.
+    The index is updated incrementally as documents are added or removed.
+    It is not thread-safe; callers are expected to hold their own lock.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the search index.
+        
+        Args:
+            k1: BM25 term frequency saturation parameter
+            b: BM25 document length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {doc ID: term frequency}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}  # doc ID -> {term: term frequency}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+    
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return len(self._doc_lengths)
+    
+    def add_document(self, doc_id: str, *texts: Optional[str]) -> None:
+        """
+        Index a document, replacing any previous version.
+        
+        Args:
+            doc_id: ID of the document
+            texts: Text fields to index
+        """
+        if doc_id in self._doc_lengths:
+            self.remove_document(doc_id)
+        
+        tokens = tokenize(" ".join(text for text in texts if text))
+        term_counts = dict(Counter(tokens))
+        length = len(tokens)
+        
+        for term, count in term_counts.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        
+        self._doc_terms[doc_id] = term_counts
+        self._doc_lengths[doc_id] = length
+        self._total_length += length
+    
+    def remove_document(self, doc_id: str) -> None:
+        """
+        Remove a document from the index.
+        
+        Args:
+            doc_id: ID of the document
+        """
+        term_counts = self._doc_terms.pop(doc_id, None)
+        if term_counts is None:
+            return
+        
+        for term in term_counts:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+        
+        self._total_length -= self._doc_lengths.pop(doc_id)
+    
+    def match(self, query: str) -> Set[str]:
+        """
+        Find documents containing every term of the query.
+        
+        Args:
+            query: Search query
+        
+        Returns:
+            Set[str]: IDs of the matching documents
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return set()
+        
+        postings = []
+        for term in terms:
+            posting = self._postings.get(term)
+            if not posting:
+                return set()
+            postings.append(posting)
+        
+        # Walk the rarest term's postings and probe the others
+        postings.sort(key=len)
+        rarest, others = postings[0], postings[1:]
+        return {
+            doc_id for doc_id in rarest
+            if all(doc_id in other for other in others)
+        }
+    
+    def score(self, query: str, doc_ids: Set[str]) -> Dict[str, float]:
+        """
+        Compute BM25 scores for a set of documents.
+        
+        Args:
+            query: Search query
+            doc_ids: IDs of the documents to score
+        
+        Returns:
+            Dict[str, float]: Mapping of document ID to score
+        """
+        scores = {doc_id: 0.0 for doc_id in doc_ids}
+        doc_count = len(self._doc_lengths)
+        if not doc_count:
+            return scores
+        
+        avg_length = self._total_length / doc_count or 1.0
+        
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            
+            for doc_id in doc_ids:
+                tf = posting.get(doc_id)
+                if not tf:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        
+        return scores
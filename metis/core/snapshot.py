@@ -0,0 +1,283 @@
+"""
+Binary snapshot format for Metis storage
+
+This module provides a compact, versioned binary snapshot format and a
+trusted load path that rebuilds models without re-running validation.
+Snapshots are only ever written from models that were validated when
+they entered storage, so restoring them does not need to validate again.
+
+Layout::
+    
+    header:  magic (8 bytes) | format version (uint16)
+    blocks:  kind (uint8) | payload length (uint32) | CRC32 (uint32) | payload
+    end:     a block of kind END whose payload holds the record counts
+
+Task and dependency payloads are lists of plain field dictionaries
+serialized with a restricted pickle that can only reference datetime
+types, so loading a snapshot cannot execute arbitrary code.
+"""
+
+import io
+import pickle
+import struct
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+from pydantic_core import TzInfo
+
+from metis.models.task import Task
+from metis.models.dependency import Dependency
+from metis.models.subtask import Subtask
+from metis.models.requirement import RequirementRef
+from metis.models.complexity import ComplexityScore, ComplexityFactor
+from metis.core.persistence import gc_paused, write_atomic
+
+MAGIC = b"METISNAP"
+FORMAT_VERSION = 1
+
+BLOCK_END = 0
+BLOCK_TASKS = 1
+BLOCK_DEPENDENCIES = 2
+
+# Number of records serialized into one block
+RECORDS_PER_BLOCK = 1000
+
+_HEADER = struct.Struct(">8sH")
+_BLOCK = struct.Struct(">BII")
+_COUNTS = struct.Struct(">II")
+
+# Classes a snapshot payload may reference
+_ALLOWED_CLASSES = {
+    ("datetime", "datetime"): datetime,
+    ("datetime", "date"): date,
+    ("datetime", "timedelta"): timedelta,
+    ("datetime", "timezone"): timezone,
+    ("pydantic_core._pydantic_core", "TzInfo"): TzInfo,  # Offsets of parsed datetimes
+}
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """Unpickler that only resolves the datetime types used by models."""
+    
+    def find_class(self, module: str, name: str) -> Any:
+        try:
+            return _ALLOWED_CLASSES[(module, name)]
+        except KeyError:
+            raise pickle.UnpicklingError(f"Forbidden class in snapshot: {module}.{name}")
+
+
+def is_binary_snapshot(filepath: str) -> bool:
+    """
+    Check whether a file is a binary snapshot.
+    
+    Args:
+        filepath: Path of the file to check
+    
+    Returns:
+        bool: True if the file starts with the snapshot magic bytes
+    """
+    with open(filepath, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_snapshot(filepath: str, tasks: Iterable[Task], dependencies: Iterable[Dependency]) -> None:
+    """
+    Write tasks and dependencies to a binary snapshot file atomically.
+    
+    Args:
+        filepath: Path of the snapshot file
+        tasks: Tasks to write
+        dependencies: Dependencies to write
+    """
+    parts = [_HEADER.pack(MAGIC, FORMAT_VERSION)]
+    
+    task_count = _append_blocks(parts, BLOCK_TASKS, (task.dict() for task in tasks))
+    dependency_count = _append_blocks(parts, BLOCK_DEPENDENCIES, (dep.dict() for dep in dependencies))
+    
+    _append_block(parts, BLOCK_END, _COUNTS.pack(task_count, dependency_count))
+    write_atomic(filepath, b"".join(parts))
+
+
+def read_snapshot(filepath: str) -> Tuple[List[Task], List[Dependency]]:
+    """
+    Read a binary snapshot using trusted model construction.
+    
+    Args:
+        filepath: Path of the snapshot file
+    
+    Returns:
+        Tuple[List[Task], List[Dependency]]: Restored tasks and dependencies
+    
+    Raises:
+        ValueError: If the file is not a valid snapshot of a supported version
+    """
+    with open(filepath, "rb") as f:
+        data = memoryview(f.read())
+    
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated snapshot header")
+    
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a Metis snapshot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+    
+    tasks: List[Task] = []
+    dependencies: List[Dependency] = []
+    counts = None
+    offset = _HEADER.size
+    
+    with gc_paused():
+        while counts is None:
+            if offset + _BLOCK.size > len(data):
+                raise ValueError("Truncated snapshot")
+            
+            kind, length, checksum = _BLOCK.unpack_from(data, offset)
+            offset += _BLOCK.size
+            payload = data[offset:offset + length]
+            offset += length
+            
+            if len(payload) != length or zlib.crc32(payload) != checksum:
+                raise ValueError("Corrupt snapshot block")
+            
+            if kind == BLOCK_END:
+                counts = _COUNTS.unpack(payload)
+            elif kind == BLOCK_TASKS:
+                tasks.extend(construct_task(record) for record in _load_records(payload))
+            elif kind == BLOCK_DEPENDENCIES:
+                dependencies.extend(construct_model(Dependency, record) for record in _load_records(payload))
+            else:
+                raise ValueError(f"Unknown snapshot block type: {kind}")
+    
+    if counts != (len(tasks), len(dependencies)):
+        raise ValueError("Snapshot record counts do not match")
+    
+    return tasks, dependencies
+
+
+_set_attr = object.__setattr__
+
+# Model class -> (fields, private attribute defaults), or None if the
+# class needs model_construct
+_fields_cache: Dict[Type[Any], Any] = {}
+
+
+def _model_fields(cls: Type[Any]) -> Any:
+    """Get the cached field definitions and private defaults of a model class."""
+    try:
+        return _fields_cache[cls]
+    except KeyError:
+        pass
+    
+    # Extra fields need pydantic's own setup
+    if cls.model_config.get("extra") == "allow":
+        fields = None
+    else:
+        private = {name: attr.get_default() for name, attr in cls.__private_attributes__.items()}
+        fields = (dict(cls.model_fields), private or None)
+    
+    _fields_cache[cls] = fields
+    return fields
+
+
+def construct_model(cls: Type[Any], data: Dict[str, Any]) -> Any:
+    """
+    Build a model instance from already-validated field data.
+    
+    The dictionary becomes the instance's field storage as-is. Missing
+    fields (for example from snapshots written before a field was added)
+    get their defaults, and unknown fields are dropped.
+    
+    Args:
+        cls: Model class
+        data: Field values, with nested models already constructed
+    
+    Returns:
+        Any: Model instance
+    """
+    cached = _model_fields(cls)
+    if cached is None:
+        return cls.model_construct(**data)
+    
+    fields, private = cached
+    if data.keys() != fields.keys():
+        data = {
+            name: data[name] if name in data else field.get_default(call_default_factory=True)
+            for name, field in fields.items()
+        }
+    
+    instance = cls.__new__(cls)
+    _set_attr(instance, "__dict__", data)
+    _set_attr(instance, "__pydantic_fields_set__", set(data))
+    _set_attr(instance, "__pydantic_extra__", None)
+    _set_attr(instance, "__pydantic_private__", dict(private) if private else None)
+    return instance
+
+
+def construct_task(data: Dict[str, Any]) -> Task:
+    """
+    Build a Task and its nested models from already-validated field data.
+    
+    Args:
+        data: Task fields as produced by ``Task.dict()``
+    
+    Returns:
+        Task: Task instance
+    """
+    data["complexity"] = _construct_complexity(data.get("complexity"))
+    
+    subtasks = []
+    for subtask in data.get("subtasks", ()):
+        subtask["complexity"] = _construct_complexity(subtask.get("complexity"))
+        subtasks.append(construct_model(Subtask, subtask))
+    data["subtasks"] = subtasks
+    
+    data["requirement_refs"] = [
+        construct_model(RequirementRef, ref) for ref in data.get("requirement_refs", ())
+    ]
+    
+    return construct_model(Task, data)
+
+
+def _construct_complexity(data: Any) -> Any:
+    """Build a ComplexityScore and its factors from field data."""
+    if data is None:
+        return None
+    data["factors"] = [construct_model(ComplexityFactor, factor) for factor in data.get("factors", ())]
+    return construct_model(ComplexityScore, data)
+
+
+def _load_records(payload: memoryview) -> List[Dict[str, Any]]:
+    """Deserialize the records of one block."""
+    return _SnapshotUnpickler(io.BytesIO(payload)).load()
+
+
+def _append_block(parts: List[bytes], kind: int, payload: bytes) -> None:
+    """Append a framed block to the output parts."""
+    parts.append(_BLOCK.pack(kind, len(payload), zlib.crc32(payload)))
+    parts.append(payload)
+
+
+def _append_blocks(parts: List[bytes], kind: int, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Append records in blocks of RECORDS_PER_BLOCK.
+    
+    Returns:
+        int: Number of records written
+    """
+    count = 0
+    block: List[Dict[str, Any]] = []
+    for record in records:
+        block.append(record)
+        if len(block) == RECORDS_PER_BLOCK:
+            _append_block(parts, kind, pickle.dumps(block, protocol=pickle.HIGHEST_PROTOCOL))
+            count += len(block)
+            block = []
+    
+    if block:
+        _append_block(parts, kind, pickle.dumps(block, protocol=pickle.HIGHEST_PROTOCOL))
+        count += len(block)
+    
+    return count
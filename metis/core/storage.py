@@ -6,33 +6,2636 @@ including in-memory storage and database-backed storage.
 """
 
 import os
-from typing import Dict, List, Optional, Any, Tuple, Set
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Tuple, Set
 from uuid import uuid4
-from datetime import datetime
+from datetime import datetime, timezone
 import json
+import sqlite3
+import heapq
+import base64
+import binascii
 import threading
+from contextlib import contextmanager
+from itertools import chain, islice
+from types import MappingProxyType
 
 from metis.models.task import Task
 from metis.models.dependency import Dependency
 from metis.models.subtask import Subtask
 from metis.models.requirement import RequirementRef
 from metis.models.complexity import ComplexityScore
+from metis.models.enums import TaskStatus, Priority
+from metis.core.search import SearchIndex, tokenize
+from metis.core.indexes import SortedIndex, TopologicalOrder
+from metis.core.reachability import ReachabilityIndex
+from metis.core.persistence import TaskJournal, gc_paused, write_atomic
+from metis.core.snapshot import is_binary_snapshot, read_snapshot, write_snapshot
+from metis.core.changes import TASK, DEPENDENCY, Change, ChangeFeed
+from metis.core.archive import TaskArchive
+
+
+def encode_cursor(task: Task) -> str:
+    """
+    Encode an opaque pagination cursor pointing just after a task.
+    
+    Args:
+        task: Last task of the current page
+    
+    Returns:
+        str: Opaque cursor string
+    """
+    raw = f"{utc_naive(task.updated_at).isoformat()}|{task.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a pagination cursor into an (updated_at, task ID) key.
+    
+    The timestamp is normalized to naive UTC, like the index keys, so a
+    cursor with a UTC offset compares with them instead of failing.
+    
+    Args:
+        cursor: Cursor produced by encode_cursor
+    
+    Returns:
+        Tuple[datetime, str]: Ordered index key the cursor points at
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, task_id = raw.split("|", 1)
+        return utc_naive(datetime.fromisoformat(timestamp)), task_id
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def write_state(
+    filepath: str,
+    tasks: List[Task],
+    dependencies: List[Dependency],
+    snapshot_format: str = "json"
+) -> None:
+    """
+    Write tasks and dependencies to a snapshot file atomically.
+    
+    Args:
+        filepath: Path of the snapshot file
+        tasks: Tasks to write
+        dependencies: Dependencies to write
+        snapshot_format: "json" for an indented JSON document or "binary"
+            for the compact binary format
+    
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if snapshot_format == "binary":
+        write_snapshot(filepath, tasks, dependencies)
+    elif snapshot_format == "json":
+        # One record per line; unchanged tasks reuse their cached encoding
+        task_lines = ",\n".join(f"{json.dumps(task.id)}: {task.to_json()}" for task in tasks)
+        dependency_lines = ",\n".join(
+            f"{json.dumps(dep.id)}: {json.dumps(dep.dict(), default=str, separators=(',', ':'))}"
+            for dep in dependencies
+        )
+        write_atomic(filepath, f'{{"tasks": {{\n{task_lines}\n}},\n"dependencies": {{\n{dependency_lines}\n}}}}\n')
+    else:
+        raise ValueError(f"Unknown snapshot format: {snapshot_format}")
+
+
+def read_state(filepath: str) -> Tuple[List[Task], List[Dependency]]:
+    """
+    Read tasks and dependencies from a snapshot file in either format.
+    
+    Binary snapshots were written from validated models and are restored
+    through trusted construction; JSON files may have been edited by hand
+    and are fully validated.
+    
+    Args:
+        filepath: Path of the snapshot file
+    
+    Returns:
+        Tuple[List[Task], List[Dependency]]: Restored tasks and dependencies
+    """
+    if is_binary_snapshot(filepath):
+        return read_snapshot(filepath)
+    
+    with open(filepath, 'r') as f:
+        data = json.load(f)
+    
+    tasks = [Task(**task_data) for task_data in data.get("tasks", {}).values()]
+    dependencies = [Dependency(**dep_data) for dep_data in data.get("dependencies", {}).values()]
+    return tasks, dependencies
+
+
+# Statuses of tasks that can no longer become overdue
+CLOSED_STATUSES = frozenset({TaskStatus.DONE.value, TaskStatus.CANCELLED.value})
+
+# Order in which ready tasks are handed out, most urgent first
+PRIORITY_RANKS = {Priority.HIGH.value: 0, Priority.MEDIUM.value: 1, Priority.LOW.value: 2}
+
+
+def ready_order_key(task: Task) -> Tuple[int, datetime, str]:
+    """
+    Get the key ready tasks are ordered by: priority, then oldest first.
+    
+    Args:
+        task: Task to order
+    
+    Returns:
+        Tuple[int, datetime, str]: Priority rank, creation time and task ID
+    """
+    return (PRIORITY_RANKS.get(task.priority, len(PRIORITY_RANKS)), utc_naive(task.created_at), task.id)
+
+
+def utc_naive(value: datetime) -> datetime:
+    """
+    Normalize a datetime to naive UTC so that aware and naive values compare.
+    
+    Args:
+        value: Naive (assumed UTC) or timezone-aware datetime
+    
+    Returns:
+        datetime: Naive UTC datetime
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def validate_task_batch(tasks: List[Task], exists: Callable[[str], bool]) -> None:
+    """
+    Validate the dependencies of a batch of new tasks.
+    
+    A task may depend on an existing task or on another task of the
+    batch, as long as the dependencies within the batch do not form a
+    cycle.
+    
+    Args:
+        tasks: Tasks to validate, with IDs assigned
+        exists: Function telling whether a task ID is already stored
+    
+    Raises:
+        ValueError: If an ID is duplicated, a dependency is missing or the
+            batch contains circular dependencies
+    """
+    batch = {}
+    for task in tasks:
+        if task.id in batch:
+            raise ValueError(f"Duplicate task ID in batch: {task.id}")
+        batch[task.id] = task
+    
+    in_degree = dict.fromkeys(batch, 0)
+    dependents: Dict[str, List[str]] = {}
+    for task in tasks:
+        for dep_id in task.dependencies:
+            if dep_id in batch:
+                in_degree[task.id] += 1
+                dependents.setdefault(dep_id, []).append(task.id)
+            elif not exists(dep_id):
+                raise ValueError(f"Dependency task not found: {dep_id}")
+    
+    # Kahn's algorithm; tasks left unvisited are on a cycle
+    ready = [task_id for task_id, degree in in_degree.items() if degree == 0]
+    visited = 0
+    while ready:
+        task_id = ready.pop()
+        visited += 1
+        for dependent_id in dependents.get(task_id, ()):
+            in_degree[dependent_id] -= 1
+            if in_degree[dependent_id] == 0:
+                ready.append(dependent_id)
+    
+    if visited != len(batch):
+        raise ValueError("Tasks in the batch have circular dependencies")
+
+
+def prepare_task_updates(
+    updates_map: Dict[str, Dict[str, Any]],
+    get_task: Callable[[str], Optional[Task]],
+    exists: Callable[[str], bool]
+) -> Dict[str, Optional[Task]]:
+    """
+    Apply a batch of updates to copies of the stored tasks.
+    
+    Nothing is stored, so a batch can be validated completely before any
+    task is replaced.
+    
+    Args:
+        updates_map: Dictionary mapping task IDs to update dictionaries
+        get_task: Function returning the stored task for an ID, or None
+        exists: Function telling whether a task ID is stored
+    
+    Returns:
+        Dict[str, Optional[Task]]: Updated copies by ID (None for unknown IDs)
+    
+    Raises:
+        ValueError: If any update is invalid
+    """
+    results: Dict[str, Optional[Task]] = {}
+    for task_id, updates in updates_map.items():
+        task = get_task(task_id)
+        if not task:
+            results[task_id] = None
+            continue
+        
+        for dep_id in updates.get("dependencies", ()):
+            if not exists(dep_id):
+                raise ValueError(f"Dependency task not found: {dep_id}")
+        
+        task = task.model_copy()
+        task.update(dict(updates))
+        results[task_id] = task
+    return results
+
+
+def filter_tasks(
+    tasks: Iterable[Task],
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assignee: Optional[str] = None,
+    tag: Optional[str] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    namespace: Optional[str] = None
+) -> List[Task]:
+    """
+    Filter unindexed tasks with the field filters of list_tasks.
+    
+    Args:
+        tasks: Tasks to filter
+        status: Filter by status
+        priority: Filter by priority
+        assignee: Filter by assignee
+        tag: Filter by tag
+        due_after: Only tasks due at or after this time
+        due_before: Only tasks due before this time
+        namespace: Filter by namespace
+    
+    Returns:
+        List[Task]: Matching tasks
+    """
+    due_after = utc_naive(due_after) if due_after is not None else None
+    due_before = utc_naive(due_before) if due_before is not None else None
+    due_range = due_after is not None or due_before is not None
+    
+    def matches(task: Task) -> bool:
+        if status and task.status != status:
+            return False
+        if priority and task.priority != priority:
+            return False
+        if assignee and task.assignee != assignee:
+            return False
+        if tag and tag not in task.tags:
+            return False
+        if namespace and task.namespace != namespace:
+            return False
+        if due_range:
+            if task.due_date is None:
+                return False
+            due = utc_naive(task.due_date)
+            if (due_after is not None and due < due_after) or (due_before is not None and due >= due_before):
+                return False
+        return True
+    
+    return [task for task in tasks if matches(task)]
+
+
+def order_tasks(tasks: List[Task], sort: str = "updated_at", search: Optional[str] = None) -> List[Task]:
+    """
+    Sort unindexed tasks in list_tasks order.
+    
+    Used to merge results from several sources (partitions or the
+    archive). With a search, tasks not matching every term are dropped and
+    relevance is scored over the given tasks only.
+    
+    Args:
+        tasks: Tasks to sort
+        sort: Sort order ("updated_at", "relevance" or "due_date")
+        search: Search terms
+    
+    Returns:
+        List[Task]: Sorted tasks
+    """
+    scores: Dict[str, float] = {}
+    if search:
+        index = SearchIndex()
+        for task in tasks:
+            index.add_document(task.id, task.title, task.description, task.details)
+        matched = index.match(search)
+        tasks = [task for task in tasks if task.id in matched]
+        if sort == "relevance":
+            scores = index.score(search, matched)
+    
+    if sort == "due_date":
+        # Soonest due first; tasks without a due date follow, newest first
+        dated = sorted((task for task in tasks if task.due_date), key=lambda task: (utc_naive(task.due_date), task.id))
+        undated = sorted(
+            (task for task in tasks if not task.due_date),
+            key=lambda task: (utc_naive(task.updated_at), task.id), reverse=True
+        )
+        return dated + undated
+    
+    # Newest first, also among equally relevant tasks
+    tasks = sorted(tasks, key=lambda task: (utc_naive(task.updated_at), task.id), reverse=True)
+    if scores:
+        tasks.sort(key=lambda task: scores[task.id], reverse=True)
+    return tasks
+
+
+def page_tasks(tasks: List[Task], page: int, page_size: int, cursor: Optional[str] = None) -> List[Task]:
+    """
+    Select one page of tasks sorted by order_tasks.
+    
+    Args:
+        tasks: Sorted tasks
+        page: Page number (1-based), ignored when a cursor is given
+        page_size: Number of items per page
+        cursor: Opaque cursor from encode_cursor; only tasks after it are returned
+    
+    Returns:
+        List[Task]: Tasks of the page
+    """
+    if cursor:
+        cursor_key = decode_cursor(cursor)
+        return [task for task in tasks if (utc_naive(task.updated_at), task.id) < cursor_key][:page_size]
+    
+    start = (page - 1) * page_size
+    return tasks[start:start + page_size]
+
+
+class StorageSnapshot:
+    """
+    Immutable, consistent view of storage at one version.
+    
+    Snapshots are published by the storage and shared by all readers of
+    the same version. The models they contain are never modified in place
+    by the storage, so a snapshot can be read without any locking while
+    writes continue; readers must treat the models as read-only too.
+    """
+    
+    def __init__(self, version: int, tasks: Dict[str, Task], dependencies: Dict[str, Dependency]):
+        """
+        Initialize the snapshot.
+        
+        Args:
+            version: Storage version the snapshot was taken at
+            tasks: Tasks by ID; the snapshot takes ownership of the dictionary
+            dependencies: Dependencies by ID; the snapshot takes ownership of the dictionary
+        """
+        self.version = version
+        self.tasks = MappingProxyType(tasks)
+        self.dependencies = MappingProxyType(dependencies)
+    
+    def __len__(self) -> int:
+        """Return the number of tasks in the snapshot."""
+        return len(self.tasks)
+    
+    def get_task(self, task_id: str) -> Optional[Task]:
+        """
+        Get a task by ID.
+        
+        Args:
+            task_id: ID of the task to retrieve
+        
+        Returns:
+            Optional[Task]: Task if found, None otherwise
+        """
+        return self.tasks.get(task_id)
+    
+    def get_dependency(self, dependency_id: str) -> Optional[Dependency]:
+        """
+        Get a dependency by ID.
+        
+        Args:
+            dependency_id: ID of the dependency to retrieve
+        
+        Returns:
+            Optional[Dependency]: Dependency if found, None otherwise
+        """
+        return self.dependencies.get(dependency_id)
 
 
 class InMemoryStorage:
     """
     In-memory storage implementation for Metis.
     
-    This class provides an in-memory storage solution for tasks and their
-    related data. It's useful for development, testing, and deployments
-    that don't require persistent storage.
-    """
+    This class provides an in-memory storage solution for tasks and their
+    related data. It's useful for development, testing, and deployments
+    that don't require persistent storage.
+    
+    Stored models are copy-on-write: updates replace a task or dependency
+    with a modified copy instead of changing it in place, so objects
+    handed out by reads and snapshots never change underneath readers.
+    
+    With an archive attached, long-closed tasks can be moved out of the
+    working set. They are still returned by get_task, are listed when
+    include_archived is requested, and move back into the working set
+    when they are updated or referenced again.
+    """
+    
+    is_persistent = False  # State is only kept through JSON backups
+    
+    def __init__(self, change_feed_size: int = 10000, change_feed: Optional[ChangeFeed] = None):
+        """
+        Initialize the in-memory storage.
+        
+        Args:
+            change_feed_size: Number of recent changes kept for incremental sync
+            change_feed: Change feed to record into, shared with other storages
+                (defaults to a private feed of change_feed_size entries)
+        """
+        self._tasks: Dict[str, Task] = {}
+        self._dependencies: Dict[str, Dependency] = {}
+        self._lock = threading.RLock()  # Reentrant lock for thread safety
+        
+        # Secondary indexes (field value -> set of task IDs)
+        self._status_index: Dict[str, Set[str]] = {}
+        self._priority_index: Dict[str, Set[str]] = {}
+        self._assignee_index: Dict[str, Set[str]] = {}
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._complexity_index: Dict[str, Set[str]] = {}
+        self._namespace_index: Dict[str, Set[str]] = {}
+        
+        # Index keys each task is currently stored under, so a task can be
+        # unindexed even after its fields were changed in place
+        self._indexed_keys: Dict[str, Dict[str, Any]] = {}
+        
+        # Adjacency for Task.dependencies (task ID -> task IDs)
+        self._task_dependencies: Dict[str, Set[str]] = {}  # Forward: what a task depends on
+        self._task_dependents: Dict[str, Set[str]] = {}  # Reverse: what depends on a task
+        
+        # Cached transitive dependents and dependencies over that adjacency;
+        # dependencies on unknown task IDs are left out until the task exists
+        self._reachability = ReachabilityIndex(
+            lambda task_id: self._task_dependents.get(task_id, ()),
+            lambda task_id: [dep_id for dep_id in self._task_dependencies.get(task_id, ()) if dep_id in self._tasks]
+        )
+        
+        # Number of each task's dependencies that are not done, and the
+        # pending tasks with none left, ordered by ready_order_key
+        self._unmet_dependencies: Dict[str, int] = {}
+        self._ready_index = SortedIndex()
+        self._ready_keys: Dict[str, Tuple[int, datetime, str]] = {}
+        
+        # Adjacency for Dependency records (task ID -> dependency IDs)
+        self._outgoing_dependencies: Dict[str, Set[str]] = {}  # Keyed by source task
+        self._incoming_dependencies: Dict[str, Set[str]] = {}  # Keyed by target task
+        
+        # Topological order of the dependency record graph, for incremental
+        # cycle detection when edges are added
+        self._dependency_order = TopologicalOrder()
+        
+        # Full-text index over title, description and details
+        self._search_index = SearchIndex()
+        
+        # Ordered index of (updated_at, task ID) for newest-first listing
+        self._updated_index = SortedIndex()
+        
+        # Ordered indexes of (due_date, task ID) over all tasks with a due
+        # date, for range queries, and over open ones, for overdue scanning
+        self._due_index = SortedIndex()
+        self._open_due_index = SortedIndex()
+        
+        # Task counts of every namespace (namespace -> field -> value ->
+        # count) and its open tasks with a due date, for namespace statistics
+        self._namespace_counts: Dict[str, Dict[str, Dict[Any, int]]] = {}
+        self._namespace_open_due: Dict[str, SortedIndex] = {}
+        
+        # Optional write-ahead journal receiving one record per mutation
+        self._journal: Optional[TaskJournal] = None
+        
+        # Optional cold-tier store for long-closed tasks
+        self._archive: Optional[TaskArchive] = None
+        
+        # Version bumped by every change, and the snapshot published for
+        # the current version (built lazily on first use)
+        self._version = 0
+        self._snapshot: Optional[StorageSnapshot] = None
+        
+        # Recent changes, numbered in the order they were made
+        self._change_feed = change_feed or ChangeFeed(change_feed_size)
+    
+    def __len__(self) -> int:
+        """Return the number of tasks in the working set."""
+        return len(self._tasks)
+    
+    @property
+    def version(self) -> int:
+        """Number of changes made since the storage was created."""
+        return self._version
+    
+    @property
+    def latest_sequence(self) -> int:
+        """Sequence number of the latest change in the change feed."""
+        return self._change_feed.latest_sequence
+    
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """
+        Hold the storage lock across several calls.
+        
+        The lock is reentrant, so storage methods can be called while it
+        is held; used to make operations spanning several storages atomic.
+        """
+        with self._lock:
+            yield
+    
+    @contextmanager
+    def _rehydrating(self) -> Iterator[None]:
+        """
+        Hold the lock for an operation that may take tasks out of the archive.
+        
+        The archive drops such tasks at once but writes the removals once
+        the lock is released, so its file I/O does not hold up other calls.
+        """
+        try:
+            with self._lock:
+                yield
+        finally:
+            if self._archive is not None:
+                self._archive.flush()
+    
+    def get_changes(self, since: int, limit: int = 1000) -> Optional[Tuple[List[Change], bool]]:
+        """
+        Get the changes made after a sequence number.
+        
+        Args:
+            since: Last sequence number the client has seen
+            limit: Maximum number of changes to return
+        
+        Returns:
+            Optional[Tuple[List[Change], bool]]: Changes in sequence order and
+            whether more changes follow, or None if the client must resync
+        """
+        return self._change_feed.since(since, limit)
+    
+    def snapshot(self) -> StorageSnapshot:
+        """
+        Get a consistent, read-only view of all tasks and dependencies.
+        
+        The snapshot of the current version is built once and shared, so
+        repeated calls without writes in between are lock-free and O(1).
+        
+        Returns:
+            StorageSnapshot: Snapshot of the current version
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = StorageSnapshot(self._version, dict(self._tasks), dict(self._dependencies))
+            return self._snapshot
+    
+    # Task operations
+    
+    def create_task(self, task: Task) -> Task:
+        """
+        Create a new task in storage.
+        
+        Args:
+            task: Task to create
+        
+        Returns:
+            Task: Created task with ID assigned
+        
+        Raises:
+            ValueError: If the ID is already used or a dependency is missing
+        """
+        with self._rehydrating():
+            # Ensure task has an ID
+            if not task.id:
+                task.id = str(uuid4())
+            elif task.id in self._tasks or (self._archive is not None and task.id in self._archive):
+                raise ValueError(f"Task already exists: {task.id}")
+            
+            # Validate task dependencies
+            for dep_id in task.dependencies:
+                if self._hot_task(dep_id) is None:
+                    raise ValueError(f"Dependency task not found: {dep_id}")
+            
+            # Store the task
+            self._tasks[task.id] = task
+            self._index_task(task)
+            self._dependency_order.add_node(task.id)
+            self._record_task(task)
+            return task
+    
+    def get_task(self, task_id: str) -> Optional[Task]:
+        """
+        Get a task by ID.
+        
+        Args:
+            task_id: ID of the task to retrieve
+        
+        Returns:
+            Optional[Task]: Task if found, None otherwise
+        """
+        # Stored tasks are replaced rather than modified, so no lock is needed
+        task = self._tasks.get(task_id)
+        if task is None and self._archive is not None:
+            return self._archive.get(task_id)
+        return task
+    
+    def has_task(self, task_id: str) -> bool:
+        """
+        Check whether a task is in the working set, without reading the archive.
+        
+        Args:
+            task_id: ID of the task
+        
+        Returns:
+            bool: True if the task is held in memory
+        """
+        return task_id in self._tasks
+    
+    def update_task(self, task_id: str, updates: Dict[str, Any]) -> Optional[Task]:
+        """
+        Update a task by ID.
+        
+        Args:
+            task_id: ID of the task to update
+            updates: Dictionary of field updates
+        
+        Returns:
+            Optional[Task]: Updated task if found, None otherwise
+        """
+        with self._rehydrating():
+            task = self._hot_task(task_id)
+            if not task:
+                return None
+            
+            # Validate dependency updates
+            if "dependencies" in updates:
+                for dep_id in updates["dependencies"]:
+                    if self._hot_task(dep_id) is None:
+                        raise ValueError(f"Dependency task not found: {dep_id}")
+            
+            # Apply updates to a copy so readers holding the task never see
+            # a partial update
+            task = task.model_copy()
+            task.update(updates)
+            
+            # Store updated task
+            self._tasks[task_id] = task
+            self._reindex_task(task)
+            self._record_task(task)
+            return task
+    
+    def edit_task(self, task_id: str, edit: Callable[[Task], Any]) -> Optional[Tuple[Task, Any]]:
+        """
+        Change a task's subtasks or requirement references and store it.
+        
+        The change is applied to an edit copy of the stored task under the
+        storage lock, so it cannot interleave with other updates of the
+        task. The change must not call back into the storage.
+        
+        Args:
+            task_id: ID of the task
+            edit: Function changing the task; returning None or False means
+                nothing was changed, and the task is not stored
+        
+        Returns:
+            Optional[Tuple[Task, Any]]: The stored task and the result of the
+            change, or None if the task was not found
+        """
+        with self._rehydrating():
+            stored = self._hot_task(task_id)
+            if not stored:
+                return None
+            
+            task = stored.edit_copy()
+            result = edit(task)
+            if result is None or result is False:
+                return stored, result
+            
+            self._tasks[task_id] = task
+            self._reindex_task(task)
+            self._record_task(task)
+            return task, result
+    
+    def delete_task(self, task_id: str) -> bool:
+        """
+        Delete a task by ID.
+        
+        Args:
+            task_id: ID of the task to delete
+        
+        Returns:
+            bool: True if task was found and deleted, False otherwise
+        """
+        with self._rehydrating():
+            if task_id not in self._tasks:
+                if self._archive is None or task_id not in self._archive:
+                    return False
+                
+                # Archived tasks have no dependency links to remove
+                self._archive.remove([task_id])
+                self._record("delete_task", {"id": task_id})
+                return True
+            
+            # Check if any tasks depend on this one
+            if self._task_dependents.get(task_id):
+                raise ValueError(f"Cannot delete task {task_id} as other tasks depend on it")
+            
+            # Delete related dependencies
+            deps_to_delete = (
+                self._outgoing_dependencies.get(task_id, set()) |
+                self._incoming_dependencies.get(task_id, set())
+            )
+            
+            for dep_id in deps_to_delete:
+                self._unlink_dependency(self._dependencies.pop(dep_id))
+                self._record("delete_dependency", {"id": dep_id})
+            
+            # Delete the task, and any archived copy a crash left behind
+            # after rehydrating it
+            del self._tasks[task_id]
+            self._unindex_task(task_id)
+            self._dependency_order.remove_node(task_id)
+            if self._archive is not None:
+                self._archive.remove([task_id])
+            self._record("delete_task", {"id": task_id})
+            return True
+    
+    def create_tasks(self, tasks: List[Task]) -> List[Task]:
+        """
+        Create several tasks atomically.
+        
+        Tasks may depend on existing tasks or on other tasks in the batch.
+        The whole batch is validated before anything is stored, so either
+        all tasks are created or none are.
+        
+        Args:
+            tasks: Tasks to create
+        
+        Returns:
+            List[Task]: Created tasks with IDs assigned
+        
+        Raises:
+            ValueError: If a dependency is missing or the batch is inconsistent
+        """
+        with self._rehydrating():
+            for task in tasks:
+                if not task.id:
+                    task.id = str(uuid4())
+            
+            validate_task_batch(tasks, lambda task_id: self._hot_task(task_id) is not None)
+            
+            for task in tasks:
+                self._unindex_task(task.id)
+                self._tasks[task.id] = task
+                self._index_task(task)
+                self._dependency_order.add_node(task.id)
+            
+            self._record_tasks(tasks)
+            return tasks
+    
+    def update_tasks(self, updates_map: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Task]]:
+        """
+        Update several tasks atomically.
+        
+        Every update is applied to a copy first; the copies replace the
+        stored tasks only if all of them are valid.
+        
+        Args:
+            updates_map: Dictionary mapping task IDs to update dictionaries
+        
+        Returns:
+            Dict[str, Optional[Task]]: Updated tasks by ID (None for unknown IDs)
+        
+        Raises:
+            ValueError: If any update is invalid; no task is changed
+        """
+        with self._rehydrating():
+            results = prepare_task_updates(
+                updates_map, self._hot_task, lambda task_id: self._hot_task(task_id) is not None
+            )
+            
+            updated = [task for task in results.values() if task is not None]
+            for task in updated:
+                self._tasks[task.id] = task
+                self._reindex_task(task)
+            
+            if updated:
+                self._record_tasks(updated)
+            return results
+    
+    def list_tasks(
+        self, 
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        assignee: Optional[str] = None,
+        tag: Optional[str] = None,
+        search: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 50,
+        sort: str = "updated_at",
+        cursor: Optional[str] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        include_archived: bool = False,
+        namespace: Optional[str] = None
+    ) -> Tuple[List[Task], int]:
+        """
+        List tasks with optional filtering.
+        
+        Only the working set is indexed; archived tasks are scanned from
+        disk when include_archived is set.
+        
+        Args:
+            status: Filter by status
+            priority: Filter by priority
+            assignee: Filter by assignee
+            tag: Filter by tag
+            search: Search terms for title/description/details (all must match)
+            page: Page number (1-based), ignored when a cursor is given
+            page_size: Number of items per page
+            sort: Sort order ("updated_at", "relevance" or "due_date")
+            cursor: Opaque cursor from encode_cursor; only tasks after it are returned
+            due_after: Only tasks due at or after this time
+            due_before: Only tasks due before this time
+            include_archived: Whether to include archived tasks
+            namespace: Filter by namespace
+        
+        Returns:
+            Tuple[List[Task], int]: List of tasks and total count
+        
+        Raises:
+            ValueError: If the sort order or cursor is invalid
+        """
+        if sort not in ("updated_at", "relevance", "due_date"):
+            raise ValueError(f"Invalid sort order: {sort}")
+        
+        if cursor and sort != "updated_at":
+            raise ValueError("Cursor pagination is only supported when sorting by updated_at")
+        
+        if include_archived and self._archive is not None and len(self._archive):
+            return self._list_with_archive(
+                status, priority, assignee, tag, search, page, page_size, sort, cursor, due_after, due_before,
+                namespace
+            )
+        
+        cursor_key = decode_cursor(cursor) if cursor else None
+        due_range = due_after is not None or due_before is not None
+        due_start = (utc_naive(due_after),) if due_after is not None else None
+        due_stop = (utc_naive(due_before),) if due_before is not None else None
+        
+        # Calculate pagination
+        start = 0 if cursor_key else (page - 1) * page_size
+        end = start + page_size
+        
+        with self._lock:
+            # Collect candidate sets from the secondary indexes
+            candidate_sets = []
+            
+            if status:
+                candidate_sets.append(self._status_index.get(status, set()))
+            
+            if priority:
+                candidate_sets.append(self._priority_index.get(priority, set()))
+            
+            if assignee:
+                candidate_sets.append(self._assignee_index.get(assignee, set()))
+            
+            if tag:
+                candidate_sets.append(self._tag_index.get(tag, set()))
+            
+            if namespace:
+                candidate_sets.append(self._namespace_index.get(namespace, set()))
+            
+            if search:
+                candidate_sets.append(self._search_index.match(search))
+            
+            if due_range and not candidate_sets and sort == "due_date":
+                # Walk the requested window of the due date index
+                keys = islice(self._due_index.ascending(due_start, due_stop), start, end)
+                total = self._due_index.count_range(due_start, due_stop)
+                return [self._tasks[task_id] for _, task_id in keys], total
+            
+            if due_range:
+                candidate_sets.append({
+                    task_id for _, task_id in self._due_index.ascending(due_start, due_stop)
+                })
+            
+            if not candidate_sets:
+                if sort == "due_date":
+                    # Soonest due first; tasks without a due date follow, newest first
+                    keys = chain(
+                        self._due_index.ascending(),
+                        (
+                            key for key in self._updated_index.descending()
+                            if self._indexed_keys[key[1]]["due_date"] is None
+                        )
+                    )
+                    return [self._tasks[task_id] for _, task_id in islice(keys, start, end)], len(self._tasks)
+                
+                # Walk the ordered index from the newest task (or the cursor)
+                keys = islice(self._updated_index.descending(before=cursor_key), start, end)
+                return [self._tasks[task_id] for _, task_id in keys], len(self._tasks)
+            
+            # Intersect starting from the smallest candidate set
+            candidate_sets.sort(key=len)
+            smallest, others = candidate_sets[0], candidate_sets[1:]
+            task_ids = [
+                task_id for task_id in smallest
+                if all(task_id in other for other in others)
+            ]
+            
+            # Get total count
+            total = len(task_ids)
+            
+            if search and sort == "relevance":
+                # Newest first among equally relevant tasks
+                scores = self._search_index.score(search, set(task_ids))
+                task_ids.sort(key=lambda task_id: self._indexed_keys[task_id]["updated_at"], reverse=True)
+                task_ids.sort(key=lambda task_id: scores[task_id], reverse=True)
+                return [self._tasks[task_id] for task_id in task_ids[start:end]], total
+            
+            if sort == "due_date":
+                # Soonest due first; tasks without a due date follow, newest first
+                due_keys, undated_keys = [], []
+                for task_id in task_ids:
+                    keys = self._indexed_keys[task_id]
+                    if keys["due_date"] is not None:
+                        due_keys.append((keys["due_date"], task_id))
+                    else:
+                        undated_keys.append((keys["updated_at"], task_id))
+                
+                selected = heapq.nsmallest(end, due_keys)
+                if len(selected) < end:
+                    selected += heapq.nlargest(end - len(selected), undated_keys)
+                return [self._tasks[task_id] for _, task_id in selected[start:end]], total
+            
+            # Select the newest tasks (before the cursor) without a full sort
+            keys = [(self._indexed_keys[task_id]["updated_at"], task_id) for task_id in task_ids]
+            if cursor_key:
+                keys = [key for key in keys if key < cursor_key]
+            
+            keys = heapq.nlargest(end, keys)[start:]
+            return [self._tasks[task_id] for _, task_id in keys], total
+    
+    def _list_with_archive(
+        self,
+        status: Optional[str],
+        priority: Optional[str],
+        assignee: Optional[str],
+        tag: Optional[str],
+        search: Optional[str],
+        page: int,
+        page_size: int,
+        sort: str,
+        cursor: Optional[str],
+        due_after: Optional[datetime],
+        due_before: Optional[datetime],
+        namespace: Optional[str]
+    ) -> Tuple[List[Task], int]:
+        """
+        List matching tasks from both the working set and the archive.
+        
+        Archived tasks are not indexed, so the archive is scanned and the
+        combined matches are sorted in full. Arguments are as for list_tasks.
+        
+        Returns:
+            Tuple[List[Task], int]: List of tasks and total count
+        """
+        with self._lock:
+            hot, _ = self.list_tasks(
+                status, priority, assignee, tag, search, page_size=max(len(self._tasks), 1),
+                due_after=due_after, due_before=due_before, namespace=namespace
+            )
+        archived = filter_tasks(
+            (task for task in self._archive.tasks() if task.id not in self._tasks),
+            status, priority, assignee, tag, due_after, due_before, namespace
+        )
+        
+        tasks = order_tasks(hot + archived, sort, search)
+        return page_tasks(tasks, page, page_size, cursor), len(tasks)
+    
+    def list_overdue_tasks(self, now: Optional[datetime] = None) -> List[Task]:
+        """
+        List open tasks whose due date has passed, most overdue first.
+        
+        Only the overdue prefix of the open due date index is walked.
+        
+        Args:
+            now: Reference time (defaults to the current UTC time)
+        
+        Returns:
+            List[Task]: Overdue tasks
+        """
+        now = utc_naive(now) if now else datetime.utcnow()
+        with self._lock:
+            return [self._tasks[task_id] for _, task_id in self._open_due_index.ascending(stop=(now,))]
+    
+    def get_statistics(self, now: Optional[datetime] = None, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get task counts by status, priority, assignee, tag, complexity level and namespace.
+        
+        The counts are read from the secondary indexes, or for a namespace
+        from its own counters, which are kept up to date on every mutation,
+        so the cost does not depend on the number of tasks. Overdue tasks
+        are open tasks whose due date has passed. Archived tasks are only
+        counted over all namespaces, as the archive is not indexed by
+        namespace.
+        
+        Args:
+            now: Reference time for overdue counts (defaults to the current UTC time)
+            namespace: Only count tasks in this namespace
+        
+        Returns:
+            Dict[str, Any]: Task statistics
+        """
+        now = utc_naive(now) if now else datetime.utcnow()
+        with self._lock:
+            if namespace:
+                return self._namespace_statistics(now, namespace)
+            
+            return {
+                "total_tasks": len(self._tasks),
+                "by_status": {key: len(ids) for key, ids in self._status_index.items()},
+                "by_priority": {key: len(ids) for key, ids in self._priority_index.items()},
+                "by_assignee": {key: len(ids) for key, ids in self._assignee_index.items()},
+                "by_tag": {key: len(ids) for key, ids in self._tag_index.items()},
+                "by_complexity": {key: len(ids) for key, ids in self._complexity_index.items()},
+                "by_namespace": {key: len(ids) for key, ids in self._namespace_index.items()},
+                "with_due_date": len(self._open_due_index),
+                "overdue": self._open_due_index.count_range(stop=(now,)),
+                "archived_tasks": len(self._archive) if self._archive is not None else 0,
+                "version": self._version
+            }
+    
+    def _namespace_statistics(self, now: datetime, namespace: str) -> Dict[str, Any]:
+        """
+        Get the statistics of one namespace from its counters.
+        
+        Must be called with the lock held.
+        
+        Args:
+            now: Reference time for overdue counts
+            namespace: Namespace to count
+        
+        Returns:
+            Dict[str, Any]: Task statistics
+        """
+        total = len(self._namespace_index.get(namespace, ()))
+        counts = self._namespace_counts.get(namespace, {})
+        open_due = self._namespace_open_due.get(namespace)
+        return {
+            "total_tasks": total,
+            "by_status": dict(counts.get("status", {})),
+            "by_priority": dict(counts.get("priority", {})),
+            "by_assignee": dict(counts.get("assignee", {})),
+            "by_tag": dict(counts.get("tags", {})),
+            "by_complexity": dict(counts.get("complexity", {})),
+            "by_namespace": {namespace: total} if total else {},
+            "with_due_date": len(open_due) if open_due is not None else 0,
+            "overdue": open_due.count_range(stop=(now,)) if open_due is not None else 0,
+            "version": self._version
+        }
+    
+    def list_namespaces(self) -> Dict[str, int]:
+        """
+        List the namespaces that have tasks in the working set.
+        
+        Returns:
+            Dict[str, int]: Number of tasks by namespace
+        """
+        with self._lock:
+            return {key: len(ids) for key, ids in self._namespace_index.items()}
+    
+    # Archive operations
+    
+    def attach_archive(self, archive: Optional[TaskArchive]) -> None:
+        """
+        Attach a cold-tier archive for long-closed tasks.
+        
+        Must be attached before a journal is replayed, so that archive
+        records in it can be applied.
+        
+        Args:
+            archive: Archive to use, or None to detach
+        """
+        with self._lock:
+            self._archive = archive
+    
+    def archive_closed_tasks(self, closed_before: datetime) -> List[str]:
+        """
+        Move done and cancelled tasks last updated before a cutoff to the archive.
+        
+        Tasks still linked to others (through Task.dependencies or dependency
+        records) stay in the working set. Candidates are read oldest first
+        from the updated_at index, so only tasks older than the cutoff are
+        visited.
+        
+        Args:
+            closed_before: Archive tasks last updated before this time
+        
+        Returns:
+            List[str]: IDs of the archived tasks
+        """
+        if self._archive is None:
+            return []
+        
+        with self._lock:
+            tasks = [
+                self._tasks[task_id]
+                for _, task_id in self._updated_index.ascending(stop=(utc_naive(closed_before),))
+                if self._indexed_keys[task_id]["status"] in CLOSED_STATUSES
+                and not self._indexed_keys[task_id]["dependencies"]
+                and not self._task_dependents.get(task_id)
+                and not self._outgoing_dependencies.get(task_id)
+                and not self._incoming_dependencies.get(task_id)
+            ]
+            if not tasks:
+                return []
+            
+            # Written to disk before the tasks leave memory
+            self._archive.put(tasks)
+            for task in tasks:
+                del self._tasks[task.id]
+                self._unindex_task(task.id)
+                self._dependency_order.remove_node(task.id)
+            
+            self._record_archived(tasks)
+            return [task.id for task in tasks]
+    
+    def _hot_task(self, task_id: str) -> Optional[Task]:
+        """
+        Get a task from the working set, rehydrating it from the archive if needed.
+        
+        Must be called with the lock held.
+        
+        Args:
+            task_id: ID of the task
+        
+        Returns:
+            Optional[Task]: Task if found, None otherwise
+        """
+        task = self._tasks.get(task_id)
+        if task is not None or self._archive is None:
+            return task
+        
+        task = self._archive.get(task_id)
+        if task is None:
+            return None
+        
+        self._tasks[task.id] = task
+        self._index_task(task)
+        self._dependency_order.add_node(task.id)
+        
+        # Journaled before it leaves the archive, so a crash cannot lose it;
+        # the removal is written once the lock is released
+        self._record_task(task)
+        self._archive.remove([task.id])
+        return task
+    
+    # Index maintenance
+    
+    @staticmethod
+    def _add_to_index(index: Dict[str, Set[str]], key: Optional[str], task_id: str) -> None:
+        """Add a task ID to an index bucket."""
+        if key is None:
+            return
+        index.setdefault(key, set()).add(task_id)
+    
+    @staticmethod
+    def _remove_from_index(index: Dict[str, Set[str]], key: Optional[str], task_id: str) -> None:
+        """Remove a task ID from an index bucket, dropping empty buckets."""
+        if key is None:
+            return
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.discard(task_id)
+        if not bucket:
+            del index[key]
+    
+    def _index_task(self, task: Task, in_place: bool = False) -> None:
+        """
+        Add a task to the secondary indexes.
+        
+        Must be called with the lock held.
+        
+        Args:
+            task: Task to index
+            in_place: Whether the task is being reindexed, in which case the
+                caller reports dependency edge and done state changes
+        """
+        keys = {
+            "status": task.status,
+            "priority": task.priority,
+            "assignee": task.assignee,
+            "tags": set(task.tags),
+            "complexity": task.complexity.level if task.complexity else None,
+            "due_date": utc_naive(task.due_date) if task.due_date else None,
+            "dependencies": set(task.dependencies),
+            "updated_at": utc_naive(task.updated_at),
+            "namespace": task.namespace,
+        }
+        
+        self._add_to_index(self._status_index, keys["status"], task.id)
+        self._add_to_index(self._priority_index, keys["priority"], task.id)
+        self._add_to_index(self._assignee_index, keys["assignee"], task.id)
+        for tag in keys["tags"]:
+            self._add_to_index(self._tag_index, tag, task.id)
+        self._add_to_index(self._complexity_index, keys["complexity"], task.id)
+        self._add_to_index(self._namespace_index, keys["namespace"], task.id)
+        if keys["due_date"] is not None:
+            self._due_index.add((keys["due_date"], task.id))
+            if keys["status"] not in CLOSED_STATUSES:
+                self._open_due_index.add((keys["due_date"], task.id))
+                self._namespace_open_due.setdefault(keys["namespace"], SortedIndex()).add((keys["due_date"], task.id))
+        self._count_namespace_keys(keys, 1)
+        
+        self._task_dependencies[task.id] = keys["dependencies"]
+        for dep_id in keys["dependencies"]:
+            self._add_to_index(self._task_dependents, dep_id, task.id)
+            if not in_place:
+                self._reachability.add_edge(dep_id, task.id)
+        if not in_place:
+            # Tasks that already listed this ID now reach it
+            for dependent_id in self._task_dependents.get(task.id, ()):
+                self._reachability.add_edge(task.id, dependent_id)
+        
+        self._search_index.add_document(task.id, task.title, task.description, task.details)
+        self._updated_index.add((keys["updated_at"], task.id))
+        
+        # Counted before the task is registered, so a task listing itself
+        # is judged by its own status
+        unmet = sum(
+            1 for dep_id in keys["dependencies"]
+            if not (keys["status"] == TaskStatus.DONE.value if dep_id == task.id else self._is_done(dep_id))
+        )
+        self._indexed_keys[task.id] = keys
+        self._unmet_dependencies[task.id] = unmet
+        if not in_place and keys["status"] == TaskStatus.DONE.value:
+            self._adjust_unmet_dependencies(task.id, -1)
+        self._update_ready(task.id)
+    
+    def _unindex_task(self, task_id: str, in_place: bool = False) -> None:
+        """
+        Remove a task from the secondary indexes.
+        
+        Must be called with the lock held.
+        
+        Args:
+            task_id: ID of the task to remove
+            in_place: Whether the task is being reindexed, in which case the
+                caller reports dependency edge and done state changes
+        """
+        keys = self._indexed_keys.pop(task_id, None)
+        if keys is None:
+            return
+        
+        self._remove_from_index(self._status_index, keys["status"], task_id)
+        self._remove_from_index(self._priority_index, keys["priority"], task_id)
+        self._remove_from_index(self._assignee_index, keys["assignee"], task_id)
+        for tag in keys["tags"]:
+            self._remove_from_index(self._tag_index, tag, task_id)
+        self._remove_from_index(self._complexity_index, keys["complexity"], task_id)
+        self._remove_from_index(self._namespace_index, keys["namespace"], task_id)
+        if keys["due_date"] is not None:
+            self._due_index.remove((keys["due_date"], task_id))
+            self._open_due_index.remove((keys["due_date"], task_id))
+            open_due = self._namespace_open_due.get(keys["namespace"])
+            if open_due is not None:
+                open_due.remove((keys["due_date"], task_id))
+        self._count_namespace_keys(keys, -1)
+        
+        self._task_dependencies.pop(task_id, None)
+        for dep_id in keys["dependencies"]:
+            self._remove_from_index(self._task_dependents, dep_id, task_id)
+            if not in_place:
+                self._reachability.remove_edge(dep_id, task_id)
+        if not in_place:
+            for dependent_id in self._task_dependents.get(task_id, ()):
+                self._reachability.remove_edge(task_id, dependent_id)
+        
+        self._search_index.remove_document(task_id)
+        self._updated_index.remove((keys["updated_at"], task_id))
+        
+        del self._unmet_dependencies[task_id]
+        self._set_ready_key(task_id, None)
+        if not in_place and keys["status"] == TaskStatus.DONE.value:
+            self._adjust_unmet_dependencies(task_id, 1)
+    
+    def _count_namespace_keys(self, keys: Dict[str, Any], delta: int) -> None:
+        """
+        Add a task's index keys to its namespace's counters, or remove them.
+        
+        Must be called with the lock held.
+        
+        Args:
+            keys: Index keys of the task
+            delta: 1 to add the task, -1 to remove it
+        """
+        counts = self._namespace_counts.setdefault(keys["namespace"], {})
+        values = [(field, keys[field]) for field in ("status", "priority", "assignee", "complexity")]
+        values.extend(("tags", tag) for tag in keys["tags"])
+        for field, value in values:
+            if value is None:
+                continue
+            field_counts = counts.setdefault(field, {})
+            count = field_counts.get(value, 0) + delta
+            if count:
+                field_counts[value] = count
+            else:
+                del field_counts[value]
+    
+    def _reindex_task(self, task: Task) -> None:
+        """
+        Refresh the index entries of a task after it changed.
+        
+        Must be called with the lock held.
+        
+        Args:
+            task: Task to reindex
+        """
+        keys = self._indexed_keys.get(task.id)
+        was_done = keys is not None and keys["status"] == TaskStatus.DONE.value
+        old_dependencies = keys["dependencies"] if keys is not None else set()
+        
+        self._unindex_task(task.id, in_place=True)
+        self._index_task(task, in_place=True)
+        
+        # Dependents are only touched when the task is done or reopened, and
+        # reachability only when its dependencies change
+        is_done = task.status == TaskStatus.DONE.value
+        if was_done != is_done:
+            self._adjust_unmet_dependencies(task.id, -1 if is_done else 1)
+        new_dependencies = self._indexed_keys[task.id]["dependencies"]
+        for dep_id in old_dependencies - new_dependencies:
+            self._reachability.remove_edge(dep_id, task.id)
+        for dep_id in new_dependencies - old_dependencies:
+            self._reachability.add_edge(dep_id, task.id)
+    
+    def _reindex_task_links(self, task: Task) -> None:
+        """
+        Refresh only the dependency adjacency and updated_at entries of a task.
+        
+        Cheaper than _reindex_task when nothing but Task.dependencies and
+        updated_at changed. Must be called with the lock held.
+        
+        Args:
+            task: Task to reindex
+        """
+        keys = self._indexed_keys[task.id]
+        
+        old_dependencies = keys["dependencies"]
+        new_dependencies = set(task.dependencies)
+        for dep_id in old_dependencies - new_dependencies:
+            self._remove_from_index(self._task_dependents, dep_id, task.id)
+            self._reachability.remove_edge(dep_id, task.id)
+            if not self._is_done(dep_id):
+                self._unmet_dependencies[task.id] -= 1
+        for dep_id in new_dependencies - old_dependencies:
+            self._add_to_index(self._task_dependents, dep_id, task.id)
+            self._reachability.add_edge(dep_id, task.id)
+            if not self._is_done(dep_id):
+                self._unmet_dependencies[task.id] += 1
+        keys["dependencies"] = new_dependencies
+        self._task_dependencies[task.id] = new_dependencies
+        self._update_ready(task.id)
+        
+        updated_at = utc_naive(task.updated_at)
+        if keys["updated_at"] != updated_at:
+            self._updated_index.remove((keys["updated_at"], task.id))
+            keys["updated_at"] = updated_at
+            self._updated_index.add((keys["updated_at"], task.id))
+    
+    def _is_done(self, task_id: str) -> bool:
+        """
+        Check whether a task in the working set is done.
+        
+        Must be called with the lock held. Unknown tasks are not done.
+        
+        Args:
+            task_id: ID of the task
+        
+        Returns:
+            bool: True if the task is indexed with the done status
+        """
+        keys = self._indexed_keys.get(task_id)
+        return keys is not None and keys["status"] == TaskStatus.DONE.value
+    
+    def _adjust_unmet_dependencies(self, task_id: str, delta: int) -> None:
+        """
+        Change the unmet dependency count of every task depending on a task.
+        
+        Must be called with the lock held.
+        
+        Args:
+            task_id: ID of the task that was done or reopened
+            delta: -1 when it was done, 1 when it was reopened
+        """
+        for dependent_id in self._task_dependents.get(task_id, ()):
+            if dependent_id != task_id and dependent_id in self._unmet_dependencies:
+                self._unmet_dependencies[dependent_id] += delta
+                self._update_ready(dependent_id)
+    
+    def _update_ready(self, task_id: str) -> None:
+        """
+        Add a task to or remove it from the ready index.
+        
+        A task is ready when it is pending and all its dependencies are
+        done. Must be called with the lock held.
+        
+        Args:
+            task_id: ID of the task
+        """
+        keys = self._indexed_keys.get(task_id)
+        task = self._tasks.get(task_id)
+        ready = (
+            keys is not None and task is not None
+            and keys["status"] == TaskStatus.PENDING.value
+            and self._unmet_dependencies[task_id] == 0
+        )
+        self._set_ready_key(task_id, ready_order_key(task) if ready else None)
+    
+    def _set_ready_key(self, task_id: str, key: Optional[Tuple[int, datetime, str]]) -> None:
+        """Move a task to a new ready index key, or out of the index for None."""
+        old_key = self._ready_keys.get(task_id)
+        if old_key == key:
+            return
+        if old_key is not None:
+            self._ready_index.remove(old_key)
+            del self._ready_keys[task_id]
+        if key is not None:
+            self._ready_index.add(key)
+            self._ready_keys[task_id] = key
+    
+    def _dependency_successors(self, task_id: str) -> List[str]:
+        """
+        Get the target task IDs of the dependency records leaving a task.
+        
+        Must be called with the lock held.
+        
+        Args:
+            task_id: Source task ID
+        
+        Returns:
+            List[str]: Target task IDs
+        """
+        return [
+            self._dependencies[dep_id].target_task_id
+            for dep_id in self._outgoing_dependencies.get(task_id, ())
+        ]
+    
+    def _dependency_predecessors(self, task_id: str) -> List[str]:
+        """
+        Get the source task IDs of the dependency records entering a task.
+        
+        Must be called with the lock held.
+        
+        Args:
+            task_id: Target task ID
+        
+        Returns:
+            List[str]: Source task IDs
+        """
+        return [
+            self._dependencies[dep_id].source_task_id
+            for dep_id in self._incoming_dependencies.get(task_id, ())
+        ]
+    
+    def _link_dependency(self, dependency: Dependency) -> None:
+        """
+        Add a dependency record to the adjacency maps.
+        
+        Must be called with the lock held.
+        
+        Args:
+            dependency: Dependency to link
+        """
+        self._add_to_index(self._outgoing_dependencies, dependency.source_task_id, dependency.id)
+        self._add_to_index(self._incoming_dependencies, dependency.target_task_id, dependency.id)
+    
+    def _unlink_dependency(self, dependency: Dependency) -> None:
+        """
+        Remove a dependency record from the adjacency maps.
+        
+        Must be called with the lock held.
+        
+        Args:
+            dependency: Dependency to unlink
+        """
+        self._remove_from_index(self._outgoing_dependencies, dependency.source_task_id, dependency.id)
+        self._remove_from_index(self._incoming_dependencies, dependency.target_task_id, dependency.id)
+    
+    def _rebuild_indexes(self) -> None:
+        """
+        Rebuild all secondary indexes and adjacency maps from stored data.
+        
+        Must be called with the lock held.
+        """
+        self._status_index.clear()
+        self._priority_index.clear()
+        self._assignee_index.clear()
+        self._tag_index.clear()
+        self._complexity_index.clear()
+        self._namespace_index.clear()
+        self._indexed_keys.clear()
+        self._task_dependencies.clear()
+        self._task_dependents.clear()
+        self._reachability.clear()
+        self._unmet_dependencies.clear()
+        self._ready_index.clear()
+        self._ready_keys.clear()
+        self._outgoing_dependencies.clear()
+        self._incoming_dependencies.clear()
+        self._search_index = SearchIndex()
+        self._updated_index.clear()
+        self._due_index.clear()
+        self._open_due_index.clear()
+        self._namespace_counts.clear()
+        self._namespace_open_due.clear()
+        
+        for task in self._tasks.values():
+            self._index_task(task)
+        
+        for dependency in self._dependencies.values():
+            self._link_dependency(dependency)
+        
+        self._dependency_order.rebuild(self._tasks, self._dependency_successors)
+    
+    # Dependency operations
+    
+    def create_dependency(self, dependency: Dependency) -> Dependency:
+        """
+        Create a new dependency in storage.
+        
+        Args:
+            dependency: Dependency to create
+        
+        Returns:
+            Dependency: Created dependency with ID assigned
+        """
+        with self._rehydrating():
+            # Ensure dependency has an ID
+            if not dependency.id:
+                dependency.id = str(uuid4())
+            
+            # Validate source and target tasks exist
+            if self._hot_task(dependency.source_task_id) is None:
+                raise ValueError(f"Source task not found: {dependency.source_task_id}")
+            
+            if self._hot_task(dependency.target_task_id) is None:
+                raise ValueError(f"Target task not found: {dependency.target_task_id}")
+            
+            # Validate no circular dependencies; only the part of the graph
+            # between the two tasks in topological order is searched
+            if not self._dependency_order.insert_edge(
+                dependency.source_task_id,
+                dependency.target_task_id,
+                self._dependency_successors,
+                self._dependency_predecessors
+            ):
+                raise ValueError("This dependency would create a circular reference")
+            
+            # Store the dependency
+            self._dependencies[dependency.id] = dependency
+            self._link_dependency(dependency)
+            self._record_dependency(dependency)
+            
+            # Update the target task's dependencies
+            target_task = self._tasks[dependency.target_task_id]
+            if dependency.source_task_id not in target_task.dependencies:
+                target_task = target_task.model_copy(update={
+                    "dependencies": target_task.dependencies + [dependency.source_task_id],
+                    "updated_at": datetime.utcnow()
+                })
+                self._tasks[target_task.id] = target_task
+                self._reindex_task_links(target_task)
+                self._record_task(target_task)
+            
+            return dependency
+    
+    def get_dependency(self, dependency_id: str) -> Optional[Dependency]:
+        """
+        Get a dependency by ID.
+        
+        Args:
+            dependency_id: ID of the dependency to retrieve
+        
+        Returns:
+            Optional[Dependency]: Dependency if found, None otherwise
+        """
+        # Stored dependencies are replaced rather than modified
+        return self._dependencies.get(dependency_id)
+    
+    def update_dependency(self, dependency_id: str, updates: Dict[str, Any]) -> Optional[Dependency]:
+        """
+        Update a dependency by ID.
+        
+        Args:
+            dependency_id: ID of the dependency to update
+            updates: Dictionary of field updates
+        
+        Returns:
+            Optional[Dependency]: Updated dependency if found, None otherwise
+        """
+        with self._lock:
+            dependency = self._dependencies.get(dependency_id)
+            if not dependency:
+                return None
+            
+            # Disallow changing source/target tasks
+            if "source_task_id" in updates or "target_task_id" in updates:
+                raise ValueError("Cannot change source_task_id or target_task_id of an existing dependency")
+            
+            # Apply updates to a copy
+            dependency = dependency.model_copy()
+            dependency.update(updates)
+            
+            # Store updated dependency
+            self._dependencies[dependency_id] = dependency
+            self._record_dependency(dependency)
+            return dependency
+    
+    def delete_dependency(self, dependency_id: str) -> bool:
+        """
+        Delete a dependency by ID.
+        
+        Args:
+            dependency_id: ID of the dependency to delete
+        
+        Returns:
+            bool: True if dependency was found and deleted, False otherwise
+        """
+        with self._lock:
+            dependency = self._dependencies.get(dependency_id)
+            if not dependency:
+                return False
+            
+            # Remove dependency from target task
+            target_task = self._tasks.get(dependency.target_task_id)
+            if target_task and dependency.source_task_id in target_task.dependencies:
+                target_task = target_task.model_copy(update={
+                    "dependencies": [
+                        dep_id for dep_id in target_task.dependencies if dep_id != dependency.source_task_id
+                    ],
+                    "updated_at": datetime.utcnow()
+                })
+                self._tasks[target_task.id] = target_task
+                self._reindex_task_links(target_task)
+                self._record_task(target_task)
+            
+            # Delete the dependency
+            del self._dependencies[dependency_id]
+            self._unlink_dependency(dependency)
+            self._record("delete_dependency", {"id": dependency_id})
+            return True
+    
+    def list_dependencies(
+        self,
+        task_id: Optional[str] = None,
+        dependency_type: Optional[str] = None
+    ) -> List[Dependency]:
+        """
+        List dependencies with optional filtering.
+        
+        Args:
+            task_id: Filter by source or target task ID
+            dependency_type: Filter by dependency type
+        
+        Returns:
+            List[Dependency]: List of matching dependencies
+        """
+        with self._lock:
+            if task_id:
+                # Only look at the edges touching this task
+                dep_ids = (
+                    self._outgoing_dependencies.get(task_id, set()) |
+                    self._incoming_dependencies.get(task_id, set())
+                )
+                dependencies = [self._dependencies[dep_id] for dep_id in dep_ids]
+            else:
+                # Start with all dependencies
+                dependencies = list(self._dependencies.values())
+            
+            # Apply filters
+            if dependency_type:
+                dependencies = [d for d in dependencies if d.dependency_type == dependency_type]
+            
+            # Sort by updated_at (newest first)
+            dependencies.sort(key=lambda d: d.updated_at, reverse=True)
+            
+            return dependencies
+    
+    def list_blocking_tasks(self, task_id: str) -> List[Task]:
+        """
+        List tasks that block a given task.
+        
+        Args:
+            task_id: ID of the task to check
+        
+        Returns:
+            List[Task]: List of tasks that block the specified task
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task:
+                return []
+            
+            return [self._tasks[dep_id] for dep_id in task.dependencies if dep_id in self._tasks]
+    
+    def list_dependent_tasks(self, task_id: str) -> List[Task]:
+        """
+        List tasks that depend on a given task.
+        
+        Args:
+            task_id: ID of the task to check
+        
+        Returns:
+            List[Task]: List of tasks that depend on the specified task
+        """
+        with self._lock:
+            return [
+                self._tasks[dependent_id]
+                for dependent_id in self._task_dependents.get(task_id, set())
+                if dependent_id in self._tasks
+            ]
+    
+    def list_ready_tasks(self, limit: int = 50, namespace: Optional[str] = None) -> List[Task]:
+        """
+        List pending tasks whose dependencies are all done.
+        
+        Read from the maintained ready index, so getting the next task to
+        run does not look at any task's dependencies.
+        
+        Args:
+            limit: Maximum number of tasks to return
+            namespace: Only list tasks in this namespace
+        
+        Returns:
+            List[Task]: Ready tasks, highest priority first, then oldest first
+        """
+        with self._lock:
+            tasks = []
+            for _, _, task_id in self._ready_index.ascending():
+                if len(tasks) >= limit:
+                    break
+                task = self._tasks[task_id]
+                if namespace is None or task.namespace == namespace:
+                    tasks.append(task)
+            return tasks
+    
+    def list_downstream_tasks(
+        self,
+        task_id: str,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """
+        List the tasks that depend on a task, directly or transitively.
+        
+        Answered from the reachability index, which caches full traversals
+        until a dependency in the same connected group of tasks changes.
+        
+        Args:
+            task_id: ID of the task
+            max_depth: Only follow this many dependency links (None for no limit)
+            limit: Maximum number of tasks to return (None for all)
+        
+        Returns:
+            Tuple[List[Tuple[Task, int]], int]: Tasks with their distance in
+            links, nearest first, and the total number of such tasks
+        """
+        with self._lock:
+            return self._reachable_tasks(self._reachability.descendants(task_id, max_depth), limit)
+    
+    def list_upstream_tasks(
+        self,
+        task_id: str,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """
+        List the tasks a task depends on, directly or transitively.
+        
+        Args:
+            task_id: ID of the task
+            max_depth: Only follow this many dependency links (None for no limit)
+            limit: Maximum number of tasks to return (None for all)
+        
+        Returns:
+            Tuple[List[Tuple[Task, int]], int]: Tasks with their distance in
+            links, nearest first, and the total number of such tasks
+        """
+        with self._lock:
+            return self._reachable_tasks(self._reachability.ancestors(task_id, max_depth), limit)
+    
+    def get_dependency_distance(self, upstream_id: str, downstream_id: str) -> Optional[int]:
+        """
+        Get how many dependency links lead from a task to one depending on it.
+        
+        Args:
+            upstream_id: ID of the task depended on
+            downstream_id: ID of the task that may depend on it
+        
+        Returns:
+            Optional[int]: Length of the shortest chain of dependencies, or
+            None if the downstream task does not depend on the upstream task
+        """
+        with self._lock:
+            return self._reachability.distance(upstream_id, downstream_id)
+    
+    def _reachable_tasks(
+        self, distances: Dict[str, int], limit: Optional[int]
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """
+        Resolve reachable task IDs to stored tasks.
+        
+        Must be called with the lock held.
+        
+        Args:
+            distances: Distance by task ID, nearest first
+            limit: Maximum number of tasks to return (None for all)
+        
+        Returns:
+            Tuple[List[Tuple[Task, int]], int]: Tasks with their distances and
+            the total number of tasks reached
+        """
+        tasks = [(self._tasks[task_id], depth) for task_id, depth in islice(distances.items(), limit)]
+        return tasks, len(distances)
+    
+    # Persistence operations (for in-memory storage backup/restore)
+    
+    def save_to_file(self, filepath: str, snapshot_format: str = "json") -> bool:
+        """
+        Save the current state to a snapshot file.
+        
+        Args:
+            filepath: Path to save the snapshot file
+            snapshot_format: "json" or "binary"
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        # Serialized from a snapshot, so writers are not blocked meanwhile
+        snapshot = self.snapshot()
+        try:
+            # Written to a temporary file and swapped in, so a crash never
+            # leaves a half-written snapshot behind
+            write_state(
+                filepath, list(snapshot.tasks.values()), list(snapshot.dependencies.values()), snapshot_format
+            )
+            
+            return True
+        except Exception as e:
+            print(f"Error saving to file: {e}")
+            return False
+    
+    def load_from_file(self, filepath: str) -> bool:
+        """
+        Load state from a snapshot file (JSON or binary).
+        
+        Args:
+            filepath: Path to the snapshot file
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        with self._lock:
+            try:
+                if not os.path.exists(filepath):
+                    return False
+                
+                # Read from file
+                tasks, dependencies = read_state(filepath)
+                self.load_state(tasks, dependencies)
+                return True
+            except Exception as e:
+                print(f"Error loading from file: {e}")
+                return False
+    
+    def load_state(self, tasks: List[Task], dependencies: List[Dependency]) -> None:
+        """
+        Replace the current state with already-loaded tasks and dependencies.
+        
+        Args:
+            tasks: Tasks to hold
+            dependencies: Dependencies to hold
+        """
+        with self._lock:
+            self._tasks = {task.id: task for task in tasks}
+            self._dependencies = {dep.id: dep for dep in dependencies}
+            
+            with gc_paused():
+                self._rebuild_indexes()
+            self._changed()
+    
+    # Journal operations
+    
+    def attach_journal(self, journal: Optional[TaskJournal]) -> None:
+        """
+        Attach a write-ahead journal that receives every subsequent mutation.
+        
+        Args:
+            journal: Journal to write to, or None to detach
+        """
+        with self._lock:
+            self._journal = journal
+    
+    def replay_journal(self, journal: TaskJournal) -> int:
+        """
+        Apply the records of a journal on top of the current state.
+        
+        Used for recovery after loading the last snapshot.
+        
+        Args:
+            journal: Journal to replay
+        
+        Returns:
+            int: Number of records applied
+        """
+        return self.apply_journal_records(journal.replay())
+    
+    def apply_journal_records(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Apply journal records, in order, without journaling them again.
+        
+        Args:
+            records: (operation, payload) pairs as produced by TaskJournal.replay
+        
+        Returns:
+            int: Number of records applied
+        """
+        with self._rehydrating():
+            count = 0
+            for op, data in records:
+                self._apply_journal_record(op, data)
+                count += 1
+            if count:
+                self._changed()
+            return count
+    
+    def compact_journal(self, snapshot_path: str, snapshot_format: str = "json") -> bool:
+        """
+        Write a snapshot of the current state and truncate the journal.
+        
+        Args:
+            snapshot_path: Path of the snapshot file
+            snapshot_format: "json" or "binary"
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        # Held so no mutation is journaled between the snapshot and the reset
+        with self._lock:
+            if not self.save_to_file(snapshot_path, snapshot_format):
+                return False
+            if self._journal:
+                self._journal.reset()
+            return True
+    
+    def _changed(
+        self,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        entity: Optional[Any] = None
+    ) -> None:
+        """
+        Start a new version, retiring the published snapshot.
+        
+        Must be called with the lock held.
+        
+        Args:
+            entity_type: Type of the changed entity, or None if the whole
+                state was replaced (clients must then resync)
+            entity_id: ID of the changed entity
+            entity: Entity after the change, or None if it was deleted
+        """
+        self._version += 1
+        self._snapshot = None
+        if entity_type is None:
+            self._change_feed.invalidate()
+        else:
+            self._change_feed.append(entity_type, entity_id, entity)
+    
+    def _record(self, op: str, data: Dict[str, Any]) -> None:
+        """Record a deletion and journal it, if a journal is attached. Must be called with the lock held."""
+        self._changed(TASK if op == "delete_task" else DEPENDENCY, data["id"])
+        if self._journal:
+            self._journal.append(op, data)
+    
+    def _record_task(self, task: Task) -> None:
+        """Record a task change and journal its full state. Must be called with the lock held."""
+        self._changed(TASK, task.id, task)
+        if self._journal:
+            self._journal.append_encoded("put_task", task.to_json())
+    
+    def _record_tasks(self, tasks: List[Task]) -> None:
+        """Record a batch of task changes as one journal record. Must be called with the lock held."""
+        for task in tasks:
+            self._changed(TASK, task.id, task)
+        if self._journal:
+            self._journal.append_encoded("put_tasks", '{"tasks":[%s]}' % ",".join(task.to_json() for task in tasks))
+    
+    def _record_archived(self, tasks: List[Task]) -> None:
+        """Record tasks moved to the archive as one journal record. Must be called with the lock held."""
+        for task in tasks:
+            self._changed(TASK, task.id, task)
+        if self._journal:
+            self._journal.append("archive_tasks", {"ids": [task.id for task in tasks]})
+    
+    def _record_dependency(self, dependency: Dependency) -> None:
+        """Record a dependency change and journal its full state. Must be called with the lock held."""
+        self._changed(DEPENDENCY, dependency.id, dependency)
+        if self._journal:
+            self._journal.append("put_dependency", dependency.dict())
+    
+    def _apply_journal_record(self, op: str, data: Dict[str, Any]) -> None:
+        """
+        Apply one journal record without validation or further journaling.
+        
+        Must be called with the lock held.
+        
+        Args:
+            op: Operation name
+            data: Operation payload
+        
+        Raises:
+            ValueError: If the operation is unknown
+        """
+        if op == "put_task":
+            task = Task(**data)
+            self._unindex_task(task.id)
+            self._tasks[task.id] = task
+            self._index_task(task)
+            self._dependency_order.add_node(task.id)
+        elif op == "put_tasks":
+            for task_data in data["tasks"]:
+                self._apply_journal_record("put_task", task_data)
+        elif op == "delete_task":
+            if self._tasks.pop(data["id"], None) is not None:
+                self._unindex_task(data["id"])
+                self._dependency_order.remove_node(data["id"])
+            if self._archive is not None:
+                self._archive.remove([data["id"]])
+        elif op == "archive_tasks":
+            # Only tasks that made it into the archive leave the working set
+            for task_id in data["ids"]:
+                if self._archive is not None and task_id in self._archive and task_id in self._tasks:
+                    del self._tasks[task_id]
+                    self._unindex_task(task_id)
+                    self._dependency_order.remove_node(task_id)
+        elif op == "put_dependency":
+            dependency = Dependency(**data)
+            previous = self._dependencies.get(dependency.id)
+            if previous:
+                self._unlink_dependency(previous)
+            else:
+                self._dependency_order.insert_edge(
+                    dependency.source_task_id,
+                    dependency.target_task_id,
+                    self._dependency_successors,
+                    self._dependency_predecessors
+                )
+            self._dependencies[dependency.id] = dependency
+            self._link_dependency(dependency)
+        elif op == "delete_dependency":
+            dependency = self._dependencies.pop(data["id"], None)
+            if dependency:
+                self._unlink_dependency(dependency)
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+class SQLiteStorage:
+    """
+    SQLite-backed storage implementation for Metis.
+    
+    This class implements the same interface as InMemoryStorage on top of
+    an SQLite database, so large task sets do not have to be held in RAM.
+    Tasks, tags, task dependencies, subtasks, requirement references and
+    dependency records live in separate indexed tables, and task text is
+    indexed for search by an FTS5 table kept in sync by triggers. The
+    database runs in WAL mode so readers are not blocked by writers, and
+    all queries are parameterized so sqlite3 reuses its cached prepared
+    statements.
+    """
+    
+    is_persistent = True  # Data survives restarts without JSON backups
+    
+    # Maximum number of bound parameters per IN (...) query
+    _CHUNK_SIZE = 500
+    
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            status TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            details TEXT,
+            test_strategy TEXT,
+            assignee TEXT,
+            due_date TEXT,
+            complexity TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            namespace TEXT NOT NULL DEFAULT 'default'
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority);
+        CREATE INDEX IF NOT EXISTS idx_tasks_assignee ON tasks (assignee);
+        CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date);
+        CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks (updated_at, id);
+        
+        CREATE TABLE IF NOT EXISTS task_tags (
+            task_id TEXT NOT NULL,
+            tag TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (task_id, tag)
+        );
+        CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags (tag);
+        
+        CREATE TABLE IF NOT EXISTS task_dependencies (
+            task_id TEXT NOT NULL,
+            depends_on TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (task_id, depends_on)
+        );
+        CREATE INDEX IF NOT EXISTS idx_task_dependencies_depends_on ON task_dependencies (depends_on);
+        
+        CREATE TABLE IF NOT EXISTS subtasks (
+            id TEXT PRIMARY KEY,
+            task_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_subtasks_task ON subtasks (task_id, position);
+        
+        CREATE TABLE IF NOT EXISTS requirement_refs (
+            id TEXT PRIMARY KEY,
+            task_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            requirement_id TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_requirement_refs_task ON requirement_refs (task_id, position);
+        CREATE INDEX IF NOT EXISTS idx_requirement_refs_requirement ON requirement_refs (requirement_id);
+        
+        CREATE TABLE IF NOT EXISTS dependencies (
+            id TEXT PRIMARY KEY,
+            source_task_id TEXT NOT NULL,
+            target_task_id TEXT NOT NULL,
+            dependency_type TEXT NOT NULL,
+            description TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_dependencies_source ON dependencies (source_task_id);
+        CREATE INDEX IF NOT EXISTS idx_dependencies_target ON dependencies (target_task_id);
+        CREATE INDEX IF NOT EXISTS idx_dependencies_type ON dependencies (dependency_type);
+    """
+    
+    # Full-text index over task text, reading its content from the tasks
+    # table by rowid. Tokens are runs of word characters, lowercased and
+    # kept with their accents, as search.tokenize splits them. Tasks are
+    # upserted rather than replaced so their rowids stay stable; after a
+    # VACUUM, which may renumber them, the index must be rebuilt.
+    _SEARCH_SCHEMA = """
+        CREATE VIRTUAL TABLE tasks_fts USING fts5(
+            title, description, details, content='tasks',
+            tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+        );
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description, details)
+            VALUES (new.rowid, new.title, new.description, new.details);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description, details)
+            VALUES ('delete', old.rowid, old.title, old.description, old.details);
+        END;
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description, details ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description, details)
+            VALUES ('delete', old.rowid, old.title, old.description, old.details);
+            INSERT INTO tasks_fts (rowid, title, description, details)
+            VALUES (new.rowid, new.title, new.description, new.details);
+        END;
+        INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild');
+    """
+    
+    # Task counts by namespace, field and value, kept by triggers so that
+    # statistics do not scan the tasks. A task counts once under "total"
+    # and "open_due" (when it is open with a due date) with an empty value,
+    # and under its status, priority, assignee, complexity level and tags.
+    _COUNTS_SCHEMA = """
+        CREATE TABLE task_counts (
+            namespace TEXT NOT NULL,
+            field TEXT NOT NULL,
+            value NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (namespace, field, value)
+        ) WITHOUT ROWID;
+        CREATE TRIGGER IF NOT EXISTS task_counts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_counts (namespace, field, value, count)
+            SELECT new.namespace, field, value, 1 FROM (
+                SELECT 'total' AS field, '' AS value
+                UNION ALL SELECT 'status', new.status
+                UNION ALL SELECT 'priority', new.priority
+                UNION ALL SELECT 'assignee', new.assignee
+                UNION ALL SELECT 'complexity', json_extract(new.complexity, '$.level')
+                UNION ALL SELECT 'open_due', CASE WHEN new.due_date IS NOT NULL
+                    AND new.status NOT IN ('cancelled', 'done') THEN '' END
+            ) WHERE value IS NOT NULL
+            ON CONFLICT (namespace, field, value) DO UPDATE SET count = count + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_counts_delete AFTER DELETE ON tasks BEGIN
+            UPDATE task_counts SET count = count - 1
+            WHERE namespace = old.namespace AND (field, value) IN (
+                SELECT 'total', ''
+                UNION ALL SELECT 'status', old.status
+                UNION ALL SELECT 'priority', old.priority
+                UNION ALL SELECT 'assignee', old.assignee
+                UNION ALL SELECT 'complexity', json_extract(old.complexity, '$.level')
+                UNION ALL SELECT 'open_due', CASE WHEN old.due_date IS NOT NULL
+                    AND old.status NOT IN ('cancelled', 'done') THEN '' END
+            );
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_counts_update
+        AFTER UPDATE OF status, priority, assignee, due_date, complexity ON tasks BEGIN
+            UPDATE task_counts SET count = count - 1
+            WHERE namespace = old.namespace AND (field, value) IN (
+                SELECT 'total', ''
+                UNION ALL SELECT 'status', old.status
+                UNION ALL SELECT 'priority', old.priority
+                UNION ALL SELECT 'assignee', old.assignee
+                UNION ALL SELECT 'complexity', json_extract(old.complexity, '$.level')
+                UNION ALL SELECT 'open_due', CASE WHEN old.due_date IS NOT NULL
+                    AND old.status NOT IN ('cancelled', 'done') THEN '' END
+            );
+            INSERT INTO task_counts (namespace, field, value, count)
+            SELECT new.namespace, field, value, 1 FROM (
+                SELECT 'total' AS field, '' AS value
+                UNION ALL SELECT 'status', new.status
+                UNION ALL SELECT 'priority', new.priority
+                UNION ALL SELECT 'assignee', new.assignee
+                UNION ALL SELECT 'complexity', json_extract(new.complexity, '$.level')
+                UNION ALL SELECT 'open_due', CASE WHEN new.due_date IS NOT NULL
+                    AND new.status NOT IN ('cancelled', 'done') THEN '' END
+            ) WHERE value IS NOT NULL
+            ON CONFLICT (namespace, field, value) DO UPDATE SET count = count + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_counts_tag_insert AFTER INSERT ON task_tags BEGIN
+            INSERT INTO task_counts (namespace, field, value, count)
+            SELECT namespace, 'tag', new.tag, 1 FROM tasks WHERE id = new.task_id
+            ON CONFLICT (namespace, field, value) DO UPDATE SET count = count + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS task_counts_tag_delete AFTER DELETE ON task_tags BEGIN
+            UPDATE task_counts SET count = count - 1
+            WHERE namespace = (SELECT namespace FROM tasks WHERE id = old.task_id)
+            AND field = 'tag' AND value = old.tag;
+        END;
+        INSERT INTO task_counts (namespace, field, value, count)
+        SELECT namespace, field, value, COUNT(*) FROM (
+            SELECT namespace, 'total' AS field, '' AS value FROM tasks
+            UNION ALL SELECT namespace, 'status', status FROM tasks
+            UNION ALL SELECT namespace, 'priority', priority FROM tasks
+            UNION ALL SELECT namespace, 'assignee', assignee FROM tasks
+            UNION ALL SELECT namespace, 'complexity', json_extract(complexity, '$.level') FROM tasks
+            UNION ALL SELECT namespace, 'open_due', '' FROM tasks
+                WHERE due_date IS NOT NULL AND status NOT IN ('cancelled', 'done')
+            UNION ALL SELECT tasks.namespace, 'tag', task_tags.tag
+                FROM task_tags JOIN tasks ON tasks.id = task_tags.task_id
+        ) WHERE value IS NOT NULL GROUP BY namespace, field, value;
+    """
+    
+    # Open tasks with a due date, as the partial indexes for overdue counts
+    # select them; queries must repeat it word for word to use the indexes
+    _OPEN_DUE = "due_date IS NOT NULL AND status NOT IN ('cancelled', 'done')"
+    
+    def __init__(self, db_path: str, change_feed_size: int = 10000):
+        """
+        Initialize the SQLite storage.
+        
+        Args:
+            db_path: Path to the SQLite database file (":memory:" for a private in-memory database)
+            change_feed_size: Number of recent changes kept for incremental sync
+        """
+        self.db_path = db_path
+        self._lock = threading.RLock()  # Serializes use of the shared connection
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        self._conn.row_factory = sqlite3.Row
+        
+        # Version bumped by every change, and the snapshot materialized for it
+        self._version = 0
+        self._snapshot: Optional[StorageSnapshot] = None
+        
+        # Changes made through this instance, numbered in order
+        self._change_feed = ChangeFeed(change_feed_size)
+        
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self._SCHEMA)
+            self._migrate()
+    
+    def _migrate(self) -> None:
+        """Add columns and indexes introduced after a database was created. Must be called with the lock held."""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if "namespace" not in columns:
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN namespace TEXT NOT NULL DEFAULT 'default'")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_namespace ON tasks (namespace, updated_at, id)")
+        self._conn.commit()
+        
+        # The search index is filled from the existing tasks when created
+        if not self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'").fetchone():
+            self._conn.executescript(self._SEARCH_SCHEMA)
+        
+        # So are the task counts, and open tasks with a due date are indexed
+        # for overdue counts
+        if not self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'task_counts'").fetchone():
+            self._conn.executescript(self._COUNTS_SCHEMA)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_open_due ON tasks (due_date) "
+            f"WHERE {self._OPEN_DUE}"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tasks_namespace_open_due ON tasks (namespace, due_date) "
+            f"WHERE {self._OPEN_DUE}"
+        )
+        self._conn.commit()
+    
+    @classmethod
+    def from_url(cls, db_url: str) -> "SQLiteStorage":
+        """
+        Create a storage instance from an SQLite URL such as ``sqlite:///path/to/tasks.db``.
+        
+        Args:
+            db_url: Database URL
+        
+        Returns:
+            SQLiteStorage: Storage connected to the database
+        
+        Raises:
+            ValueError: If the URL is not an SQLite URL
+        """
+        prefix = "sqlite:///"
+        if not db_url.startswith(prefix):
+            raise ValueError(f"Unsupported database URL: {db_url}")
+        return cls(db_url[len(prefix):] or ":memory:")
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    @property
+    def version(self) -> int:
+        """Number of changes made through this storage instance."""
+        return self._version
+    
+    @property
+    def latest_sequence(self) -> int:
+        """Sequence number of the latest change in the change feed."""
+        return self._change_feed.latest_sequence
+    
+    def get_changes(self, since: int, limit: int = 1000) -> Optional[Tuple[List[Change], bool]]:
+        """
+        Get the changes made through this instance after a sequence number.
+        
+        Writes by other processes sharing the database are not in the feed.
+        
+        Args:
+            since: Last sequence number the client has seen
+            limit: Maximum number of changes to return
+        
+        Returns:
+            Optional[Tuple[List[Change], bool]]: Changes in sequence order and
+            whether more changes follow, or None if the client must resync
+        """
+        return self._change_feed.since(since, limit)
+    
+    def snapshot(self) -> StorageSnapshot:
+        """
+        Get a consistent, read-only view of all tasks and dependencies.
+        
+        The database is read once per version; repeated calls without
+        writes in between return the same snapshot.
+        
+        Returns:
+            StorageSnapshot: Snapshot of the current version
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        
+        with self._lock:
+            if self._snapshot is None:
+                tasks = {task.id: task for task in self._get_tasks("1", [])}
+                dependencies = {dep.id: dep for dep in self.list_dependencies()}
+                self._snapshot = StorageSnapshot(self._version, tasks, dependencies)
+            return self._snapshot
+    
+    def _changed(
+        self,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[str] = None,
+        entity: Optional[Any] = None
+    ) -> None:
+        """
+        Start a new version, retiring the materialized snapshot.
+        
+        Must be called with the lock held.
+        
+        Args:
+            entity_type: Type of the changed entity, or None if the whole
+                state was replaced (clients must then resync)
+            entity_id: ID of the changed entity
+            entity: Entity after the change, or None if it was deleted
+        """
+        self._version += 1
+        self._snapshot = None
+        if entity_type is None:
+            self._change_feed.invalidate()
+        else:
+            self._change_feed.append(entity_type, entity_id, entity)
     
-    def __init__(self):
-        """Initialize the in-memory storage."""
-        self._tasks: Dict[str, Task] = {}
-        self._dependencies: Dict[str, Dependency] = {}
-        self._lock = threading.RLock()  # Reentrant lock for thread safety
+    # Serialization helpers
+    
+    @staticmethod
+    def _timestamp(value: Optional[datetime]) -> Optional[str]:
+        """Format a datetime so that stored values sort chronologically."""
+        if value is None:
+            return None
+        if value.tzinfo is not None:
+            # A common offset keeps aware values comparable as text
+            value = value.astimezone(timezone.utc)
+        return value.isoformat(timespec="microseconds")
+    
+    @staticmethod
+    def _to_json(model: Any) -> str:
+        """Serialize a model to compact JSON."""
+        return json.dumps(model.dict(), default=str, separators=(",", ":"))
+    
+    def _write_task(self, task: Task) -> None:
+        """
+        Insert or replace a task and its child rows.
+        
+        Must be called inside a transaction with the lock held.
+        
+        Args:
+            task: Task to write
+        """
+        conn = self._conn
+        # Upserted, not replaced, so the row keeps the rowid the search index refers to
+        conn.execute(
+            "INSERT INTO tasks (id, title, description, status, priority, details, "
+            "test_strategy, assignee, due_date, complexity, created_at, updated_at, namespace) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET title = excluded.title, description = excluded.description, "
+            "status = excluded.status, priority = excluded.priority, details = excluded.details, "
+            "test_strategy = excluded.test_strategy, assignee = excluded.assignee, "
+            "due_date = excluded.due_date, complexity = excluded.complexity, "
+            "created_at = excluded.created_at, updated_at = excluded.updated_at, namespace = excluded.namespace",
+            (
+                task.id, task.title, task.description, task.status, task.priority,
+                task.details, task.test_strategy, task.assignee,
+                self._timestamp(task.due_date),
+                self._to_json(task.complexity) if task.complexity else None,
+                self._timestamp(task.created_at), self._timestamp(task.updated_at),
+                task.namespace
+            )
+        )
+        
+        self._delete_task_children(task.id)
+        
+        conn.executemany(
+            "INSERT OR IGNORE INTO task_tags (task_id, tag, position) VALUES (?, ?, ?)",
+            [(task.id, tag, i) for i, tag in enumerate(task.tags)]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO task_dependencies (task_id, depends_on, position) VALUES (?, ?, ?)",
+            [(task.id, dep_id, i) for i, dep_id in enumerate(task.dependencies)]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO subtasks (id, task_id, position, status, data) VALUES (?, ?, ?, ?, ?)",
+            [
+                (subtask.id, task.id, i, subtask.status, self._to_json(subtask))
+                for i, subtask in enumerate(task.subtasks)
+            ]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO requirement_refs (id, task_id, position, requirement_id, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (ref.id, task.id, i, ref.requirement_id, self._to_json(ref))
+                for i, ref in enumerate(task.requirement_refs)
+            ]
+        )
+    
+    def _delete_task_children(self, task_id: str) -> None:
+        """Delete the child rows of a task. Must be called with the lock held."""
+        for table in ("task_tags", "task_dependencies", "subtasks", "requirement_refs"):
+            self._conn.execute(f"DELETE FROM {table} WHERE task_id = ?", (task_id,))
+    
+    def _fetch_grouped(self, query: str, task_ids: List[str]) -> Dict[str, List[sqlite3.Row]]:
+        """
+        Run a child-row query for many tasks in chunks and group rows by task ID.
+        
+        Args:
+            query: Query with a ``{ids}`` placeholder for the IN list, ordered by position
+            task_ids: Task IDs to fetch rows for
+        
+        Returns:
+            Dict[str, List[sqlite3.Row]]: Rows grouped by task ID
+        """
+        grouped: Dict[str, List[sqlite3.Row]] = {}
+        for i in range(0, len(task_ids), self._CHUNK_SIZE):
+            chunk = task_ids[i:i + self._CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            for row in self._conn.execute(query.format(ids=placeholders), chunk):
+                grouped.setdefault(row["task_id"], []).append(row)
+        return grouped
+    
+    def _rows_to_tasks(self, rows: List[sqlite3.Row]) -> List[Task]:
+        """
+        Build Task models from task rows, loading their child rows in bulk.
+        
+        Must be called with the lock held.
+        
+        Args:
+            rows: Rows from the tasks table
+        
+        Returns:
+            List[Task]: Tasks in the same order as the rows
+        """
+        task_ids = [row["id"] for row in rows]
+        if not task_ids:
+            return []
+        
+        tags = self._fetch_grouped(
+            "SELECT task_id, tag FROM task_tags WHERE task_id IN ({ids}) ORDER BY position", task_ids
+        )
+        deps = self._fetch_grouped(
+            "SELECT task_id, depends_on FROM task_dependencies WHERE task_id IN ({ids}) ORDER BY position",
+            task_ids
+        )
+        subtasks = self._fetch_grouped(
+            "SELECT task_id, data FROM subtasks WHERE task_id IN ({ids}) ORDER BY position", task_ids
+        )
+        refs = self._fetch_grouped(
+            "SELECT task_id, data FROM requirement_refs WHERE task_id IN ({ids}) ORDER BY position",
+            task_ids
+        )
+        
+        tasks = []
+        for row in rows:
+            task_id = row["id"]
+            tasks.append(Task(
+                id=task_id,
+                title=row["title"],
+                description=row["description"],
+                status=row["status"],
+                priority=row["priority"],
+                details=row["details"],
+                test_strategy=row["test_strategy"],
+                assignee=row["assignee"],
+                due_date=row["due_date"],
+                complexity=ComplexityScore(**json.loads(row["complexity"])) if row["complexity"] else None,
+                created_at=row["created_at"],
+                updated_at=row["updated_at"],
+                namespace=row["namespace"],
+                tags=[r["tag"] for r in tags.get(task_id, [])],
+                dependencies=[r["depends_on"] for r in deps.get(task_id, [])],
+                subtasks=[Subtask(**json.loads(r["data"])) for r in subtasks.get(task_id, [])],
+                requirement_refs=[RequirementRef(**json.loads(r["data"])) for r in refs.get(task_id, [])]
+            ))
+        
+        return tasks
+    
+    def _row_to_dependency(self, row: sqlite3.Row) -> Dependency:
+        """Build a Dependency model from a dependencies row."""
+        return Dependency(
+            id=row["id"],
+            source_task_id=row["source_task_id"],
+            target_task_id=row["target_task_id"],
+            dependency_type=row["dependency_type"],
+            description=row["description"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"]
+        )
+    
+    def _count_by(self, query: str, params: Optional[List[Any]] = None) -> Dict[str, int]:
+        """Run a (key, count) grouping query, skipping NULL keys. Must be called with the lock held."""
+        return {row[0]: row[1] for row in self._conn.execute(query, params or []) if row[0] is not None}
+    
+    def _task_exists(self, task_id: str) -> bool:
+        """Check whether a task exists. Must be called with the lock held."""
+        return self._conn.execute("SELECT 1 FROM tasks WHERE id = ?", (task_id,)).fetchone() is not None
+    
+    def _get_tasks(self, where: str, params: List[Any]) -> List[Task]:
+        """Load the tasks matching a WHERE clause. Must be called with the lock held."""
+        rows = self._conn.execute(f"SELECT * FROM tasks WHERE {where}", params).fetchall()
+        return self._rows_to_tasks(rows)
     
     # Task operations
     
@@ -42,22 +2645,28 @@ class InMemoryStorage:
         
         Args:
             task: Task to create
-            
+        
         Returns:
             Task: Created task with ID assigned
+        
+        Raises:
+            ValueError: If the ID is already used or a dependency is missing
         """
         with self._lock:
             # Ensure task has an ID
             if not task.id:
                 task.id = str(uuid4())
+            elif self._task_exists(task.id):
+                raise ValueError(f"Task already exists: {task.id}")
             
             # Validate task dependencies
             for dep_id in task.dependencies:
-                if dep_id not in self._tasks:
+                if not self._task_exists(dep_id):
                     raise ValueError(f"Dependency task not found: {dep_id}")
             
-            # Store the task
-            self._tasks[task.id] = task
+            with self._conn:
+                self._write_task(task)
+            self._changed(TASK, task.id, task)
             return task
     
     def get_task(self, task_id: str) -> Optional[Task]:
@@ -66,12 +2675,13 @@ class InMemoryStorage:
         
         Args:
             task_id: ID of the task to retrieve
-            
+        
         Returns:
             Optional[Task]: Task if found, None otherwise
         """
         with self._lock:
-            return self._tasks.get(task_id)
+            tasks = self._get_tasks("id = ?", [task_id])
+            return tasks[0] if tasks else None
     
     def update_task(self, task_id: str, updates: Dict[str, Any]) -> Optional[Task]:
         """
@@ -80,58 +2690,153 @@ class InMemoryStorage:
         Args:
             task_id: ID of the task to update
             updates: Dictionary of field updates
-            
+        
         Returns:
             Optional[Task]: Updated task if found, None otherwise
         """
         with self._lock:
-            task = self._tasks.get(task_id)
+            task = self.get_task(task_id)
             if not task:
                 return None
             
             # Validate dependency updates
             if "dependencies" in updates:
                 for dep_id in updates["dependencies"]:
-                    if dep_id not in self._tasks:
+                    if not self._task_exists(dep_id):
                         raise ValueError(f"Dependency task not found: {dep_id}")
             
             # Apply updates
             task.update(updates)
             
-            # Store updated task
-            self._tasks[task_id] = task
+            with self._conn:
+                self._write_task(task)
+            self._changed(TASK, task.id, task)
             return task
     
+    def edit_task(self, task_id: str, edit: Callable[[Task], Any]) -> Optional[Tuple[Task, Any]]:
+        """
+        Change a task's subtasks or requirement references and store it.
+        
+        Arguments and return value are as for InMemoryStorage.edit_task.
+        """
+        with self._lock:
+            task = self.get_task(task_id)
+            if not task:
+                return None
+            
+            # Loaded tasks are not shared, so the change is applied directly
+            result = edit(task)
+            if result is None or result is False:
+                return task, result
+            
+            with self._conn:
+                self._write_task(task)
+            self._changed(TASK, task.id, task)
+            return task, result
+    
+    def create_tasks(self, tasks: List[Task]) -> List[Task]:
+        """
+        Create several tasks in one transaction.
+        
+        Tasks may depend on existing tasks or on other tasks in the batch;
+        either all tasks are created or none are.
+        
+        Args:
+            tasks: Tasks to create
+        
+        Returns:
+            List[Task]: Created tasks with IDs assigned
+        
+        Raises:
+            ValueError: If a dependency is missing or the batch is inconsistent
+        """
+        with self._lock:
+            for task in tasks:
+                if not task.id:
+                    task.id = str(uuid4())
+            
+            validate_task_batch(tasks, self._task_exists)
+            
+            with self._conn:
+                for task in tasks:
+                    self._write_task(task)
+            for task in tasks:
+                self._changed(TASK, task.id, task)
+            return tasks
+    
+    def update_tasks(self, updates_map: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[Task]]:
+        """
+        Update several tasks in one transaction.
+        
+        Args:
+            updates_map: Dictionary mapping task IDs to update dictionaries
+        
+        Returns:
+            Dict[str, Optional[Task]]: Updated tasks by ID (None for unknown IDs)
+        
+        Raises:
+            ValueError: If any update is invalid; no task is changed
+        """
+        with self._lock:
+            results: Dict[str, Optional[Task]] = {}
+            for task_id, updates in updates_map.items():
+                task = self.get_task(task_id)
+                if task:
+                    for dep_id in updates.get("dependencies", ()):
+                        if not self._task_exists(dep_id):
+                            raise ValueError(f"Dependency task not found: {dep_id}")
+                    task.update(dict(updates))
+                results[task_id] = task
+            
+            updated = [task for task in results.values() if task is not None]
+            with self._conn:
+                for task in updated:
+                    self._write_task(task)
+            for task in updated:
+                self._changed(TASK, task.id, task)
+            return results
+    
     def delete_task(self, task_id: str) -> bool:
         """
         Delete a task by ID.
         
         Args:
             task_id: ID of the task to delete
-            
+        
         Returns:
             bool: True if task was found and deleted, False otherwise
         """
         with self._lock:
-            if task_id not in self._tasks:
+            if not self._task_exists(task_id):
                 return False
             
             # Check if any tasks depend on this one
-            for t in self._tasks.values():
-                if task_id in t.dependencies:
-                    raise ValueError(f"Cannot delete task {task_id} as other tasks depend on it")
+            dependent = self._conn.execute(
+                "SELECT 1 FROM task_dependencies WHERE depends_on = ? LIMIT 1", (task_id,)
+            ).fetchone()
+            if dependent:
+                raise ValueError(f"Cannot delete task {task_id} as other tasks depend on it")
             
-            # Delete related dependencies
-            deps_to_delete = []
-            for dep_id, dep in self._dependencies.items():
-                if dep.source_task_id == task_id or dep.target_task_id == task_id:
-                    deps_to_delete.append(dep_id)
-            
-            for dep_id in deps_to_delete:
-                del self._dependencies[dep_id]
+            with self._conn:
+                # Delete related dependencies
+                dep_ids = [
+                    row[0] for row in self._conn.execute(
+                        "SELECT id FROM dependencies WHERE source_task_id = ? OR target_task_id = ?",
+                        (task_id, task_id)
+                    )
+                ]
+                self._conn.execute(
+                    "DELETE FROM dependencies WHERE source_task_id = ? OR target_task_id = ?",
+                    (task_id, task_id)
+                )
+                
+                # Delete the task
+                self._delete_task_children(task_id)
+                self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
             
-            # Delete the task
-            del self._tasks[task_id]
+            for dep_id in dep_ids:
+                self._changed(DEPENDENCY, dep_id)
+            self._changed(TASK, task_id)
             return True
     
     def list_tasks(
@@ -142,7 +2847,13 @@ class InMemoryStorage:
         tag: Optional[str] = None,
         search: Optional[str] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        sort: str = "updated_at",
+        cursor: Optional[str] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        include_archived: bool = False,
+        namespace: Optional[str] = None
     ) -> Tuple[List[Task], int]:
         """
         List tasks with optional filtering.
@@ -152,51 +2863,196 @@ class InMemoryStorage:
             priority: Filter by priority
             assignee: Filter by assignee
             tag: Filter by tag
-            search: Search term for title/description
-            page: Page number (1-based)
+            search: Search terms for title/description/details (all must match)
+            page: Page number (1-based), ignored when a cursor is given
             page_size: Number of items per page
-            
+            sort: Sort order ("updated_at", "relevance" or "due_date")
+            cursor: Opaque cursor from encode_cursor; only tasks after it are returned
+            due_after: Only tasks due at or after this time
+            due_before: Only tasks due before this time
+            include_archived: Accepted for interface compatibility; every
+                task lives in the database, so nothing is ever archived
+            namespace: Filter by namespace
+        
         Returns:
             Tuple[List[Task], int]: List of tasks and total count
+        
+        Raises:
+            ValueError: If the sort order or cursor is invalid
         """
+        if sort not in ("updated_at", "relevance", "due_date"):
+            raise ValueError(f"Invalid sort order: {sort}")
+        
+        if cursor and sort != "updated_at":
+            raise ValueError("Cursor pagination is only supported when sorting by updated_at")
+        
+        cursor_key = decode_cursor(cursor) if cursor else None
+        
+        where = []
+        params: List[Any] = []
+        
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        
+        if priority:
+            where.append("priority = ?")
+            params.append(priority)
+        
+        if assignee:
+            where.append("assignee = ?")
+            params.append(assignee)
+        
+        if tag:
+            where.append("id IN (SELECT task_id FROM task_tags WHERE tag = ?)")
+            params.append(tag)
+        
+        if namespace:
+            where.append("namespace = ?")
+            params.append(namespace)
+        
+        if due_after is not None:
+            where.append("due_date >= ?")
+            params.append(self._timestamp(utc_naive(due_after)))
+        
+        if due_before is not None:
+            where.append("due_date < ?")
+            params.append(self._timestamp(utc_naive(due_before)))
+        
+        filter_sql = " AND ".join(where) or "1"
+        filter_params = list(params)
+        where_sql = filter_sql
+        
+        if search:
+            terms = set(tokenize(search))
+            if not terms:
+                return [], 0
+            # Every term must match a whole token; quoted, so no term is read as an operator
+            query = " ".join(f'"{term}"' for term in sorted(terms))
+            where_sql = f"tasks.rowid IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?) AND {filter_sql}"
+            params.insert(0, query)
+        
         with self._lock:
-            # Start with all tasks
-            tasks = list(self._tasks.values())
-            
-            # Apply filters
-            if status:
-                tasks = [t for t in tasks if t.status == status]
-            
-            if priority:
-                tasks = [t for t in tasks if t.priority == priority]
-            
-            if assignee:
-                tasks = [t for t in tasks if t.assignee == assignee]
-            
-            if tag:
-                tasks = [t for t in tasks if tag in t.tags]
-            
-            if search:
-                search = search.lower()
-                tasks = [
-                    t for t in tasks 
-                    if search in t.title.lower() or 
-                       search in t.description.lower() or
-                       (t.details and search in t.details.lower())
-                ]
-            
             # Get total count
-            total = len(tasks)
+            total = self._conn.execute(f"SELECT COUNT(*) FROM tasks WHERE {where_sql}", params).fetchone()[0]
             
-            # Sort by updated_at (newest first)
-            tasks.sort(key=lambda t: t.updated_at, reverse=True)
+            if search and sort == "relevance":
+                # Best BM25 score first (lowest, as SQLite negates it), then newest first
+                rows = self._conn.execute(
+                    "SELECT tasks.* FROM tasks_fts JOIN tasks ON tasks.rowid = tasks_fts.rowid "
+                    f"WHERE tasks_fts MATCH ? AND {filter_sql} "
+                    "ORDER BY bm25(tasks_fts), updated_at DESC, id DESC LIMIT ? OFFSET ?",
+                    [query] + filter_params + [page_size, (page - 1) * page_size]
+                ).fetchall()
+                return self._rows_to_tasks(rows), total
             
-            # Calculate pagination
-            start = (page - 1) * page_size
-            end = start + page_size
+            if sort == "due_date":
+                # Soonest due first; tasks without a due date follow, newest first
+                tasks = self._get_tasks(
+                    f"{where_sql} ORDER BY due_date IS NULL, due_date, "
+                    "CASE WHEN due_date IS NOT NULL THEN id END, updated_at DESC, id DESC LIMIT ? OFFSET ?",
+                    params + [page_size, (page - 1) * page_size]
+                )
+                return tasks, total
             
-            # Return paginated results
-            return tasks[start:end], total
+            page_params = list(params)
+            if cursor_key:
+                timestamp, task_id = cursor_key
+                where_sql += " AND (updated_at < ? OR (updated_at = ? AND id < ?))"
+                page_params.extend([self._timestamp(timestamp), self._timestamp(timestamp), task_id])
+                offset = 0
+            else:
+                offset = (page - 1) * page_size
+            
+            tasks = self._get_tasks(
+                f"{where_sql} ORDER BY updated_at DESC, id DESC LIMIT ? OFFSET ?",
+                page_params + [page_size, offset]
+            )
+            return tasks, total
+    
+    def list_overdue_tasks(self, now: Optional[datetime] = None) -> List[Task]:
+        """
+        List open tasks whose due date has passed, most overdue first.
+        
+        Args:
+            now: Reference time (defaults to the current UTC time)
+        
+        Returns:
+            List[Task]: Overdue tasks
+        """
+        now = utc_naive(now) if now else datetime.utcnow()
+        closed = sorted(CLOSED_STATUSES)
+        with self._lock:
+            return self._get_tasks(
+                f"due_date < ? AND status NOT IN ({','.join('?' * len(closed))}) ORDER BY due_date, id",
+                [self._timestamp(now)] + closed
+            )
+    
+    def get_statistics(self, now: Optional[datetime] = None, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get task counts by status, priority, assignee, tag, complexity level and namespace.
+        
+        The counts are read from the task_counts table, which triggers keep
+        up to date, and overdue tasks are counted over the index of open
+        tasks with a due date, so no query scans the tasks. The archived
+        task count is only reported over all namespaces.
+        
+        Args:
+            now: Reference time for overdue counts (defaults to the current UTC time)
+            namespace: Only count tasks in this namespace
+        
+        Returns:
+            Dict[str, Any]: Task statistics
+        """
+        now = utc_naive(now) if now else datetime.utcnow()
+        scope, scope_params = ("AND namespace = ?", [namespace]) if namespace else ("", [])
+        
+        with self._lock:
+            counts = self._conn.execute(
+                f"SELECT namespace, field, value, count FROM task_counts WHERE count > 0 {scope}", scope_params
+            ).fetchall()
+            overdue = self._conn.execute(
+                f"SELECT COUNT(*) FROM tasks WHERE {self._OPEN_DUE} AND due_date < ? {scope}",
+                [self._timestamp(now)] + scope_params
+            ).fetchone()[0]
+            version = self._version
+        
+        stats: Dict[str, Any] = {
+            "total_tasks": 0,
+            "by_status": {},
+            "by_priority": {},
+            "by_assignee": {},
+            "by_tag": {},
+            "by_complexity": {},
+            "by_namespace": {},
+            "with_due_date": 0,
+            "overdue": overdue,
+            "version": version
+        }
+        for task_namespace, field, value, count in counts:
+            if field == "total":
+                stats["total_tasks"] += count
+                stats["by_namespace"][task_namespace] = count
+            elif field == "open_due":
+                stats["with_due_date"] += count
+            else:
+                by_value = stats[f"by_{field}"]
+                by_value[value] = by_value.get(value, 0) + count
+        if not namespace:
+            stats["archived_tasks"] = 0
+        return stats
+    
+    def list_namespaces(self) -> Dict[str, int]:
+        """
+        List the namespaces that have tasks.
+        
+        Returns:
+            Dict[str, int]: Number of tasks by namespace
+        """
+        with self._lock:
+            return self._count_by(
+                "SELECT namespace, count FROM task_counts WHERE field = 'total' AND count > 0"
+            )
     
     # Dependency operations
     
@@ -206,7 +3062,7 @@ class InMemoryStorage:
         
         Args:
             dependency: Dependency to create
-            
+        
         Returns:
             Dependency: Created dependency with ID assigned
         """
@@ -216,30 +3072,54 @@ class InMemoryStorage:
                 dependency.id = str(uuid4())
             
             # Validate source and target tasks exist
-            if dependency.source_task_id not in self._tasks:
+            if not self._task_exists(dependency.source_task_id):
                 raise ValueError(f"Source task not found: {dependency.source_task_id}")
             
-            if dependency.target_task_id not in self._tasks:
+            if not self._task_exists(dependency.target_task_id):
                 raise ValueError(f"Target task not found: {dependency.target_task_id}")
             
-            # Validate no circular dependencies
-            from metis.models.dependency import DependencyManager
-            all_deps = list(self._dependencies.values())
-            
-            if not DependencyManager.validate_new_dependency(
-                all_deps, dependency.source_task_id, dependency.target_task_id
-            ):
+            # Validate no circular dependencies: the source must not be
+            # reachable from the target through existing dependency records
+            if dependency.source_task_id == dependency.target_task_id:
                 raise ValueError("This dependency would create a circular reference")
             
-            # Store the dependency
-            self._dependencies[dependency.id] = dependency
+            cycle = self._conn.execute(
+                """
+                WITH RECURSIVE reach(id) AS (
+                    SELECT ?
+                    UNION
+                    SELECT d.target_task_id FROM dependencies d JOIN reach r ON d.source_task_id = r.id
+                )
+                SELECT 1 FROM reach WHERE id = ? LIMIT 1
+                """,
+                (dependency.target_task_id, dependency.source_task_id)
+            ).fetchone()
+            if cycle:
+                raise ValueError("This dependency would create a circular reference")
             
-            # Update the target task's dependencies
-            target_task = self._tasks[dependency.target_task_id]
-            if dependency.source_task_id not in target_task.dependencies:
-                target_task.dependencies.append(dependency.source_task_id)
-                target_task.updated_at = datetime.utcnow()
+            with self._conn:
+                # Store the dependency
+                self._conn.execute(
+                    "INSERT INTO dependencies (id, source_task_id, target_task_id, dependency_type, "
+                    "description, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        dependency.id, dependency.source_task_id, dependency.target_task_id,
+                        dependency.dependency_type, dependency.description,
+                        self._timestamp(dependency.created_at), self._timestamp(dependency.updated_at)
+                    )
+                )
+                
+                # Update the target task's dependencies
+                target_task = self.get_task(dependency.target_task_id)
+                linked = dependency.source_task_id not in target_task.dependencies
+                if linked:
+                    target_task.dependencies.append(dependency.source_task_id)
+                    target_task.updated_at = datetime.utcnow()
+                    self._write_task(target_task)
             
+            self._changed(DEPENDENCY, dependency.id, dependency)
+            if linked:
+                self._changed(TASK, target_task.id, target_task)
             return dependency
     
     def get_dependency(self, dependency_id: str) -> Optional[Dependency]:
@@ -248,12 +3128,13 @@ class InMemoryStorage:
         
         Args:
             dependency_id: ID of the dependency to retrieve
-            
+        
         Returns:
             Optional[Dependency]: Dependency if found, None otherwise
         """
         with self._lock:
-            return self._dependencies.get(dependency_id)
+            row = self._conn.execute("SELECT * FROM dependencies WHERE id = ?", (dependency_id,)).fetchone()
+            return self._row_to_dependency(row) if row else None
     
     def update_dependency(self, dependency_id: str, updates: Dict[str, Any]) -> Optional[Dependency]:
         """
@@ -262,12 +3143,12 @@ class InMemoryStorage:
         Args:
             dependency_id: ID of the dependency to update
             updates: Dictionary of field updates
-            
+        
         Returns:
             Optional[Dependency]: Updated dependency if found, None otherwise
         """
         with self._lock:
-            dependency = self._dependencies.get(dependency_id)
+            dependency = self.get_dependency(dependency_id)
             if not dependency:
                 return None
             
@@ -278,8 +3159,15 @@ class InMemoryStorage:
             # Apply updates
             dependency.update(updates)
             
-            # Store updated dependency
-            self._dependencies[dependency_id] = dependency
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE dependencies SET dependency_type = ?, description = ?, updated_at = ? WHERE id = ?",
+                    (
+                        dependency.dependency_type, dependency.description,
+                        self._timestamp(dependency.updated_at), dependency_id
+                    )
+                )
+            self._changed(DEPENDENCY, dependency.id, dependency)
             return dependency
     
     def delete_dependency(self, dependency_id: str) -> bool:
@@ -288,23 +3176,30 @@ class InMemoryStorage:
         
         Args:
             dependency_id: ID of the dependency to delete
-            
+        
         Returns:
             bool: True if dependency was found and deleted, False otherwise
         """
         with self._lock:
-            dependency = self._dependencies.get(dependency_id)
+            dependency = self.get_dependency(dependency_id)
             if not dependency:
                 return False
             
-            # Remove dependency from target task
-            target_task = self._tasks.get(dependency.target_task_id)
-            if target_task and dependency.source_task_id in target_task.dependencies:
-                target_task.dependencies.remove(dependency.source_task_id)
-                target_task.updated_at = datetime.utcnow()
+            with self._conn:
+                # Remove dependency from target task
+                target_task = self.get_task(dependency.target_task_id)
+                unlinked = target_task is not None and dependency.source_task_id in target_task.dependencies
+                if unlinked:
+                    target_task.dependencies.remove(dependency.source_task_id)
+                    target_task.updated_at = datetime.utcnow()
+                    self._write_task(target_task)
+                
+                # Delete the dependency
+                self._conn.execute("DELETE FROM dependencies WHERE id = ?", (dependency_id,))
             
-            # Delete the dependency
-            del self._dependencies[dependency_id]
+            if unlinked:
+                self._changed(TASK, target_task.id, target_task)
+            self._changed(DEPENDENCY, dependency_id)
             return True
     
     def list_dependencies(
@@ -318,28 +3213,28 @@ class InMemoryStorage:
         Args:
             task_id: Filter by source or target task ID
             dependency_type: Filter by dependency type
-            
+        
         Returns:
             List[Dependency]: List of matching dependencies
         """
+        where = []
+        params: List[Any] = []
+        
+        if task_id:
+            where.append("(source_task_id = ? OR target_task_id = ?)")
+            params.extend([task_id, task_id])
+        
+        if dependency_type:
+            where.append("dependency_type = ?")
+            params.append(dependency_type)
+        
+        where_sql = " AND ".join(where) or "1"
+        
         with self._lock:
-            # Start with all dependencies
-            dependencies = list(self._dependencies.values())
-            
-            # Apply filters
-            if task_id:
-                dependencies = [
-                    d for d in dependencies
-                    if d.source_task_id == task_id or d.target_task_id == task_id
-                ]
-            
-            if dependency_type:
-                dependencies = [d for d in dependencies if d.dependency_type == dependency_type]
-            
-            # Sort by updated_at (newest first)
-            dependencies.sort(key=lambda d: d.updated_at, reverse=True)
-            
-            return dependencies
+            rows = self._conn.execute(
+                f"SELECT * FROM dependencies WHERE {where_sql} ORDER BY updated_at DESC", params
+            ).fetchall()
+            return [self._row_to_dependency(row) for row in rows]
     
     def list_blocking_tasks(self, task_id: str) -> List[Task]:
         """
@@ -347,16 +3242,14 @@ class InMemoryStorage:
         
         Args:
             task_id: ID of the task to check
-            
+        
         Returns:
             List[Task]: List of tasks that block the specified task
         """
         with self._lock:
-            task = self._tasks.get(task_id)
-            if not task:
-                return []
-            
-            return [self._tasks[dep_id] for dep_id in task.dependencies if dep_id in self._tasks]
+            return self._get_tasks(
+                "id IN (SELECT depends_on FROM task_dependencies WHERE task_id = ?)", [task_id]
+            )
     
     def list_dependent_tasks(self, task_id: str) -> List[Task]:
         """
@@ -364,42 +3257,170 @@ class InMemoryStorage:
         
         Args:
             task_id: ID of the task to check
-            
+        
         Returns:
             List[Task]: List of tasks that depend on the specified task
         """
         with self._lock:
-            dependent_tasks = []
-            
-            for task in self._tasks.values():
-                if task_id in task.dependencies:
-                    dependent_tasks.append(task)
-            
-            return dependent_tasks
+            return self._get_tasks(
+                "id IN (SELECT task_id FROM task_dependencies WHERE depends_on = ?)", [task_id]
+            )
     
-    # Persistence operations (for in-memory storage backup/restore)
+    def list_ready_tasks(self, limit: int = 50, namespace: Optional[str] = None) -> List[Task]:
+        """
+        List pending tasks whose dependencies are all done.
+        
+        Args:
+            limit: Maximum number of tasks to return
+            namespace: Only list tasks in this namespace
+        
+        Returns:
+            List[Task]: Ready tasks, highest priority first, then oldest first
+        """
+        where = [
+            "status = ?",
+            "NOT EXISTS (SELECT 1 FROM task_dependencies d LEFT JOIN tasks t ON t.id = d.depends_on "
+            "WHERE d.task_id = tasks.id AND (t.status IS NULL OR t.status != ?))"
+        ]
+        params: List[Any] = [TaskStatus.PENDING.value, TaskStatus.DONE.value]
+        if namespace:
+            where.append("namespace = ?")
+            params.append(namespace)
+        
+        ranks = " ".join("WHEN ? THEN ?" for _ in PRIORITY_RANKS)
+        for priority, rank in PRIORITY_RANKS.items():
+            params.extend([priority, rank])
+        params.extend([len(PRIORITY_RANKS), limit])
+        
+        with self._lock:
+            return self._get_tasks(
+                f"{' AND '.join(where)} ORDER BY CASE priority {ranks} ELSE ? END, created_at, id LIMIT ?",
+                params
+            )
+    
+    def list_downstream_tasks(
+        self,
+        task_id: str,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """
+        List the tasks that depend on a task, directly or transitively.
+        
+        Arguments and return value are as for InMemoryStorage.list_downstream_tasks.
+        """
+        return self._reachable_tasks(task_id, "task_id", "depends_on", max_depth, limit)
+    
+    def list_upstream_tasks(
+        self,
+        task_id: str,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """
+        List the tasks a task depends on, directly or transitively.
+        
+        Arguments and return value are as for InMemoryStorage.list_upstream_tasks.
+        """
+        return self._reachable_tasks(task_id, "depends_on", "task_id", max_depth, limit)
+    
+    def get_dependency_distance(self, upstream_id: str, downstream_id: str) -> Optional[int]:
+        """
+        Get how many dependency links lead from a task to one depending on it.
+        
+        Arguments and return value are as for InMemoryStorage.get_dependency_distance.
+        """
+        if upstream_id == downstream_id:
+            return None
+        
+        with self._lock:
+            return self._reach_depths(upstream_id, "task_id", "depends_on", target=downstream_id).get(downstream_id)
     
-    def save_to_file(self, filepath: str) -> bool:
+    def _reach_depths(
+        self,
+        task_id: str,
+        step: str,
+        link: str,
+        max_depth: Optional[int] = None,
+        target: Optional[str] = None
+    ) -> Dict[str, int]:
         """
-        Save the current state to a JSON file.
+        Find the tasks reached from a task by following task_dependencies.
+        
+        Walks breadth first with one indexed query per level (and chunk of
+        the level), so every task and link is read once and each task gets
+        its shortest distance. A recursive query cannot skip tasks already
+        reached by a shorter path, and would revisit them once per path.
+        Must be called with the lock held.
         
         Args:
-            filepath: Path to save the JSON file
+            task_id: ID of the start task
+            step: Column holding the task a link leads to
+            link: Column holding the task a link is followed from
+            max_depth: Only follow this many links (None for no limit)
+            target: Stop after the level that reaches this task
+        
+        Returns:
+            Dict[str, int]: Distance in links by reached task ID; dependencies
+            may name tasks that no longer exist
+        """
+        query = f"SELECT {step} FROM task_dependencies WHERE {link} IN ({{ids}})"
+        depths = {task_id: 0}
+        frontier = [task_id]
+        depth = 0
+        while frontier and target not in depths and (max_depth is None or depth < max_depth):
+            depth += 1
+            reached = []
+            for i in range(0, len(frontier), self._CHUNK_SIZE):
+                chunk = frontier[i:i + self._CHUNK_SIZE]
+                for (next_id,) in self._conn.execute(query.format(ids=",".join("?" * len(chunk))), chunk):
+                    if next_id not in depths:
+                        depths[next_id] = depth
+                        reached.append(next_id)
+            frontier = reached
+        
+        del depths[task_id]
+        return depths
+    
+    def _reachable_tasks(
+        self,
+        task_id: str,
+        step: str,
+        link: str,
+        max_depth: Optional[int],
+        limit: Optional[int]
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """Load the tasks reached from a task, nearest first, then by ID."""
+        with self._lock:
+            depths = self._reach_depths(task_id, step, link, max_depth)
             
+            # Only tasks that still exist are listed and counted
+            found = self._fetch_grouped("SELECT id AS task_id FROM tasks WHERE id IN ({ids})", list(depths))
+            reached = sorted(found, key=lambda reached_id: (depths[reached_id], reached_id))[:limit]
+            rows = self._fetch_grouped("SELECT *, id AS task_id FROM tasks WHERE id IN ({ids})", reached)
+            tasks = self._rows_to_tasks([rows[reached_id][0] for reached_id in reached])
+            return [(task, depths[task.id]) for task in tasks], len(found)
+    
+    # Persistence operations (snapshot export/import, compatible with InMemoryStorage)
+    
+    def save_to_file(self, filepath: str, snapshot_format: str = "json") -> bool:
+        """
+        Export the database contents to a snapshot file.
+        
+        Args:
+            filepath: Path to save the snapshot file
+            snapshot_format: "json" or "binary"
+        
         Returns:
             bool: True if successful, False otherwise
         """
         with self._lock:
             try:
-                # Convert to JSON-serializable format
-                data = {
-                    "tasks": {task_id: task.dict() for task_id, task in self._tasks.items()},
-                    "dependencies": {dep_id: dep.dict() for dep_id, dep in self._dependencies.items()}
-                }
+                tasks = self._get_tasks("1", [])
+                dependencies = self.list_dependencies()
                 
                 # Write to file
-                with open(filepath, 'w') as f:
-                    json.dump(data, f, indent=2, default=str)
+                write_state(filepath, tasks, dependencies, snapshot_format)
                 
                 return True
             except Exception as e:
@@ -408,11 +3429,11 @@ class InMemoryStorage:
     
     def load_from_file(self, filepath: str) -> bool:
         """
-        Load state from a JSON file.
+        Replace the database contents with the state from a snapshot file.
         
         Args:
-            filepath: Path to the JSON file
-            
+            filepath: Path to the snapshot file (JSON or binary)
+        
         Returns:
             bool: True if successful, False otherwise
         """
@@ -422,22 +3443,32 @@ class InMemoryStorage:
                     return False
                 
                 # Read from file
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                
-                # Clear current state
-                self._tasks.clear()
-                self._dependencies.clear()
+                tasks, dependencies = read_state(filepath)
                 
-                # Recreate tasks
-                for task_id, task_data in data.get("tasks", {}).items():
-                    self._tasks[task_id] = Task(**task_data)
-                
-                # Recreate dependencies
-                for dep_id, dep_data in data.get("dependencies", {}).items():
-                    self._dependencies[dep_id] = Dependency(**dep_data)
+                with self._conn:
+                    # Clear current state
+                    for table in ("tasks", "task_tags", "task_dependencies", "subtasks",
+                                  "requirement_refs", "dependencies", "task_counts"):
+                        self._conn.execute(f"DELETE FROM {table}")
+                    
+                    # Recreate tasks
+                    for task in tasks:
+                        self._write_task(task)
+                    
+                    # Recreate dependencies
+                    for dependency in dependencies:
+                        self._conn.execute(
+                            "INSERT INTO dependencies (id, source_task_id, target_task_id, dependency_type, "
+                            "description, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (
+                                dependency.id, dependency.source_task_id, dependency.target_task_id,
+                                dependency.dependency_type, dependency.description,
+                                self._timestamp(dependency.created_at), self._timestamp(dependency.updated_at)
+                            )
+                        )
                 
+                self._changed()  # Replaces the whole state
                 return True
             except Exception as e:
                 print(f"Error loading from file: {e}")
-                return False
\ No newline at end of file
+                return False
@@ -5,19 +5,25 @@ This module defines the TaskManager class, which provides the core business
 logic for managing tasks in the Metis system.
 """
 
-from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple, Set, Union
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Any, Tuple, Set, Union
 from uuid import uuid4
 import asyncio
 import os
 
-from metis.models.task import Task
+from metis.models.task import Task, DEFAULT_NAMESPACE
 from metis.models.enums import TaskStatus, Priority
 from metis.models.dependency import Dependency, DependencyManager
 from metis.models.subtask import Subtask
 from metis.models.complexity import ComplexityScore
 from metis.models.requirement import RequirementRef
-from metis.core.storage import InMemoryStorage
+from metis.core.storage import InMemoryStorage, StorageSnapshot
+from metis.core.dependency import DependencyResolver
+from metis.core.async_storage import ThreadedStorage, as_async_storage
+from metis.core.critical_path import CriticalPathCache
+from metis.core.changes import Change
+from metis.core.archive import TaskArchive
+from metis.core.persistence import TaskJournal, SnapshotWriter
 
 # Import these modules lazily to avoid circular imports
 # They'll be imported when the methods that use them are called
@@ -39,13 +45,66 @@ class TaskManager:
         Args:
             storage: Optional storage implementation (defaults to InMemoryStorage)
         """
-        self.storage = storage or InMemoryStorage()
+        self.storage = storage if storage is not None else InMemoryStorage()
         self._event_handlers = {}
         
-        # Load from backup file if exists
-        backup_path = os.environ.get("METIS_BACKUP_PATH", "metis_data.json")
-        if os.path.exists(backup_path):
-            self.storage.load_from_file(backup_path)
+        # Async view of the storage: blocking backends run on a bounded
+        # thread pool so that storage locks and file I/O never stall the
+        # event loop; native async backends are used as they are
+        self.async_storage = as_async_storage(
+            self.storage, max_workers=int(os.environ.get("METIS_STORAGE_WORKERS", "4"))
+        )
+        
+        # Critical path of each namespace, kept current by task events
+        self.critical_paths = CriticalPathCache(self)
+        
+        # Persistence mode: "background" coalesces backup file writes in a
+        # background task, "snapshot" rewrites the backup file after every
+        # mutation, "journal" appends one record per mutation and compacts
+        # the journal into the backup file periodically
+        self.persistence_mode = os.environ.get("METIS_PERSISTENCE_MODE", "background")
+        self.backup_path = os.environ.get("METIS_BACKUP_PATH", "metis_data.json")
+        self.snapshot_format = os.environ.get("METIS_SNAPSHOT_FORMAT", "json")
+        self.journal: Optional[TaskJournal] = None
+        self.snapshot_writer: Optional[SnapshotWriter] = None
+        
+        # Overdue tasks already announced, with the due date they were
+        # announced for, and the background sweep task
+        self._overdue_notified: Dict[str, datetime] = {}
+        self._overdue_sweep: Optional[asyncio.Task] = None
+        
+        # Cold-tier archive for tasks closed longer than the configured age
+        # (in-memory storage only; 0 keeps every task in memory)
+        self.archive_after_days = float(os.environ.get("METIS_ARCHIVE_AFTER_DAYS", "0"))
+        self.archive: Optional[TaskArchive] = None
+        self._archive_sweep: Optional[asyncio.Task] = None
+        
+        # Load from backup file if exists (persistent storage keeps its own state)
+        if not getattr(self.storage, "is_persistent", False):
+            if self.archive_after_days > 0:
+                # Attached first so journaled archive records can be replayed
+                self.archive = TaskArchive(os.environ.get("METIS_ARCHIVE_PATH", f"{self.backup_path}.archive"))
+                self.storage.attach_archive(self.archive)
+            
+            if os.path.exists(self.backup_path):
+                self.storage.load_from_file(self.backup_path)
+            
+            if self.persistence_mode == "journal":
+                # Recover by replaying the journal on top of the snapshot
+                self.journal = TaskJournal(
+                    os.environ.get("METIS_JOURNAL_PATH", f"{self.backup_path}.journal"),
+                    compact_threshold=int(os.environ.get("METIS_JOURNAL_COMPACT_THRESHOLD", "1000"))
+                )
+                self.storage.replay_journal(self.journal)
+                self.storage.attach_journal(self.journal)
+            elif self.persistence_mode == "background" and "METIS_BACKUP_PATH" in os.environ:
+                self.snapshot_writer = SnapshotWriter(
+                    self.storage,
+                    self.backup_path,
+                    interval=float(os.environ.get("METIS_SNAPSHOT_INTERVAL", "1.0")),
+                    max_changes=int(os.environ.get("METIS_SNAPSHOT_MAX_CHANGES", "100")),
+                    snapshot_format=self.snapshot_format
+                )
     
     # Task operations
     
@@ -55,10 +114,10 @@ class TaskManager:
         
         Args:
             task_data: Dictionary of task data
-            
+        
         Returns:
             Task: Created task
-            
+        
         Raises:
             ValueError: If task data is invalid
         """
@@ -66,7 +125,7 @@ class TaskManager:
         task = Task(**task_data)
         
         # Save to storage
-        created_task = self.storage.create_task(task)
+        created_task = await self.async_storage.create_task(task)
         
         # Fire event
         await self._fire_event("task_created", created_task)
@@ -82,11 +141,11 @@ class TaskManager:
         
         Args:
             task_id: ID of the task to retrieve
-            
+        
         Returns:
             Optional[Task]: Task if found, None otherwise
         """
-        return self.storage.get_task(task_id)
+        return await self.async_storage.get_task(task_id)
     
     async def update_task(self, task_id: str, updates: Dict[str, Any]) -> Optional[Task]:
         """
@@ -95,10 +154,10 @@ class TaskManager:
         Args:
             task_id: ID of the task to update
             updates: Dictionary of field updates
-            
+        
         Returns:
             Optional[Task]: Updated task if found, None otherwise
-            
+        
         Raises:
             ValueError: If updates are invalid
         """
@@ -107,7 +166,7 @@ class TaskManager:
             return None
         
         # Apply updates
-        updated_task = self.storage.update_task(task_id, updates)
+        updated_task = await self.async_storage.update_task(task_id, updates)
         
         # Fire event
         await self._fire_event("task_updated", updated_task)
@@ -123,10 +182,10 @@ class TaskManager:
         
         Args:
             task_id: ID of the task to delete
-            
+        
         Returns:
             bool: True if task was deleted, False if not found
-            
+        
         Raises:
             ValueError: If task cannot be deleted due to dependencies
         """
@@ -135,7 +194,7 @@ class TaskManager:
             return False
         
         # Delete from storage
-        deleted = self.storage.delete_task(task_id)
+        deleted = await self.async_storage.delete_task(task_id)
         
         if deleted:
             # Fire event
@@ -146,6 +205,45 @@ class TaskManager:
         
         return deleted
     
+    async def _edit_task(self, task_id: str, edit: Callable[[Task], Any]) -> Any:
+        """
+        Change a task's subtasks or requirement references.
+        
+        The storage applies the change to a copy of the task and stores it
+        under its own lock, so the change cannot interleave with other
+        updates of the task, and the copy shares every subtask and
+        requirement reference the change does not replace.
+        
+        Args:
+            task_id: ID of the task
+            edit: Function changing the task; returning None or False means
+                nothing was changed
+        
+        Returns:
+            Any: Result of the change, or None if the task was not found
+        """
+        edited = await self.async_storage.edit_task(task_id, edit)
+        if edited is None:
+            return None
+        
+        task, result = edited
+        if result is not None and result is not False:
+            # Fire event
+            await self._fire_event("task_updated", task)
+            
+            # Auto-save if backup path is set
+            await self._auto_save()
+        return result
+    
+    def snapshot(self) -> StorageSnapshot:
+        """
+        Get a consistent, read-only view of all tasks and dependencies.
+        
+        Returns:
+            StorageSnapshot: Snapshot of the current storage version
+        """
+        return self.storage.snapshot()
+    
     async def list_tasks(
         self, 
         status: Optional[str] = None,
@@ -154,7 +252,13 @@ class TaskManager:
         tag: Optional[str] = None,
         search: Optional[str] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        sort: str = "updated_at",
+        cursor: Optional[str] = None,
+        due_after: Optional[datetime] = None,
+        due_before: Optional[datetime] = None,
+        include_archived: bool = False,
+        namespace: Optional[str] = None
     ) -> Tuple[List[Task], int]:
         """
         List tasks with optional filtering.
@@ -164,23 +268,78 @@ class TaskManager:
             priority: Filter by priority
             assignee: Filter by assignee
             tag: Filter by tag
-            search: Search term for title/description
+            search: Search terms for title/description/details
             page: Page number (1-based)
             page_size: Number of items per page
-            
+            sort: Sort order ("updated_at", "relevance" or "due_date")
+            cursor: Opaque cursor returned with the previous page
+            due_after: Only tasks due at or after this time
+            due_before: Only tasks due before this time
+            include_archived: Whether to also search archived tasks
+            namespace: Only list tasks in this namespace
+        
         Returns:
             Tuple[List[Task], int]: List of tasks and total count
         """
-        return self.storage.list_tasks(
+        return await self.async_storage.list_tasks(
             status=status,
             priority=priority,
             assignee=assignee,
             tag=tag,
             search=search,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            sort=sort,
+            cursor=cursor,
+            due_after=due_after,
+            due_before=due_before,
+            include_archived=include_archived,
+            namespace=namespace
         )
     
+    async def get_statistics(self, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get live task counts by status, priority, assignee, tag, complexity and namespace.
+        
+        Args:
+            namespace: Only count tasks in this namespace
+        
+        Returns:
+            Dict[str, Any]: Task statistics, including overdue counts
+        """
+        return await self.async_storage.get_statistics(namespace=namespace)
+    
+    async def list_namespaces(self) -> Dict[str, int]:
+        """
+        List the namespaces that have tasks.
+        
+        Returns:
+            Dict[str, int]: Number of tasks by namespace
+        """
+        return await self.async_storage.list_namespaces()
+    
+    async def get_changes(
+        self,
+        since: Optional[int] = None,
+        limit: int = 1000
+    ) -> Tuple[int, Optional[Tuple[List[Change], bool]]]:
+        """
+        Get the task and dependency changes made after a sequence number.
+        
+        Args:
+            since: Last sequence number the client has seen; None starts from
+                the latest sequence number
+            limit: Maximum number of changes to return
+        
+        Returns:
+            Tuple[int, Optional[Tuple[List[Change], bool]]]: The sequence number
+            the changes follow, and the changes in sequence order with whether
+            more changes follow, or None if the client must resync
+        """
+        if since is None:
+            since = self.async_storage.latest_sequence
+        return since, await self.async_storage.get_changes(since, limit)
+    
     # Subtask operations
     
     async def add_subtask(self, task_id: str, subtask_data: Dict[str, Any]) -> Optional[Subtask]:
@@ -190,33 +349,49 @@ class TaskManager:
         Args:
             task_id: ID of the parent task
             subtask_data: Dictionary of subtask data
-            
+        
         Returns:
             Optional[Subtask]: Created subtask if parent task exists, None otherwise
-            
+        
         Raises:
             ValueError: If subtask data is invalid
         """
-        task = await self.get_task(task_id)
-        if not task:
-            return None
-        
         # Create subtask
         subtask = Subtask(**subtask_data)
         
-        # Add to task
-        task.add_subtask(subtask)
+        def add(task: Task) -> Subtask:
+            task.add_subtask(subtask)
+            return subtask
         
-        # Update in storage
-        self.storage.update_task(task_id, {"subtasks": task.subtasks})
+        return await self._edit_task(task_id, add)
+    
+    async def add_subtasks(
+        self, task_id: str, subtasks_data: List[Union[Dict[str, Any], Subtask]]
+    ) -> Optional[List[Subtask]]:
+        """
+        Add several subtasks to a task with a single storage update.
         
-        # Fire event
-        await self._fire_event("task_updated", task)
+        Args:
+            task_id: ID of the task
+            subtasks_data: Dictionaries of subtask data or Subtask models, in order
         
-        # Auto-save if backup path is set
-        await self._auto_save()
+        Returns:
+            Optional[List[Subtask]]: Created subtasks if task exists, None otherwise
+        
+        Raises:
+            ValueError: If any subtask data is invalid; no subtask is added
+        """
+        # Validate all subtasks before changing the task
+        subtasks = [
+            data if isinstance(data, Subtask) else Subtask(**data)
+            for data in subtasks_data
+        ]
+        
+        def add(task: Task) -> List[Subtask]:
+            task.add_subtasks(subtasks)
+            return subtasks
         
-        return subtask
+        return await self._edit_task(task_id, add)
     
     async def update_subtask(
         self, task_id: str, subtask_id: str, updates: Dict[str, Any]
@@ -228,35 +403,43 @@ class TaskManager:
             task_id: ID of the parent task
             subtask_id: ID of the subtask to update
             updates: Dictionary of field updates
-            
+        
         Returns:
             Optional[Subtask]: Updated subtask if found, None otherwise
-            
+        
         Raises:
             ValueError: If updates are invalid
         """
-        task = await self.get_task(task_id)
-        if not task:
-            return None
-        
-        # Update subtask
-        success = task.update_subtask(subtask_id, updates)
-        if not success:
-            return None
-        
-        # Find the updated subtask
-        subtask = next((s for s in task.subtasks if s.id == subtask_id), None)
+        return await self._edit_task(
+            task_id,
+            lambda task: task.get_subtask(subtask_id) if task.update_subtask(subtask_id, updates) else None
+        )
+    
+    async def move_subtask(
+        self, task_id: str, subtask_id: str, after_id: Optional[str] = None
+    ) -> Optional[Subtask]:
+        """
+        Move a subtask to just after another one, or to the front.
         
-        # Update in storage
-        self.storage.update_task(task_id, {"subtasks": task.subtasks})
+        Only the moved subtask's rank changes, so one update and one event
+        cover the move.
         
-        # Fire event
-        await self._fire_event("task_updated", task)
+        Args:
+            task_id: ID of the parent task
+            subtask_id: ID of the subtask to move
+            after_id: ID of the subtask to place it after, or None to move
+                it to the front
         
-        # Auto-save if backup path is set
-        await self._auto_save()
+        Returns:
+            Optional[Subtask]: Moved subtask if found, None otherwise
         
-        return subtask
+        Raises:
+            ValueError: If after_id is the moved subtask or is not found
+        """
+        return await self._edit_task(
+            task_id,
+            lambda task: task.get_subtask(subtask_id) if task.move_subtask(subtask_id, after_id) else None
+        )
     
     async def remove_subtask(self, task_id: str, subtask_id: str) -> bool:
         """
@@ -265,29 +448,11 @@ class TaskManager:
         Args:
             task_id: ID of the parent task
             subtask_id: ID of the subtask to remove
-            
+        
         Returns:
             bool: True if subtask was removed, False if not found
         """
-        task = await self.get_task(task_id)
-        if not task:
-            return False
-        
-        # Remove subtask
-        success = task.remove_subtask(subtask_id)
-        if not success:
-            return False
-        
-        # Update in storage
-        self.storage.update_task(task_id, {"subtasks": task.subtasks})
-        
-        # Fire event
-        await self._fire_event("task_updated", task)
-        
-        # Auto-save if backup path is set
-        await self._auto_save()
-        
-        return True
+        return bool(await self._edit_task(task_id, lambda task: task.remove_subtask(subtask_id)))
     
     # Requirement reference operations
     
@@ -300,33 +465,21 @@ class TaskManager:
         Args:
             task_id: ID of the task
             req_ref_data: Dictionary of requirement reference data
-            
+        
         Returns:
             Optional[RequirementRef]: Created reference if task exists, None otherwise
-            
+        
         Raises:
             ValueError: If reference data is invalid
         """
-        task = await self.get_task(task_id)
-        if not task:
-            return None
-        
         # Create requirement reference
         req_ref = RequirementRef(**req_ref_data)
         
-        # Add to task
-        task.add_requirement_ref(req_ref)
-        
-        # Update in storage
-        self.storage.update_task(task_id, {"requirement_refs": task.requirement_refs})
-        
-        # Fire event
-        await self._fire_event("task_updated", task)
-        
-        # Auto-save if backup path is set
-        await self._auto_save()
+        def add(task: Task) -> RequirementRef:
+            task.add_requirement_ref(req_ref)
+            return req_ref
         
-        return req_ref
+        return await self._edit_task(task_id, add)
     
     async def update_requirement_ref(
         self, task_id: str, ref_id: str, updates: Dict[str, Any]
@@ -338,35 +491,17 @@ class TaskManager:
             task_id: ID of the task
             ref_id: ID of the requirement reference to update
             updates: Dictionary of field updates
-            
+        
         Returns:
             Optional[RequirementRef]: Updated reference if found, None otherwise
-            
+        
         Raises:
             ValueError: If updates are invalid
         """
-        task = await self.get_task(task_id)
-        if not task:
-            return None
-        
-        # Update requirement reference
-        success = task.update_requirement_ref(ref_id, updates)
-        if not success:
-            return None
-        
-        # Find the updated reference
-        ref = next((r for r in task.requirement_refs if r.id == ref_id), None)
-        
-        # Update in storage
-        self.storage.update_task(task_id, {"requirement_refs": task.requirement_refs})
-        
-        # Fire event
-        await self._fire_event("task_updated", task)
-        
-        # Auto-save if backup path is set
-        await self._auto_save()
-        
-        return ref
+        return await self._edit_task(
+            task_id,
+            lambda task: task.get_requirement_ref(ref_id) if task.update_requirement_ref(ref_id, updates) else None
+        )
     
     async def remove_requirement_ref(self, task_id: str, ref_id: str) -> bool:
         """
@@ -375,29 +510,11 @@ class TaskManager:
         Args:
             task_id: ID of the task
             ref_id: ID of the requirement reference to remove
-            
+        
         Returns:
             bool: True if reference was removed, False if not found
         """
-        task = await self.get_task(task_id)
-        if not task:
-            return False
-        
-        # Remove requirement reference
-        success = task.remove_requirement_ref(ref_id)
-        if not success:
-            return False
-        
-        # Update in storage
-        self.storage.update_task(task_id, {"requirement_refs": task.requirement_refs})
-        
-        # Fire event
-        await self._fire_event("task_updated", task)
-        
-        # Auto-save if backup path is set
-        await self._auto_save()
-        
-        return True
+        return bool(await self._edit_task(task_id, lambda task: task.remove_requirement_ref(ref_id)))
     
     # Dependency operations
     
@@ -407,10 +524,10 @@ class TaskManager:
         
         Args:
             dependency_data: Dictionary of dependency data
-            
+        
         Returns:
             Dependency: Created dependency
-            
+        
         Raises:
             ValueError: If dependency data is invalid or would create a cycle
         """
@@ -418,7 +535,7 @@ class TaskManager:
         dependency = Dependency(**dependency_data)
         
         # Save to storage
-        created_dependency = self.storage.create_dependency(dependency)
+        created_dependency = await self.async_storage.create_dependency(dependency)
         
         # Fire event for both tasks
         source_task = await self.get_task(dependency.source_task_id)
@@ -441,11 +558,11 @@ class TaskManager:
         
         Args:
             dependency_id: ID of the dependency to retrieve
-            
+        
         Returns:
             Optional[Dependency]: Dependency if found, None otherwise
         """
-        return self.storage.get_dependency(dependency_id)
+        return await self.async_storage.get_dependency(dependency_id)
     
     async def update_dependency(
         self, dependency_id: str, updates: Dict[str, Any]
@@ -456,15 +573,15 @@ class TaskManager:
         Args:
             dependency_id: ID of the dependency to update
             updates: Dictionary of field updates
-            
+        
         Returns:
             Optional[Dependency]: Updated dependency if found, None otherwise
-            
+        
         Raises:
             ValueError: If updates are invalid
         """
         # Update in storage
-        updated_dependency = self.storage.update_dependency(dependency_id, updates)
+        updated_dependency = await self.async_storage.update_dependency(dependency_id, updates)
         
         if updated_dependency:
             # Fire event for both tasks
@@ -488,7 +605,7 @@ class TaskManager:
         
         Args:
             dependency_id: ID of the dependency to delete
-            
+        
         Returns:
             bool: True if dependency was deleted, False if not found
         """
@@ -498,7 +615,7 @@ class TaskManager:
             return False
         
         # Delete from storage
-        deleted = self.storage.delete_dependency(dependency_id)
+        deleted = await self.async_storage.delete_dependency(dependency_id)
         
         if deleted:
             # Fire event for both tasks
@@ -527,11 +644,11 @@ class TaskManager:
         Args:
             task_id: Filter by source or target task ID
             dependency_type: Filter by dependency type
-            
+        
         Returns:
             List[Dependency]: List of matching dependencies
         """
-        return self.storage.list_dependencies(
+        return await self.async_storage.list_dependencies(
             task_id=task_id,
             dependency_type=dependency_type
         )
@@ -542,11 +659,11 @@ class TaskManager:
         
         Args:
             task_id: ID of the task to check
-            
+        
         Returns:
             List[Task]: List of tasks that block the specified task
         """
-        return self.storage.list_blocking_tasks(task_id)
+        return await self.async_storage.list_blocking_tasks(task_id)
     
     async def list_dependent_tasks(self, task_id: str) -> List[Task]:
         """
@@ -554,11 +671,129 @@ class TaskManager:
         
         Args:
             task_id: ID of the task to check
-            
+        
         Returns:
             List[Task]: List of tasks that depend on the specified task
         """
-        return self.storage.list_dependent_tasks(task_id)
+        return await self.async_storage.list_dependent_tasks(task_id)
+    
+    async def list_ready_tasks(self, limit: int = 50, namespace: Optional[str] = None) -> List[Task]:
+        """
+        List pending tasks whose dependencies are all done.
+        
+        The storage keeps an unmet dependency count per task and an ordered
+        index of ready tasks, so this does not walk any dependencies.
+        
+        Args:
+            limit: Maximum number of tasks to return
+            namespace: Only list tasks in this namespace
+        
+        Returns:
+            List[Task]: Ready tasks, highest priority first, then oldest first
+        """
+        return await self.async_storage.list_ready_tasks(limit=limit, namespace=namespace)
+    
+    async def list_downstream_tasks(
+        self,
+        task_id: str,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """
+        List the tasks that depend on a task, directly or transitively.
+        
+        These are the tasks affected if the task slips. The in-memory
+        storage answers from a cached reachability index.
+        
+        Args:
+            task_id: ID of the task
+            max_depth: Only follow this many dependency links (None for no limit)
+            limit: Maximum number of tasks to return (None for all)
+        
+        Returns:
+            Tuple[List[Tuple[Task, int]], int]: Tasks with their distance in
+            links, nearest first, and the total number of such tasks
+        """
+        return await self.async_storage.list_downstream_tasks(task_id, max_depth=max_depth, limit=limit)
+    
+    async def list_upstream_tasks(
+        self,
+        task_id: str,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[Tuple[Task, int]], int]:
+        """
+        List the tasks a task depends on, directly or transitively.
+        
+        Args:
+            task_id: ID of the task
+            max_depth: Only follow this many dependency links (None for no limit)
+            limit: Maximum number of tasks to return (None for all)
+        
+        Returns:
+            Tuple[List[Tuple[Task, int]], int]: Tasks with their distance in
+            links, nearest first, and the total number of such tasks
+        """
+        return await self.async_storage.list_upstream_tasks(task_id, max_depth=max_depth, limit=limit)
+    
+    async def get_dependency_distance(self, upstream_id: str, downstream_id: str) -> Optional[int]:
+        """
+        Get how many dependency links lead from a task to one depending on it.
+        
+        Args:
+            upstream_id: ID of the task depended on
+            downstream_id: ID of the task that may depend on it
+        
+        Returns:
+            Optional[int]: Length of the shortest chain of dependencies, or
+            None if the downstream task does not depend on the upstream task
+        """
+        return await self.async_storage.get_dependency_distance(upstream_id, downstream_id)
+    
+    async def analyze_dependencies(self, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Report every dependency cycle and missing dependency.
+        
+        The analysis runs off the event loop, in time linear in the size
+        of the dependency graph.
+        
+        Args:
+            namespace: Only analyze tasks in this namespace (None for all);
+                dependencies never cross namespaces
+        
+        Returns:
+            Dict[str, Any]: Number of tasks analyzed, cycle groups and missing
+            dependencies, as returned by DependencyResolver.analyze_dependencies
+        """
+        snapshot = await self.async_storage.snapshot()
+        tasks = [
+            task for task in snapshot.tasks.values()
+            if namespace is None or task.namespace == namespace
+        ]
+        
+        loop = asyncio.get_running_loop()
+        analysis = await loop.run_in_executor(None, DependencyResolver.analyze_dependencies, tasks)
+        analysis["task_count"] = len(tasks)
+        return analysis
+    
+    async def get_critical_path(self, namespace: str = DEFAULT_NAMESPACE) -> Dict[str, Any]:
+        """
+        Get the critical path and slack of the tasks in a namespace.
+        
+        The schedule is computed once and then updated incrementally from
+        task events, so repeated calls between edits are cheap.
+        
+        Args:
+            namespace: Namespace to schedule
+        
+        Returns:
+            Dict[str, Any]: Critical path task IDs ordered by earliest finish,
+            project duration and slack by task ID
+        
+        Raises:
+            ValueError: If there are cyclic dependencies
+        """
+        return await self.critical_paths.get(namespace)
     
     # Bulk operations
     
@@ -566,20 +801,33 @@ class TaskManager:
         """
         Create multiple tasks in a batch.
         
+        The batch is stored atomically: either all tasks are created or,
+        if any task is invalid, none are. A single "tasks_created" event
+        is fired and the backup is saved once for the whole batch.
+        
         Args:
             tasks_data: List of task data dictionaries
-            
+        
         Returns:
             List[Task]: List of created tasks
-            
+        
         Raises:
             ValueError: If any task data is invalid
         """
-        created_tasks = []
+        if not tasks_data:
+            return []
+        
+        # Create Task instances; validation errors abort the whole batch
+        tasks = [Task(**task_data) for task_data in tasks_data]
+        
+        # Save to storage
+        created_tasks = await self.async_storage.create_tasks(tasks)
+        
+        # Fire one event for the batch
+        await self._fire_event("tasks_created", created_tasks)
         
-        for task_data in tasks_data:
-            task = await self.create_task(task_data)
-            created_tasks.append(task)
+        # Auto-save once for the batch
+        await self._auto_save(len(created_tasks))
         
         return created_tasks
     
@@ -591,21 +839,140 @@ class TaskManager:
         
         Args:
             updates_map: Dictionary mapping task IDs to update dictionaries
-            
+        
         Returns:
             Dict[str, Optional[Task]]: Dictionary mapping task IDs to updated tasks
-            
+            (None for tasks that were not found)
+        
         Raises:
-            ValueError: If any updates are invalid
+            ValueError: If any updates are invalid; no task is changed
         """
-        results = {}
+        if not updates_map:
+            return {}
+        
+        results = await self.async_storage.update_tasks(updates_map)
+        updated_tasks = [task for task in results.values() if task is not None]
         
-        for task_id, updates in updates_map.items():
-            task = await self.update_task(task_id, updates)
-            results[task_id] = task
+        if updated_tasks:
+            # Fire one event for the batch
+            await self._fire_event("tasks_updated", updated_tasks)
+            
+            # Auto-save once for the batch
+            await self._auto_save(len(updated_tasks))
         
         return results
     
+    # Overdue tracking
+    
+    async def sweep_overdue(self, now: Optional[datetime] = None) -> List[Task]:
+        """
+        Fire a "task_overdue" event for each task that became overdue.
+        
+        Only the overdue prefix of the storage's due date index is read.
+        A task is announced once per due date, so moving its due date
+        into the past again announces it again.
+        
+        Args:
+            now: Reference time (defaults to the current UTC time)
+        
+        Returns:
+            List[Task]: Tasks that became overdue since the last sweep
+        """
+        overdue = await self.async_storage.list_overdue_tasks(now)
+        
+        notified = {task.id: task.due_date for task in overdue}
+        newly_overdue = [
+            task for task in overdue
+            if self._overdue_notified.get(task.id) != task.due_date
+        ]
+        self._overdue_notified = notified
+        
+        for task in newly_overdue:
+            await self._fire_event("task_overdue", task)
+        
+        return newly_overdue
+    
+    def start_overdue_sweep(self, interval: Optional[float] = None) -> None:
+        """
+        Start sweeping for overdue tasks in the background.
+        
+        Must be called from a running event loop.
+        
+        Args:
+            interval: Seconds between sweeps (defaults to METIS_OVERDUE_SWEEP_INTERVAL
+                or 60; 0 disables the sweep)
+        """
+        if interval is None:
+            interval = float(os.environ.get("METIS_OVERDUE_SWEEP_INTERVAL", "60"))
+        
+        if interval > 0 and self._overdue_sweep is None:
+            self._overdue_sweep = asyncio.get_running_loop().create_task(self._run_overdue_sweep(interval))
+    
+    async def _run_overdue_sweep(self, interval: float) -> None:
+        """Sweep for overdue tasks once per interval until cancelled."""
+        while True:
+            try:
+                await self.sweep_overdue()
+            except Exception as e:
+                print(f"Error sweeping overdue tasks: {e}")
+            await asyncio.sleep(interval)
+    
+    # Archival
+    
+    async def archive_closed_tasks(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Move tasks closed for longer than the configured age to the archive.
+        
+        Fires a single "tasks_archived" event for the whole run. Archived
+        tasks can still be fetched by ID and return to the working set
+        when they are updated.
+        
+        Args:
+            now: Reference time (defaults to the current UTC time)
+        
+        Returns:
+            List[str]: IDs of the archived tasks
+        """
+        if self.archive is None:
+            return []
+        
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.archive_after_days)
+        archived = await self.async_storage.archive_closed_tasks(cutoff)
+        
+        if archived:
+            await self._fire_event("tasks_archived", {"ids": archived})
+            
+            # The archived tasks leave the backup file
+            await self._auto_save(len(archived))
+        
+        return archived
+    
+    def start_archive_sweep(self, interval: Optional[float] = None) -> None:
+        """
+        Start archiving long-closed tasks in the background.
+        
+        Does nothing unless an archive is configured. Must be called from a
+        running event loop.
+        
+        Args:
+            interval: Seconds between sweeps (defaults to METIS_ARCHIVE_SWEEP_INTERVAL
+                or 3600; 0 disables the sweep)
+        """
+        if interval is None:
+            interval = float(os.environ.get("METIS_ARCHIVE_SWEEP_INTERVAL", "3600"))
+        
+        if self.archive is not None and interval > 0 and self._archive_sweep is None:
+            self._archive_sweep = asyncio.get_running_loop().create_task(self._run_archive_sweep(interval))
+    
+    async def _run_archive_sweep(self, interval: float) -> None:
+        """Archive long-closed tasks once per interval until cancelled."""
+        while True:
+            try:
+                await self.archive_closed_tasks()
+            except Exception as e:
+                print(f"Error archiving closed tasks: {e}")
+            await asyncio.sleep(interval)
+    
     # Event handling
     
     def register_event_handler(self, event_type: str, handler: callable) -> None:
@@ -628,7 +995,7 @@ class TaskManager:
         Args:
             event_type: Type of event
             handler: Handler to unregister
-            
+        
         Returns:
             bool: True if handler was found and removed, False otherwise
         """
@@ -670,11 +1037,11 @@ class TaskManager:
         
         Args:
             filepath: Path to save the file
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
-        return self.storage.save_to_file(filepath)
+        return await self.async_storage.save_to_file(filepath)
     
     async def load(self, filepath: str) -> bool:
         """
@@ -682,17 +1049,135 @@ class TaskManager:
         
         Args:
             filepath: Path to the file
-            
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        loaded = await self.async_storage.load_from_file(filepath)
+        if loaded:
+            # Loading replaces tasks without firing events
+            self.critical_paths.invalidate()
+        
+        # The journal describes the replaced state, so fold the loaded
+        # state into a fresh snapshot
+        if loaded and self.journal:
+            await self.async_storage.compact_journal(self.backup_path, self.snapshot_format)
+        
+        return loaded
+    
+    async def save_namespace(self, namespace: str, filepath: str) -> bool:
+        """
+        Save the tasks of one namespace to their own file.
+        
+        Args:
+            namespace: Namespace to save
+            filepath: Path to save the file
+        
         Returns:
             bool: True if successful, False otherwise
+        
+        Raises:
+            ValueError: If the storage is not partitioned by namespace
         """
-        return self.storage.load_from_file(filepath)
+        if not hasattr(self.storage, "save_namespace"):
+            raise ValueError("The storage backend does not support per-namespace persistence")
+        
+        return await self.async_storage.save_namespace(namespace, filepath, self.snapshot_format)
     
-    async def _auto_save(self) -> None:
-        """Auto-save if backup path is set."""
+    async def load_namespace(self, namespace: str, filepath: str) -> bool:
+        """
+        Replace the tasks of one namespace with the contents of a file.
+        
+        Other namespaces are not touched and stay available while loading.
+        
+        Args:
+            namespace: Namespace to replace
+            filepath: Path to the file
+        
+        Returns:
+            bool: True if successful, False otherwise
+        
+        Raises:
+            ValueError: If the storage is not partitioned by namespace, or the
+                file holds tasks of another namespace
+        """
+        if not hasattr(self.storage, "load_namespace"):
+            raise ValueError("The storage backend does not support per-namespace persistence")
+        
+        loaded = await self.async_storage.load_namespace(namespace, filepath)
+        if loaded:
+            self.critical_paths.invalidate(namespace)
+        
+        if loaded and self.journal:
+            await self.async_storage.compact_journal(self.backup_path, self.snapshot_format)
+        elif loaded:
+            await self._auto_save()
+        
+        return loaded
+    
+    def get_persistence_status(self) -> Dict[str, Any]:
+        """
+        Get monitoring information about persistence.
+        
+        Returns:
+            Dict[str, Any]: Persistence mode and writer or journal state
+        """
+        status: Dict[str, Any] = {
+            "mode": "storage" if getattr(self.storage, "is_persistent", False) else self.persistence_mode
+        }
+        
+        if self.snapshot_writer:
+            status.update(self.snapshot_writer.get_status())
+        
+        if self.journal:
+            status["journal_records"] = self.journal.record_count
+        
+        if self.archive is not None:
+            status["archived_tasks"] = len(self.archive)
+        
+        return status
+    
+    async def close(self) -> None:
+        """Stop the background sweeps, flush pending snapshot writes and close the journal."""
+        for sweep in (self._overdue_sweep, self._archive_sweep):
+            if sweep:
+                sweep.cancel()
+                try:
+                    await sweep
+                except asyncio.CancelledError:
+                    pass
+        self._overdue_sweep = self._archive_sweep = None
+        
+        if self.snapshot_writer:
+            await self.snapshot_writer.stop()
+        
+        if self.journal:
+            self.journal.close()
+        
+        if isinstance(self.async_storage, ThreadedStorage):
+            self.async_storage.shutdown()
+    
+    async def _auto_save(self, changes: int = 1) -> None:
+        """
+        Auto-save if backup path is set and the storage is not persistent.
+        
+        Args:
+            changes: Number of changes made since the last call
+        """
+        if self.journal:
+            # Mutations are already journaled; only compact when it grew large
+            if self.journal.needs_compaction():
+                await self.async_storage.compact_journal(self.backup_path, self.snapshot_format)
+            return
+        
+        if self.snapshot_writer:
+            # Coalesced and written off the event loop
+            self.snapshot_writer.mark_dirty(changes)
+            return
+        
         backup_path = os.environ.get("METIS_BACKUP_PATH")
-        if backup_path:
-            self.storage.save_to_file(backup_path)
+        if backup_path and not getattr(self.storage, "is_persistent", False):
+            await self.async_storage.save_to_file(backup_path, self.snapshot_format)
     
     # Telos integration
     
@@ -703,7 +1188,7 @@ class TaskManager:
         Args:
             requirement_id: ID of the requirement to import
             task_id: Optional task ID to add the reference to
-            
+        
         Returns:
             Tuple[Optional[RequirementRef], Optional[Task]]: 
                 Created reference and task if successful, None otherwise
@@ -736,7 +1221,7 @@ class TaskManager:
         
         Args:
             requirement_id: ID of the requirement to import
-            
+        
         Returns:
             Optional[Task]: Created task if successful, None otherwise
         """
@@ -786,7 +1271,7 @@ class TaskManager:
             category: Filter by category
             page: Page number
             page_size: Page size
-            
+        
         Returns:
             Tuple[List[Dict[str, Any]], int]: List of requirements and total count
         """
@@ -0,0 +1,137 @@
+"""
+Rank keys for Metis
+
+This module provides lexicographic rank keys for ordering items in a
+list. A key can always be generated between any two others, so moving an
+item only changes that item's key instead of renumbering its siblings.
+"""
+
+from typing import List, Optional
+
+# Base-62 digits in ASCII order, so keys compare as plain strings
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+# Keys longer than this should be rebalanced with spread_ranks
+MAX_RANK_LENGTH = 12
+
+_DIGIT_VALUES = {digit: value for value, digit in enumerate(DIGITS)}
+
+
+def _midpoint(lower: str, upper: Optional[str]) -> str:
+    """
+    Get a key strictly between two keys.
+    
+    Neither key may end with the zero digit, which keeps room below every
+    key; the result never does either.
+    
+    Args:
+        lower: Lower bound, or "" for no lower bound
+        upper: Upper bound, or None for no upper bound
+    
+    Returns:
+        str: Key between the bounds
+    """
+    if upper is not None:
+        # Keep the common prefix, padding the lower bound with zeros
+        prefix = 0
+        while prefix < len(upper) and (lower[prefix] if prefix < len(lower) else "0") == upper[prefix]:
+            prefix += 1
+        if prefix > 0:
+            return upper[:prefix] + _midpoint(lower[prefix:], upper[prefix:])
+    
+    low = _DIGIT_VALUES[lower[0]] if lower else 0
+    high = _DIGIT_VALUES[upper[0]] if upper is not None else BASE
+    if high - low > 1:
+        return DIGITS[(low + high) // 2]
+    
+    # Adjacent first digits: the upper bound's first digit alone is between
+    # the bounds if the upper bound has more digits, otherwise go deeper
+    if upper is not None and len(upper) > 1:
+        return upper[:1]
+    return DIGITS[low] + _midpoint(lower[1:], None)
+
+
+def _validate(rank: str) -> None:
+    """Check that a key was produced by this module."""
+    if not rank or rank[-1] == DIGITS[0] or any(c not in _DIGIT_VALUES for c in rank):
+        raise ValueError(f"Invalid rank key: {rank!r}")
+
+
+def rank_after(rank: Optional[str]) -> str:
+    """
+    Get a short key after a key, for appending to a list.
+    
+    Bumps the first digit that can be bumped, so repeated appends grow
+    keys by one digit only every few dozen appends.
+    
+    Args:
+        rank: Key of the last item, or None for an empty list
+    
+    Returns:
+        str: Key after the given key
+    """
+    if rank is None:
+        return DIGITS[BASE // 2]
+    
+    _validate(rank)
+    for i, digit in enumerate(rank):
+        value = _DIGIT_VALUES[digit]
+        if value < BASE - 1:
+            return rank[:i] + DIGITS[value + 1]
+    return rank + DIGITS[BASE // 2]
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Get a key between two neighboring keys.
+    
+    Args:
+        before: Key of the item before the new position, or None at the start
+        after: Key of the item after the new position, or None at the end
+    
+    Returns:
+        str: Key that sorts between the neighbors
+    
+    Raises:
+        ValueError: If a key is invalid or the keys are out of order
+    """
+    if after is None:
+        return rank_after(before)
+    
+    _validate(after)
+    if before is not None:
+        _validate(before)
+        if before >= after:
+            raise ValueError(f"Rank keys out of order: {before!r} >= {after!r}")
+    return _midpoint(before or "", after)
+
+
+def spread_ranks(count: int) -> List[str]:
+    """
+    Get evenly spaced keys for a whole list.
+    
+    Used to rebalance a list whose keys have grown too long. The keys
+    leave room for several insertions between and after them.
+    
+    Args:
+        count: Number of keys
+    
+    Returns:
+        List[str]: Keys in ascending order
+    """
+    width = 1
+    while BASE ** width <= count * 4:
+        width += 1
+    step = BASE ** width // (count + 1)
+    
+    ranks = []
+    for i in range(1, count + 1):
+        value = i * step
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        # Trailing zeros don't change the order, and keys never end in one
+        ranks.append("".join(reversed(digits)).rstrip(DIGITS[0]))
+    return ranks
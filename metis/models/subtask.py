@@ -28,6 +28,7 @@ class Subtask(TektonBaseModel):
     description: Optional[str] = None
     status: str = TaskStatus.PENDING.value
     order: int = 0  # Position within list of subtasks
+    rank: Optional[str] = None  # Sort key among siblings; see metis.models.rank
     estimated_hours: float = 1.0  # Estimated time to complete
     complexity: Optional[ComplexityScore] = None  # Complexity analysis
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -86,5 +87,5 @@ class SubtaskTemplate(TektonBaseModel):
                 order=i
             )
             result.append(subtask)
-            
+        
         return result
\ No newline at end of file
@@ -4,16 +4,92 @@ Task model for Metis
 This module defines the core Task model for the Metis system.
 """
 
+import re
+import json
 from datetime import datetime
-from pydantic import Field, field_validator
+from pydantic import Field, PrivateAttr, field_validator
 from uuid import uuid4
-from typing import Optional, List, Dict, Any, Set
+from typing import Optional, List, Dict, Any, Set, Callable
 from tekton.models.base import TektonBaseModel
 
 from metis.models.enums import TaskStatus, Priority
 from metis.models.complexity import ComplexityScore
 from metis.models.subtask import Subtask
 from metis.models.requirement import RequirementRef
+from metis.models.rank import MAX_RANK_LENGTH, rank_after, rank_between, spread_ranks
+
+DEFAULT_NAMESPACE = "default"
+
+# Namespaces name storage partitions, so keep them short and path-safe
+_NAMESPACE_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+
+class _DerivedForms:
+    """
+    Forms derived from one revision of a task, such as its JSON encoding.
+    
+    Copies of an unmodified task share the same instance: copying returns
+    it as-is, and a modified copy replaces it instead of changing it.
+    """
+    
+    __slots__ = ("revision", "values")
+    
+    def __init__(self, revision: int):
+        self.revision = revision
+        self.values: Dict[str, Any] = {}
+    
+    def __copy__(self) -> "_DerivedForms":
+        return self
+    
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "_DerivedForms":
+        return self
+
+
+class _PositionIndex:
+    """
+    Positions of the items of a list, by item ID.
+    
+    Kept in sync by the Task methods that change the list. A lookup that
+    finds the list changed behind the index's back (a stale position, or
+    a different length on a miss) rebuilds the index first.
+    """
+    
+    __slots__ = ("positions",)
+    
+    def __init__(self, items: List[Any]):
+        self.positions: Dict[str, int] = {item.id: i for i, item in enumerate(items)}
+    
+    def find(self, items: List[Any], item_id: str) -> Optional[int]:
+        """Get the position of an item in the list, or None if it is not there."""
+        position = self.positions.get(item_id)
+        if position is None:
+            if len(self.positions) == len(items):
+                return None
+        elif position < len(items) and items[position].id == item_id:
+            return position
+        
+        self.positions = {item.id: i for i, item in enumerate(items)}
+        return self.positions.get(item_id)
+    
+    def copy(self) -> "_PositionIndex":
+        """Copy the index, for a copy of the list with the same items."""
+        copied = _PositionIndex.__new__(_PositionIndex)
+        copied.positions = dict(self.positions)
+        return copied
+    
+    def appended(self, items: List[Any]) -> None:
+        """Record the item just appended to the list."""
+        self.positions[items[-1].id] = len(items) - 1
+    
+    def removed(self, items: List[Any], item_id: str, position: int) -> None:
+        """Record the removal of an item, shifting the items after it."""
+        del self.positions[item_id]
+        self.shifted(items, position, len(items))
+    
+    def shifted(self, items: List[Any], start: int, end: int) -> None:
+        """Record new positions for the items in a range of the list."""
+        for i in range(start, end):
+            self.positions[items[i].id] = i
 
 
 class Task(TektonBaseModel):
@@ -39,6 +115,17 @@ class Task(TektonBaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     requirement_refs: List[RequirementRef] = []
+    namespace: str = DEFAULT_NAMESPACE  # Project the task belongs to; fixed after creation
+    
+    # Bumped by every modification, so derived forms can be reused until then
+    _revision: int = PrivateAttr(default=0)
+    _derived: Optional[_DerivedForms] = PrivateAttr(default=None)
+    
+    # Positions of subtasks and requirement references by ID, and the highest
+    # subtask order; built on first use and reset when the lists are replaced
+    _subtask_index: Optional[_PositionIndex] = PrivateAttr(default=None)
+    _requirement_ref_index: Optional[_PositionIndex] = PrivateAttr(default=None)
+    _max_subtask_order: Optional[int] = PrivateAttr(default=None)
     
     @field_validator("status")
     @classmethod
@@ -56,16 +143,131 @@ class Task(TektonBaseModel):
             raise ValueError(f"Invalid task priority: {v}")
         return v
     
+    @field_validator("namespace")
+    @classmethod
+    def namespace_must_be_valid(cls, v):
+        """Validate that the namespace is a short, path-safe name."""
+        if not _NAMESPACE_PATTERN.match(v):
+            raise ValueError(f"Invalid namespace: {v}")
+        return v
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute, counting field assignments as modifications."""
+        super().__setattr__(name, value)
+        if name in Task.model_fields:
+            private = self.__pydantic_private__
+            private["_revision"] += 1
+            if name == "subtasks":
+                private["_subtask_index"] = private["_max_subtask_order"] = None
+            elif name == "requirement_refs":
+                private["_requirement_ref_index"] = None
+    
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "Task":
+        """
+        Copy the task; a copy with updated fields starts a new revision.
+        
+        The copy rebuilds its subtask and requirement reference indexes on
+        first use, so changing its lists never affects the original's.
+        
+        Args:
+            update: Field values to change in the copy
+            deep: Whether to copy nested models and lists too
+        
+        Returns:
+            Task: Copy of the task
+        """
+        copied = super().model_copy(update=update, deep=deep)
+        private = copied.__pydantic_private__
+        private["_subtask_index"] = private["_requirement_ref_index"] = private["_max_subtask_order"] = None
+        if update:
+            private["_revision"] += 1
+        return copied
+    
+    def edit_copy(self) -> "Task":
+        """
+        Copy the task to change its subtasks or requirement references.
+        
+        The copy gets its own subtask and requirement reference lists but
+        shares their items with the original; the methods below replace an
+        item with a copy before changing it, so the original never changes.
+        The position indexes are carried over, so lookups on the copy stay
+        constant time. Copying takes time linear in the number of items,
+        with a small constant, instead of copying every item.
+        
+        Returns:
+            Task: Copy of the task
+        """
+        copied = super().model_copy(update={
+            "subtasks": list(self.subtasks),
+            "requirement_refs": list(self.requirement_refs),
+        })
+        private = copied.__pydantic_private__
+        for name in ("_subtask_index", "_requirement_ref_index"):
+            index = private[name]
+            private[name] = index.copy() if index is not None else None
+        return copied
+    
+    @property
+    def revision(self) -> int:
+        """Number of modifications made since the task was created or loaded."""
+        return self._revision
+    
+    def touch(self) -> None:
+        """
+        Mark the task as modified.
+        
+        Field assignments are detected automatically; call this after
+        changing a nested list or model in place.
+        """
+        self.updated_at = datetime.utcnow()
+    
+    def derived(self, key: str, build: Callable[["Task"], Any]) -> Any:
+        """
+        Get a form derived from the task, rebuilt only after it is modified.
+        
+        Derived forms are shared between copies of an unmodified task and
+        must not be changed by callers.
+        
+        Args:
+            key: Name of the derived form
+            build: Function building the form from the task
+        
+        Returns:
+            Any: Derived form for the current revision
+        """
+        derived = self._derived
+        if derived is None or derived.revision != self._revision:
+            derived = _DerivedForms(self._revision)
+            self._derived = derived
+        
+        try:
+            return derived.values[key]
+        except KeyError:
+            value = derived.values[key] = build(self)
+            return value
+    
+    def to_json(self) -> str:
+        """
+        Get the compact JSON encoding of the task.
+        
+        The encoding is cached per revision, so unchanged tasks are not
+        re-encoded for snapshots, journal records and event payloads.
+        
+        Returns:
+            str: JSON object with all task fields
+        """
+        return self.derived("json", _encode_task)
+    
     def update_status(self, new_status: str) -> bool:
         """
         Update the task status with validation.
         
         Args:
             new_status: New status value
-            
+        
         Returns:
             bool: True if status was updated, False if transition was invalid
-            
+        
         Raises:
             ValueError: If the new status is not a valid TaskStatus value
         """
@@ -79,7 +281,7 @@ class Task(TektonBaseModel):
         
         # Update status and timestamp
         self.status = new_status
-        self.updated_at = datetime.utcnow()
+        self.touch()
         return True
     
     def update(self, updates: Dict[str, Any]) -> None:
@@ -98,6 +300,10 @@ class Task(TektonBaseModel):
             # Remove status from updates dict since we've already handled it
             del updates["status"]
         
+        # Tasks are partitioned by namespace, so they cannot move between them
+        if "namespace" in updates and updates["namespace"] != self.namespace:
+            raise ValueError("The namespace of a task cannot be changed")
+        
         # Handle priority updates with validation
         if "priority" in updates:
             if updates["priority"] not in [p.value for p in Priority]:
@@ -109,7 +315,7 @@ class Task(TektonBaseModel):
                 setattr(self, key, value)
         
         # Update timestamp
-        self.updated_at = datetime.utcnow()
+        self.touch()
     
     def add_subtask(self, subtask: Subtask) -> None:
         """
@@ -118,12 +324,37 @@ class Task(TektonBaseModel):
         Args:
             subtask: Subtask to add
         """
-        # Set order to end of list if not specified
-        if subtask.order == 0 and self.subtasks:
-            subtask.order = max(s.order for s in self.subtasks) + 1
+        self._append_subtask(subtask)
+        self.touch()
+    
+    def add_subtasks(self, subtasks: List[Subtask]) -> None:
+        """
+        Add several subtasks to the task, in order.
         
-        self.subtasks.append(subtask)
-        self.updated_at = datetime.utcnow()
+        Each subtask is ordered as by add_subtask, in constant time per
+        subtask, and the task is marked modified once.
+        
+        Args:
+            subtasks: Subtasks to add
+        """
+        for subtask in subtasks:
+            self._append_subtask(subtask)
+        
+        if subtasks:
+            self.touch()
+    
+    def get_subtask(self, subtask_id: str) -> Optional[Subtask]:
+        """
+        Get a subtask by ID.
+        
+        Args:
+            subtask_id: ID of the subtask
+        
+        Returns:
+            Optional[Subtask]: Subtask if found, None otherwise
+        """
+        position = self._subtask_position(subtask_id)
+        return self.subtasks[position] if position is not None else None
     
     def update_subtask(self, subtask_id: str, updates: Dict[str, Any]) -> bool:
         """
@@ -132,18 +363,29 @@ class Task(TektonBaseModel):
         Args:
             subtask_id: ID of the subtask to update
             updates: Dictionary of field updates
-            
+        
         Returns:
             bool: True if subtask was found and updated, False otherwise
         """
-        for i, subtask in enumerate(self.subtasks):
-            if subtask.id == subtask_id:
-                subtask.update(updates)
-                self.subtasks[i] = subtask
-                self.updated_at = datetime.utcnow()
-                return True
+        position = self._subtask_position(subtask_id)
+        if position is None:
+            return False
         
-        return False
+        # Changed on a copy, as the list may be shared with a stored task
+        subtask = self.subtasks[position].model_copy()
+        previous_order = subtask.order
+        subtask.update(updates)
+        self.subtasks[position] = subtask
+        
+        max_order = self._max_subtask_order
+        if max_order is not None and subtask.order != previous_order:
+            if subtask.order > max_order:
+                self._max_subtask_order = subtask.order
+            elif previous_order == max_order:
+                self._max_subtask_order = None  # Recomputed on next use
+        
+        self.touch()
+        return True
     
     def remove_subtask(self, subtask_id: str) -> bool:
         """
@@ -151,17 +393,116 @@ class Task(TektonBaseModel):
         
         Args:
             subtask_id: ID of the subtask to remove
-            
+        
         Returns:
             bool: True if subtask was found and removed, False otherwise
         """
-        for i, subtask in enumerate(self.subtasks):
-            if subtask.id == subtask_id:
-                self.subtasks.pop(i)
-                self.updated_at = datetime.utcnow()
-                return True
+        position = self._subtask_position(subtask_id)
+        if position is None:
+            return False
+        
+        subtask = self.subtasks.pop(position)
+        self._subtask_index.removed(self.subtasks, subtask_id, position)
+        if subtask.order == self._max_subtask_order:
+            self._max_subtask_order = None  # Recomputed on next use
         
-        return False
+        self.touch()
+        return True
+    
+    def move_subtask(self, subtask_id: str, after_id: Optional[str] = None) -> bool:
+        """
+        Move a subtask to just after another one, or to the front.
+        
+        The moved subtask gets a rank key between its new neighbors, so
+        no other subtask changes. When the key grows too long, the ranks
+        of all subtasks are respread instead.
+        
+        Args:
+            subtask_id: ID of the subtask to move
+            after_id: ID of the subtask to place it after, or None to
+                move it to the front
+        
+        Returns:
+            bool: True if subtask was found and moved, False otherwise
+        
+        Raises:
+            ValueError: If after_id is the moved subtask or is not found
+        """
+        position = self._subtask_position(subtask_id)
+        if position is None:
+            return False
+        
+        if after_id == subtask_id:
+            raise ValueError("Cannot move a subtask after itself")
+        if after_id is not None and self._subtask_position(after_id) is None:
+            raise ValueError(f"Subtask not found: {after_id}")
+        
+        if any(s.rank is None for s in self.subtasks):
+            self._spread_subtask_ranks()
+        
+        subtask = self.subtasks.pop(position).model_copy()
+        self._subtask_index.removed(self.subtasks, subtask_id, position)
+        target = 0 if after_id is None else self._subtask_position(after_id) + 1
+        
+        subtask.rank = self._rank_at(target)
+        subtask.updated_at = datetime.utcnow()
+        
+        self.subtasks.insert(target, subtask)
+        self._subtask_index.shifted(self.subtasks, target, len(self.subtasks))
+        if len(subtask.rank) > MAX_RANK_LENGTH:
+            self._spread_subtask_ranks()
+        
+        self.touch()
+        return True
+    
+    def _rank_at(self, position: int) -> str:
+        """Get a rank for a subtask about to be inserted at a position."""
+        for _ in range(2):
+            before = self.subtasks[position - 1].rank if position > 0 else None
+            after = self.subtasks[position].rank if position < len(self.subtasks) else None
+            try:
+                return rank_between(before, after)
+            except ValueError:
+                # Ranks set outside these methods are out of order; respread them
+                self._spread_subtask_ranks()
+        raise ValueError("Subtask ranks could not be rebalanced")
+    
+    def _spread_subtask_ranks(self) -> None:
+        """Give the subtasks evenly spaced ranks, keeping their order."""
+        self.subtasks[:] = [
+            subtask.model_copy(update={"rank": rank})
+            for subtask, rank in zip(self.subtasks, spread_ranks(len(self.subtasks)))
+        ]
+    
+    def _subtask_position(self, subtask_id: str) -> Optional[int]:
+        """Find the position of a subtask through the subtask index."""
+        index = self._subtask_index
+        if index is None:
+            index = self._subtask_index = _PositionIndex(self.subtasks)
+        return index.find(self.subtasks, subtask_id)
+    
+    def _append_subtask(self, subtask: Subtask) -> None:
+        """Append a subtask, placing it after the others if it has no order."""
+        if self._subtask_index is None:
+            self._subtask_index = _PositionIndex(self.subtasks)
+        
+        max_order = self._max_subtask_order
+        if max_order is None:
+            max_order = max((s.order for s in self.subtasks), default=0)
+        
+        # Set order to end of list if not specified
+        if subtask.order == 0 and self.subtasks:
+            subtask.order = max_order + 1
+        
+        # Rank it after the last subtask; unranked lists are ranked on first move
+        if not self.subtasks or self.subtasks[-1].rank is not None:
+            subtask.rank = rank_after(self.subtasks[-1].rank if self.subtasks else None)
+        
+        self.subtasks.append(subtask)
+        self._subtask_index.appended(self.subtasks)
+        self._max_subtask_order = max(max_order, subtask.order)
+        if len(subtask.rank or "") > MAX_RANK_LENGTH:
+            self._spread_subtask_ranks()
     
     def add_requirement_ref(self, req_ref: RequirementRef) -> None:
         """
@@ -170,8 +511,24 @@ class Task(TektonBaseModel):
         Args:
             req_ref: Requirement reference to add
         """
+        index = self._requirement_ref_index
         self.requirement_refs.append(req_ref)
-        self.updated_at = datetime.utcnow()
+        if index is not None:
+            index.appended(self.requirement_refs)
+        self.touch()
+    
+    def get_requirement_ref(self, ref_id: str) -> Optional[RequirementRef]:
+        """
+        Get a requirement reference by ID.
+        
+        Args:
+            ref_id: ID of the requirement reference
+        
+        Returns:
+            Optional[RequirementRef]: Reference if found, None otherwise
+        """
+        position = self._requirement_ref_position(ref_id)
+        return self.requirement_refs[position] if position is not None else None
     
     def update_requirement_ref(self, ref_id: str, updates: Dict[str, Any]) -> bool:
         """
@@ -180,18 +537,19 @@ class Task(TektonBaseModel):
         Args:
             ref_id: ID of the requirement reference to update
             updates: Dictionary of field updates
-            
+        
         Returns:
             bool: True if reference was found and updated, False otherwise
         """
-        for i, ref in enumerate(self.requirement_refs):
-            if ref.id == ref_id:
-                ref.update(updates)
-                self.requirement_refs[i] = ref
-                self.updated_at = datetime.utcnow()
-                return True
+        position = self._requirement_ref_position(ref_id)
+        if position is None:
+            return False
         
-        return False
+        ref = self.requirement_refs[position].model_copy()
+        ref.update(updates)
+        self.requirement_refs[position] = ref
+        self.touch()
+        return True
     
     def remove_requirement_ref(self, ref_id: str) -> bool:
         """
@@ -199,17 +557,25 @@ class Task(TektonBaseModel):
         
         Args:
             ref_id: ID of the requirement reference to remove
-            
+        
         Returns:
             bool: True if reference was found and removed, False otherwise
         """
-        for i, ref in enumerate(self.requirement_refs):
-            if ref.id == ref_id:
-                self.requirement_refs.pop(i)
-                self.updated_at = datetime.utcnow()
-                return True
+        position = self._requirement_ref_position(ref_id)
+        if position is None:
+            return False
         
-        return False
+        self.requirement_refs.pop(position)
+        self._requirement_ref_index.removed(self.requirement_refs, ref_id, position)
+        self.touch()
+        return True
+    
+    def _requirement_ref_position(self, ref_id: str) -> Optional[int]:
+        """Find the position of a requirement reference through its index."""
+        index = self._requirement_ref_index
+        if index is None:
+            index = self._requirement_ref_index = _PositionIndex(self.requirement_refs)
+        return index.find(self.requirement_refs, ref_id)
     
     def has_dependency(self, task_id: str) -> bool:
         """
@@ -217,7 +583,7 @@ class Task(TektonBaseModel):
         
         Args:
             task_id: ID of the dependency task to check
-            
+        
         Returns:
             bool: True if task has this dependency, False otherwise
         """
@@ -229,7 +595,7 @@ class Task(TektonBaseModel):
         
         Args:
             task_id: ID of the task to depend on
-            
+        
         Returns:
             bool: True if dependency was added, False if it already existed
         """
@@ -237,7 +603,7 @@ class Task(TektonBaseModel):
             return False
         
         self.dependencies.append(task_id)
-        self.updated_at = datetime.utcnow()
+        self.touch()
         return True
     
     def remove_dependency(self, task_id: str) -> bool:
@@ -246,7 +612,7 @@ class Task(TektonBaseModel):
         
         Args:
             task_id: ID of the dependency to remove
-            
+        
         Returns:
             bool: True if dependency was removed, False if it wasn't found
         """
@@ -254,7 +620,7 @@ class Task(TektonBaseModel):
             return False
         
         self.dependencies.remove(task_id)
-        self.updated_at = datetime.utcnow()
+        self.touch()
         return True
     
     def get_progress(self) -> float:
@@ -277,4 +643,9 @@ class Task(TektonBaseModel):
         
         # With subtasks, calculate progress based on completed subtasks
         completed = sum(1 for s in self.subtasks if s.status == TaskStatus.DONE.value)
-        return (completed / len(self.subtasks)) * 100.0
\ No newline at end of file
+        return (completed / len(self.subtasks)) * 100.0
+
+
+def _encode_task(task: Task) -> str:
+    """Encode a task as compact JSON."""
+    return json.dumps(task.dict(), default=str, separators=(",", ":"))
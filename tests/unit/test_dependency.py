@@ -0,0 +1,156 @@
+"""
+Unit tests for Metis dependency resolution
+
+This module contains tests for the DependencyResolver, which orders
+tasks by their dependencies, detects cycles and finds the critical path,
+and for the incrementally maintained schedule behind the critical path
+cache.
+"""
+
+import random
+
+import pytest
+
+from metis.core.dependency import DependencyResolver
+from metis.core.critical_path import _Schedule
+from metis.models.task import Task
+from metis.models.complexity import ComplexityScore
+
+
+def make_task(task_id: str, *dependencies: str, **kwargs) -> Task:
+    """Create a task with the given ID and dependency IDs."""
+    return Task(id=task_id, title=task_id, description=task_id, dependencies=list(dependencies), **kwargs)
+
+
+class TestDependencyResolver:
+    """Tests for the DependencyResolver class."""
+    
+    def test_execution_order_puts_dependencies_first(self):
+        """Test that every task comes after the tasks it depends on."""
+        tasks = [
+            make_task("deploy", "test", "build"),
+            make_task("test", "build"),
+            make_task("build", "design", "external"),
+            make_task("design"),
+        ]
+        order = DependencyResolver.get_execution_order(tasks)
+        assert order == ["design", "build", "test", "deploy"]
+    
+    def test_cycle_is_reported(self):
+        """Test that a cycle is reported with the tasks along it."""
+        tasks = [make_task("a", "c"), make_task("b", "a"), make_task("c", "b"), make_task("d", "c")]
+        with pytest.raises(ValueError, match="Cyclic dependency detected: a -> c -> b -> a"):
+            DependencyResolver.get_execution_order(tasks)
+        
+        issues = DependencyResolver.check_dependency_issues(tasks + [make_task("e", "missing")])
+        assert [issue["type"] for issue in issues] == ["missing_dependency", "circular_dependency"]
+        
+        with pytest.raises(ValueError, match="x -> x"):
+            DependencyResolver.get_critical_path([make_task("x", "x")])
+    
+    def test_analysis_reports_every_cycle(self):
+        """Test that all cycle groups and missing dependencies are reported at once."""
+        tasks = [
+            make_task("a", "b"), make_task("b", "a", "missing"),
+            make_task("c", "d"), make_task("d", "e"), make_task("e", "c", "d"),
+            make_task("f", "f"),
+            make_task("g", "a", "c", "gone"),
+        ]
+        analysis = DependencyResolver.analyze_dependencies(tasks)
+        
+        assert [cycle["task_ids"] for cycle in analysis["cycles"]] == [["a", "b"], ["c", "d", "e"], ["f"]]
+        assert analysis["missing_dependencies"] == [
+            {"task_id": "b", "dependency_id": "missing"},
+            {"task_id": "g", "dependency_id": "gone"},
+        ]
+        
+        # Removing the suggested dependencies leaves no cycle
+        removed = {
+            (edge["task_id"], edge["dependency_id"])
+            for cycle in analysis["cycles"] for edge in cycle["edges_to_remove"]
+        }
+        assert len(removed) == 4
+        for task in tasks:
+            task.dependencies = [dep_id for dep_id in task.dependencies if (task.id, dep_id) not in removed]
+        assert DependencyResolver.analyze_dependencies(tasks)["cycles"] == []
+        DependencyResolver.get_execution_order(tasks)
+        
+        issues = DependencyResolver.check_dependency_issues([make_task("x", "y"), make_task("y", "x")])
+        assert issues[0]["task_ids"] == ["x", "y"]
+    
+    def test_deep_chain(self):
+        """Test that chains deeper than the recursion limit are handled."""
+        depth = 20000
+        tasks = [make_task("t0")] + [make_task(f"t{i}", f"t{i - 1}") for i in range(1, depth)]
+        order = DependencyResolver.get_execution_order(list(reversed(tasks)))
+        assert order[0] == "t0" and order[-1] == f"t{depth - 1}"
+        assert len(DependencyResolver.get_critical_path(tasks)) == depth
+        
+        tasks[0].dependencies = [f"t{depth - 1}"]
+        with pytest.raises(ValueError):
+            DependencyResolver.get_execution_order(tasks)
+        assert len(DependencyResolver.analyze_dependencies(tasks)["cycles"][0]["task_ids"]) == depth
+    
+    def test_critical_path(self):
+        """Test that the critical path follows the longest chain."""
+        tasks = [
+            make_task("start"),
+            make_task("slow", "start", complexity=ComplexityScore(overall_score=8)),
+            make_task("fast", "start", complexity=ComplexityScore(overall_score=1)),
+            make_task("finish", "slow", "fast"),
+        ]
+        assert DependencyResolver.get_critical_path(tasks) == ["start", "slow", "finish"]
+
+
+class TestSchedule:
+    """Tests for the incrementally maintained schedule."""
+    
+    def test_incremental_updates_match_full_recomputation(self):
+        """Test that random edits give the same result as computing from scratch."""
+        rng = random.Random(7)
+        tasks = {}
+        schedule = _Schedule()
+        schedule.build([])
+        
+        for step in range(400):
+            ids = sorted(tasks)
+            action = rng.random()
+            if action < 0.15 and ids:
+                task_id = rng.choice(ids)
+                del tasks[task_id]
+                schedule.remove(task_id)
+            else:
+                # Only depend on lower IDs to stay acyclic; removed IDs dangle
+                task_id = f"t{rng.randrange(60):02d}"
+                candidates = [f"t{i:02d}" for i in range(int(task_id[1:]))]
+                dependencies = rng.sample(candidates, min(len(candidates), rng.randrange(4)))
+                task = make_task(task_id, *dependencies, complexity=ComplexityScore(overall_score=rng.randint(1, 9)))
+                tasks[task_id] = task
+                schedule.put(task)
+            
+            expected = _Schedule()
+            expected.build(list(tasks.values()))
+            result = schedule.result()
+            assert result["slack"] == expected.result()["slack"]
+            assert result["project_duration"] == expected.project_duration()
+            assert set(result["critical_path"]) == set(DependencyResolver.get_critical_path(list(tasks.values())))
+    
+    def test_unchanged_schedule_fields_are_ignored(self):
+        """Test that edits that don't affect scheduling keep the cached result."""
+        schedule = _Schedule()
+        schedule.build([make_task("a"), make_task("b", "a")])
+        result = schedule.result()
+        assert result == {"critical_path": ["a", "b"], "project_duration": 6, "slack": {"a": 0, "b": 0}}
+        
+        assert not schedule.put(make_task("b", "a", assignee="someone"))
+        assert schedule.result() is result
+    
+    def test_cycle_is_rejected(self):
+        """Test that closing a cycle raises, both incrementally and from scratch."""
+        schedule = _Schedule()
+        schedule.build([make_task("a"), make_task("b", "a")])
+        with pytest.raises(ValueError):
+            schedule.put(make_task("a", "b"))
+        
+        with pytest.raises(ValueError, match="a -> b -> a"):
+            _Schedule().build([make_task("a", "b"), make_task("b", "a")])
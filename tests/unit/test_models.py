@@ -5,6 +5,7 @@ This module contains tests for the data models used in Metis,
 including Task, Dependency, Subtask, and ComplexityScore.
 """
 
+import json
 import pytest
 from datetime import datetime, timedelta
 from uuid import uuid4
@@ -13,6 +14,7 @@ from metis.models.task import Task
 from metis.models.dependency import Dependency, DependencyManager
 from metis.models.subtask import Subtask, SubtaskTemplate
 from metis.models.requirement import RequirementRef
+from metis.models.rank import MAX_RANK_LENGTH
 from metis.models.complexity import ComplexityFactor, ComplexityScore, ComplexityTemplate
 from metis.models.enums import TaskStatus, Priority, ComplexityLevel
 
@@ -161,6 +163,97 @@ class TestTaskModel:
         success = task.remove_subtask("non-existent-id")
         assert not success
     
+    def test_task_subtask_indexes(self):
+        """Test that ID lookups and ordering stay correct as subtasks change."""
+        task = Task(title="Epic", description="Generated epic")
+        subtasks = [Subtask(title=f"Step {i}") for i in range(5)]
+        task.add_subtasks(subtasks)
+        assert [s.order for s in task.subtasks] == [0, 1, 2, 3, 4]
+        
+        assert task.remove_subtask(subtasks[1].id)
+        assert task.get_subtask(subtasks[3].id) is subtasks[3]
+        assert task.update_subtask(subtasks[4].id, {"title": "Last step"})
+        assert task.subtasks[-1].title == "Last step"
+        
+        # Removing the highest order lets the next subtask reuse it
+        assert task.remove_subtask(subtasks[4].id)
+        task.add_subtask(Subtask(title="New"))
+        assert task.subtasks[-1].order == 4
+        
+        # Replaced or directly changed lists are picked up
+        task.subtasks = [Subtask(title="Only", order=7)]
+        task.subtasks.append(Subtask(title="Appended"))
+        assert task.get_subtask(task.subtasks[-1].id).title == "Appended"
+        task.add_subtask(Subtask(title="After"))
+        assert task.subtasks[-1].order == 8
+        assert task.get_subtask("missing") is None
+        
+        # Copies keep their own indexes
+        copy = task.model_copy(deep=True)
+        assert copy.remove_subtask(copy.subtasks[0].id)
+        assert task.get_subtask(task.subtasks[0].id).title == "Only"
+        
+        ref = RequirementRef(requirement_id="req-1", source="telos", requirement_type="functional", title="Req")
+        task.add_requirement_ref(ref)
+        assert task.get_requirement_ref(ref.id) is ref
+        assert task.update_requirement_ref(ref.id, {"title": "Renamed"})
+        assert task.remove_requirement_ref(ref.id)
+        assert task.get_requirement_ref(ref.id) is None
+    
+    def test_edit_copy_leaves_original_unchanged(self):
+        """Test that editing a copy replaces only the items it changes."""
+        task = Task(title="Epic", description="Generated epic")
+        task.add_subtasks([Subtask(title=f"Step {i}") for i in range(4)])
+        ref = RequirementRef(requirement_id="req-1", source="telos", requirement_type="functional", title="Req")
+        task.add_requirement_ref(ref)
+        original = list(task.subtasks)
+        
+        copy = task.edit_copy()
+        assert copy.update_subtask(original[1].id, {"title": "Changed"})
+        assert copy.move_subtask(original[3].id)
+        assert copy.update_requirement_ref(ref.id, {"title": "Changed"})
+        copy.add_subtask(Subtask(title="Extra"))
+        
+        assert task.subtasks == original
+        assert [s.title for s in task.subtasks] == ["Step 0", "Step 1", "Step 2", "Step 3"]
+        assert task.requirement_refs[0] is ref and ref.title == "Req"
+        assert [s.title for s in copy.subtasks] == ["Step 3", "Step 0", "Changed", "Step 2", "Extra"]
+        assert copy.get_subtask(original[0].id) is original[0]
+        assert copy.get_requirement_ref(ref.id).title == "Changed"
+    
+    def test_move_subtask(self):
+        """Test that moving a subtask only changes that subtask's rank."""
+        task = Task(title="Epic", description="Generated epic")
+        subtasks = [Subtask(title=f"Step {i}") for i in range(4)]
+        task.add_subtasks(subtasks)
+        ranks = [s.rank for s in task.subtasks]
+        assert ranks == sorted(ranks)
+        
+        assert task.move_subtask(subtasks[3].id, after_id=subtasks[0].id)
+        assert [s.title for s in task.subtasks] == ["Step 0", "Step 3", "Step 1", "Step 2"]
+        assert [s.rank for s in task.subtasks if s.id != subtasks[3].id] == [ranks[0], ranks[1], ranks[2]]
+        assert task.get_subtask(subtasks[2].id) is subtasks[2]
+        
+        assert task.move_subtask(subtasks[2].id)
+        assert task.subtasks[0].id == subtasks[2].id
+        assert not task.move_subtask("missing")
+        with pytest.raises(ValueError):
+            task.move_subtask(subtasks[0].id, after_id=subtasks[0].id)
+        
+        # Repeated moves into the same gap respread the ranks once keys get long
+        for _ in range(200):
+            assert task.move_subtask(subtasks[1].id, after_id=subtasks[2].id)
+            assert task.move_subtask(subtasks[0].id, after_id=subtasks[2].id)
+        assert max(len(s.rank) for s in task.subtasks) <= MAX_RANK_LENGTH
+        ranks = [s.rank for s in task.subtasks]
+        assert ranks == sorted(ranks) and len(set(ranks)) == 4
+        
+        # Subtasks without ranks are ranked on their first move
+        task.subtasks = [Subtask(title="A"), Subtask(title="B")]
+        assert task.move_subtask(task.subtasks[1].id)
+        assert [s.title for s in task.subtasks] == ["B", "A"]
+        assert task.subtasks[0].rank < task.subtasks[1].rank
+    
     def test_task_progress(self):
         """Test calculating task progress."""
         task = Task(
@@ -195,6 +288,31 @@ class TestTaskModel:
         # Only 1 of 3 subtasks is done, so progress should be ~33.33%
         expected = 100.0 / 3  # = 33.33%
         assert abs(task.get_progress() - expected) < 0.001  # Check with tolerance
+    
+    def test_task_revision_and_cached_json(self):
+        """Test that modifications bump the revision and refresh the cached encoding."""
+        task = Task(title="Test Task", description="This is a test task")
+        encoded = task.to_json()
+        assert task.to_json() is encoded
+        assert json.loads(encoded)["title"] == "Test Task"
+        
+        # Unmodified copies share the cached encoding
+        assert task.model_copy(deep=True).to_json() is encoded
+        
+        revision = task.revision
+        task.update({"title": "Renamed"})
+        assert task.revision > revision
+        assert json.loads(task.to_json())["title"] == "Renamed"
+        
+        revision = task.revision
+        task.add_subtask(Subtask(title="Subtask 1"))
+        assert task.revision > revision
+        assert len(json.loads(task.to_json())["subtasks"]) == 1
+        
+        copy = task.model_copy(update={"tags": ["api"]})
+        assert copy.revision > task.revision
+        assert json.loads(copy.to_json())["tags"] == ["api"]
+        assert json.loads(task.to_json())["tags"] == []
 
 
 class TestSubtaskModel:
@@ -0,0 +1,235 @@
+"""
+Unit tests for Metis persistence
+
+This module contains tests for the write-ahead journal, for recovering
+storage state from a snapshot plus journal, and for the background
+snapshot writer.
+"""
+
+import json
+import asyncio
+import pytest
+
+from metis.core.persistence import TaskJournal, SnapshotWriter
+from metis.core.storage import InMemoryStorage
+from metis.core.task_manager import TaskManager
+from metis.models.task import Task
+from metis.models.dependency import Dependency
+from metis.models.enums import TaskStatus
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    """Path of a journal file in a temporary directory."""
+    return str(tmp_path / "metis.journal")
+
+
+def make_task(**kwargs) -> Task:
+    """Create a task with default title and description."""
+    kwargs.setdefault("title", "Test Task")
+    kwargs.setdefault("description", "This is a test task")
+    return Task(**kwargs)
+
+
+class TestTaskJournal:
+    """Tests for the TaskJournal class."""
+    
+    def test_append_and_replay(self, journal_path):
+        """Test that records are replayed in write order."""
+        journal = TaskJournal(journal_path, compact_threshold=2)
+        journal.append("delete_task", {"id": "a"})
+        assert not journal.needs_compaction()
+        journal.append("delete_task", {"id": "b"})
+        assert journal.needs_compaction()
+        journal.close()
+        
+        reopened = TaskJournal(journal_path)
+        assert reopened.record_count == 2
+        assert list(reopened.replay()) == [("delete_task", {"id": "a"}), ("delete_task", {"id": "b"})]
+        
+        reopened.reset()
+        assert reopened.record_count == 0
+        assert list(reopened.replay()) == []
+    
+    def test_torn_record_ignored(self, journal_path):
+        """Test that a partially written final record is skipped."""
+        journal = TaskJournal(journal_path)
+        journal.append("delete_task", {"id": "a"})
+        journal.close()
+        
+        with open(journal_path, "a") as f:
+            f.write('{"op": "delete_task", "da')
+        
+        assert list(TaskJournal(journal_path).replay()) == [("delete_task", {"id": "a"})]
+
+
+class TestJournalRecovery:
+    """Tests for recovering InMemoryStorage from a snapshot and journal."""
+    
+    def test_replay_restores_state(self, journal_path):
+        """Test that replaying the journal reproduces every mutation."""
+        storage = InMemoryStorage()
+        storage.attach_journal(TaskJournal(journal_path))
+        
+        source = storage.create_task(make_task(title="Source", tags=["api"]))
+        target = storage.create_task(make_task(title="Target"))
+        doomed = storage.create_task(make_task(title="Doomed"))
+        storage.update_task(source.id, {"status": TaskStatus.IN_PROGRESS.value})
+        storage.create_dependency(Dependency(source_task_id=source.id, target_task_id=target.id))
+        storage.delete_task(doomed.id)
+        
+        recovered = InMemoryStorage()
+        assert recovered.replay_journal(TaskJournal(journal_path)) > 0
+        
+        assert recovered.get_task(doomed.id) is None
+        assert recovered.get_task(source.id).status == TaskStatus.IN_PROGRESS.value
+        assert recovered.get_task(target.id).dependencies == [source.id]
+        assert len(recovered.list_dependencies(task_id=source.id)) == 1
+        assert recovered.list_tasks(tag="api")[1] == 1
+        assert [t.id for t in recovered.list_dependent_tasks(source.id)] == [target.id]
+    
+    def test_compaction(self, journal_path, tmp_path):
+        """Test that compaction writes a snapshot and truncates the journal."""
+        snapshot_path = str(tmp_path / "metis_data.json")
+        journal = TaskJournal(journal_path)
+        storage = InMemoryStorage()
+        storage.attach_journal(journal)
+        
+        first = storage.create_task(make_task(title="First"))
+        assert storage.compact_journal(snapshot_path)
+        assert journal.record_count == 0
+        second = storage.create_task(make_task(title="Second"))
+        
+        recovered = InMemoryStorage()
+        assert recovered.load_from_file(snapshot_path)
+        recovered.replay_journal(TaskJournal(journal_path))
+        
+        assert recovered.get_task(first.id).title == "First"
+        assert recovered.get_task(second.id).title == "Second"
+    
+    @pytest.mark.asyncio
+    async def test_task_manager_journal_mode(self, tmp_path, monkeypatch):
+        """Test that TaskManager recovers journaled mutations on startup."""
+        monkeypatch.setenv("METIS_PERSISTENCE_MODE", "journal")
+        monkeypatch.setenv("METIS_BACKUP_PATH", str(tmp_path / "metis_data.json"))
+        monkeypatch.setenv("METIS_JOURNAL_COMPACT_THRESHOLD", "3")
+        
+        manager = TaskManager(InMemoryStorage())
+        tasks = [
+            await manager.create_task({"title": f"Task {i}", "description": "Journaled"})
+            for i in range(5)
+        ]
+        
+        # Compaction ran once the threshold was reached
+        assert (tmp_path / "metis_data.json").exists()
+        assert manager.journal.record_count < 3
+        manager.journal.close()
+        
+        restarted = TaskManager(InMemoryStorage())
+        assert restarted.storage.list_tasks()[1] == 5
+        assert restarted.storage.get_task(tasks[-1].id).title == "Task 4"
+        restarted.journal.close()
+
+
+class CountingStorage(InMemoryStorage):
+    """InMemoryStorage that counts snapshot writes."""
+    
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.saves = 0
+        self.fail = fail
+    
+    def save_to_file(self, filepath: str, snapshot_format: str = "json") -> bool:
+        self.saves += 1
+        if self.fail:
+            return False
+        return super().save_to_file(filepath, snapshot_format)
+
+
+async def wait_for_flushes(writer, count, timeout=2.0):
+    """Wait until the writer has completed a number of flushes."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while writer.flush_count < count:
+        assert asyncio.get_running_loop().time() < deadline, "flush did not happen"
+        await asyncio.sleep(0.01)
+
+
+class TestSnapshotWriter:
+    """Tests for the background SnapshotWriter."""
+    
+    @pytest.mark.asyncio
+    async def test_coalesces_until_max_changes(self, tmp_path):
+        """Test that bursts of changes are written once."""
+        storage = CountingStorage()
+        writer = SnapshotWriter(storage, str(tmp_path / "snapshot.json"), interval=60, max_changes=3)
+        
+        storage.create_task(make_task())
+        writer.mark_dirty()
+        writer.mark_dirty()
+        await asyncio.sleep(0.05)
+        assert storage.saves == 0
+        assert writer.get_status()["pending_changes"] == 2
+        assert writer.lag > 0
+        
+        writer.mark_dirty()
+        await wait_for_flushes(writer, 1)
+        assert storage.saves == 1
+        assert writer.pending_changes == 0
+        assert writer.get_status()["last_flush"] is not None
+        
+        with open(tmp_path / "snapshot.json") as f:
+            assert len(json.load(f)["tasks"]) == 1
+        
+        await writer.stop()
+        assert storage.saves == 1
+    
+    @pytest.mark.asyncio
+    async def test_interval_flush_and_stop(self, tmp_path):
+        """Test that pending changes are flushed after the interval and on stop."""
+        storage = CountingStorage()
+        writer = SnapshotWriter(storage, str(tmp_path / "snapshot.json"), interval=0.05, max_changes=100)
+        
+        writer.mark_dirty()
+        await wait_for_flushes(writer, 1)
+        
+        writer.mark_dirty()
+        await writer.stop()
+        assert writer.flush_count == 2
+        assert writer.pending_changes == 0
+    
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_changes_pending(self, tmp_path):
+        """Test that a failed write is retried later."""
+        storage = CountingStorage(fail=True)
+        writer = SnapshotWriter(storage, str(tmp_path / "snapshot.json"), interval=60, max_changes=100)
+        
+        writer.mark_dirty()
+        assert not await writer.flush()
+        assert writer.pending_changes == 1
+        assert writer.get_status()["last_error"]
+        
+        storage.fail = False
+        assert await writer.flush()
+        assert writer.pending_changes == 0
+        await writer.stop()
+    
+    @pytest.mark.asyncio
+    async def test_task_manager_background_mode(self, tmp_path, monkeypatch):
+        """Test that TaskManager writes the backup in the background by default."""
+        backup_path = tmp_path / "metis_data.json"
+        monkeypatch.delenv("METIS_PERSISTENCE_MODE", raising=False)
+        monkeypatch.setenv("METIS_BACKUP_PATH", str(backup_path))
+        monkeypatch.setenv("METIS_SNAPSHOT_INTERVAL", "60")
+        
+        storage = CountingStorage()
+        manager = TaskManager(storage)
+        for i in range(5):
+            await manager.create_task({"title": f"Task {i}", "description": "Buffered"})
+        
+        assert storage.saves == 0
+        assert manager.get_persistence_status()["pending_changes"] == 5
+        
+        await manager.close()
+        assert storage.saves == 1
+        with open(backup_path) as f:
+            assert len(json.load(f)["tasks"]) == 5
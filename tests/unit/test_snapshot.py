@@ -0,0 +1,152 @@
+"""
+Unit tests for the Metis binary snapshot format
+
+This module contains tests for writing and reading binary snapshots and
+for the trusted model construction used when restoring them.
+"""
+
+import pickle
+import pytest
+from datetime import datetime, timezone
+
+from metis.core.snapshot import (
+    MAGIC, construct_model, is_binary_snapshot, read_snapshot, write_snapshot
+)
+from metis.core.storage import InMemoryStorage, SQLiteStorage
+from metis.models.task import Task
+from metis.models.dependency import Dependency
+from metis.models.subtask import Subtask
+from metis.models.requirement import RequirementRef
+from metis.models.complexity import ComplexityScore, ComplexityFactor
+from metis.models.enums import TaskStatus
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    """Path of a snapshot file in a temporary directory."""
+    return str(tmp_path / "metis.snap")
+
+
+def make_full_task(**kwargs) -> Task:
+    """Create a task with every kind of nested model populated."""
+    return Task(
+        title=kwargs.pop("title", "Full Task"),
+        description="A task with nested models",
+        tags=["api"],
+        due_date=datetime(2030, 1, 1, tzinfo=timezone.utc),
+        complexity=ComplexityScore(factors=[ComplexityFactor(name="Size", description="Code size")]),
+        subtasks=[Subtask(title="Step", complexity=ComplexityScore())],
+        requirement_refs=[RequirementRef(requirement_id="req-1", requirement_type="functional", title="Req")],
+        **kwargs
+    )
+
+
+class TestBinarySnapshot:
+    """Tests for the binary snapshot format."""
+    
+    def test_round_trip(self, snapshot_path):
+        """Test that restored models equal the originals."""
+        base = make_full_task(title="Base")
+        child = make_full_task(title="Child", dependencies=[base.id])
+        dependency = Dependency(source_task_id=base.id, target_task_id=child.id)
+        
+        write_snapshot(snapshot_path, [base, child], [dependency])
+        assert is_binary_snapshot(snapshot_path)
+        
+        tasks, dependencies = read_snapshot(snapshot_path)
+        assert tasks == [base, child]
+        assert dependencies == [dependency]
+        
+        restored = tasks[0]
+        assert isinstance(restored.subtasks[0], Subtask)
+        assert isinstance(restored.complexity.factors[0], ComplexityFactor)
+        assert restored.complexity.factors[0].calculate_weighted_score() == 3.0
+        assert restored.dict() == base.dict()
+        
+        # Restored models behave like validated ones
+        restored.update({"status": TaskStatus.IN_PROGRESS.value})
+        assert restored.status == TaskStatus.IN_PROGRESS.value
+    
+    def test_many_blocks(self, snapshot_path, monkeypatch):
+        """Test that records spanning several blocks are all restored."""
+        monkeypatch.setattr("metis.core.snapshot.RECORDS_PER_BLOCK", 3)
+        tasks = [Task(title=f"Task {i}", description="Blocked") for i in range(10)]
+        
+        write_snapshot(snapshot_path, tasks, [])
+        
+        assert [t.id for t in read_snapshot(snapshot_path)[0]] == [t.id for t in tasks]
+    
+    def test_rejects_damaged_files(self, snapshot_path):
+        """Test that truncated or corrupted snapshots are rejected."""
+        write_snapshot(snapshot_path, [Task(title="Task", description="Damaged")], [])
+        with open(snapshot_path, "rb") as f:
+            data = f.read()
+        
+        with open(snapshot_path, "wb") as f:
+            f.write(data[:-4])
+        with pytest.raises(ValueError):
+            read_snapshot(snapshot_path)
+        
+        corrupted = bytearray(data)
+        corrupted[-20] ^= 0xFF
+        with open(snapshot_path, "wb") as f:
+            f.write(bytes(corrupted))
+        with pytest.raises(ValueError):
+            read_snapshot(snapshot_path)
+        
+        with open(snapshot_path, "wb") as f:
+            f.write(MAGIC + b"\xff\xff")
+        with pytest.raises(ValueError):
+            read_snapshot(snapshot_path)
+    
+    def test_rejects_foreign_classes(self, snapshot_path, monkeypatch):
+        """Test that payloads referencing arbitrary classes are refused."""
+        class Evil:
+            def __reduce__(self):
+                return (print, ("executed",))
+        
+        monkeypatch.setattr("metis.models.task.Task.dict", lambda self: {"evil": Evil()})
+        write_snapshot(snapshot_path, [Task(title="Task", description="Evil")], [])
+        monkeypatch.undo()
+        
+        with pytest.raises(pickle.UnpicklingError):
+            read_snapshot(snapshot_path)
+    
+    def test_missing_fields_get_defaults(self):
+        """Test that records from older schemas are completed with defaults."""
+        task = construct_model(Task, {"id": "t1", "title": "Old", "description": "Old record"})
+        
+        assert task.tags == []
+        assert task.status == TaskStatus.PENDING.value
+        assert isinstance(task.created_at, datetime)
+        
+        # Private state is initialized, so the task tracks modifications
+        task.update({"title": "New"})
+        assert task.revision > 0
+        assert '"title":"New"' in task.to_json()
+    
+    @pytest.mark.parametrize("storage_class", [InMemoryStorage, SQLiteStorage])
+    def test_storage_round_trip(self, storage_class, tmp_path):
+        """Test that storage backends save and load binary snapshots."""
+        def create():
+            return storage_class() if storage_class is InMemoryStorage else storage_class(":memory:")
+        
+        storage = create()
+        base = storage.create_task(make_full_task(title="Base"))
+        child = storage.create_task(make_full_task(title="Child"))
+        storage.create_dependency(Dependency(source_task_id=base.id, target_task_id=child.id))
+        
+        filepath = str(tmp_path / "backup.snap")
+        assert storage.save_to_file(filepath, "binary")
+        
+        restored = create()
+        assert restored.load_from_file(filepath)
+        assert restored.get_task(child.id).dependencies == [base.id]
+        assert restored.list_tasks(tag="api")[1] == 2
+        assert [t.id for t in restored.list_dependent_tasks(base.id)] == [child.id]
+        
+        # JSON snapshots are still detected and loaded
+        json_path = str(tmp_path / "backup.json")
+        assert storage.save_to_file(json_path)
+        assert not is_binary_snapshot(json_path)
+        assert create().load_from_file(json_path)
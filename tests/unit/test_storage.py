@@ -0,0 +1,1471 @@
+"""
+Unit tests for Metis storage
+
+This module contains tests for the InMemoryStorage class, focusing on the
+index structures it maintains alongside the stored tasks and on its
+copy-on-write snapshots, change feed and archive, and for the
+namespace-partitioned and SQLite backends that implement the same interface.
+"""
+
+import base64
+import os
+import pytest
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from metis.core.storage import InMemoryStorage, SQLiteStorage, encode_cursor
+from metis.core.partitions import PartitionedStorage
+from metis.core.task_manager import TaskManager
+from metis.core.archive import TaskArchive
+from metis.core.persistence import TaskJournal
+from metis.models.task import Task
+from metis.models.dependency import Dependency
+from metis.models.subtask import Subtask
+from metis.models.enums import TaskStatus, Priority
+
+
+@pytest.fixture
+def storage():
+    """Create an InMemoryStorage instance for testing."""
+    return InMemoryStorage()
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    """Create an SQLiteStorage instance backed by a temporary database."""
+    storage = SQLiteStorage(str(tmp_path / "tasks.db"))
+    yield storage
+    storage.close()
+
+
+def make_task(**kwargs) -> Task:
+    """Create a task with default title and description."""
+    kwargs.setdefault("title", "Test Task")
+    kwargs.setdefault("description", "This is a test task")
+    return Task(**kwargs)
+
+
+class TestSecondaryIndexes:
+    """Tests for the status, priority, assignee and tag indexes."""
+    
+    def test_filters_intersect(self, storage):
+        """Test that combined filters return the intersection."""
+        storage.create_task(make_task(priority=Priority.HIGH.value, assignee="alice", tags=["api"]))
+        storage.create_task(make_task(priority=Priority.HIGH.value, assignee="bob", tags=["api"]))
+        storage.create_task(make_task(priority=Priority.LOW.value, assignee="alice", tags=["ui"]))
+        
+        tasks, total = storage.list_tasks(priority=Priority.HIGH.value, assignee="alice")
+        assert total == 1
+        assert tasks[0].assignee == "alice"
+        assert tasks[0].priority == Priority.HIGH.value
+        
+        tasks, total = storage.list_tasks(tag="api")
+        assert total == 2
+        
+        tasks, total = storage.list_tasks(tag="missing")
+        assert total == 0
+        assert tasks == []
+    
+    def test_indexes_follow_updates(self, storage):
+        """Test that updates move tasks between index buckets."""
+        task = storage.create_task(make_task(assignee="alice", tags=["api"]))
+        
+        storage.update_task(task.id, {
+            "status": TaskStatus.IN_PROGRESS.value,
+            "assignee": "bob",
+            "tags": ["ui"]
+        })
+        
+        assert storage.list_tasks(status=TaskStatus.PENDING.value)[1] == 0
+        assert storage.list_tasks(status=TaskStatus.IN_PROGRESS.value)[1] == 1
+        assert storage.list_tasks(assignee="alice")[1] == 0
+        assert storage.list_tasks(assignee="bob")[1] == 1
+        assert storage.list_tasks(tag="api")[1] == 0
+        assert storage.list_tasks(tag="ui")[1] == 1
+    
+    def test_indexes_follow_deletes(self, storage):
+        """Test that deleted tasks are removed from the indexes."""
+        task = storage.create_task(make_task(assignee="alice", tags=["api"]))
+        
+        storage.delete_task(task.id)
+        
+        assert storage.list_tasks(assignee="alice")[1] == 0
+        assert storage.list_tasks(tag="api")[1] == 0
+        assert "alice" not in storage._assignee_index
+        assert "api" not in storage._tag_index
+    
+    @pytest.mark.parametrize("backend", ["memory", "partitioned", "sqlite"])
+    def test_create_rejects_existing_id(self, backend, tmp_path):
+        """Test that creating a task with a used ID fails and leaves the stored task indexed."""
+        storage = {
+            "memory": InMemoryStorage,
+            "partitioned": PartitionedStorage,
+            "sqlite": lambda: SQLiteStorage(str(tmp_path / "tasks.db")),
+        }[backend]()
+        storage.create_task(make_task(id="x", assignee="bob"))
+        
+        with pytest.raises(ValueError):
+            storage.create_task(make_task(id="x", status=TaskStatus.DONE.value, assignee="alice"))
+        
+        stats = storage.get_statistics()
+        assert stats["total_tasks"] == 1
+        assert stats["by_status"] == {TaskStatus.PENDING.value: 1}
+        assert storage.list_tasks(assignee="alice")[1] == 0
+        assert storage.get_task("x").assignee == "bob"
+    
+    def test_indexes_rebuilt_on_load(self, storage, tmp_path):
+        """Test that loading from a file rebuilds the indexes."""
+        storage.create_task(make_task(assignee="alice", tags=["api"]))
+        filepath = str(tmp_path / "backup.json")
+        assert storage.save_to_file(filepath)
+        
+        restored = InMemoryStorage()
+        assert restored.load_from_file(filepath)
+        
+        assert restored.list_tasks(assignee="alice")[1] == 1
+        assert restored.list_tasks(tag="api")[1] == 1
+
+
+class TestDependencyAdjacency:
+    """Tests for the forward and reverse dependency adjacency maps."""
+    
+    def test_dependent_lookup(self, storage):
+        """Test listing dependents through the reverse adjacency map."""
+        base = storage.create_task(make_task(title="Base"))
+        child = storage.create_task(make_task(title="Child", dependencies=[base.id]))
+        
+        assert [t.id for t in storage.list_dependent_tasks(base.id)] == [child.id]
+        assert [t.id for t in storage.list_blocking_tasks(child.id)] == [base.id]
+        
+        storage.update_task(child.id, {"dependencies": []})
+        assert storage.list_dependent_tasks(base.id) == []
+    
+    def test_delete_blocked_by_dependents(self, storage):
+        """Test that a task with dependents cannot be deleted."""
+        base = storage.create_task(make_task(title="Base"))
+        storage.create_task(make_task(title="Child", dependencies=[base.id]))
+        
+        with pytest.raises(ValueError):
+            storage.delete_task(base.id)
+    
+    def test_dependency_records_follow_mutations(self, storage):
+        """Test that dependency records are tracked per task and dropped with it."""
+        source = storage.create_task(make_task(title="Source"))
+        target = storage.create_task(make_task(title="Target"))
+        dependency = storage.create_dependency(
+            Dependency(source_task_id=source.id, target_task_id=target.id)
+        )
+        
+        assert [d.id for d in storage.list_dependencies(task_id=source.id)] == [dependency.id]
+        assert [t.id for t in storage.list_dependent_tasks(source.id)] == [target.id]
+        
+        # Removing the edge unblocks deletion of the source task
+        assert storage.delete_dependency(dependency.id)
+        assert storage.list_dependencies(task_id=target.id) == []
+        assert storage.delete_task(source.id)
+    
+    def test_delete_drops_incoming_records(self, storage):
+        """Test that deleting a target task removes its dependency records."""
+        source = storage.create_task(make_task(title="Source"))
+        target = storage.create_task(make_task(title="Target"))
+        storage.create_dependency(Dependency(source_task_id=source.id, target_task_id=target.id))
+        
+        assert storage.delete_task(target.id)
+        
+        assert storage.list_dependencies() == []
+        assert storage.list_dependent_tasks(source.id) == []
+        assert storage.delete_task(source.id)
+
+
+def finish(storage, task_id: str) -> None:
+    """Move a pending task through review to done."""
+    for status in (TaskStatus.IN_PROGRESS, TaskStatus.REVIEW, TaskStatus.DONE):
+        storage.update_task(task_id, {"status": status.value})
+
+
+class TestReadyTasks:
+    """Tests for the maintained set of tasks that can start."""
+    
+    def check_ready_set(self, storage):
+        """Compare the ready index with a scan of every task's dependencies."""
+        tasks = {task.id: task for task in storage.snapshot().tasks.values()}
+        expected = sorted(
+            (
+                task for task in tasks.values()
+                if task.status == TaskStatus.PENDING.value
+                and all(dep_id in tasks and tasks[dep_id].status == TaskStatus.DONE.value for dep_id in task.dependencies)
+            ),
+            key=lambda task: ({"high": 0, "medium": 1, "low": 2}[task.priority], task.created_at, task.id)
+        )
+        assert [t.id for t in storage.list_ready_tasks(limit=len(tasks) + 1)] == [t.id for t in expected]
+    
+    @pytest.mark.parametrize("backend", ["memory", "partitioned", "sqlite"])
+    def test_ready_set_follows_dependencies(self, backend, tmp_path):
+        """Test that tasks become ready when their dependencies are done and not when reopened."""
+        storage = {
+            "memory": InMemoryStorage,
+            "partitioned": PartitionedStorage,
+            "sqlite": lambda: SQLiteStorage(str(tmp_path / "tasks.db")),
+        }[backend]()
+        
+        base = storage.create_task(make_task(title="Base"))
+        child = storage.create_task(make_task(title="Child", dependencies=[base.id], priority=Priority.HIGH.value))
+        low = storage.create_task(make_task(title="Low", priority=Priority.LOW.value))
+        urgent = storage.create_task(make_task(title="Urgent", priority=Priority.HIGH.value))
+        assert [t.id for t in storage.list_ready_tasks()] == [urgent.id, base.id, low.id]
+        assert [t.id for t in storage.list_ready_tasks(limit=1)] == [urgent.id]
+        
+        finish(storage, base.id)
+        assert [t.id for t in storage.list_ready_tasks()] == [child.id, urgent.id, low.id]
+        
+        # Reopening the dependency blocks the dependent again
+        storage.update_task(base.id, {"status": TaskStatus.IN_PROGRESS.value})
+        assert [t.id for t in storage.list_ready_tasks()] == [urgent.id, low.id]
+        
+        # Dependency records add to the target's dependencies
+        dependency = storage.create_dependency(Dependency(source_task_id=urgent.id, target_task_id=low.id))
+        assert [t.id for t in storage.list_ready_tasks()] == [urgent.id]
+        storage.delete_dependency(dependency.id)
+        assert [t.id for t in storage.list_ready_tasks()] == [urgent.id, low.id]
+        assert storage.list_ready_tasks(namespace="other") == []
+    
+    def test_counters_match_full_scan(self, storage, tmp_path):
+        """Test the ready set against a scan after mixed mutations and a reload."""
+        tasks = [storage.create_task(make_task(title=f"Task {i}")) for i in range(6)]
+        for i in range(1, 6):
+            storage.update_task(tasks[i].id, {"dependencies": [tasks[i - 1].id, tasks[0].id]})
+        self.check_ready_set(storage)
+        
+        finish(storage, tasks[0].id)
+        self.check_ready_set(storage)
+        finish(storage, tasks[1].id)
+        storage.update_task(tasks[3].id, {"dependencies": [tasks[1].id]})
+        self.check_ready_set(storage)
+        
+        # Deleting a done dependency's dependent and reopening keep counts right
+        storage.update_task(tasks[5].id, {"dependencies": []})
+        storage.update_task(tasks[4].id, {"dependencies": []})
+        storage.update_task(tasks[0].id, {"status": TaskStatus.IN_PROGRESS.value})
+        self.check_ready_set(storage)
+        
+        filepath = str(tmp_path / "tasks.json")
+        assert storage.save_to_file(filepath)
+        restored = InMemoryStorage()
+        assert restored.load_from_file(filepath)
+        self.check_ready_set(restored)
+        assert [t.id for t in restored.list_ready_tasks()] == [t.id for t in storage.list_ready_tasks()]
+
+
+class TestReachability:
+    """Tests for transitive upstream and downstream queries."""
+    
+    def check_reachability(self, storage):
+        """Compare every task's downstream and upstream tasks with a plain BFS."""
+        tasks = storage.snapshot().tasks
+        dependents = {task_id: [] for task_id in tasks}
+        for task in tasks.values():
+            for dep_id in task.dependencies:
+                if dep_id in dependents:
+                    dependents[dep_id].append(task.id)
+        
+        def bfs(start, neighbors):
+            distances, frontier = {}, [start]
+            while frontier:
+                next_frontier = []
+                for node in frontier:
+                    for neighbor in neighbors(node):
+                        if neighbor != start and neighbor not in distances:
+                            distances[neighbor] = distances.get(node, 0) + 1
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+            return distances
+        
+        for task_id in tasks:
+            downstream = bfs(task_id, dependents.__getitem__)
+            upstream = bfs(task_id, lambda node: [d for d in tasks[node].dependencies if d in tasks])
+            reached, total = storage.list_downstream_tasks(task_id)
+            assert {task.id: depth for task, depth in reached} == downstream
+            assert total == len(downstream)
+            reached, _ = storage.list_upstream_tasks(task_id)
+            assert {task.id: depth for task, depth in reached} == upstream
+            for other_id in tasks:
+                assert storage.get_dependency_distance(task_id, other_id) == downstream.get(other_id)
+    
+    @pytest.mark.parametrize("backend", ["memory", "partitioned", "sqlite"])
+    def test_downstream_and_upstream(self, backend, tmp_path):
+        """Test transitive queries with depth limits, limits and dependency records."""
+        storage = {
+            "memory": InMemoryStorage,
+            "partitioned": PartitionedStorage,
+            "sqlite": lambda: SQLiteStorage(str(tmp_path / "tasks.db")),
+        }[backend]()
+        
+        base = storage.create_task(make_task(title="Base"))
+        middle = storage.create_task(make_task(title="Middle", dependencies=[base.id]))
+        top = storage.create_task(make_task(title="Top", dependencies=[middle.id, base.id]))
+        leaf = storage.create_task(make_task(title="Leaf", dependencies=[top.id]))
+        
+        reached, total = storage.list_downstream_tasks(base.id)
+        assert [depth for _, depth in reached] == [1, 1, 2]
+        assert {task.id: depth for task, depth in reached} == {middle.id: 1, top.id: 1, leaf.id: 2}
+        assert total == 3
+        reached, total = storage.list_downstream_tasks(base.id, max_depth=1)
+        assert {task.id for task, _ in reached} == {middle.id, top.id}
+        reached, total = storage.list_downstream_tasks(base.id, limit=1)
+        assert len(reached) == 1 and reached[0][1] == 1 and total == 3
+        reached, _ = storage.list_upstream_tasks(leaf.id)
+        assert {task.id: depth for task, depth in reached} == {top.id: 1, middle.id: 2, base.id: 2}
+        assert storage.get_dependency_distance(base.id, leaf.id) == 2
+        assert storage.get_dependency_distance(leaf.id, base.id) is None
+        assert storage.list_downstream_tasks("missing") == ([], 0)
+        
+        # Dependency records add and remove links
+        other = storage.create_task(make_task(title="Other"))
+        dependency = storage.create_dependency(Dependency(source_task_id=leaf.id, target_task_id=other.id))
+        assert storage.get_dependency_distance(base.id, other.id) == 3
+        storage.delete_dependency(dependency.id)
+        assert storage.get_dependency_distance(base.id, other.id) is None
+    
+    def test_index_matches_bfs_after_edits(self, storage, tmp_path):
+        """Test the cached index against a BFS through mixed edits and a reload."""
+        tasks = [storage.create_task(make_task(title=f"Task {i}")) for i in range(8)]
+        for i in range(1, 8):
+            storage.update_task(tasks[i].id, {"dependencies": [tasks[(i - 1) // 2].id]})
+        self.check_reachability(storage)
+        
+        # Removing a link splits the tasks into two groups
+        storage.update_task(tasks[2].id, {"dependencies": []})
+        self.check_reachability(storage)
+        storage.update_task(tasks[2].id, {"dependencies": [tasks[4].id, tasks[7].id]})
+        storage.create_dependency(Dependency(source_task_id=tasks[6].id, target_task_id=tasks[3].id))
+        self.check_reachability(storage)
+        assert storage.delete_task(tasks[5].id)
+        self.check_reachability(storage)
+        
+        # A batch may list a task before its dependency
+        waiting = make_task(title="Waiting", dependencies=["later"])
+        storage.create_tasks([waiting, make_task(id="later", title="Later", dependencies=[tasks[0].id])])
+        self.check_reachability(storage)
+        assert storage.get_dependency_distance(tasks[0].id, waiting.id) == 2
+        
+        filepath = str(tmp_path / "tasks.json")
+        assert storage.save_to_file(filepath)
+        restored = InMemoryStorage()
+        assert restored.load_from_file(filepath)
+        self.check_reachability(restored)
+    
+    def test_status_change_keeps_cached_traversals(self, storage):
+        """Test that only dependency changes drop cached traversals."""
+        base = storage.create_task(make_task(title="Base"))
+        child = storage.create_task(make_task(title="Child", dependencies=[base.id]))
+        unrelated = storage.create_task(make_task(title="Unrelated"))
+        other = storage.create_task(make_task(title="Other", dependencies=[unrelated.id]))
+        cached = storage._reachability.descendants(base.id)
+        
+        finish(storage, base.id)
+        storage.update_task(other.id, {"dependencies": []})
+        assert storage._reachability.descendants(base.id) is cached
+        
+        storage.update_task(child.id, {"dependencies": []})
+        assert storage._reachability.descendants(base.id) == {}
+
+
+class TestDependencyCycles:
+    """Tests for incremental cycle detection on dependency records."""
+    
+    def _wire(self, storage, tasks, pairs):
+        """Create dependency records between tasks given as index pairs."""
+        for source, target in pairs:
+            storage.create_dependency(
+                Dependency(source_task_id=tasks[source].id, target_task_id=tasks[target].id)
+            )
+    
+    def test_edges_against_creation_order(self, storage):
+        """Test that edges against creation order are reordered and cycles still rejected."""
+        tasks = [storage.create_task(make_task(title=f"Task {i}")) for i in range(5)]
+        
+        # 4 -> 3 -> 2 -> 1 -> 0 runs against creation order
+        self._wire(storage, tasks, [(4, 3), (3, 2), (2, 1), (1, 0)])
+        order = storage._dependency_order
+        assert [order.position(t.id) for t in reversed(tasks)] == sorted(order.position(t.id) for t in tasks)
+        
+        with pytest.raises(ValueError):
+            self._wire(storage, tasks, [(0, 4)])
+        with pytest.raises(ValueError):
+            self._wire(storage, tasks, [(2, 3)])
+        with pytest.raises(ValueError):
+            self._wire(storage, tasks, [(1, 1)])
+        
+        # Shortcuts along the chain are fine
+        self._wire(storage, tasks, [(4, 0), (3, 1)])
+        assert len(storage.list_dependencies()) == 6
+    
+    def test_cycle_allowed_after_edge_removed(self, storage):
+        """Test that deleting an edge lifts the cycle restriction it caused."""
+        a, b = storage.create_task(make_task(title="A")), storage.create_task(make_task(title="B"))
+        dependency = storage.create_dependency(Dependency(source_task_id=a.id, target_task_id=b.id))
+        
+        with pytest.raises(ValueError):
+            storage.create_dependency(Dependency(source_task_id=b.id, target_task_id=a.id))
+        
+        storage.delete_dependency(dependency.id)
+        storage.create_dependency(Dependency(source_task_id=b.id, target_task_id=a.id))
+    
+    def test_order_rebuilt_on_load(self, storage, tmp_path):
+        """Test that the topological order is recomputed after loading a file."""
+        tasks = [storage.create_task(make_task(title=f"Task {i}")) for i in range(3)]
+        self._wire(storage, tasks, [(2, 1), (1, 0)])
+        filepath = str(tmp_path / "backup.json")
+        storage.save_to_file(filepath)
+        
+        restored = InMemoryStorage()
+        restored.load_from_file(filepath)
+        
+        with pytest.raises(ValueError):
+            self._wire(restored, tasks, [(0, 2)])
+        self._wire(restored, tasks, [(2, 0)])
+
+
+class TestFullTextSearch:
+    """Tests for the inverted index behind the search filter."""
+    
+    def test_multi_term_search(self, storage):
+        """Test that every search term must match."""
+        storage.create_task(make_task(title="Fix login bug", description="Auth fails"))
+        storage.create_task(make_task(title="Login page", description="New design"))
+        storage.create_task(make_task(title="Other", description="Nothing", details="login BUG notes"))
+        
+        tasks, total = storage.list_tasks(search="login bug")
+        assert total == 2
+        assert {t.title for t in tasks} == {"Fix login bug", "Other"}
+        
+        assert storage.list_tasks(search="LOGIN")[1] == 3
+        assert storage.list_tasks(search="login missing")[1] == 0
+    
+    def test_search_follows_updates(self, storage):
+        """Test that the index is updated incrementally."""
+        task = storage.create_task(make_task(title="Alpha"))
+        
+        storage.update_task(task.id, {"title": "Beta"})
+        
+        assert storage.list_tasks(search="alpha")[1] == 0
+        assert storage.list_tasks(search="beta")[1] == 1
+        
+        storage.delete_task(task.id)
+        assert storage.list_tasks(search="beta")[1] == 0
+    
+    def test_relevance_sort(self, storage):
+        """Test ranking search results by relevance."""
+        now = datetime.utcnow()
+        strong = storage.create_task(make_task(
+            title="cache cache cache", description="cache", updated_at=now - timedelta(hours=1)
+        ))
+        weak = storage.create_task(make_task(
+            title="cache", description="a long description about many other things", updated_at=now
+        ))
+        
+        # Default order is newest first
+        tasks, _ = storage.list_tasks(search="cache")
+        assert [t.id for t in tasks] == [weak.id, strong.id]
+        
+        tasks, _ = storage.list_tasks(search="cache", sort="relevance")
+        assert [t.id for t in tasks] == [strong.id, weak.id]
+        
+        with pytest.raises(ValueError):
+            storage.list_tasks(sort="unknown")
+
+
+class TestCursorPagination:
+    """Tests for keyset pagination over the updated_at index."""
+    
+    def _create_tasks(self, storage, count, **kwargs):
+        """Create tasks with strictly increasing updated_at values in the past."""
+        now = datetime.utcnow()
+        return [
+            storage.create_task(make_task(
+                title=f"Task {i}", updated_at=now - timedelta(seconds=count - i), **kwargs
+            ))
+            for i in range(count)
+        ]
+    
+    def test_walk_pages_with_cursor(self, storage):
+        """Test walking every task page by page with cursors."""
+        tasks = self._create_tasks(storage, 5)
+        expected = [t.id for t in reversed(tasks)]
+        
+        seen = []
+        cursor = None
+        while True:
+            page, total = storage.list_tasks(page_size=2, cursor=cursor)
+            assert total == 5
+            seen.extend(t.id for t in page)
+            if len(page) < 2:
+                break
+            cursor = encode_cursor(page[-1])
+        
+        assert seen == expected
+    
+    def test_cursor_with_filters(self, storage):
+        """Test cursors combined with index filters."""
+        tasks = self._create_tasks(storage, 4, assignee="alice")
+        self._create_tasks(storage, 3, assignee="bob")
+        
+        page, total = storage.list_tasks(assignee="alice", page_size=3)
+        assert total == 4
+        assert [t.id for t in page] == [t.id for t in reversed(tasks)][:3]
+        
+        page, _ = storage.list_tasks(assignee="alice", page_size=3, cursor=encode_cursor(page[-1]))
+        assert [t.id for t in page] == [tasks[0].id]
+    
+    def test_cursor_stable_under_updates(self, storage):
+        """Test that updating a seen task does not repeat it on later pages."""
+        tasks = self._create_tasks(storage, 4)
+        
+        page, _ = storage.list_tasks(page_size=2)
+        storage.update_task(page[0].id, {"title": "Touched"})
+        
+        next_page, _ = storage.list_tasks(page_size=2, cursor=encode_cursor(page[-1]))
+        assert [t.id for t in next_page] == [tasks[1].id, tasks[0].id]
+    
+    def test_invalid_cursor(self, storage):
+        """Test that malformed cursors are rejected."""
+        with pytest.raises(ValueError):
+            storage.list_tasks(cursor="not-a-cursor")
+        
+        with pytest.raises(ValueError):
+            storage.list_tasks(search="x", sort="relevance", cursor=encode_cursor(make_task()))
+    
+    @pytest.mark.parametrize("backend", ["memory", "partitioned", "sqlite"])
+    def test_cursor_with_utc_offset(self, backend, tmp_path):
+        """Test that a cursor whose timestamp has a UTC offset compares with naive index keys."""
+        storage = {
+            "memory": InMemoryStorage,
+            "partitioned": PartitionedStorage,
+            "sqlite": lambda: SQLiteStorage(str(tmp_path / "tasks.db")),
+        }[backend]()
+        tasks = self._create_tasks(storage, 3)
+        
+        # Forged cursor pointing just after the middle task, in another timezone
+        offset = timezone(timedelta(hours=2))
+        timestamp = tasks[1].updated_at.replace(tzinfo=timezone.utc).astimezone(offset)
+        cursor = base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{tasks[1].id}".encode()).decode()
+        
+        page, _ = storage.list_tasks(page_size=5, cursor=cursor)
+        assert [t.id for t in page] == [tasks[0].id]
+
+
+class TestDueDateIndex:
+    """Tests for due date range filters, due date sorting and overdue scanning."""
+    
+    @pytest.fixture
+    def due_tasks(self, storage):
+        """Tasks due on consecutive days, plus one without a due date."""
+        base = datetime(2026, 1, 1)
+        tasks = [
+            storage.create_task(make_task(title=f"Day {day}", due_date=base + timedelta(days=day)))
+            for day in (3, 1, 2, 4)
+        ]
+        tasks.append(storage.create_task(make_task(title="Undated")))
+        return base, tasks
+    
+    def test_due_window(self, storage, due_tasks):
+        """Test that due_after is inclusive and due_before exclusive."""
+        base, _ = due_tasks
+        tasks, total = storage.list_tasks(
+            due_after=base + timedelta(days=2), due_before=base + timedelta(days=4), sort="due_date"
+        )
+        assert total == 2
+        assert [task.title for task in tasks] == ["Day 2", "Day 3"]
+        
+        # Combined with other filters and the default sort
+        storage.update_task(tasks[0].id, {"status": TaskStatus.IN_PROGRESS.value})
+        tasks, total = storage.list_tasks(status=TaskStatus.PENDING.value, due_before=base + timedelta(days=4))
+        assert sorted(task.title for task in tasks) == ["Day 1", "Day 3"]
+    
+    def test_sort_by_due_date(self, storage, due_tasks):
+        """Test that undated tasks come after the dated ones."""
+        tasks, total = storage.list_tasks(sort="due_date")
+        assert total == 5
+        assert [task.title for task in tasks] == ["Day 1", "Day 2", "Day 3", "Day 4", "Undated"]
+        
+        tasks, _ = storage.list_tasks(sort="due_date", page=2, page_size=2)
+        assert [task.title for task in tasks] == ["Day 3", "Day 4"]
+        
+        tasks, _ = storage.list_tasks(priority=Priority.MEDIUM.value, sort="due_date", page_size=3)
+        assert [task.title for task in tasks] == ["Day 1", "Day 2", "Day 3"]
+    
+    def test_list_overdue_tasks(self, storage, due_tasks):
+        """Test that only open tasks past their due date are listed, most overdue first."""
+        base, tasks = due_tasks
+        now = base + timedelta(days=3, hours=12)
+        assert [task.title for task in storage.list_overdue_tasks(now)] == ["Day 1", "Day 2", "Day 3"]
+        
+        storage.update_task(tasks[1].id, {"status": TaskStatus.CANCELLED.value})
+        assert [task.title for task in storage.list_overdue_tasks(now)] == ["Day 2", "Day 3"]
+    
+    @pytest.mark.asyncio
+    async def test_sweep_announces_once(self, storage, due_tasks):
+        """Test that the overdue sweep fires one event per task and due date."""
+        base, tasks = due_tasks
+        manager = TaskManager(storage)
+        events = []
+        manager.register_event_handler("task_overdue", lambda event_type, task: events.append(task.title))
+        
+        await manager.sweep_overdue(base + timedelta(days=2, hours=12))
+        assert events == ["Day 1", "Day 2"]
+        
+        await manager.sweep_overdue(base + timedelta(days=3, hours=12))
+        assert events == ["Day 1", "Day 2", "Day 3"]
+        
+        # Pushing a due date back and letting it pass again re-announces the task
+        await manager.update_task(tasks[1].id, {"due_date": base + timedelta(days=3, hours=6)})
+        assert await manager.sweep_overdue(base + timedelta(days=3, hours=12)) == [storage.get_task(tasks[1].id)]
+    
+    def test_sqlite_due_dates(self, sqlite_storage):
+        """Test due date filters and sorting on the SQLite backend."""
+        base = datetime(2026, 1, 1)
+        for day in (3, 1, 2):
+            sqlite_storage.create_task(make_task(title=f"Day {day}", due_date=base + timedelta(days=day)))
+        sqlite_storage.create_task(make_task(title="Undated"))
+        
+        tasks, total = sqlite_storage.list_tasks(sort="due_date")
+        assert [task.title for task in tasks] == ["Day 1", "Day 2", "Day 3", "Undated"]
+        
+        tasks, total = sqlite_storage.list_tasks(due_after=base + timedelta(days=2), sort="due_date")
+        assert total == 2
+        assert [task.title for task in tasks] == ["Day 2", "Day 3"]
+        
+        overdue = sqlite_storage.list_overdue_tasks(base + timedelta(days=2, hours=1))
+        assert [task.title for task in overdue] == ["Day 1", "Day 2"]
+
+
+class TestChangeFeed:
+    """Tests for the change feed used for incremental sync."""
+    
+    def test_changes_in_sequence_order(self, storage):
+        """Test that puts and deletes are reported after the given sequence."""
+        start = storage.version
+        first = storage.create_task(make_task(title="First"))
+        second = storage.create_task(make_task(title="Second"))
+        dependency = storage.create_dependency(Dependency(source_task_id=first.id, target_task_id=second.id))
+        storage.delete_task(second.id)
+        
+        changes, has_more = storage.get_changes(start)
+        assert not has_more
+        assert [change.sequence for change in changes] == list(range(start + 1, storage.version + 1))
+        assert [(change.entity_type, change.entity_id, change.op) for change in changes[:3]] == [
+            ("task", first.id, "put"), ("task", second.id, "put"), ("dependency", dependency.id, "put")
+        ]
+        assert ("dependency", dependency.id, "delete") in [(c.entity_type, c.entity_id, c.op) for c in changes]
+        assert (changes[-1].entity_type, changes[-1].entity_id, changes[-1].op) == ("task", second.id, "delete")
+        
+        # Only later changes are returned, and paging reports more
+        changes, has_more = storage.get_changes(start, limit=2)
+        assert has_more and len(changes) == 2
+        changes, has_more = storage.get_changes(changes[-1].sequence)
+        assert changes[0].sequence == start + 3
+        assert storage.get_changes(storage.version) == ([], False)
+    
+    def test_resync_required(self, tmp_path):
+        """Test that evicted changes and reloaded state require a resync."""
+        storage = InMemoryStorage(change_feed_size=2)
+        for i in range(3):
+            storage.create_task(make_task(title=f"Task {i}"))
+        
+        assert storage.get_changes(0) is None
+        assert len(storage.get_changes(1)[0]) == 2
+        assert storage.get_changes(storage.version + 1) is None
+        
+        filepath = str(tmp_path / "tasks.json")
+        storage.save_to_file(filepath)
+        seen = storage.version
+        storage.load_from_file(filepath)
+        assert storage.get_changes(seen) is None
+        assert storage.get_changes(storage.version) == ([], False)
+    
+    def test_sqlite_changes(self, sqlite_storage):
+        """Test that SQLite reports the same changes, including cascaded ones."""
+        first = sqlite_storage.create_task(make_task(title="First"))
+        second = sqlite_storage.create_task(make_task(title="Second"))
+        dependency = sqlite_storage.create_dependency(Dependency(source_task_id=first.id, target_task_id=second.id))
+        seen = sqlite_storage.version
+        sqlite_storage.delete_task(second.id)
+        
+        changes, has_more = sqlite_storage.get_changes(seen)
+        assert [(change.entity_type, change.entity_id, change.op) for change in changes] == [
+            ("dependency", dependency.id, "delete"), ("task", second.id, "delete")
+        ]
+        assert sqlite_storage.get_changes(0)[0][0].entity.title == "First"
+
+
+class TestArchive:
+    """Tests for moving long-closed tasks to the cold-tier archive."""
+    
+    @pytest.fixture
+    def archived_storage(self, storage, tmp_path):
+        """Storage with an attached archive and one old, cancelled task archived."""
+        storage.attach_archive(TaskArchive(str(tmp_path / "archive")))
+        old = storage.create_task(make_task(title="Old release notes", status=TaskStatus.CANCELLED.value))
+        storage.create_task(make_task(title="Current release notes"))
+        assert storage.archive_closed_tasks(datetime.utcnow() + timedelta(seconds=1)) == [old.id]
+        return storage, old
+    
+    def test_archived_task_leaves_working_set(self, archived_storage):
+        """Test that archived tasks are only listed on request but found by ID."""
+        storage, old = archived_storage
+        
+        assert storage.get_task(old.id).title == "Old release notes"
+        assert old.id not in storage.snapshot().tasks
+        assert storage.get_statistics()["archived_tasks"] == 1
+        assert storage.list_tasks()[1] == 1
+        
+        tasks, total = storage.list_tasks(search="release notes", include_archived=True)
+        assert total == 2
+        assert [task.title for task in tasks] == ["Current release notes", "Old release notes"]
+        
+        tasks, total = storage.list_tasks(status=TaskStatus.CANCELLED.value, include_archived=True)
+        assert [task.id for task in tasks] == [old.id]
+    
+    def test_reactivation_rehydrates(self, archived_storage):
+        """Test that updating an archived task moves it back into the working set."""
+        storage, old = archived_storage
+        
+        storage.update_task(old.id, {"status": TaskStatus.PENDING.value})
+        assert storage.get_statistics()["archived_tasks"] == 0
+        tasks, total = storage.list_tasks(status=TaskStatus.PENDING.value)
+        assert total == 2 and old.id in [task.id for task in tasks]
+        
+        assert storage.delete_task(old.id)
+        assert storage.get_task(old.id) is None
+    
+    def test_linked_and_open_tasks_stay(self, storage, tmp_path):
+        """Test that open tasks and tasks linked to others are not archived."""
+        storage.attach_archive(TaskArchive(str(tmp_path / "archive")))
+        done = storage.create_task(make_task(status=TaskStatus.DONE.value))
+        dependent = storage.create_task(make_task(dependencies=[done.id]))
+        storage.create_task(make_task())
+        
+        assert storage.archive_closed_tasks(datetime.utcnow() + timedelta(seconds=1)) == []
+        
+        storage.update_task(dependent.id, {"dependencies": [], "status": TaskStatus.CANCELLED.value})
+        assert len(storage.archive_closed_tasks(datetime.utcnow() + timedelta(seconds=1))) == 2
+    
+    def test_archive_survives_restart(self, archived_storage, tmp_path):
+        """Test that the archive and journaled archive runs are recovered."""
+        storage, old = archived_storage
+        filepath = str(tmp_path / "tasks.json")
+        journal = TaskJournal(str(tmp_path / "tasks.journal"))
+        
+        # Snapshot taken while the task was still in memory, then archived
+        storage.update_task(old.id, {"title": "Old notes"})
+        storage.save_to_file(filepath)
+        storage.attach_journal(journal)
+        storage.archive_closed_tasks(datetime.utcnow() + timedelta(seconds=1))
+        journal.close()
+        
+        restored = InMemoryStorage()
+        restored.attach_archive(TaskArchive(str(tmp_path / "archive")))
+        restored.load_from_file(filepath)
+        restored.replay_journal(TaskJournal(str(tmp_path / "tasks.journal")))
+        assert old.id not in restored.snapshot().tasks
+        assert restored.get_task(old.id).title == "Old notes"
+    
+    def test_rehydration_writes_outside_lock(self, archived_storage):
+        """Test that the archive removal of a reactivated task is written after the lock is released."""
+        storage, old = archived_storage
+        archive = storage._archive
+        flush = archive.flush
+        lock_free = []
+        
+        def probe_lock():
+            acquired = storage._lock.acquire(timeout=1)
+            if acquired:
+                storage._lock.release()
+            lock_free.append(acquired)
+        
+        def checked_flush():
+            # The storage lock is reentrant, so probe it from another thread
+            probe = threading.Thread(target=probe_lock)
+            probe.start()
+            probe.join()
+            flush()
+        
+        archive.flush = checked_flush
+        storage.update_task(old.id, {"status": TaskStatus.PENDING.value})
+        assert lock_free and all(lock_free)
+        assert old.id not in archive
+    
+    def test_manifest_log_and_compaction(self, tmp_path):
+        """Test that removals are logged, recovered on reopening and compacted away."""
+        directory = str(tmp_path / "archive")
+        archive = TaskArchive(directory, compact_threshold=3)
+        first, second = make_task(title="First"), make_task(title="Second")
+        archive.put([first, second])
+        segment = archive._segment_path(1)
+        written = os.path.getmtime(segment)
+        
+        archive.remove([first.id])
+        archive.flush()
+        assert os.path.getmtime(segment) == written
+        
+        reopened = TaskArchive(directory)
+        assert first.id not in reopened and reopened.get(second.id).title == "Second"
+        
+        # The third log record triggers compaction, which rewrites the segment
+        archive.remove([second.id])
+        archive.flush()
+        assert not os.path.exists(segment)
+        assert len(TaskArchive(directory)) == 0
+
+
+class TestStatistics:
+    """Tests for the statistics served from the secondary indexes."""
+    
+    def test_counts_follow_mutations(self, storage):
+        """Test that counts reflect creates, updates and deletes."""
+        from metis.models.complexity import ComplexityScore
+        
+        first = storage.create_task(make_task(assignee="alice", tags=["api", "ui"]))
+        second = storage.create_task(make_task(priority=Priority.HIGH.value, complexity=ComplexityScore(level="complex")))
+        storage.update_task(first.id, {"status": TaskStatus.IN_PROGRESS.value, "tags": ["api"]})
+        
+        stats = storage.get_statistics()
+        assert stats["total_tasks"] == 2
+        assert stats["by_status"] == {TaskStatus.IN_PROGRESS.value: 1, TaskStatus.PENDING.value: 1}
+        assert stats["by_priority"][Priority.HIGH.value] == 1
+        assert stats["by_assignee"] == {"alice": 1}
+        assert stats["by_tag"] == {"api": 1}
+        assert stats["by_complexity"] == {"complex": 1}
+        
+        storage.delete_task(second.id)
+        stats = storage.get_statistics()
+        assert stats["total_tasks"] == 1
+        assert stats["by_complexity"] == {}
+    
+    def test_overdue_counts(self, storage):
+        """Test that only open tasks past their due date are overdue."""
+        now = datetime(2026, 1, 10)
+        late = storage.create_task(make_task(due_date=now - timedelta(days=1)))
+        storage.create_task(make_task(due_date=now + timedelta(days=1)))
+        storage.create_task(make_task())
+        
+        stats = storage.get_statistics(now=now)
+        assert stats["with_due_date"] == 2
+        assert stats["overdue"] == 1
+        
+        storage.update_task(late.id, {"status": TaskStatus.CANCELLED.value})
+        stats = storage.get_statistics(now=now)
+        assert stats["with_due_date"] == 1
+        assert stats["overdue"] == 0
+    
+    def test_sqlite_statistics(self, sqlite_storage):
+        """Test that SQLite statistics match the in-memory ones."""
+        now = datetime(2026, 1, 10)
+        sqlite_storage.create_task(make_task(assignee="alice", tags=["api"], due_date=now - timedelta(days=1)))
+        sqlite_storage.create_task(make_task(priority=Priority.HIGH.value))
+        
+        stats = sqlite_storage.get_statistics(now=now)
+        assert stats["total_tasks"] == 2
+        assert stats["by_priority"] == {Priority.HIGH.value: 1, Priority.MEDIUM.value: 1}
+        assert stats["by_assignee"] == {"alice": 1}
+        assert stats["by_tag"] == {"api": 1}
+        assert stats["overdue"] == 1
+    
+    @pytest.mark.parametrize("backend", ["memory", "partitioned", "sqlite"])
+    def test_namespace_counts_follow_mutations(self, backend, tmp_path):
+        """Test that namespace statistics follow updates and deletes."""
+        storage = {
+            "memory": InMemoryStorage,
+            "partitioned": PartitionedStorage,
+            "sqlite": lambda: SQLiteStorage(str(tmp_path / "tasks.db"))
+        }[backend]()
+        now = datetime(2026, 1, 10)
+        first = storage.create_task(make_task(
+            namespace="alpha", assignee="alice", tags=["api"], due_date=now - timedelta(days=1)
+        ))
+        storage.create_task(make_task(namespace="alpha", tags=["api", "ui"]))
+        storage.create_task(make_task(namespace="beta", tags=["api"]))
+        
+        storage.update_task(first.id, {"status": TaskStatus.CANCELLED.value})
+        stats = storage.get_statistics(now=now, namespace="alpha")
+        assert stats["total_tasks"] == 2
+        assert stats["by_status"] == {TaskStatus.CANCELLED.value: 1, TaskStatus.PENDING.value: 1}
+        assert stats["by_assignee"] == {"alice": 1}
+        assert stats["by_tag"] == {"api": 2, "ui": 1}
+        assert stats["by_namespace"] == {"alpha": 2}
+        assert (stats["with_due_date"], stats["overdue"]) == (0, 0)
+        assert "archived_tasks" not in stats
+        
+        storage.delete_task(first.id)
+        stats = storage.get_statistics(now=now, namespace="alpha")
+        assert stats["by_assignee"] == {}
+        assert stats["by_tag"] == {"api": 1, "ui": 1}
+        assert storage.get_statistics()["by_tag"] == {"api": 2, "ui": 1}
+    
+    def test_sqlite_counts_backfilled(self, tmp_path):
+        """Test that task counts are filled from the tasks of an existing database."""
+        db_path = str(tmp_path / "tasks.db")
+        storage = SQLiteStorage(db_path)
+        storage.create_task(make_task(namespace="alpha", tags=["api"]))
+        storage.create_task(make_task(namespace="beta"))
+        with storage._conn:
+            storage._conn.execute("DROP TABLE task_counts")
+        
+        stats = SQLiteStorage(db_path).get_statistics(namespace="alpha")
+        assert stats["total_tasks"] == 1
+        assert stats["by_tag"] == {"api": 1}
+
+
+class TestBatchOperations:
+    """Tests for the atomic create_tasks and update_tasks batch operations."""
+    
+    def test_create_with_intra_batch_dependencies(self, storage):
+        """Test that tasks in a batch may depend on each other."""
+        existing = storage.create_task(make_task(title="Existing"))
+        first = make_task(title="First", id="first", dependencies=[existing.id])
+        second = make_task(title="Second", id="second", dependencies=["first"], tags=["api"])
+        
+        created = storage.create_tasks([second, first])
+        assert [task.id for task in created] == ["second", "first"]
+        assert storage.list_tasks(tag="api")[1] == 1
+        assert [t.id for t in storage.list_dependent_tasks("first")] == ["second"]
+    
+    def test_create_is_all_or_nothing(self, storage):
+        """Test that an invalid task rejects the whole batch."""
+        valid = make_task(title="Valid")
+        with pytest.raises(ValueError, match="not found"):
+            storage.create_tasks([valid, make_task(dependencies=["missing"])])
+        
+        with pytest.raises(ValueError, match="circular"):
+            storage.create_tasks([
+                make_task(id="a", dependencies=["b"]),
+                make_task(id="b", dependencies=["a"])
+            ])
+        
+        assert storage.list_tasks()[1] == 0
+    
+    def test_update_is_all_or_nothing(self, storage):
+        """Test that an invalid update leaves every task unchanged."""
+        first, second = storage.create_tasks([make_task(title="First"), make_task(title="Second")])
+        version = storage.version
+        
+        with pytest.raises(ValueError):
+            storage.update_tasks({
+                first.id: {"title": "Renamed"},
+                second.id: {"priority": "not-a-priority"}
+            })
+        
+        assert storage.get_task(first.id).title == "First"
+        assert storage.version == version
+        
+        results = storage.update_tasks({first.id: {"title": "Renamed"}, "missing": {"title": "Nope"}})
+        assert results[first.id].title == "Renamed"
+        assert results["missing"] is None
+        assert storage.list_tasks(search="renamed")[1] == 1
+    
+    def test_batch_journaled_as_one_record(self, storage, tmp_path):
+        """Test that a batch is replayed from a single journal record."""
+        from metis.core.persistence import TaskJournal
+        
+        journal = TaskJournal(str(tmp_path / "metis.journal"))
+        storage.attach_journal(journal)
+        tasks = storage.create_tasks([make_task(title=f"Task {i}") for i in range(5)])
+        assert journal.record_count == 1
+        
+        recovered = InMemoryStorage()
+        recovered.replay_journal(TaskJournal(journal.path))
+        assert recovered.list_tasks()[1] == 5
+        assert recovered.get_task(tasks[0].id).title == "Task 0"
+    
+    def test_sqlite_batches(self, sqlite_storage):
+        """Test batch operations on the SQLite backend."""
+        with pytest.raises(ValueError):
+            sqlite_storage.create_tasks([make_task(), make_task(dependencies=["missing"])])
+        assert sqlite_storage.list_tasks()[1] == 0
+        
+        first, second = sqlite_storage.create_tasks([
+            make_task(id="first"), make_task(id="second", dependencies=["first"])
+        ])
+        assert sqlite_storage.get_task("second").dependencies == ["first"]
+        
+        with pytest.raises(ValueError):
+            sqlite_storage.update_tasks({"first": {"title": "Renamed"}, "second": {"priority": "bad"}})
+        assert sqlite_storage.get_task("first").title == "Test Task"
+        
+        results = sqlite_storage.update_tasks({"first": {"title": "Renamed"}})
+        assert results["first"].title == "Renamed"
+
+
+class TestSnapshots:
+    """Tests for copy-on-write storage and versioned snapshots."""
+    
+    def test_snapshot_isolated_from_writes(self, storage):
+        """Test that a snapshot keeps its version while writes continue."""
+        task = storage.create_task(make_task(title="Original"))
+        doomed = storage.create_task(make_task(title="Doomed"))
+        snapshot = storage.snapshot()
+        assert snapshot.version == storage.version
+        
+        storage.update_task(task.id, {"title": "Changed"})
+        storage.delete_task(doomed.id)
+        storage.create_task(make_task(title="New"))
+        
+        assert len(snapshot) == 2
+        assert snapshot.get_task(task.id).title == "Original"
+        assert snapshot.get_task(doomed.id) is not None
+        assert storage.snapshot().version > snapshot.version
+        assert storage.snapshot().get_task(task.id).title == "Changed"
+        
+        with pytest.raises(TypeError):
+            snapshot.tasks["other"] = task
+    
+    def test_snapshot_shared_until_write(self, storage):
+        """Test that the snapshot of a version is built once."""
+        storage.create_task(make_task())
+        first = storage.snapshot()
+        assert storage.snapshot() is first
+        
+        storage.create_task(make_task())
+        assert storage.snapshot() is not first
+    
+    def test_returned_objects_not_mutated(self, storage):
+        """Test that updates replace stored objects instead of changing them."""
+        source = storage.create_task(make_task(title="Source"))
+        target = storage.create_task(make_task(title="Target"))
+        before = storage.get_task(target.id)
+        
+        dependency = storage.create_dependency(Dependency(source_task_id=source.id, target_task_id=target.id))
+        storage.update_task(target.id, {"status": TaskStatus.IN_PROGRESS.value})
+        
+        assert before.dependencies == []
+        assert before.status == TaskStatus.PENDING.value
+        
+        linked = storage.get_task(target.id)
+        storage.update_dependency(dependency.id, {"description": "Changed"})
+        storage.delete_dependency(dependency.id)
+        
+        assert linked.dependencies == [source.id]
+        assert dependency.description != "Changed"
+        assert storage.get_task(target.id).dependencies == []
+    
+    @pytest.mark.asyncio
+    async def test_task_manager_copies_before_modifying(self, storage):
+        """Test that subtask operations leave previously returned tasks unchanged."""
+        manager = TaskManager(storage)
+        task = await manager.create_task({"title": "Parent", "description": "With subtasks"})
+        
+        subtask = await manager.add_subtask(task.id, {"title": "Step", "description": "First step"})
+        assert task.subtasks == []
+        
+        with_subtask = await manager.get_task(task.id)
+        await manager.remove_subtask(task.id, subtask.id)
+        assert [s.id for s in with_subtask.subtasks] == [subtask.id]
+        assert (await manager.get_task(task.id)).subtasks == []
+    
+    def test_sqlite_snapshot(self, sqlite_storage):
+        """Test that SQLite snapshots are cached per version."""
+        task = sqlite_storage.create_task(make_task(title="Stored"))
+        snapshot = sqlite_storage.snapshot()
+        assert sqlite_storage.snapshot() is snapshot
+        assert snapshot.get_task(task.id).title == "Stored"
+        
+        sqlite_storage.update_task(task.id, {"title": "Changed"})
+        assert snapshot.get_task(task.id).title == "Stored"
+        assert sqlite_storage.snapshot().get_task(task.id).title == "Changed"
+
+
+class TestNamespaces:
+    """Tests for namespace-partitioned storage."""
+    
+    @pytest.fixture
+    def partitioned(self):
+        """Create a PartitionedStorage instance for testing."""
+        return PartitionedStorage()
+    
+    def test_partitions_are_isolated(self, partitioned):
+        """Test that each namespace has its own partition and counts."""
+        api = partitioned.create_task(make_task(namespace="api", tags=["backend"]))
+        partitioned.create_task(make_task(namespace="api"))
+        ui = partitioned.create_task(make_task(namespace="ui", tags=["backend"]))
+        
+        assert partitioned.list_namespaces() == {"api": 2, "ui": 1}
+        assert partitioned.partition("api") is not partitioned.partition("ui")
+        assert [t.id for t in partitioned.list_tasks(namespace="ui")[0]] == [ui.id]
+        assert partitioned.get_task(api.id).namespace == "api"
+        
+        stats = partitioned.get_statistics()
+        assert stats["total_tasks"] == 3
+        assert stats["by_tag"] == {"backend": 2}
+        assert stats["by_namespace"] == {"api": 2, "ui": 1}
+        assert partitioned.get_statistics(namespace="api")["total_tasks"] == 2
+        
+        with pytest.raises(ValueError):
+            partitioned.update_task(api.id, {"namespace": "ui"})
+        with pytest.raises(ValueError):
+            partitioned.create_task(make_task(id=api.id, namespace="ui"))
+    
+    def test_concurrent_creates_claim_an_id_once(self, partitioned, monkeypatch):
+        """Test that one ID created concurrently in several namespaces is stored once."""
+        # Slow partition inserts, so every create checks the ID before any stores it
+        insert = InMemoryStorage.create_task
+        def slow_insert(storage, task):
+            time.sleep(0.05)
+            return insert(storage, task)
+        monkeypatch.setattr(InMemoryStorage, "create_task", slow_insert)
+        
+        barrier = threading.Barrier(8)
+        created = []
+        
+        def create(namespace):
+            barrier.wait()
+            try:
+                created.append(partitioned.create_task(make_task(id="shared", namespace=namespace)))
+            except ValueError:
+                pass
+        
+        threads = [threading.Thread(target=create, args=(f"ns{i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(created) == 1
+        assert partitioned.list_namespaces() == {created[0].namespace: 1}
+        assert partitioned.get_task("shared").namespace == created[0].namespace
+        
+        # A deleted ID may be reused in another namespace
+        assert partitioned.delete_task("shared")
+        assert partitioned.get_task("shared") is None
+        partitioned.create_task(make_task(id="shared", namespace="other"))
+        assert partitioned.get_task("shared").namespace == "other"
+    
+    def test_merged_listing_and_changes(self, partitioned):
+        """Test that unscoped listing merges partitions in order with one change sequence."""
+        start = partitioned.latest_sequence
+        created = [
+            partitioned.create_task(make_task(title=f"Task {i}", namespace="api" if i % 2 else "ui"))
+            for i in range(5)
+        ]
+        
+        tasks, total = partitioned.list_tasks(page=2, page_size=2)
+        assert total == 5
+        assert [t.id for t in tasks] == [created[2].id, created[1].id]
+        
+        changes, _ = partitioned.get_changes(start)
+        assert [change.sequence for change in changes] == list(range(start + 1, start + 6))
+        assert [change.entity_id for change in changes] == [task.id for task in created]
+    
+    def test_dependencies_stay_in_namespace(self, partitioned):
+        """Test that dependencies may only link tasks of the same namespace."""
+        a = partitioned.create_task(make_task(namespace="api"))
+        b = partitioned.create_task(make_task(namespace="api"))
+        c = partitioned.create_task(make_task(namespace="ui"))
+        
+        with pytest.raises(ValueError):
+            partitioned.create_dependency(Dependency(source_task_id=a.id, target_task_id=c.id))
+        
+        dependency = partitioned.create_dependency(Dependency(source_task_id=a.id, target_task_id=b.id))
+        assert partitioned.get_dependency(dependency.id) is not None
+        assert [t.id for t in partitioned.list_dependent_tasks(a.id)] == [b.id]
+        assert partitioned.list_dependencies(task_id=c.id) == []
+        assert partitioned.delete_dependency(dependency.id)
+    
+    def test_batches_span_namespaces_atomically(self, partitioned):
+        """Test that a batch touching several namespaces is all-or-nothing."""
+        a = partitioned.create_task(make_task(namespace="api"))
+        b = partitioned.create_task(make_task(namespace="ui"))
+        
+        with pytest.raises(ValueError):
+            partitioned.update_tasks({
+                a.id: {"title": "Renamed"},
+                b.id: {"status": TaskStatus.DONE.value, "dependencies": ["missing"]}
+            })
+        assert partitioned.get_task(a.id).title == "Test Task"
+        
+        results = partitioned.update_tasks({a.id: {"title": "A"}, b.id: {"title": "B"}, "missing": {}})
+        assert results["missing"] is None
+        assert partitioned.get_task(b.id).title == "B"
+    
+    def test_namespace_save_and_load(self, partitioned, tmp_path):
+        """Test that one namespace is flushed and reloaded without touching others."""
+        api = partitioned.create_task(make_task(namespace="api"))
+        partitioned.create_task(make_task(namespace="ui"))
+        filepath = str(tmp_path / "api.json")
+        assert partitioned.save_namespace("api", filepath)
+        
+        partitioned.update_task(api.id, {"title": "Changed"})
+        partitioned.create_task(make_task(namespace="api"))
+        assert partitioned.load_namespace("api", filepath)
+        
+        assert partitioned.list_namespaces() == {"api": 1, "ui": 1}
+        assert partitioned.get_task(api.id).title == "Test Task"
+        
+        with pytest.raises(ValueError):
+            partitioned.load_namespace("ui", filepath)
+    
+    def test_namespace_load_is_atomic(self, partitioned, tmp_path):
+        """Test that a task created while a namespace loads is kept or released, never leaked."""
+        partitioned.create_task(make_task(namespace="api"))
+        filepath = str(tmp_path / "api.json")
+        assert partitioned.save_namespace("api", filepath)
+        
+        partition = partitioned.partition("api")
+        load_state = partition.load_state
+        creator = threading.Thread(target=lambda: partitioned.create_task(make_task(namespace="api")))
+        
+        def racing_load_state(tasks, dependencies):
+            creator.start()
+            creator.join(timeout=0.2)
+            load_state(tasks, dependencies)
+        
+        partition.load_state = racing_load_state
+        assert partitioned.load_namespace("api", filepath)
+        creator.join()
+        
+        assert set(partitioned._namespaces) == set(partitioned.snapshot().tasks)
+        assert partitioned.list_namespaces() == {"api": 2}
+    
+    def test_journal_replay_routes_by_namespace(self, partitioned, tmp_path):
+        """Test that a snapshot and journal restore every namespace."""
+        filepath = str(tmp_path / "tasks.json")
+        journal = TaskJournal(str(tmp_path / "tasks.journal"))
+        a = partitioned.create_task(make_task(namespace="api"))
+        partitioned.save_to_file(filepath)
+        
+        partitioned.attach_journal(journal)
+        b = partitioned.create_task(make_task(namespace="api"))
+        partitioned.create_task(make_task(namespace="ui"))
+        partitioned.create_dependency(Dependency(source_task_id=a.id, target_task_id=b.id))
+        journal.close()
+        
+        restored = PartitionedStorage()
+        assert restored.load_from_file(filepath)
+        assert restored.replay_journal(TaskJournal(str(tmp_path / "tasks.journal"))) == 4
+        assert restored.list_namespaces() == {"api": 2, "ui": 1}
+        assert [t.id for t in restored.list_dependent_tasks(a.id)] == [b.id]
+    
+    def test_compaction_keeps_writes_to_new_namespaces(self, partitioned, tmp_path):
+        """Test that a namespace created while compacting is not truncated from the journal."""
+        filepath = str(tmp_path / "tasks.json")
+        journal = TaskJournal(str(tmp_path / "tasks.journal"))
+        partitioned.attach_journal(journal)
+        partitioned.create_task(make_task(namespace="api"))
+        
+        # Another thread writes to a new namespace between snapshot and reset
+        writer = threading.Thread(target=lambda: partitioned.create_task(make_task(namespace="ui")))
+        reset = journal.reset
+        def reset_after_write():
+            writer.start()
+            writer.join(0.2)
+            reset()
+        journal.reset = reset_after_write
+        
+        assert partitioned.compact_journal(filepath)
+        writer.join()
+        journal.close()
+        
+        restored = PartitionedStorage()
+        assert restored.load_from_file(filepath)
+        restored.replay_journal(TaskJournal(str(tmp_path / "tasks.journal")))
+        assert restored.list_namespaces() == {"api": 1, "ui": 1}
+    
+    def test_sqlite_namespace_filter(self, sqlite_storage):
+        """Test that the SQLite backend filters and counts by namespace."""
+        sqlite_storage.create_task(make_task(namespace="api"))
+        sqlite_storage.create_task(make_task(namespace="api"))
+        sqlite_storage.create_task(make_task())
+        
+        assert sqlite_storage.list_tasks(namespace="api")[1] == 2
+        assert sqlite_storage.list_namespaces() == {"api": 2, "default": 1}
+        assert sqlite_storage.get_statistics(namespace="api")["total_tasks"] == 2
+        assert sqlite_storage.get_statistics()["by_namespace"] == {"api": 2, "default": 1}
+
+
+class TestSQLiteStorage:
+    """Tests for the SQLite storage backend."""
+    
+    def test_round_trip(self, sqlite_storage):
+        """Test that tasks and their child rows survive a round trip."""
+        task = sqlite_storage.create_task(make_task(
+            tags=["api", "backend"],
+            subtasks=[Subtask(title="Step 1", description="First"), Subtask(title="Step 2", description="Second")]
+        ))
+        
+        loaded = sqlite_storage.get_task(task.id)
+        assert loaded.title == task.title
+        assert loaded.tags == ["api", "backend"]
+        assert [s.title for s in loaded.subtasks] == ["Step 1", "Step 2"]
+        assert loaded.created_at == task.created_at
+        
+        updated = sqlite_storage.update_task(task.id, {"status": TaskStatus.IN_PROGRESS.value, "tags": ["ui"]})
+        assert updated.status == TaskStatus.IN_PROGRESS.value
+        assert sqlite_storage.get_task(task.id).tags == ["ui"]
+        
+        assert sqlite_storage.delete_task(task.id)
+        assert sqlite_storage.get_task(task.id) is None
+        assert sqlite_storage.get_task("missing") is None
+    
+    def test_failed_commit_is_not_published(self, sqlite_storage):
+        """Test that a write whose transaction fails leaves the version and change feed alone."""
+        task = sqlite_storage.create_task(make_task())
+        version = sqlite_storage.snapshot().version
+        
+        class FailingCommit:
+            """Connection whose transactions roll back and fail on exit."""
+            
+            def __init__(self, conn):
+                self.conn = conn
+            
+            def __getattr__(self, name):
+                return getattr(self.conn, name)
+            
+            def __enter__(self):
+                return self.conn.__enter__()
+            
+            def __exit__(self, *exc_info):
+                self.conn.__exit__(sqlite3.OperationalError, None, None)
+                raise sqlite3.OperationalError("disk I/O error")
+        
+        conn = sqlite_storage._conn
+        sqlite_storage._conn = FailingCommit(conn)
+        with pytest.raises(sqlite3.OperationalError):
+            sqlite_storage.update_task(task.id, {"title": "Renamed"})
+        with pytest.raises(sqlite3.OperationalError):
+            sqlite_storage.delete_task(task.id)
+        sqlite_storage._conn = conn
+        
+        assert sqlite_storage.snapshot().version == version
+        assert sqlite_storage.get_changes(version)[0] == []
+        assert sqlite_storage.get_task(task.id).title == "Test Task"
+    
+    def test_data_persists_across_connections(self, tmp_path):
+        """Test that a new storage instance sees previously written data."""
+        db_path = str(tmp_path / "tasks.db")
+        storage = SQLiteStorage(db_path)
+        task = storage.create_task(make_task(assignee="alice"))
+        storage.close()
+        
+        reopened = SQLiteStorage.from_url(f"sqlite:///{db_path}")
+        assert reopened.get_task(task.id).assignee == "alice"
+        assert reopened.is_persistent
+        reopened.close()
+    
+    def test_filters_and_search(self, sqlite_storage):
+        """Test index-backed filters and multi-term search."""
+        sqlite_storage.create_task(make_task(title="Fix login bug", priority=Priority.HIGH.value, tags=["api"]))
+        sqlite_storage.create_task(make_task(title="Login page", priority=Priority.LOW.value, tags=["ui"]))
+        sqlite_storage.create_task(make_task(title="100% done_flag", priority=Priority.HIGH.value))
+        
+        assert sqlite_storage.list_tasks(priority=Priority.HIGH.value)[1] == 2
+        assert sqlite_storage.list_tasks(tag="ui")[1] == 1
+        assert sqlite_storage.list_tasks(search="login")[1] == 2
+        assert sqlite_storage.list_tasks(search="LOGIN bug")[1] == 1
+        assert sqlite_storage.list_tasks(search="login", tag="api")[1] == 1
+        
+        # Terms match whole tokens, as in the in-memory index, and punctuation is ignored
+        assert sqlite_storage.list_tasks(search="done_flag")[1] == 1
+        assert sqlite_storage.list_tasks(search="one_fla")[1] == 0
+        assert sqlite_storage.list_tasks(search="100%")[1] == 1
+        assert sqlite_storage.list_tasks(search='"done_flag" OR login')[1] == 0
+    
+    def test_search_index_follows_writes(self, sqlite_storage):
+        """Test that the full-text index follows updates and deletes and ranks in SQL."""
+        now = datetime.utcnow()
+        strong = sqlite_storage.create_task(make_task(
+            title="cache cache cache", description="cache", updated_at=now - timedelta(hours=1)
+        ))
+        weak = sqlite_storage.create_task(make_task(
+            title="cache", description="a long description about many other things", updated_at=now
+        ))
+        other = sqlite_storage.create_task(make_task(title="Alpha"))
+        
+        tasks, total = sqlite_storage.list_tasks(search="cache", sort="relevance", page_size=1)
+        assert total == 2 and [t.id for t in tasks] == [strong.id]
+        tasks, _ = sqlite_storage.list_tasks(search="cache", sort="relevance", page=2, page_size=1)
+        assert [t.id for t in tasks] == [weak.id]
+        
+        sqlite_storage.update_task(other.id, {"title": "Beta"})
+        assert sqlite_storage.list_tasks(search="alpha")[1] == 0
+        assert sqlite_storage.list_tasks(search="beta")[1] == 1
+        
+        sqlite_storage.delete_task(other.id)
+        assert sqlite_storage.list_tasks(search="beta")[1] == 0
+    
+    def test_search_index_built_for_existing_database(self, tmp_path):
+        """Test that a database created before the full-text index gets it filled on open."""
+        db_path = str(tmp_path / "tasks.db")
+        storage = SQLiteStorage(db_path)
+        task = storage.create_task(make_task(title="Legacy login"))
+        storage._conn.executescript(
+            "DROP TRIGGER tasks_fts_insert; DROP TRIGGER tasks_fts_delete; "
+            "DROP TRIGGER tasks_fts_update; DROP TABLE tasks_fts"
+        )
+        storage.close()
+        
+        reopened = SQLiteStorage(db_path)
+        assert [t.id for t in reopened.list_tasks(search="login")[0]] == [task.id]
+        reopened.close()
+    
+    def test_cursor_pagination(self, sqlite_storage):
+        """Test walking pages with cursors in updated_at order."""
+        now = datetime.utcnow()
+        tasks = [
+            sqlite_storage.create_task(make_task(title=f"Task {i}", updated_at=now - timedelta(seconds=5 - i)))
+            for i in range(5)
+        ]
+        
+        seen = []
+        cursor = None
+        while True:
+            page, total = sqlite_storage.list_tasks(page_size=2, cursor=cursor)
+            assert total == 5
+            seen.extend(t.id for t in page)
+            if len(page) < 2:
+                break
+            cursor = encode_cursor(page[-1])
+        
+        assert seen == [t.id for t in reversed(tasks)]
+    
+    def test_dependencies(self, sqlite_storage):
+        """Test dependency records, blocking lookups and cycle detection."""
+        a = sqlite_storage.create_task(make_task(title="A"))
+        b = sqlite_storage.create_task(make_task(title="B"))
+        c = sqlite_storage.create_task(make_task(title="C"))
+        
+        ab = sqlite_storage.create_dependency(Dependency(source_task_id=a.id, target_task_id=b.id))
+        sqlite_storage.create_dependency(Dependency(source_task_id=b.id, target_task_id=c.id))
+        
+        assert sqlite_storage.get_task(b.id).dependencies == [a.id]
+        assert [t.id for t in sqlite_storage.list_blocking_tasks(b.id)] == [a.id]
+        assert [t.id for t in sqlite_storage.list_dependent_tasks(a.id)] == [b.id]
+        assert len(sqlite_storage.list_dependencies(task_id=b.id)) == 2
+        
+        with pytest.raises(ValueError):
+            sqlite_storage.create_dependency(Dependency(source_task_id=c.id, target_task_id=a.id))
+        
+        with pytest.raises(ValueError):
+            sqlite_storage.delete_task(a.id)
+        
+        assert sqlite_storage.delete_dependency(ab.id)
+        assert sqlite_storage.get_task(b.id).dependencies == []
+        assert sqlite_storage.delete_task(a.id)
+    
+    def test_export_import(self, sqlite_storage, tmp_path):
+        """Test that JSON exports are interchangeable with InMemoryStorage."""
+        source = sqlite_storage.create_task(make_task(title="Source"))
+        target = sqlite_storage.create_task(make_task(title="Target"))
+        sqlite_storage.create_dependency(Dependency(source_task_id=source.id, target_task_id=target.id))
+        filepath = str(tmp_path / "export.json")
+        assert sqlite_storage.save_to_file(filepath)
+        
+        memory = InMemoryStorage()
+        assert memory.load_from_file(filepath)
+        assert memory.get_task(target.id).dependencies == [source.id]
+        
+        restored = SQLiteStorage(":memory:")
+        assert restored.load_from_file(filepath)
+        assert restored.list_tasks()[1] == 2
+        assert len(restored.list_dependencies()) == 1
+        restored.close()
@@ -7,15 +7,19 @@ the core business logic for managing tasks in Metis.
 
 import pytest
 import asyncio
+import time
 from datetime import datetime, timedelta
 from uuid import uuid4
 
 from metis.core.task_manager import TaskManager
 from metis.core.storage import InMemoryStorage
+from metis.core.async_storage import ThreadedStorage, as_async_storage
+from metis.models import task as task_module
 from metis.models.task import Task
 from metis.models.dependency import Dependency
 from metis.models.subtask import Subtask
 from metis.models.requirement import RequirementRef
+from metis.models.complexity import ComplexityScore
 from metis.models.enums import TaskStatus, Priority
 
 
@@ -238,6 +242,89 @@ class TestTaskManager:
         updated_task = await task_manager.get_task(task.id)
         assert len(updated_task.subtasks) == 0
     
+    @pytest.mark.asyncio
+    async def test_add_subtasks_batch(self, task_manager):
+        """Test adding many subtasks in one update."""
+        task = await task_manager.create_task({"title": "Epic", "description": "Generated epic"})
+        
+        subtasks = await task_manager.add_subtasks(
+            task.id, [{"title": f"Step {i}"} for i in range(500)]
+        )
+        assert [s.order for s in subtasks[:3]] == [0, 1, 2]
+        
+        updated_task = await task_manager.get_task(task.id)
+        assert len(updated_task.subtasks) == 500
+        assert updated_task.subtasks[-1].order == 499
+        
+        # Later subtasks keep being appended after the highest order
+        subtask = await task_manager.add_subtask(task.id, {"title": "Wrap up"})
+        assert subtask.order == 500
+        
+        with pytest.raises(ValueError):
+            await task_manager.add_subtasks(task.id, [{"title": "Valid"}, {"title": "Bad", "order": "last"}])
+        assert len((await task_manager.get_task(task.id)).subtasks) == 501
+        
+        assert await task_manager.add_subtasks("missing", [{"title": "Orphan"}]) is None
+    
+    @pytest.mark.asyncio
+    async def test_move_subtask(self, task_manager):
+        """Test that a move updates only the moved subtask and fires one event."""
+        task = await task_manager.create_task({"title": "Epic", "description": "Generated epic"})
+        subtasks = await task_manager.add_subtasks(task.id, [{"title": f"Step {i}"} for i in range(3)])
+        before = {s.id: (s.rank, s.updated_at) for s in subtasks}
+        
+        events = []
+        task_manager.register_event_handler("task_updated", lambda event_type, data: events.append(data))
+        
+        moved = await task_manager.move_subtask(task.id, subtasks[0].id, after_id=subtasks[2].id)
+        assert moved.rank > subtasks[2].rank
+        assert len(events) == 1
+        
+        updated_task = await task_manager.get_task(task.id)
+        assert [s.title for s in updated_task.subtasks] == ["Step 1", "Step 2", "Step 0"]
+        assert [s.order for s in updated_task.subtasks] == [1, 2, 0]
+        changed = [s.id for s in updated_task.subtasks if (s.rank, s.updated_at) != before[s.id]]
+        assert changed == [subtasks[0].id]
+        
+        with pytest.raises(ValueError):
+            await task_manager.move_subtask(task.id, subtasks[1].id, after_id="missing")
+        assert await task_manager.move_subtask(task.id, "missing") is None
+        assert await task_manager.move_subtask("missing", subtasks[1].id) is None
+    
+    @pytest.mark.asyncio
+    async def test_update_subtask_on_large_task(self, task_manager, monkeypatch):
+        """Test that updating one subtask of a large task leaves the others untouched."""
+        task = await task_manager.create_task({"title": "Epic", "description": "Generated epic"})
+        subtasks = await task_manager.add_subtasks(
+            task.id, [{"title": f"Step {i}"} for i in range(1000)]
+        )
+        await task_manager.update_subtask(task.id, subtasks[0].id, {"title": "First"})
+        before = await task_manager.get_task(task.id)
+        
+        # The position index is carried over to the edited copy, not rebuilt
+        builds = []
+        build_index = task_module._PositionIndex.__init__
+        def counting_build(index, items):
+            builds.append(len(items))
+            build_index(index, items)
+        monkeypatch.setattr(task_module._PositionIndex, "__init__", counting_build)
+        
+        updated = await task_manager.update_subtask(task.id, subtasks[500].id, {"title": "Middle"})
+        after = await task_manager.get_task(task.id)
+        assert updated.title == "Middle"
+        assert builds == []
+        
+        # Only the edited subtask is a new object; the old task is unchanged
+        assert after is not before
+        assert all(
+            new is old
+            for i, (new, old) in enumerate(zip(after.subtasks, before.subtasks))
+            if i != 500
+        )
+        assert after.subtasks[500] is not before.subtasks[500]
+        assert before.subtasks[500].title == "Step 500"
+        assert after.get_subtask(subtasks[999].id) is before.subtasks[999]
+    
     @pytest.mark.asyncio
     async def test_requirement_ref_operations(self, task_manager):
         """Test requirement reference operations."""
@@ -400,6 +487,35 @@ class TestTaskManager:
         assert updated_tasks[task_ids[1]].priority == Priority.HIGH.value
         assert updated_tasks[task_ids[2]].title == "Updated Bulk Task 3"
     
+    @pytest.mark.asyncio
+    async def test_bulk_operations_batched(self, task_manager):
+        """Test that bulk operations are atomic and fire one event per batch."""
+        events = []
+        task_manager.register_event_handler("tasks_created", lambda event_type, data: events.append((event_type, data)))
+        task_manager.register_event_handler("tasks_updated", lambda event_type, data: events.append((event_type, data)))
+        
+        tasks = await task_manager.bulk_create_tasks([
+            {"id": "parent", "title": "Parent", "description": "Created first"},
+            {"title": "Child", "description": "Depends on parent", "dependencies": ["parent"]}
+        ])
+        assert len(events) == 1
+        assert events[0][0] == "tasks_created"
+        assert [task.id for task in events[0][1]] == [task.id for task in tasks]
+        
+        # One invalid update rejects the whole batch
+        with pytest.raises(ValueError):
+            await task_manager.bulk_update_tasks({
+                tasks[0].id: {"title": "Renamed"},
+                tasks[1].id: {"status": "not-a-status"}
+            })
+        assert (await task_manager.get_task(tasks[0].id)).title == "Parent"
+        assert len(events) == 1
+        
+        await task_manager.bulk_update_tasks({task.id: {"priority": Priority.HIGH.value} for task in tasks})
+        assert len(events) == 2
+        assert events[1][0] == "tasks_updated"
+        assert len(events[1][1]) == 2
+    
     @pytest.mark.asyncio
     async def test_event_handlers(self, task_manager):
         """Test event handling."""
@@ -457,4 +573,154 @@ class TestTaskManager:
         # But task_updated event handler is still registered
         await task_manager.update_task(another_task.id, {"title": "Updated Another Test Task"})
         assert len(events) == 4
-        assert events[3][0] == "task_updated"
\ No newline at end of file
+        assert events[3][0] == "task_updated"
+    
+    
+    @pytest.mark.asyncio
+    async def test_analyze_dependencies(self, task_manager):
+        """Test reporting dependency issues for all tasks or one namespace."""
+        # Imported state is not validated, so it can hold cycles and dangling links
+        task_manager.storage.load_state([
+            Task(id="a", title="A", description="A", dependencies=["b"]),
+            Task(id="b", title="B", description="B", dependencies=["a"]),
+            Task(id="c", title="C", description="C", dependencies=["gone"], namespace="other"),
+        ], [])
+        
+        analysis = await task_manager.analyze_dependencies()
+        assert analysis["task_count"] == 3
+        assert [cycle["task_ids"] for cycle in analysis["cycles"]] == [["a", "b"]]
+        assert analysis["missing_dependencies"] == [{"task_id": "c", "dependency_id": "gone"}]
+        
+        analysis = await task_manager.analyze_dependencies(namespace="other")
+        assert analysis["task_count"] == 1 and analysis["cycles"] == []
+    
+    @pytest.mark.asyncio
+    async def test_list_ready_tasks(self, task_manager):
+        """Test listing the tasks that can start now."""
+        base = await task_manager.create_task({"title": "Base", "description": "Base"})
+        child = await task_manager.create_task({
+            "title": "Child", "description": "Child", "dependencies": [base.id], "priority": Priority.HIGH.value
+        })
+        assert [t.id for t in await task_manager.list_ready_tasks()] == [base.id]
+        
+        for status in (TaskStatus.IN_PROGRESS, TaskStatus.REVIEW, TaskStatus.DONE):
+            await task_manager.update_task(base.id, {"status": status.value})
+        assert [t.id for t in await task_manager.list_ready_tasks()] == [child.id]
+        assert await task_manager.list_ready_tasks(namespace="other") == []
+    
+    @pytest.mark.asyncio
+    async def test_downstream_and_upstream_tasks(self, task_manager):
+        """Test transitive dependency queries through the task manager."""
+        base = await task_manager.create_task({"title": "Base", "description": "Base"})
+        child = await task_manager.create_task({"title": "Child", "description": "Child", "dependencies": [base.id]})
+        leaf = await task_manager.create_task({"title": "Leaf", "description": "Leaf", "dependencies": [child.id]})
+        
+        reached, total = await task_manager.list_downstream_tasks(base.id)
+        assert [(task.id, depth) for task, depth in reached] == [(child.id, 1), (leaf.id, 2)]
+        assert total == 2
+        reached, total = await task_manager.list_upstream_tasks(leaf.id, max_depth=1)
+        assert [(task.id, depth) for task, depth in reached] == [(child.id, 1)]
+        assert await task_manager.get_dependency_distance(base.id, leaf.id) == 2
+        
+        await task_manager.update_task(leaf.id, {"dependencies": []})
+        assert await task_manager.get_dependency_distance(base.id, leaf.id) is None
+    
+    @pytest.mark.asyncio
+    async def test_critical_path_follows_task_events(self, task_manager):
+        """Test that the cached critical path tracks task changes."""
+        start = await task_manager.create_task({"title": "Start", "description": "Start"})
+        slow = await task_manager.create_task({"title": "Slow", "description": "Slow", "dependencies": [start.id]})
+        fast = await task_manager.create_task({
+            "title": "Fast", "description": "Fast", "dependencies": [start.id],
+            "complexity": {"overall_score": 1}
+        })
+        
+        schedule = await task_manager.get_critical_path()
+        assert schedule["critical_path"] == [start.id, slow.id]
+        assert schedule["project_duration"] == 6
+        assert schedule["slack"][fast.id] == 2
+        
+        # Each change is applied to the cached schedule
+        await task_manager.update_task(fast.id, {"complexity": ComplexityScore(overall_score=8)})
+        schedule = await task_manager.get_critical_path()
+        assert schedule["critical_path"] == [start.id, fast.id]
+        assert schedule["slack"][slow.id] == 5
+        
+        finish = await task_manager.create_task({"title": "Finish", "description": "Finish"})
+        await task_manager.create_dependency({"source_task_id": slow.id, "target_task_id": finish.id})
+        schedule = await task_manager.get_critical_path()
+        assert schedule["project_duration"] == 11
+        assert schedule["slack"][finish.id] == 2
+        
+        await task_manager.delete_task(fast.id)
+        schedule = await task_manager.get_critical_path()
+        assert schedule["critical_path"] == [start.id, slow.id, finish.id]
+        
+        # Other namespaces are scheduled separately
+        schedule = await task_manager.get_critical_path("other")
+        assert schedule == {"critical_path": [], "project_duration": 0, "slack": {}}
+
+
+class SlowStorage(InMemoryStorage):
+    """In-memory storage whose task writes block like slow file I/O."""
+    
+    def create_task(self, task: Task) -> Task:
+        time.sleep(0.2)
+        return super().create_task(task)
+
+
+class TestAsyncStorage:
+    """Tests for running storage calls off the event loop."""
+    
+    @pytest.mark.asyncio
+    async def test_blocking_storage_does_not_stall_loop(self):
+        """Test that a slow storage call leaves the event loop responsive."""
+        manager = TaskManager(SlowStorage())
+        assert isinstance(manager.async_storage, ThreadedStorage)
+        
+        ticks = 0
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        ticking = asyncio.ensure_future(ticker())
+        await manager.create_task({"title": "Slow", "description": "Slow write"})
+        ticking.cancel()
+        assert ticks >= 5
+        await manager.close()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_updates_are_not_lost(self, task_manager):
+        """Test that concurrent read-modify-write updates of one task all apply."""
+        task = await task_manager.create_task({"title": "Epic", "description": "Generated epic"})
+        await asyncio.gather(*[
+            task_manager.add_subtask(task.id, {"title": f"Step {i}"}) for i in range(20)
+        ])
+        assert len((await task_manager.get_task(task.id)).subtasks) == 20
+        
+        # Plain updates and reference edits interleave with subtask edits
+        ref = {"requirement_id": "req-1", "source": "telos", "requirement_type": "functional", "title": "Req"}
+        await asyncio.gather(*[
+            operation
+            for i in range(20)
+            for operation in (
+                task_manager.add_subtask(task.id, {"title": f"More {i}"}),
+                task_manager.add_requirement_ref(task.id, ref),
+                task_manager.update_task(task.id, {"title": f"Epic {i}"}),
+            )
+        ])
+        stored = await task_manager.get_task(task.id)
+        assert len(stored.subtasks) == 40 and len(stored.requirement_refs) == 20
+        assert stored.title.startswith("Epic ")
+    
+    def test_native_async_storage_is_used_directly(self):
+        """Test that a storage with coroutine methods is not wrapped."""
+        class NativeStorage:
+            is_async = True
+            is_persistent = True
+        
+        storage = NativeStorage()
+        assert as_async_storage(storage) is storage
+        assert TaskManager(storage).async_storage is storage